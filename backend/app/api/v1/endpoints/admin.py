@@ -3,14 +3,14 @@
 # ===========================================
 
 from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import logging
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_pool_status
 from app.core.dependencies import get_current_user, require_admin
 from app.models.user import User
-from app.services.dashboard import DashboardService
+from app.services.dashboard import AsyncDashboardService
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +22,12 @@ router = APIRouter()
 
 @router.get("/dashboard")
 async def get_admin_dashboard(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Obter dados do dashboard administrativo."""
     try:
-        dashboard_data = DashboardService.get_admin_dashboard_data(db)
+        dashboard_data = await AsyncDashboardService.get_admin_dashboard_data(db)
         return dashboard_data
     except Exception as e:
         logger.error(f"Erro ao obter dashboard admin: {e}")
@@ -233,12 +233,12 @@ async def create_backup():
 
 @router.get("/statistics")
 async def get_system_statistics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Obter estatísticas do sistema."""
     try:
-        metrics_data = DashboardService.get_system_metrics(db)
+        metrics_data = await AsyncDashboardService.get_system_metrics(db)
         return {
             "metrics": metrics_data,
             "database": {
@@ -264,8 +264,16 @@ async def get_system_statistics(
             detail="Erro interno do servidor"
         )
 
-
-
-
-
-
+@router.get("/database/pool")
+async def get_database_pool_metrics(
+    current_user: User = Depends(require_admin)
+):
+    """Obter saturação e eventos dos pools de conexão do worker atual."""
+    try:
+        return get_pool_status()
+    except Exception as e:
+        logger.error(f"Erro ao obter métricas do pool: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro interno do servidor"
+        )
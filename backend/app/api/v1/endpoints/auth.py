@@ -4,14 +4,17 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 import logging
 import traceback
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.dependencies import get_current_user
+from app.core.principal_cache import invalidate_principal
 from app.schemas.auth import LoginResponse, RefreshTokenRequest, TwoFactorVerify
 from app.schemas.user import UserCreate, UserLogin, UserProfile
 from app.services.auth import AuthService
@@ -44,16 +47,21 @@ except (ImportError, Exception) as e:
 async def login(
     request: Request,
     login_data: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Login do usuário - SEM VALIDAÇÃO DE SENHA.
+    Login do usuário.
     
-    Retorna tokens de acesso e refresh.
+    A senha só é validada com LOGIN_VERIFY_PASSWORD=true (o padrão é o modo
+    de demonstração, sem validação). Retorna tokens de acesso e refresh.
     """
     try:
-        # Buscar usuário por email (sem validar senha)
-        user = db.query(User).filter(User.email == login_data.email).first()
+        # Buscar usuário por email (sessão assíncrona: com o pool esgotado,
+        # a espera por conexão não trava o event loop)
+        result = await db.execute(select(User).where(User.email == login_data.email))
+        user = result.scalar_one_or_none()
+        # Devolver a conexão ao pool antes da verificação de senha
+        await db.close()
         
         if not user:
             raise HTTPException(
@@ -67,7 +75,16 @@ async def login(
                 detail="Usuário inativo"
             )
         
-        # Criar token sem validar senha
+        # Verificação de senha fora do event loop (executor limitado)
+        if settings.LOGIN_VERIFY_PASSWORD and not await AuthService.verify_password_async(
+            login_data.password, user.hashed_password
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Email ou senha incorretos"
+            )
+        
+        # Criar tokens
         # O campo 'sub' deve ser string para a biblioteca jose JWT
         access_token = AuthService.create_access_token(data={"sub": str(user.id), "email": user.email})
         refresh_token = AuthService.create_refresh_token(data={"sub": str(user.id), "email": user.email})
@@ -175,7 +192,7 @@ async def register(
             )
         
         # Criar usuário
-        hashed_password = AuthService.get_password_hash(user_data.password)
+        hashed_password = await AuthService.get_password_hash_async(user_data.password)
         
         # Converter role string para enum
         from app.models.user import UserRole
@@ -279,7 +296,8 @@ async def setup_2fa(
     Gera QR code para configurar 2FA.
     """
     try:
-        return AuthService.setup_2fa(db, current_user)
+        user = db.get(User, current_user.id)
+        return AuthService.setup_2fa(db, user)
         
     except HTTPException:
         raise
@@ -300,7 +318,9 @@ async def enable_2fa(
     Habilitar 2FA após verificação do código.
     """
     try:
-        AuthService.enable_2fa(db, current_user, verify_data.code)
+        user = db.get(User, current_user.id)
+        AuthService.enable_2fa(db, user, verify_data.code)
+        await invalidate_principal(current_user.id)
         return {"message": "2FA habilitado com sucesso"}
         
     except HTTPException:
@@ -322,7 +342,9 @@ async def disable_2fa(
     Desabilitar 2FA.
     """
     try:
-        AuthService.disable_2fa(db, current_user, verify_data.code)
+        user = db.get(User, current_user.id)
+        AuthService.disable_2fa(db, user, verify_data.code)
+        await invalidate_principal(current_user.id)
         return {"message": "2FA desabilitado com sucesso"}
         
     except HTTPException:
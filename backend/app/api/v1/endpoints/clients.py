@@ -0,0 +1,41 @@
+# ===========================================
+# ENDPOINTS DE CLIENTES
+# ===========================================
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.services.clients import ClientService
+
+router = APIRouter()
+
+@router.get("/")
+async def list_clients(
+    q: Optional[str] = Query(None, description="CPF/CNPJ ou início do nome"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Listar clientes com número de processos, precatórios e receita."""
+    clients = ClientService.search(db, q, skip=skip, limit=limit)
+    return {"clients": clients, "skip": skip, "limit": limit}
+
+@router.get("/{client_id}")
+async def get_client(
+    client_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Obter cliente com seus agregados."""
+    client = ClientService.get_client(db, client_id)
+    if not client:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cliente não encontrado"
+        )
+    return client
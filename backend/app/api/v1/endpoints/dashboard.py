@@ -3,18 +3,20 @@
 # ===========================================
 
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-from typing import Optional
 import logging
-from datetime import datetime, timedelta
 
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
-from app.models.process import Process, ProcessStatus
-from app.models.task import Task, TaskStatus, TaskPriority
-from app.models.user import User, UserRole
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.dependencies import get_current_user, get_stream_user
+from app.models.process import Process
+from app.models.task import Task
+from app.models.user import User
 from app.models.timeline import TimelineEvent
+from app.services.dashboard import DashboardService
+from app.services.auth import AuthService
+from app.services.dashboard_feed import dashboard_feed
 
 logger = logging.getLogger(__name__)
 
@@ -32,68 +34,12 @@ async def test_dashboard():
 
 @router.get("/stats")
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter estatísticas gerais do dashboard baseado em dados reais."""
     try:
-        # Total de processos
-        total_processes = db.query(func.count(Process.id)).scalar()
-        
-        # Processos ativos
-        active_processes = db.query(func.count(Process.id)).filter(
-            Process.status == ProcessStatus.ACTIVE
-        ).scalar()
-        
-        # Tarefas concluídas
-        completed_tasks = db.query(func.count(Task.id)).filter(
-            Task.status == TaskStatus.COMPLETED
-        ).scalar()
-        
-        # Tempo médio de processos (em dias)
-        avg_process_time = db.query(
-            func.avg(
-                func.extract('epoch', Process.updated_at - Process.created_at) / 86400
-            )
-        ).filter(
-            Process.status == ProcessStatus.COMPLETED
-        ).scalar()
-        average_time = float(avg_process_time) if avg_process_time else 0.0
-        
-        # Receita total
-        total_revenue = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            Process.actual_value.isnot(None)
-        ).scalar()
-        total_revenue = float(total_revenue) if total_revenue else 0.0
-        
-        # Tarefas pendentes
-        pending_tasks = db.query(func.count(Task.id)).filter(
-            Task.status == TaskStatus.TODO
-        ).scalar()
-        
-        # Tarefas atrasadas (vencidas)
-        overdue_tasks = db.query(func.count(Task.id)).filter(
-            and_(
-                Task.due_date < datetime.now(),
-                Task.status != TaskStatus.COMPLETED
-            )
-        ).scalar()
-        
-        # Membros da equipe
-        team_members = db.query(func.count(User.id)).filter(
-            User.role != UserRole.ADMIN
-        ).scalar()
-        
-        return {
-            "totalProcesses": total_processes,
-            "activeProcesses": active_processes,
-            "completedTasks": completed_tasks,
-            "averageTime": round(average_time, 1),
-            "totalRevenue": total_revenue,
-            "pendingTasks": pending_tasks,
-            "overdueTasks": overdue_tasks,
-            "teamMembers": team_members
-        }
+        return DashboardService.get_stats(db)
     except Exception as e:
         logger.error(f"Erro ao calcular estatísticas do dashboard: {e}")
         raise HTTPException(
@@ -105,7 +51,7 @@ async def get_dashboard_stats(
 @router.get("/recent-activity")
 async def get_recent_activity(
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter atividades recentes baseado em dados reais."""
@@ -155,7 +101,7 @@ async def get_recent_activity(
 @router.get("/processes")
 async def get_process_summary(
     limit: int = 5,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter resumo de processos baseado em dados reais."""
@@ -189,7 +135,7 @@ async def get_process_summary(
 @router.get("/tasks")
 async def get_task_summary(
     limit: int = 5,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter resumo de tarefas baseado em dados reais."""
@@ -222,80 +168,12 @@ async def get_task_summary(
 
 @router.get("/performance")
 async def get_performance_metrics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter métricas de performance baseado em dados reais."""
     try:
-        # Taxa de conclusão de processos
-        total_processes = db.query(func.count(Process.id)).scalar()
-        completed_processes = db.query(func.count(Process.id)).filter(
-            Process.status == ProcessStatus.COMPLETED
-        ).scalar()
-        process_completion_rate = (completed_processes / total_processes * 100) if total_processes > 0 else 0
-        
-        # Taxa de conclusão de tarefas
-        total_tasks = db.query(func.count(Task.id)).scalar()
-        completed_tasks = db.query(func.count(Task.id)).filter(
-            Task.status == TaskStatus.COMPLETED
-        ).scalar()
-        task_completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        
-        # Tempo médio de processo
-        avg_process_time = db.query(
-            func.avg(
-                func.extract('epoch', Process.updated_at - Process.created_at) / 86400
-            )
-        ).filter(
-            Process.status == ProcessStatus.COMPLETED
-        ).scalar()
-        average_process_time = float(avg_process_time) if avg_process_time else 0.0
-        
-        # Tempo médio de tarefa
-        avg_task_time = db.query(
-            func.avg(
-                func.extract('epoch', Task.completed_at - Task.created_at) / 86400
-            )
-        ).filter(
-            Task.status == TaskStatus.COMPLETED,
-            Task.completed_at.isnot(None)
-        ).scalar()
-        average_task_time = float(avg_task_time) if avg_task_time else 0.0
-        
-        # Crescimento de receita (últimos 30 dias vs mês anterior)
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        sixty_days_ago = datetime.now() - timedelta(days=60)
-        
-        current_revenue = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.updated_at >= thirty_days_ago
-            )
-        ).scalar()
-        
-        previous_revenue = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.updated_at >= sixty_days_ago,
-                Process.updated_at < thirty_days_ago
-            )
-        ).scalar()
-        
-        revenue_growth = 0.0
-        if previous_revenue and previous_revenue > 0:
-            revenue_growth = ((float(current_revenue) - float(previous_revenue)) / float(previous_revenue)) * 100
-        
-        # Satisfação do cliente (simulado baseado em processos completados)
-        client_satisfaction = min(95, max(70, process_completion_rate + 10))
-        
-        return {
-            "processCompletionRate": round(process_completion_rate, 1),
-            "taskCompletionRate": round(task_completion_rate, 1),
-            "averageProcessTime": round(average_process_time, 1),
-            "averageTaskTime": round(average_task_time, 1),
-            "revenueGrowth": round(revenue_growth, 1),
-            "clientSatisfaction": round(client_satisfaction, 1)
-        }
+        return DashboardService.get_performance(db)
     except Exception as e:
         logger.error(f"Erro ao calcular métricas de performance: {e}")
         raise HTTPException(
@@ -306,45 +184,12 @@ async def get_performance_metrics(
 
 @router.get("/alerts")
 async def get_alerts(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter alertas baseado em dados reais."""
     try:
-        # Tarefas urgentes (alta prioridade e próximas do vencimento)
-        urgent_tasks = db.query(func.count(Task.id)).filter(
-            and_(
-                Task.priority == TaskPriority.URGENT,
-                Task.due_date <= datetime.now() + timedelta(days=1),
-                Task.status != TaskStatus.COMPLETED
-            )
-        ).scalar() or 0
-        
-        # Tarefas atrasadas
-        overdue_tasks = db.query(func.count(Task.id)).filter(
-            and_(
-                Task.due_date < datetime.now(),
-                Task.status != TaskStatus.COMPLETED
-            )
-        ).scalar() or 0
-        
-        # Processos próximos do vencimento
-        warning_processes = db.query(func.count(Process.id)).filter(
-            and_(
-                Process.expected_end_date <= datetime.now() + timedelta(days=7),
-                Process.status == ProcessStatus.ACTIVE
-            )
-        ).scalar() or 0
-        
-        # Notificações não lidas (simulado - sem consulta complexa)
-        unread_notifications = 0
-        
-        return {
-            "urgent": urgent_tasks,
-            "warnings": overdue_tasks + warning_processes,
-            "info": unread_notifications,
-            "total": urgent_tasks + overdue_tasks + warning_processes + unread_notifications
-        }
+        return DashboardService.get_alerts(db)
     except Exception as e:
         logger.error(f"Erro ao calcular alertas: {e}")
         # Retornar dados padrão em caso de erro
@@ -354,3 +199,47 @@ async def get_alerts(
             "info": 0,
             "total": 0
         }
+
+
+@router.post("/stream-token")
+async def create_stream_token(
+    current_user: User = Depends(get_current_user)
+):
+    """Token curto para abrir /dashboard/stream com EventSource (?token=...)."""
+    return {
+        "token": AuthService.create_stream_token({"sub": str(current_user.id), "email": current_user.email}),
+        "expires_in": settings.DASHBOARD_STREAM_TOKEN_SECONDS
+    }
+
+
+@router.get("/stream")
+async def stream_dashboard(
+    current_user: User = Depends(get_stream_user)
+):
+    """
+    Feed SSE das métricas do dashboard (stats, alerts, performance e financial).
+
+    Envia o retrato completo ao conectar (evento "snapshot") e depois só as
+    métricas que mudaram (evento "delta"), calculadas uma vez para todos os
+    assinantes. Substitui a consulta periódica dos endpoints individuais.
+    Autenticação pelo token de /dashboard/stream-token na query string, já
+    que EventSource não envia cabeçalhos; reconexões pedem um token novo.
+    """
+    if not settings.DASHBOARD_FEED_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Feed do dashboard desabilitado"
+        )
+    try:
+        queue, version, snapshot = await dashboard_feed.subscribe()
+    except Exception as e:
+        logger.error(f"Erro ao iniciar o feed do dashboard: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro interno do servidor"
+        )
+    return StreamingResponse(
+        dashboard_feed.events(queue, version, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
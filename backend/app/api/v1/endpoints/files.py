@@ -5,17 +5,18 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form
 from fastapi.responses import FileResponse as FastAPIFileResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import aiofiles
 import os
 import hashlib
 from datetime import datetime
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_async_db, get_current_user
+from app.core.pagination import PaginationError
 from app.models.user import User
 from app.models.file import FileType
 from app.schemas.file import FileCreate, FileResponse, FileList
-from app.services.file import FileService
+from app.services.file import AsyncFileService
 
 router = APIRouter()
 
@@ -30,7 +31,7 @@ async def upload_file(
     description: Optional[str] = Form(None),
     process_id: Optional[int] = Form(None),
     file_type: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Upload de arquivo."""
@@ -71,15 +72,15 @@ async def upload_file(
             process_id=process_id
         )
         
-        file_record = FileService.create_file(db, file_data, current_user.id)
+        file_record = await AsyncFileService.create_file(db, file_data, current_user.id)
         
         # Atualizar hashes
         file_record.hash_md5 = hash_md5
         file_record.hash_sha256 = hash_sha256
         file_record.file_path = file_path
         
-        db.commit()
-        db.refresh(file_record)
+        await db.commit()
+        await db.refresh(file_record)
         
         return file_record
         
@@ -96,24 +97,25 @@ async def get_files(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     process_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter lista de arquivos."""
     try:
-        if process_id:
-            files = FileService.get_process_files(db, process_id, skip, limit)
-        else:
-            files = FileService.get_files(db, skip, limit)
-        
-        total = len(files)
+        page = await AsyncFileService.get_files_page(
+            db, limit, cursor=cursor, skip=skip, process_id=process_id, include_total=include_total
+        )
         
         return FileList(
-            files=files,
-            total=total,
+            files=page.items,
+            **page.metadata(),
             page=skip // limit + 1,
             per_page=limit
         )
+    except PaginationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -123,12 +125,12 @@ async def get_files(
 @router.get("/{file_id}", response_model=FileResponse)
 async def get_file(
     file_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter arquivo por ID."""
     try:
-        file_record = FileService.get_file_by_id(db, file_id)
+        file_record = await AsyncFileService.get_file_by_id(db, file_id)
         if not file_record:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -146,12 +148,12 @@ async def get_file(
 @router.get("/{file_id}/download")
 async def download_file(
     file_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Download de arquivo."""
     try:
-        file_record = FileService.get_file_by_id(db, file_id)
+        file_record = await AsyncFileService.get_file_by_id(db, file_id)
         if not file_record:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -182,12 +184,12 @@ async def download_file(
 @router.delete("/{file_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_file(
     file_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Deletar arquivo."""
     try:
-        file_record = FileService.get_file_by_id(db, file_id)
+        file_record = await AsyncFileService.get_file_by_id(db, file_id)
         if not file_record:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -199,7 +201,7 @@ async def delete_file(
             os.remove(file_record.file_path)
         
         # Deletar registro no banco
-        success = FileService.delete_file(db, file_id)
+        success = await AsyncFileService.delete_file(db, file_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -2,20 +2,41 @@
 # ENDPOINTS FINANCEIROS
 # ===========================================
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import case, func
 from typing import Optional
 import logging
-from datetime import datetime, timedelta
-
-from app.core.database import get_db
-from app.models.process import Process, ProcessStatus
+from datetime import datetime
+
+from app.api.v1.endpoints.reports import parse_period
+from app.core.database import get_read_db, sum_where
+from app.core.dependencies import get_async_db, get_current_user
+from app.models.client import Client
+from app.models.ledger import LedgerEntry, LedgerEntryType
+from app.models.payment import PaymentStatus
+from app.models.process import Process
+from app.models.user import User
+from app.schemas.payment import PaymentCreate
+from app.services.financial_analytics import FinancialAnalyticsService, current_period
+from app.services.ledger import LedgerService
+from app.services.payment import AsyncPaymentService, serialize_payment
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _parse_payment_status(value: str) -> PaymentStatus:
+    try:
+        return PaymentStatus(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Status de pagamento inválido: {value}"
+        )
+
 # ===========================================
 # ENDPOINTS
 # ===========================================
@@ -24,61 +45,24 @@ router = APIRouter()
 async def get_payments(
     skip: int = 0,
     limit: int = 100,
-    status: Optional[str] = None,
-    user_id: Optional[int] = None
+    payment_status: Optional[str] = Query(None, alias="status"),
+    user_id: Optional[int] = None,
+    process_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Listar pagamentos com filtros."""
+    parsed_status = _parse_payment_status(payment_status) if payment_status else None
     try:
-        # TODO: Implementar listagem real de pagamentos
+        payments, totals = await AsyncPaymentService.get_payments(
+            db, skip=skip, limit=limit, status=parsed_status, user_id=user_id, process_id=process_id
+        )
         return {
-            "payments": [
-                {
-                    "id": 1,
-                    "user": {
-                        "id": 1,
-                        "name": "João Calculista",
-                        "email": "joao@example.com"
-                    },
-                    "task": {
-                        "id": 1,
-                        "title": "Cálculo de Pensão Alimentícia"
-                    },
-                    "amount": 150.00,
-                    "currency": "BRL",
-                    "status": "pago",
-                    "payment_date": "2024-01-01T12:00:00Z",
-                    "due_date": "2024-01-15T23:59:59Z",
-                    "created_at": "2024-01-01T00:00:00Z"
-                },
-                {
-                    "id": 2,
-                    "user": {
-                        "id": 2,
-                        "name": "Maria Calculista",
-                        "email": "maria@example.com"
-                    },
-                    "task": {
-                        "id": 2,
-                        "title": "Cálculo de Danos Morais"
-                    },
-                    "amount": 200.00,
-                    "currency": "BRL",
-                    "status": "pendente",
-                    "due_date": "2024-01-20T23:59:59Z",
-                    "created_at": "2024-01-02T00:00:00Z"
-                }
-            ],
-            "total": 2,
+            "payments": [serialize_payment(payment) for payment in payments],
+            "total": totals["total"],
             "skip": skip,
             "limit": limit,
-            "summary": {
-                "total_amount": 350.00,
-                "paid_amount": 150.00,
-                "pending_amount": 200.00,
-                "total_payments": 2,
-                "paid_payments": 1,
-                "pending_payments": 1
-            }
+            "summary": totals["summary"]
         }
     except Exception as e:
         logger.error(f"Erro ao listar pagamentos: {e}")
@@ -88,167 +72,111 @@ async def get_payments(
         )
 
 @router.get("/payments/{payment_id}")
-async def get_payment(payment_id: int):
+async def get_payment(
+    payment_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Obter pagamento por ID."""
-    try:
-        # TODO: Implementar obtenção real de pagamento
-        if payment_id == 1:
-            return {
-                "id": 1,
-                "user": {
-                    "id": 1,
-                    "name": "João Calculista",
-                    "email": "joao@example.com"
-                },
-                "task": {
-                    "id": 1,
-                    "title": "Cálculo de Pensão Alimentícia",
-                    "cnj_number": "0000001-23.2024.8.26.0100"
-                },
-                "amount": 150.00,
-                "currency": "BRL",
-                "status": "pago",
-                "payment_date": "2024-01-01T12:00:00Z",
-                "due_date": "2024-01-15T23:59:59Z",
-                "payment_method": "transferência",
-                "transaction_id": "TXN123456789",
-                "notes": "Pagamento realizado via transferência bancária",
-                "created_at": "2024-01-01T00:00:00Z",
-                "updated_at": "2024-01-01T12:00:00Z"
-            }
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Pagamento não encontrado"
-            )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Erro ao obter pagamento {payment_id}: {e}")
+    payment = await AsyncPaymentService.get_payment_by_id(db, payment_id)
+    if not payment:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Erro interno do servidor"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pagamento não encontrado"
         )
+    return serialize_payment(payment)
 
-@router.post("/payments")
-async def create_payment():
-    """Criar novo pagamento."""
+@router.post("/payments", status_code=status.HTTP_201_CREATED)
+async def create_payment(
+    payment_data: PaymentCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Registrar pagamento (pagamentos pagos entram no livro-razão)."""
     try:
-        # TODO: Implementar criação real de pagamento
-        return {
-            "id": 3,
-            "amount": 175.00,
-            "status": "pendente",
-            "message": "Pagamento criado com sucesso"
-        }
-    except Exception as e:
-        logger.error(f"Erro ao criar pagamento: {e}")
+        payment = await AsyncPaymentService.create_payment(db, payment_data, current_user.id)
+        return {**serialize_payment(payment), "message": "Pagamento criado com sucesso"}
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Erro interno do servidor"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Processo, tarefa ou usuário do pagamento não encontrado"
         )
 
 @router.put("/payments/{payment_id}/status")
-async def update_payment_status(payment_id: int, status: str):
+async def update_payment_status(
+    payment_id: int,
+    payment_status: str = Query(..., alias="status"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Atualizar status do pagamento."""
+    payment = await AsyncPaymentService.update_status(db, payment_id, _parse_payment_status(payment_status))
+    if not payment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pagamento não encontrado"
+        )
+    return {
+        "payment_id": payment.id,
+        "status": payment.status.value,
+        "message": "Status atualizado com sucesso"
+    }
+
+@router.get("/ledger")
+def get_ledger(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    entry_type: Optional[str] = None,
+    category: Optional[str] = None,
+    client_id: Optional[int] = None,
+    client_name: Optional[str] = None,
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Lançamentos do livro-razão por período, categoria e cliente."""
+    start, end = parse_period(start_date, end_date)
     try:
-        # TODO: Implementar atualização real de status
-        return {
-            "payment_id": payment_id,
-            "status": status,
-            "message": "Status atualizado com sucesso"
-        }
-    except Exception as e:
-        logger.error(f"Erro ao atualizar status do pagamento {payment_id}: {e}")
+        ledger_type = LedgerEntryType(entry_type) if entry_type else None
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Erro interno do servidor"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de lançamento inválido: {entry_type}"
         )
-
+    entries = LedgerService.get_entries(
+        db, start=start, end=end, entry_type=ledger_type, category=category,
+        client_id=client_id, client_name=client_name, skip=skip, limit=limit
+    )
+    return {
+        "entries": [
+            {
+                "id": entry.id,
+                "date": entry.entry_date.isoformat(),
+                "type": entry.entry_type.value,
+                "amount": float(entry.amount),
+                "cases": entry.cases,
+                "currency": entry.currency,
+                "category": entry.category,
+                "client_id": entry.client_id,
+                "client": entry.client_name,
+                "process_id": entry.process_id,
+                "payment_id": entry.payment_id,
+                "description": entry.description
+            }
+            for entry in entries
+        ],
+        "skip": skip,
+        "limit": limit
+    }
 
 @router.get("/summary")
-async def get_financial_summary(db: Session = Depends(get_db)):
+async def get_financial_summary(db: Session = Depends(get_read_db)):
     """Obter resumo financeiro baseado em dados reais."""
     try:
-        # Calcular receita total (soma dos valores reais dos processos)
-        total_revenue_result = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            Process.actual_value.isnot(None)
-        ).scalar()
-        total_revenue = float(total_revenue_result) if total_revenue_result else 0.0
-
-        # Calcular receita mensal (últimos 30 dias)
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        monthly_revenue_result = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.updated_at >= thirty_days_ago
-            )
-        ).scalar()
-        monthly_revenue = float(monthly_revenue_result) if monthly_revenue_result else 0.0
-
-        # Calcular crescimento (comparar com mês anterior)
-        sixty_days_ago = datetime.now() - timedelta(days=60)
-        previous_month_revenue_result = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.updated_at >= sixty_days_ago,
-                Process.updated_at < thirty_days_ago
-            )
-        ).scalar()
-        previous_month_revenue = float(previous_month_revenue_result) if previous_month_revenue_result else 0.0
-
-        growth_rate = 0.0
-        if previous_month_revenue > 0:
-            growth_rate = ((monthly_revenue - previous_month_revenue) / previous_month_revenue) * 100
-
-        # Calcular ticket médio
-        process_count = db.query(func.count(Process.id)).filter(
-            Process.actual_value.isnot(None)
-        ).scalar()
-        average_ticket = total_revenue / process_count if process_count > 0 else 0.0
-
-        # Contar clientes únicos
-        total_clients = db.query(func.count(func.distinct(Process.client_name))).scalar()
-        active_clients = db.query(func.count(func.distinct(Process.client_name))).filter(
-            Process.status == ProcessStatus.ACTIVE
-        ).scalar()
-
-        # Calcular pagamentos (simulado baseado em status dos processos)
-        paid_payments = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.status == ProcessStatus.COMPLETED
-            )
-        ).scalar()
-        paid_payments = float(paid_payments) if paid_payments else 0.0
-
-        pending_payments = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.status == ProcessStatus.ACTIVE
-            )
-        ).scalar()
-        pending_payments = float(pending_payments) if pending_payments else 0.0
-
-        overdue_payments = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.status == ProcessStatus.PAUSED
-            )
-        ).scalar()
-        overdue_payments = float(overdue_payments) if overdue_payments else 0.0
-
-        return {
-            "totalRevenue": total_revenue,
-            "monthlyRevenue": monthly_revenue,
-            "growthRate": round(growth_rate, 2),
-            "averageTicket": round(average_ticket, 2),
-            "totalClients": total_clients,
-            "activeClients": active_clients,
-            "pendingPayments": pending_payments,
-            "paidPayments": paid_payments,
-            "overduePayments": overdue_payments
-        }
+        snapshot = await FinancialAnalyticsService.get_snapshot(db, current_period())
+        return FinancialAnalyticsService.summary(snapshot)
     except Exception as e:
         logger.error(f"Erro ao calcular resumo financeiro: {e}")
         raise HTTPException(
@@ -257,32 +185,23 @@ async def get_financial_summary(db: Session = Depends(get_db)):
         )
 
 @router.get("/revenue-by-area")
-async def get_revenue_by_area(db: Session = Depends(get_db)):
+async def get_revenue_by_area(db: Session = Depends(get_read_db)):
     """Obter receitas por área jurídica baseado em dados reais."""
     try:
-        # Buscar receitas por categoria
-        revenue_by_category = db.query(
-            Process.category,
-            func.coalesce(func.sum(Process.actual_value), 0).label('revenue'),
-            func.count(Process.id).label('cases')
-        ).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.category.isnot(None)
-            )
-        ).group_by(Process.category).all()
+        snapshot = await FinancialAnalyticsService.get_snapshot(db, current_period())
+        areas = snapshot["by_area"]
 
         # Calcular total para percentuais
-        total_revenue = sum(float(item.revenue) for item in revenue_by_category)
+        total_revenue = sum(item["revenue"] for item in areas)
 
         result = []
-        for item in revenue_by_category:
-            percentage = (float(item.revenue) / total_revenue * 100) if total_revenue > 0 else 0
+        for item in areas:
+            percentage = (item["revenue"] / total_revenue * 100) if total_revenue > 0 else 0
             result.append({
-                "area": item.category or "Não categorizado",
-                "revenue": float(item.revenue),
+                "area": item["area"] or "Não categorizado",
+                "revenue": item["revenue"],
                 "percentage": round(percentage, 1),
-                "cases": item.cases
+                "cases": item["cases"]
             })
 
         return result
@@ -294,38 +213,19 @@ async def get_revenue_by_area(db: Session = Depends(get_db)):
         )
 
 @router.get("/monthly-trends")
-async def get_monthly_trends(db: Session = Depends(get_db)):
+async def get_monthly_trends(db: Session = Depends(get_read_db)):
     """Obter tendências mensais baseado em dados reais."""
     try:
-        # Buscar dados dos últimos 6 meses
-        trends = []
-        for i in range(6):
-            month_start = datetime.now().replace(day=1) - timedelta(days=30*i)
-            month_end = month_start + timedelta(days=30)
-            
-            month_revenue = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-                and_(
-                    Process.actual_value.isnot(None),
-                    Process.updated_at >= month_start,
-                    Process.updated_at < month_end
-                )
-            ).scalar()
-            
-            month_cases = db.query(func.count(Process.id)).filter(
-                and_(
-                    Process.actual_value.isnot(None),
-                    Process.updated_at >= month_start,
-                    Process.updated_at < month_end
-                )
-            ).scalar()
-
-            trends.append({
-                "month": month_start.strftime("%b"),
-                "revenue": float(month_revenue) if month_revenue else 0.0,
-                "cases": month_cases or 0
-            })
-
-        return list(reversed(trends))
+        # Últimos 6 meses-calendário, do mais antigo ao atual
+        snapshot = await FinancialAnalyticsService.get_snapshot(db, current_period())
+        return [
+            {
+                "month": datetime.strptime(item["month"], "%Y-%m").strftime("%b"),
+                "revenue": item["revenue"],
+                "cases": item["cases"]
+            }
+            for item in snapshot["monthly"]
+        ]
     except Exception as e:
         logger.error(f"Erro ao calcular tendências mensais: {e}")
         raise HTTPException(
@@ -334,18 +234,25 @@ async def get_monthly_trends(db: Session = Depends(get_db)):
         )
 
 @router.get("/top-clients")
-async def get_top_clients(db: Session = Depends(get_db)):
-    """Obter top clientes por receita baseado em dados reais."""
+def get_top_clients(db: Session = Depends(get_read_db)):
+    """Obter top clientes por receita baseado em dados reais (sessão síncrona: roda no threadpool)."""
     try:
+        # Receita e casos pelo livro-razão, agrupados pela FK do cliente;
+        # último pagamento = lançamento PAYMENT mais recente
+        dialect_name = db.get_bind().dialect.name
+        is_revenue = LedgerEntry.entry_type == LedgerEntryType.REVENUE
+        revenue = func.coalesce(sum_where(LedgerEntry.amount, is_revenue, dialect_name), 0).label('revenue')
         top_clients = db.query(
-            Process.client_name,
-            func.coalesce(func.sum(Process.actual_value), 0).label('revenue'),
-            func.count(Process.id).label('cases'),
-            func.max(Process.updated_at).label('last_payment')
-        ).filter(
-            Process.actual_value.isnot(None)
-        ).group_by(Process.client_name).order_by(
-            func.sum(Process.actual_value).desc()
+            Client.name.label('client_name'),
+            revenue,
+            func.coalesce(sum_where(LedgerEntry.cases, is_revenue, dialect_name), 0).label('cases'),
+            func.max(case(
+                (LedgerEntry.entry_type == LedgerEntryType.PAYMENT, LedgerEntry.entry_date)
+            )).label('last_payment')
+        ).select_from(LedgerEntry).join(
+            Client, Client.id == LedgerEntry.client_id
+        ).group_by(LedgerEntry.client_id, Client.name).order_by(
+            revenue.desc()
         ).limit(5).all()
 
         result = []
@@ -366,32 +273,15 @@ async def get_top_clients(db: Session = Depends(get_db)):
         )
 
 @router.get("/insights")
-async def get_financial_insights(db: Session = Depends(get_db)):
+async def get_financial_insights(db: Session = Depends(get_read_db)):
     """Gerar insights financeiros baseado em dados reais."""
     try:
         insights = []
+        snapshot = await FinancialAnalyticsService.get_snapshot(db, current_period())
         
-        # Calcular crescimento
-        current_month = datetime.now().replace(day=1)
-        last_month = (current_month - timedelta(days=1)).replace(day=1)
-        
-        current_revenue = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.updated_at >= current_month
-            )
-        ).scalar()
-        
-        last_revenue = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.updated_at >= last_month,
-                Process.updated_at < current_month
-            )
-        ).scalar()
-        
-        if last_revenue and last_revenue > 0:
-            growth = ((float(current_revenue) - float(last_revenue)) / float(last_revenue)) * 100
+        # Crescimento do mês atual sobre o anterior
+        growth = snapshot["growth_rate"]
+        if growth is not None:
             if growth > 0:
                 insights.append({
                     "type": "success",
@@ -410,33 +300,24 @@ async def get_financial_insights(db: Session = Depends(get_db)):
                 })
 
         # Verificar pagamentos pendentes
-        pending_amount = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
-            and_(
-                Process.actual_value.isnot(None),
-                Process.status == ProcessStatus.ACTIVE
-            )
-        ).scalar()
-        
-        if pending_amount and float(pending_amount) > 0:
+        pending_amount = snapshot["payments"]["pending"]
+        if pending_amount > 0:
             insights.append({
                 "type": "warning",
                 "title": "Pagamentos Pendentes",
-                "description": f"R$ {float(pending_amount):,.2f} em pagamentos pendentes",
-                "value": f"R$ {float(pending_amount):,.2f}",
+                "description": f"R$ {pending_amount:,.2f} em pagamentos pendentes",
+                "value": f"R$ {pending_amount:,.2f}",
                 "icon": "ClockCircleOutlined"
             })
 
         # Verificar ticket médio
-        avg_ticket = db.query(func.avg(Process.actual_value)).filter(
-            Process.actual_value.isnot(None)
-        ).scalar()
-        
-        if avg_ticket and float(avg_ticket) > 5000:
+        avg_ticket = snapshot["average_ticket"]
+        if avg_ticket > 5000:
             insights.append({
                 "type": "info",
                 "title": "Ticket Médio Alto",
-                "description": f"Ticket médio de R$ {float(avg_ticket):,.2f} indica processos de alto valor",
-                "value": f"R$ {float(avg_ticket):,.2f}",
+                "description": f"Ticket médio de R$ {avg_ticket:,.2f} indica processos de alto valor",
+                "value": f"R$ {avg_ticket:,.2f}",
                 "icon": "DollarOutlined"
             })
 
@@ -449,8 +330,8 @@ async def get_financial_insights(db: Session = Depends(get_db)):
         )
 
 @router.get("/processes")
-async def get_processes_financial(db: Session = Depends(get_db)):
-    """Obter processos com dados financeiros."""
+def get_processes_financial(db: Session = Depends(get_read_db)):
+    """Obter processos com dados financeiros (sessão síncrona: roda no threadpool)."""
     try:
         processes = db.query(Process).filter(
             Process.actual_value.isnot(None)
@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException, Depends, Query, status
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+from app.core.database import get_read_db
 from app.core.dependencies import get_db, get_current_user
 from app.models.user import User
 from app.models.funnel import (
@@ -436,7 +437,7 @@ async def move_process_stage(
 @router.get("/funnels/{funnel_id}/analytics", response_model=FunnelAnalytics)
 async def get_funnel_analytics(
     funnel_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter analytics de um funil."""
@@ -4,12 +4,12 @@
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_async_db, get_current_user
 from app.models.user import User
 from app.schemas.notification import NotificationResponse, NotificationList
-from app.services.notification import NotificationService
+from app.services.notification import AsyncNotificationService
 
 router = APIRouter()
 
@@ -17,12 +17,12 @@ router = APIRouter()
 async def get_notifications(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter notificações do usuário atual."""
     try:
-        notifications = NotificationService.get_user_notifications(db, current_user.id, skip, limit)
+        notifications = await AsyncNotificationService.get_user_notifications(db, current_user.id, skip, limit)
         total = len(notifications)
         
         return NotificationList(
@@ -40,13 +40,12 @@ async def get_notifications(
 @router.get("/{notification_id}", response_model=NotificationResponse)
 async def get_notification(
     notification_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter notificação por ID."""
     try:
-        notifications = NotificationService.get_user_notifications(db, current_user.id, 0, 1000)
-        notification = next((n for n in notifications if n.id == notification_id), None)
+        notification = await AsyncNotificationService.get_notification(db, notification_id, current_user.id)
         
         if not notification:
             raise HTTPException(
@@ -66,12 +65,12 @@ async def get_notification(
 @router.put("/{notification_id}/read", status_code=status.HTTP_200_OK)
 async def mark_notification_as_read(
     notification_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Marcar notificação como lida."""
     try:
-        success = NotificationService.mark_as_read(db, notification_id, current_user.id)
+        success = await AsyncNotificationService.mark_as_read(db, notification_id, current_user.id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -89,12 +88,12 @@ async def mark_notification_as_read(
 
 @router.put("/read-all", status_code=status.HTTP_200_OK)
 async def mark_all_notifications_as_read(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Marcar todas as notificações como lidas."""
     try:
-        count = NotificationService.mark_all_as_read(db, current_user.id)
+        count = await AsyncNotificationService.mark_all_as_read(db, current_user.id)
         return {"message": f"{count} notificações marcadas como lidas"}
     except Exception as e:
         raise HTTPException(
@@ -106,12 +105,12 @@ async def mark_all_notifications_as_read(
 async def get_unread_notifications(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter apenas notificações não lidas."""
     try:
-        notifications = NotificationService.get_user_notifications(
+        notifications = await AsyncNotificationService.get_user_notifications(
             db, current_user.id, skip, limit, unread_only=True
         )
         total = len(notifications)
@@ -130,12 +129,12 @@ async def get_unread_notifications(
 
 @router.get("/unread/count")
 async def get_unread_count(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter contagem de notificações não lidas."""
     try:
-        count = NotificationService.get_unread_count(db, current_user.id)
+        count = await AsyncNotificationService.get_unread_count(db, current_user.id)
         return {"unread_count": count}
     except Exception as e:
         raise HTTPException(
@@ -146,12 +145,12 @@ async def get_unread_count(
 @router.delete("/{notification_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_notification(
     notification_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Deletar notificação."""
     try:
-        success = NotificationService.delete_notification(db, notification_id, current_user.id)
+        success = await AsyncNotificationService.delete_notification(db, notification_id, current_user.id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1,10 +1,12 @@
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.pagination import KeysetPage, PaginationError, count_rows, paginate_sync
 from app.models import Precatorio, User
 from app.schemas import (
     PrecatorioCreate,
@@ -22,28 +24,31 @@ async def list_precatorios(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     ente_devedor: Optional[str] = None,
-    status: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    include_total: bool = Query(True),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Listar precatórios com paginação básica."""
-    query = db.query(Precatorio)
-
+    """Listar precatórios, dos mais recentes aos mais antigos (cursor; `page` só na primeira página)."""
+    filters = []
     if ente_devedor:
-        query = query.filter(Precatorio.ente_devedor.ilike(f"%{ente_devedor}%"))
-
-    if status:
-        query = query.filter(Precatorio.status == status)
+        filters.append(Precatorio.ente_devedor.ilike(f"%{ente_devedor}%"))
+    if status_filter:
+        filters.append(Precatorio.status == status_filter)
 
-    total = query.count()
-    items = (
-        query.order_by(Precatorio.created_at.desc())
-        .offset((page - 1) * per_page)
-        .limit(per_page)
-        .all()
-    )
+    try:
+        items, next_cursor = paginate_sync(
+            db, select(Precatorio).where(*filters), "-created_at", Precatorio.created_at, Precatorio.id,
+            True, cursor, per_page, skip=(page - 1) * per_page,
+        )
+    except PaginationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return PrecatorioList(items=items, total=total)
+    result = KeysetPage(items, next_cursor)
+    if include_total:
+        result.total, result.total_estimated = count_rows(db, Precatorio, *filters)
+    return PrecatorioList(items=result.items, **result.metadata())
 
 
 @router.get("/{precatorio_id}", response_model=PrecatorioResponse)
@@ -4,12 +4,15 @@
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_async_db, get_current_user
+from app.core.pagination import PaginationError
 from app.models.user import User
 from app.schemas.process import ProcessCreate, ProcessUpdate, ProcessResponse, ProcessList
-from app.services.process import ProcessService
+from app.services.process import AsyncProcessService
+from app.services.process_lookup import ProcessLookupService
+from app.services.process_search import ProcessSearchService
 
 router = APIRouter()
 
@@ -30,11 +33,11 @@ async def test_processes_endpoint():
     }
 
 @router.delete("/test/{process_id}", status_code=status.HTTP_200_OK)
-async def test_delete_process(process_id: int, db: Session = Depends(get_db)):
+async def test_delete_process(process_id: int, db: AsyncSession = Depends(get_async_db)):
     """Endpoint de teste para exclusão sem autenticação."""
     try:
         # Realmente deletar o processo
-        success = ProcessService.delete_process(db, process_id)
+        success = await AsyncProcessService.delete_process(db, process_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -56,12 +59,12 @@ async def test_delete_process(process_id: int, db: Session = Depends(get_db)):
 @router.post("/", response_model=ProcessResponse, status_code=status.HTTP_201_CREATED)
 async def create_process(
     process_data: ProcessCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Criar novo processo."""
     try:
-        process = ProcessService.create_process(db, process_data, current_user.id)
+        process = await AsyncProcessService.create_process(db, process_data, current_user.id)
         return process
     except Exception as e:
         raise HTTPException(
@@ -74,16 +77,18 @@ async def get_processes(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    sort: Optional[str] = Query(None, description="id ou updated_at (prefixo '-' para decrescente)"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Obter lista de processos."""
+    """Obter lista de processos (paginação por cursor; `skip` só na primeira página)."""
     try:
-        # Versão simplificada para debug
-        if search:
-            processes = ProcessService.search_processes(db, search, skip, limit)
-        else:
-            processes = ProcessService.get_processes(db, skip, limit)
+        page = await AsyncProcessService.get_processes_page(
+            db, limit, cursor=cursor, skip=skip, sort=sort, search=search, include_total=include_total
+        )
+        processes = page.items
         
         # Converter para dicionário simples para evitar problemas de serialização
         processes_data = []
@@ -95,6 +100,7 @@ async def get_processes(
                 "process_number": process.process_number,
                 "client_name": process.client_name,
                 "client_document": process.client_document,
+                "client_id": process.client_id,
                 "status": process.status.value if process.status else "draft",
                 "priority": process.priority.value if process.priority else "medium",
                 "estimated_value": float(process.estimated_value) if process.estimated_value else None,
@@ -109,14 +115,14 @@ async def get_processes(
                 "updated_at": process.updated_at.isoformat() if process.updated_at else None
             })
         
-        total = len(processes)
-        
         return {
             "processes": processes_data,
-            "total": total,
+            **page.metadata(),
             "page": skip // limit + 1,
             "per_page": limit
         }
+    except PaginationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -129,35 +135,77 @@ async def get_processes(
 async def get_my_processes(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    sort: Optional[str] = Query(None, description="id ou updated_at (prefixo '-' para decrescente)"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter processos do usuário atual."""
     try:
-        processes = ProcessService.get_user_processes(db, current_user.id, skip, limit)
-        total = len(processes)
+        page = await AsyncProcessService.get_processes_page(
+            db, limit, cursor=cursor, skip=skip, sort=sort, user_id=current_user.id, include_total=include_total
+        )
         
         return ProcessList(
-            processes=processes,
-            total=total,
+            processes=page.items,
+            **page.metadata(),
             page=skip // limit + 1,
             per_page=limit
         )
+    except PaginationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao buscar processos: {str(e)}"
         )
 
+@router.get("/search")
+async def search_processes(
+    q: str = Query(..., min_length=2, max_length=200, description="Termos da busca (título, cliente, categoria e descrição)"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    include_total: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Busca textual de processos, por relevância, com os trechos destacados (<mark>)."""
+    try:
+        return await db.run_sync(
+            lambda session: ProcessSearchService.search(session, q, limit, offset, include_total)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro na busca de processos: {str(e)}"
+        )
+
+@router.get("/typeahead")
+async def typeahead_processes(
+    q: str = Query(..., min_length=3, max_length=100, description="Número CNJ (com ou sem pontuação) ou nome do cliente"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Sugestões por número do processo ou cliente, aproximadas e ordenadas por similaridade."""
+    try:
+        return await db.run_sync(lambda session: ProcessLookupService.typeahead(session, q, limit))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro no typeahead de processos: {str(e)}"
+        )
+
 @router.get("/{process_id}", response_model=ProcessResponse)
 async def get_process(
     process_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter processo por ID."""
     try:
-        process = ProcessService.get_process_by_id(db, process_id)
+        process = await AsyncProcessService.get_process_by_id(db, process_id)
         if not process:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -176,12 +224,12 @@ async def get_process(
 async def update_process(
     process_id: int,
     process_data: ProcessUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Atualizar processo."""
     try:
-        process = ProcessService.update_process(db, process_id, process_data)
+        process = await AsyncProcessService.update_process(db, process_id, process_data)
         if not process:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -199,14 +247,14 @@ async def update_process(
 @router.delete("/{process_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_process(
     process_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Deletar processo."""
     try:
         # Log para debug
         print(f"Tentando deletar processo {process_id}")
         
-        success = ProcessService.delete_process(db, process_id)
+        success = await AsyncProcessService.delete_process(db, process_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
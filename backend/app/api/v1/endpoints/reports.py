@@ -2,51 +2,41 @@
 # ENDPOINTS DE RELATÓRIOS
 # ===========================================
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
 from datetime import datetime, timedelta
+import json
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.codec import json_default
+
+from app.core.database import get_read_db
+from app.core.dependencies import get_current_user
 from app.models.user import User
-from app.models.process import Process
-from app.models.task import Task
+from app.models.process import Process, ProcessStatus
+from app.models.task import Task, TaskStatus
 from app.models.file import File
+from app.services.counters import CounterService
+from app.services.report_analytics import ReportAnalyticsService
 
 router = APIRouter()
 
 @router.get("/dashboard")
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter estatísticas do dashboard."""
     try:
-        # Contar processos
-        total_processes = db.query(Process).count()
-        active_processes = db.query(Process).filter(Process.status == "active").count()
-        
-        # Contar tarefas
-        total_tasks = db.query(Task).count()
-        completed_tasks = db.query(Task).filter(Task.status == "completed").count()
-        pending_tasks = db.query(Task).filter(Task.status == "todo").count()
+        # Processos e tarefas: contadores mantidos incrementalmente
+        counters = CounterService.get_counters(db)
+        processes_by_status = CounterService.status_counts(counters, "processes", ProcessStatus)
+        tasks_by_status = CounterService.status_counts(counters, "tasks", TaskStatus)
         
         # Contar arquivos
         total_files = db.query(File).count()
         
-        # Tarefas por status
-        tasks_by_status = db.query(
-            Task.status,
-            func.count(Task.id).label('count')
-        ).group_by(Task.status).all()
-        
-        # Processos por status
-        processes_by_status = db.query(
-            Process.status,
-            func.count(Process.id).label('count')
-        ).group_by(Process.status).all()
-        
         # Tarefas criadas nos últimos 30 dias
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
         recent_tasks = db.query(Task).filter(Task.created_at >= thirty_days_ago).count()
@@ -56,15 +46,21 @@ async def get_dashboard_stats(
         
         return {
             "processes": {
-                "total": total_processes,
-                "active": active_processes,
-                "by_status": [{"status": status, "count": count} for status, count in processes_by_status]
+                "total": counters["processes.total"],
+                "active": processes_by_status[ProcessStatus.ACTIVE],
+                "by_status": [
+                    {"status": status.value, "count": count}
+                    for status, count in processes_by_status.items() if count
+                ]
             },
             "tasks": {
-                "total": total_tasks,
-                "completed": completed_tasks,
-                "pending": pending_tasks,
-                "by_status": [{"status": status, "count": count} for status, count in tasks_by_status]
+                "total": counters["tasks.total"],
+                "completed": tasks_by_status[TaskStatus.COMPLETED],
+                "pending": tasks_by_status[TaskStatus.TODO],
+                "by_status": [
+                    {"status": status.value, "count": count}
+                    for status, count in tasks_by_status.items() if count
+                ]
             },
             "files": {
                 "total": total_files
@@ -80,123 +76,83 @@ async def get_dashboard_stats(
             detail=f"Erro ao buscar estatísticas: {str(e)}"
         )
 
+def parse_period(start_date: Optional[str], end_date: Optional[str]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Converter start_date/end_date (ISO 8601) em datas."""
+    try:
+        return (
+            datetime.fromisoformat(start_date) if start_date else None,
+            datetime.fromisoformat(end_date) if end_date else None,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Datas devem estar no formato ISO 8601 (AAAA-MM-DD)"
+        )
+
+def ndjson_stream(db: Session, rows: Iterator[Dict[str, Any]]) -> StreamingResponse:
+    """Resposta NDJSON (uma linha JSON por registro) gerada sob demanda."""
+    def generate():
+        try:
+            for row in rows:
+                yield json.dumps(row, default=json_default, ensure_ascii=False) + "\n"
+        finally:
+            # A sessão da dependência já pode ter sido fechada; a do stream é liberada aqui
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 @router.get("/processes/analytics")
 async def get_process_analytics(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Obter análise de processos."""
+    """Obter análise de processos (agregada no banco, filtrada pelo período)."""
+    start, end = parse_period(start_date, end_date)
     try:
-        query = db.query(Process)
-        
-        if start_date:
-            start = datetime.fromisoformat(start_date)
-            query = query.filter(Process.created_at >= start)
-        
-        if end_date:
-            end = datetime.fromisoformat(end_date)
-            query = query.filter(Process.created_at <= end)
-        
-        processes = query.all()
-        
-        # Análise por mês
-        monthly_data = db.query(
-            extract('year', Process.created_at).label('year'),
-            extract('month', Process.created_at).label('month'),
-            func.count(Process.id).label('count')
-        ).group_by(
-            extract('year', Process.created_at),
-            extract('month', Process.created_at)
-        ).all()
-        
-        # Análise por cliente
-        client_data = db.query(
-            Process.client_name,
-            func.count(Process.id).label('count')
-        ).group_by(Process.client_name).all()
-        
-        return {
-            "total": len(processes),
-            "monthly": [{"year": int(year), "month": int(month), "count": count} for year, month, count in monthly_data],
-            "by_client": [{"client": client, "count": count} for client, count in client_data]
-        }
+        return ReportAnalyticsService.process_analytics(db, start, end)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao gerar análise: {str(e)}"
         )
 
+@router.get("/processes/analytics/rows")
+async def stream_process_rows(
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Processos do período em NDJSON, lidos em lotes (memória constante)."""
+    start, end = parse_period(start_date, end_date)
+    return ndjson_stream(db, ReportAnalyticsService.iter_process_rows(db, start, end))
+
 @router.get("/tasks/analytics")
 async def get_task_analytics(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Obter análise de tarefas."""
+    """Obter análise de tarefas (agregada no banco, filtrada pelo período)."""
+    start, end = parse_period(start_date, end_date)
     try:
-        query = db.query(Task)
-        
-        if start_date:
-            start = datetime.fromisoformat(start_date)
-            query = query.filter(Task.created_at >= start)
-        
-        if end_date:
-            end = datetime.fromisoformat(end_date)
-            query = query.filter(Task.created_at <= end)
-        
-        tasks = query.all()
-        
-        # Análise por prioridade
-        priority_data = db.query(
-            Task.priority,
-            func.count(Task.id).label('count')
-        ).group_by(Task.priority).all()
-        
-        # Análise por categoria
-        category_data = db.query(
-            Task.category,
-            func.count(Task.id).label('count')
-        ).group_by(Task.category).all()
-        
-        # Tempo médio de conclusão
-        completed_tasks = db.query(Task).filter(
-            Task.status == "completed",
-            Task.completed_at.isnot(None)
-        ).all()
-        
-        avg_completion_time = 0
-        if completed_tasks:
-            total_time = sum([
-                (task.completed_at - task.created_at).total_seconds()
-                for task in completed_tasks
-                if task.completed_at and task.created_at
-            ])
-            avg_completion_time = total_time / len(completed_tasks)
-        
-        return {
-            "total": len(tasks),
-            "by_priority": [{"priority": priority, "count": count} for priority, count in priority_data],
-            "by_category": [{"category": category, "count": count} for category, count in category_data],
-            "avg_completion_time_seconds": avg_completion_time
-        }
+        return ReportAnalyticsService.task_analytics(db, start, end)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao gerar análise: {str(e)}"
         )
 
-
-
-
-
-
-
-
-
-
-
-
-
+@router.get("/tasks/analytics/rows")
+async def stream_task_rows(
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Tarefas do período em NDJSON, lidas em lotes (memória constante)."""
+    start, end = parse_period(start_date, end_date)
+    return ndjson_stream(db, ReportAnalyticsService.iter_task_rows(db, start, end))
@@ -2,7 +2,7 @@
 # ENDPOINT DE EXPORTAÇÃO DE RELATÓRIOS
 # ===========================================
 
-from fastapi import APIRouter, HTTPException, status, Depends, Response
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -10,17 +10,19 @@ import io
 import logging
 from datetime import datetime
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-
-from app.core.dependencies import get_db, get_current_user
+from app.core.database import get_read_db
+from app.core.dependencies import get_current_user, require_admin
 from app.models.user import User
 from app.models.process import Process
 from app.models.task import Task
+from app.services.bulk_export import (
+    EXPORT_FORMATS,
+    EXPORT_TABLES,
+    ExportError,
+    available_formats,
+    iter_export,
+    validate_export,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,13 @@ def generate_report_pdf(
     db: Session = None
 ) -> bytes:
     """Gerar PDF do relatório."""
+    # reportlab é importado sob demanda para não pesar no boot da aplicação
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib.enums import TA_CENTER
     
     # Criar buffer para o PDF
     buffer = io.BytesIO()
@@ -180,7 +189,7 @@ async def export_report_pdf(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     user_ids: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Exportar relatório em formato PDF."""
@@ -225,7 +234,7 @@ async def export_report_excel(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     user_ids: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Exportar relatório em formato Excel."""
@@ -251,7 +260,7 @@ async def export_report_csv(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     user_ids: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Exportar relatório em formato CSV."""
@@ -271,5 +280,39 @@ async def export_report_csv(
             detail=f"Erro ao gerar relatório CSV: {str(e)}"
         )
 
+@router.get("/export/bulk")
+async def list_bulk_exports(current_user: User = Depends(require_admin)):
+    """Tabelas e formatos disponíveis para exportação completa."""
+    return {"tables": list(EXPORT_TABLES), "formats": available_formats()}
 
+@router.get("/export/bulk/{table_name}")
+async def export_bulk(
+    table_name: str,
+    format: str = Query("parquet", description="parquet, arrow ou csv"),
+    since: Optional[str] = Query(None, description="Somente registros com updated_at a partir desta data (ISO 8601)"),
+    batch_size: Optional[int] = Query(None, ge=100, le=100000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    """Exportar uma tabela inteira para BI, em lotes lidos com cursor no servidor."""
+    try:
+        validate_export(table_name, format)
+        since_date = datetime.fromisoformat(since) if since else None
+    except (ExportError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+    def generate():
+        try:
+            yield from iter_export(db.connection(), table_name, format, batch_size, since_date)
+        finally:
+            # A sessão da dependência já pode ter sido fechada; a do stream é liberada aqui
+            db.close()
+
+    media_type, extension, _ = EXPORT_FORMATS[format]
+    filename = f"{table_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
+    logger.info(f"Exportação {table_name} ({format}) para usuário {current_user.id}")
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -4,24 +4,25 @@
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_async_db, get_current_user
+from app.core.pagination import PaginationError
 from app.models.user import User
 from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskList
-from app.services.task import TaskService
+from app.services.task import AsyncTaskService
 
 router = APIRouter()
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Criar nova tarefa."""
     try:
-        task = TaskService.create_task(db, task_data, current_user.id)
+        task = await AsyncTaskService.create_task(db, task_data, current_user.id)
         return task
     except Exception as e:
         raise HTTPException(
@@ -33,20 +34,26 @@ async def create_task(
 async def get_tasks(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    sort: Optional[str] = Query(None, description="id ou updated_at (prefixo '-' para decrescente)"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter lista de tarefas."""
     try:
-        tasks = TaskService.get_tasks(db, skip, limit)
-        total = len(tasks)
+        page = await AsyncTaskService.get_tasks_page(
+            db, limit, cursor=cursor, skip=skip, sort=sort, include_total=include_total
+        )
         
         return TaskList(
-            tasks=tasks,
-            total=total,
+            tasks=page.items,
+            **page.metadata(),
             page=skip // limit + 1,
             per_page=limit
         )
+    except PaginationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -57,20 +64,26 @@ async def get_tasks(
 async def get_my_tasks(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    sort: Optional[str] = Query(None, description="id ou updated_at (prefixo '-' para decrescente)"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter tarefas do usuário atual."""
     try:
-        tasks = TaskService.get_user_tasks(db, current_user.id, skip, limit)
-        total = len(tasks)
+        page = await AsyncTaskService.get_tasks_page(
+            db, limit, cursor=cursor, skip=skip, sort=sort, assigned_user_id=current_user.id, include_total=include_total
+        )
         
         return TaskList(
-            tasks=tasks,
-            total=total,
+            tasks=page.items,
+            **page.metadata(),
             page=skip // limit + 1,
             per_page=limit
         )
+    except PaginationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -80,12 +93,12 @@ async def get_my_tasks(
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter tarefa por ID."""
     try:
-        task = TaskService.get_task_by_id(db, task_id)
+        task = await AsyncTaskService.get_task_by_id(db, task_id)
         if not task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -104,12 +117,12 @@ async def get_task(
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Atualizar tarefa."""
     try:
-        task = TaskService.update_task(db, task_id, task_data)
+        task = await AsyncTaskService.update_task(db, task_id, task_data)
         if not task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -127,12 +140,12 @@ async def update_task(
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Deletar tarefa."""
     try:
-        success = TaskService.delete_task(db, task_id)
+        success = await AsyncTaskService.delete_task(db, task_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
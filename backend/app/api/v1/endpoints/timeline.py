@@ -4,12 +4,13 @@
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_async_db, get_current_user
+from app.core.pagination import PaginationError
 from app.models.user import User
 from app.schemas.timeline import TimelineEventResponse, TimelineEventList
-from app.services.timeline import TimelineService
+from app.services.timeline import AsyncTimelineService
 
 router = APIRouter()
 
@@ -17,20 +18,25 @@ router = APIRouter()
 async def get_timeline(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter timeline geral."""
     try:
-        events = TimelineService.get_events(db, skip, limit)
-        total = len(events)
+        page = await AsyncTimelineService.get_events_page(
+            db, limit, cursor=cursor, skip=skip, include_total=include_total
+        )
         
         return TimelineEventList(
-            events=events,
-            total=total,
+            events=page.items,
+            **page.metadata(),
             page=skip // limit + 1,
             per_page=limit
         )
+    except PaginationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -41,20 +47,25 @@ async def get_timeline(
 async def get_user_timeline(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter timeline do usuário atual."""
     try:
-        events = TimelineService.get_user_events(db, current_user.id, skip, limit)
-        total = len(events)
+        page = await AsyncTimelineService.get_events_page(
+            db, limit, cursor=cursor, skip=skip, user_id=current_user.id, include_total=include_total
+        )
         
         return TimelineEventList(
-            events=events,
-            total=total,
+            events=page.items,
+            **page.metadata(),
             page=skip // limit + 1,
             per_page=limit
         )
+    except PaginationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -66,20 +77,25 @@ async def get_process_timeline(
     process_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter timeline de um processo."""
     try:
-        events = TimelineService.get_process_events(db, process_id, skip, limit)
-        total = len(events)
+        page = await AsyncTimelineService.get_events_page(
+            db, limit, cursor=cursor, skip=skip, process_id=process_id, include_total=include_total
+        )
         
         return TimelineEventList(
-            events=events,
-            total=total,
+            events=page.items,
+            **page.metadata(),
             page=skip // limit + 1,
             per_page=limit
         )
+    except PaginationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -91,20 +107,25 @@ async def get_task_timeline(
     task_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter timeline de uma tarefa."""
     try:
-        events = TimelineService.get_task_events(db, task_id, skip, limit)
-        total = len(events)
+        page = await AsyncTimelineService.get_events_page(
+            db, limit, cursor=cursor, skip=skip, task_id=task_id, include_total=include_total
+        )
         
         return TimelineEventList(
-            events=events,
-            total=total,
+            events=page.items,
+            **page.metadata(),
             page=skip // limit + 1,
             per_page=limit
         )
+    except PaginationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
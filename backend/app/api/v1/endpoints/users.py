@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.core.dependencies import get_db, get_current_user, require_admin
+from app.core.principal_cache import invalidate_principal
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserList
 from app.services.user import UserService
@@ -110,6 +111,7 @@ async def update_my_profile(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuário não encontrado"
             )
+        await invalidate_principal(current_user.id)
         return user
     except HTTPException:
         raise
@@ -157,6 +159,8 @@ async def update_user(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuário não encontrado"
             )
+        # Inclui mudança de role/status: vale já na próxima requisição
+        await invalidate_principal(user_id)
         return user
     except HTTPException:
         raise
@@ -187,6 +191,7 @@ async def delete_user(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuário não encontrado"
             )
+        await invalidate_principal(user_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -4,7 +4,7 @@
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, processes, tasks, files, notifications, timeline, reports, websocket, admin, datajud, funnel, financial, dashboard, reports_export, rdstation, precatorios, indices_economicos, deadlines, ai_analysis, legal_diagnosis, jurisprudence
+from app.api.v1.endpoints import auth, users, clients, processes, tasks, files, notifications, timeline, reports, websocket, admin, datajud, funnel, financial, dashboard, reports_export, rdstation, precatorios, indices_economicos, deadlines, ai_analysis, legal_diagnosis, jurisprudence
 
 # ===========================================
 # ROUTER PRINCIPAL
@@ -30,6 +30,13 @@ api_router.include_router(
     tags=["Usuários"]
 )
 
+# Clientes
+api_router.include_router(
+    clients.router,
+    prefix="/clients",
+    tags=["Clientes"]
+)
+
 # Processos
 api_router.include_router(
     processes.router,
@@ -0,0 +1,231 @@
+# ===========================================
+# COMANDOS DE LINHA DE COMANDO
+# ===========================================
+#
+# Tarefas pontuais que não precisam rodar a cada boot da aplicação:
+#   python -m app.cli init-db      # criar tabelas e gravar o marcador de schema
+#   python -m app.cli seed-users   # criar usuários admin e demo (idempotente)
+#   python -m app.cli prepare      # init-db + seed-users + backfills pendentes (comando de start)
+#   python -m app.cli bootstrap    # init-db + seed-users + todos os backfills de novo (inclui os índices da busca)
+#   python -m app.cli backfill-clients # vincular processos/precatórios à tabela de clientes
+#   python -m app.cli backfill-ledger  # lançamentos de abertura do livro-razão
+#   python -m app.cli search-index [--rebuild]  # índices da busca textual e do typeahead
+#   python -m app.cli export --format parquet --output exports/  # snapshot para BI
+
+import argparse
+import asyncio
+import importlib
+import logging
+import sys
+from typing import List
+
+from app.core.database import (
+    SessionLocal, claim_backfill, ensure_schema, finish_backfill, mark_backfill_completed,
+)
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+# Usuários padrão criados pelo seed
+DEFAULT_USERS = [
+    {
+        "email": "admin@sistema.com",
+        "username": "admin",
+        "full_name": "Administrador",
+        "password": "123456",
+        "role": UserRole.ADMIN,
+        "label": "admin",
+    },
+    {
+        "email": "demo@demo.com",
+        "username": "demo",
+        "full_name": "Usuário Demo",
+        "password": "demo123",
+        "role": UserRole.ASSISTANT,
+        "label": "DEMO",
+    },
+]
+
+# Backfills de dados, na ordem em que rodam: (marcador, módulo, função). Todos
+# são idempotentes; o marcador evita repetir a cada boot a varredura de um
+# backfill já concluído neste banco.
+BACKFILLS = [
+    ("clients", "app.services.clients", "backfill_clients"),
+    ("ledger", "app.services.ledger", "backfill_ledger"),
+    ("lookup_index", "app.services.process_lookup", "backfill_lookup_index"),
+    ("search_index", "app.services.process_search", "backfill_search_index"),
+]
+
+# ===========================================
+# COMANDOS
+# ===========================================
+
+def init_db(force: bool = False) -> bool:
+    """Criar/atualizar tabelas e o marcador de versão do schema."""
+    created = ensure_schema(force=force)
+    if created:
+        logger.info("✅ Schema do banco criado/atualizado")
+    else:
+        logger.info("✅ Schema do banco já está atualizado")
+    return created
+
+def seed_default_users():
+    """Criar/garantir os usuários admin e demo."""
+    from app.services.auth import AuthService
+
+    db = SessionLocal()
+    try:
+        # Cada usuário é tratado separadamente: falha em um não impede o outro
+        for data in DEFAULT_USERS:
+            try:
+                user = db.query(User).filter(User.email == data["email"]).first()
+                if user:
+                    logger.info(f"✅ Usuário {data['label']} já existe")
+                    continue
+
+                db.add(User(
+                    email=data["email"],
+                    username=data["username"],
+                    full_name=data["full_name"],
+                    hashed_password=AuthService.get_password_hash(data["password"]),
+                    is_active=True,
+                    is_verified=True,
+                    role=data["role"]
+                ))
+                db.commit()
+                logger.info(f"✅ Usuário {data['label']} criado ({data['email']})")
+            except Exception as e:
+                logger.error(f"❌ Erro ao criar/garantir usuário {data['label']}: {e}")
+                db.rollback()
+    finally:
+        db.close()
+
+def seed_users_if_empty() -> bool:
+    """Criar os usuários padrão só em banco sem nenhum usuário (boot rápido); retorna se criou."""
+    with SessionLocal() as db:
+        if db.query(User.id).first() is not None:
+            return False
+    logger.info("👤 Banco sem usuários: criando os usuários padrão")
+    seed_default_users()
+    return True
+
+def run_backfills(force: bool = False) -> List[str]:
+    """Rodar os backfills ainda não concluídos (todos com force); retorna os que rodaram."""
+    ran = []
+    for name, module_name, function_name in BACKFILLS:
+        if not claim_backfill(name, force=force):
+            continue
+        completed = False
+        try:
+            getattr(importlib.import_module(module_name), function_name)()
+            completed = True
+        finally:
+            finish_backfill(name, completed)
+        ran.append(name)
+    return ran
+
+async def run_pending_backfills():
+    """Backfills pendentes fora do event loop (iniciado no startup da aplicação)."""
+    try:
+        ran = await asyncio.to_thread(run_backfills)
+    except Exception as e:
+        logger.error(f"❌ Erro nos backfills de dados: {e}")
+        return
+    if ran:
+        logger.info(f"✅ Backfills concluídos: {', '.join(ran)}")
+
+def export_tables(args) -> int:
+    """Gravar as tabelas pedidas em arquivos, uma por vez, com cursor no servidor."""
+    from datetime import datetime
+    from app.core.database import engine
+    from app.services.bulk_export import EXPORT_TABLES, ExportError, export_to_file, validate_export
+
+    tables = args.tables or list(EXPORT_TABLES)
+    try:
+        for table_name in tables:
+            validate_export(table_name, args.format)
+        since = datetime.fromisoformat(args.since) if args.since else None
+    except (ExportError, ValueError) as e:
+        logger.error(f"❌ {e}")
+        return 2
+
+    with engine.connect() as connection:
+        for table_name in tables:
+            result = export_to_file(connection, table_name, args.format, args.output, args.batch_size, since)
+            logger.info(f"✅ {table_name}: {result['path']} ({result['bytes']:,} bytes)")
+    return 0
+
+# ===========================================
+# ENTRADA
+# ===========================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Comandos do backend")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser("init-db", help="Criar tabelas e marcador de schema")
+    init_parser.add_argument("--force", action="store_true", help="Executar create_all mesmo com o marcador atualizado")
+    subparsers.add_parser("seed-users", help="Criar usuários admin e demo")
+    subparsers.add_parser("prepare", help="init-db + seed-users + backfills ainda não concluídos")
+    subparsers.add_parser("bootstrap", help="init-db + seed-users + todos os backfills de novo")
+    subparsers.add_parser("backfill-clients", help="Vincular processos e precatórios aos clientes")
+    subparsers.add_parser("backfill-ledger", help="Criar lançamentos de abertura do livro-razão")
+    search_parser = subparsers.add_parser("search-index", help="Indexar processos para a busca textual e o typeahead")
+    search_parser.add_argument("--rebuild", action="store_true", help="Reindexar todos os processos")
+    subparsers.add_parser("reconcile-counters", help="Recalcular os contadores do dashboard")
+    subparsers.add_parser("reconcile-rollups", help="Recalcular os agregados mensais dos gráficos")
+    export_parser = subparsers.add_parser("export", help="Exportar tabelas para BI (Parquet/Arrow/CSV)")
+    export_parser.add_argument("--tables", nargs="+", help="Tabelas a exportar (padrão: todas)")
+    export_parser.add_argument("--format", default="parquet", help="parquet, arrow ou csv")
+    export_parser.add_argument("--output", default="exports", help="Diretório de destino")
+    export_parser.add_argument("--since", help="Somente registros com updated_at a partir desta data (ISO 8601)")
+    export_parser.add_argument("--batch-size", type=int, help="Linhas por lote (padrão: EXPORT_BATCH_SIZE)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.command == "init-db":
+        init_db(force=args.force)
+    elif args.command == "seed-users":
+        seed_default_users()
+    elif args.command == "prepare":
+        # A cada start: o marcador de schema e os dos backfills evitam repetir
+        # varreduras já feitas neste banco
+        init_db()
+        seed_default_users()
+        run_backfills()
+    elif args.command == "bootstrap":
+        init_db()
+        seed_default_users()
+        run_backfills(force=True)
+    elif args.command == "backfill-clients":
+        from app.services.clients import backfill_clients
+        linked = backfill_clients()
+        logger.info(f"✅ Clientes vinculados: {linked}")
+    elif args.command == "backfill-ledger":
+        from app.services.ledger import backfill_ledger
+        created = backfill_ledger()
+        logger.info(f"✅ Livro-razão: {created} lançamentos de abertura")
+    elif args.command == "search-index":
+        from app.services.process_lookup import LOOKUP_BACKFILL, backfill_lookup_index
+        from app.services.process_search import SEARCH_BACKFILL, backfill_search_index
+        normalized = backfill_lookup_index(rebuild=args.rebuild)
+        mark_backfill_completed(LOOKUP_BACKFILL)
+        indexed = backfill_search_index(rebuild=args.rebuild)
+        mark_backfill_completed(SEARCH_BACKFILL)
+        logger.info(f"✅ Busca: {indexed} processos indexados, {normalized} números normalizados")
+    elif args.command == "reconcile-counters":
+        from app.services.counters import reconcile_counters
+        drift = reconcile_counters()
+        logger.info(f"✅ Contadores reconciliados ({drift} divergentes)")
+    elif args.command == "reconcile-rollups":
+        from app.services.rollups import reconcile_rollups
+        drift = reconcile_rollups()
+        logger.info(f"✅ Agregados mensais reconciliados ({drift} divergentes)")
+    elif args.command == "export":
+        return export_tables(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+# ===========================================
+# CACHE DE SERVIÇOS EM DOIS NÍVEIS
+# ===========================================
+#
+# O decorator @cached guarda o resultado de funções assíncronas de serviço
+# (consultas DataJud, agregados do dashboard, listas de tribunais) em:
+#   1. LRU em memória do processo, com TTL curto (CACHE_LOCAL_TTL);
+#   2. Redis, compartilhado entre workers, com o TTL da função.
+# Proteções contra stampede quando uma chave popular expira:
+#   - single-flight: no processo, só uma corrotina por chave recalcula; as
+#     outras aguardam o mesmo resultado;
+#   - stale-while-revalidate: passado o TTL, o valor antigo continua sendo
+#     servido por mais stale_ttl segundos enquanto uma tarefa em segundo plano
+#     recalcula (com lock no Redis, só um worker faz isso).
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from app.core.codec import cache_codec, json_default
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Validade do lock de recálculo em segundo plano
+REFRESH_LOCK_SECONDS = 30
+
+CACHE_KEY_PREFIX = "cache"
+
+# Parâmetros que não entram na chave (instância do serviço, sessão do banco)
+DEFAULT_IGNORED_PARAMS = ("self", "cls", "db")
+
+# ===========================================
+# NÍVEL LOCAL
+# ===========================================
+
+class LocalCache:
+    """LRU com TTL para envelopes do cache, com índice por tag."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, envelope, _ = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return envelope
+
+    def set(self, key: str, envelope: Dict[str, Any], ttl: float, tags: List[str]):
+        self._entries[key] = (time.monotonic() + ttl, envelope, tags)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = set(tags)
+        keys = [key for key, (_, _, entry_tags) in self._entries.items() if tags.intersection(entry_tags)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+# ===========================================
+# CACHE EM DOIS NÍVEIS
+# ===========================================
+
+class TwoTierCache:
+    """Nível local + Redis, com single-flight e stale-while-revalidate."""
+
+    def __init__(self, local_max_entries: int, local_ttl: float):
+        self.local = LocalCache(local_max_entries)
+        self.local_ttl = local_ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refresh_tasks = set()
+        self.stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+        }
+
+    # -------------------------------------------
+    # Redis
+    # -------------------------------------------
+
+    async def _redis(self, binary: bool = False):
+        """Cliente Redis, ou None com o circuito do Redis aberto."""
+        from app.core.redis import get_redis_if_available
+        return await get_redis_if_available(binary=binary)
+
+    def _redis_unavailable(self, error: Exception):
+        from app.core.redis import redis_breaker
+        redis_breaker.record_failure(error)
+        logger.warning(f"⚠️ Redis indisponível para o cache de serviços: {error}")
+
+    async def _get_remote(self, key: str) -> Optional[Dict[str, Any]]:
+        client = await self._redis(binary=True)
+        if client is None:
+            return None
+        try:
+            raw = await client.get(key)
+        except Exception as e:
+            self._redis_unavailable(e)
+            return None
+        from app.core.redis import redis_breaker
+        redis_breaker.record_success()
+        if not raw:
+            return None
+        try:
+            return cache_codec.decode(raw)
+        except Exception as e:
+            logger.warning(f"⚠️ Valor ilegível no cache {key}: {e}")
+            return None
+
+    async def _set_remote(self, key: str, envelope: Dict[str, Any], expire: int, tags: List[str]):
+        if await self._redis() is None:
+            return
+        from app.core.redis import set_cache
+        await set_cache(key, cache_codec.encode(envelope), max(1, int(expire)), tags=tags)
+
+    async def _try_refresh_lock(self, key: str) -> bool:
+        """Lock entre workers para o recálculo em segundo plano."""
+        client = await self._redis()
+        if client is None:
+            return True
+        try:
+            return bool(await client.set(f"{key}:refresh", "1", nx=True, ex=REFRESH_LOCK_SECONDS))
+        except Exception as e:
+            self._redis_unavailable(e)
+            return True
+
+    # -------------------------------------------
+    # Leitura / cálculo
+    # -------------------------------------------
+
+    async def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        envelope = self.local.get(key)
+        if envelope is not None:
+            self.stats["local_hits"] += 1
+            return envelope
+        envelope = await self._get_remote(key)
+        if envelope is not None:
+            self.stats["redis_hits"] += 1
+            # O valor local nunca sobrevive ao envelope no Redis
+            remaining = envelope["stale_until"] - time.time()
+            if remaining > 0:
+                self.local.set(key, envelope, min(self.local_ttl, remaining), envelope.get("tags", []))
+        return envelope
+
+    async def _compute(self, key: str, compute: Callable, ttl: int, stale_ttl: int,
+                       tags: List[str], condition: Optional[Callable]):
+        """Calcular, gravar nos dois níveis e devolver o valor."""
+        value = await compute()
+        if condition is not None and not condition(value):
+            return value
+
+        # Normalizar pelo JSON: hit e miss devolvem exatamente o mesmo formato
+        value = json.loads(json.dumps(value, default=json_default))
+        now = time.time()
+        envelope = {
+            "value": value,
+            "fresh_until": now + ttl,
+            "stale_until": now + ttl + stale_ttl,
+            "tags": tags,
+        }
+        self.local.set(key, envelope, min(self.local_ttl, ttl + stale_ttl), tags)
+        await self._set_remote(key, envelope, ttl + stale_ttl, tags)
+        return value
+
+    async def _single_flight(self, key: str, factory: Callable):
+        """Uma corrotina por chave calcula; as demais aguardam o mesmo resultado."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: o cancelamento de quem espera não cancela o cálculo compartilhado
+        return await asyncio.shield(task)
+
+    def _schedule_refresh(self, key: str, factory: Callable):
+        if key in self._inflight:
+            return
+
+        async def refresh():
+            if not await self._try_refresh_lock(key):
+                return
+            self.stats["refreshes"] += 1
+            try:
+                await self._single_flight(key, factory)
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao recalcular cache {key} em segundo plano: {e}")
+
+        task = asyncio.ensure_future(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable,
+        ttl: int,
+        stale_ttl: int = 0,
+        tags: Optional[List[str]] = None,
+        condition: Optional[Callable[[Any], bool]] = None,
+        refresh_compute: Optional[Callable] = None,
+    ):
+        """
+        Obter o valor da chave, calculando-o com compute() quando necessário.
+
+        refresh_compute é usado no recálculo em segundo plano; sem ele, valores
+        vencidos não são servidos (o cálculo é feito na hora).
+        """
+        tags = list(tags or [])
+        envelope = await self._lookup(key)
+        now = time.time()
+        if envelope is not None:
+            if now < envelope["fresh_until"]:
+                return envelope["value"]
+            if refresh_compute is not None and now < envelope["stale_until"]:
+                self.stats["stale_hits"] += 1
+                self._schedule_refresh(
+                    key,
+                    lambda: self._compute(key, refresh_compute, ttl, stale_ttl, tags, condition)
+                )
+                return envelope["value"]
+
+        self.stats["misses"] += 1
+        return await self._single_flight(
+            key,
+            lambda: self._compute(key, compute, ttl, stale_ttl, tags, condition)
+        )
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Invalidar as entradas das tags no nível local e no Redis."""
+        removed = self.local.invalidate_tags(tags)
+        if await self._redis() is not None:
+            from app.core.redis import invalidate_tags
+            removed += await invalidate_tags(*tags)
+        return removed
+
+    def status(self) -> Dict[str, Any]:
+        """Contadores e tamanho do nível local."""
+        return {"local_entries": len(self.local), **self.stats}
+
+# ===========================================
+# INSTÂNCIA GLOBAL
+# ===========================================
+
+service_cache = TwoTierCache(
+    local_max_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+    local_ttl=settings.CACHE_LOCAL_TTL,
+)
+
+async def invalidate_cache_tags(*tags: str) -> int:
+    """Invalidar entradas do cache de serviços (chamar após escritas)."""
+    if not settings.CACHE_ENABLED:
+        return 0
+    return await service_cache.invalidate_tags(*tags)
+
+# ===========================================
+# DECORATOR
+# ===========================================
+
+def cached(
+    namespace: str,
+    ttl: int,
+    stale_ttl: int = 0,
+    tags: Union[Iterable[str], Callable[[Dict[str, Any]], Iterable[str]], None] = None,
+    condition: Optional[Callable[[Any], bool]] = None,
+    ignore: Iterable[str] = DEFAULT_IGNORED_PARAMS,
+    session_factory: Optional[Callable] = None,
+):
+    """
+    Cachear o resultado de uma função assíncrona.
+
+    Args:
+        namespace: prefixo da chave (ex.: "datajud:tribunais")
+        ttl: segundos em que o valor é considerado fresco
+        stale_ttl: segundos extras servindo o valor antigo enquanto recalcula
+        tags: tags de invalidação (lista fixa ou função dos argumentos)
+        condition: só cacheia resultados para os quais condition(valor) é True
+        ignore: parâmetros fora da chave (padrão: self, cls, db)
+        session_factory: para funções que recebem "db", abre uma sessão nova
+            no recálculo em segundo plano (a da requisição já terá fechado)
+
+    O valor devolvido passa pelo JSON (datas viram strings ISO), igual ao que
+    a API responderia.
+    """
+    ignored = set(ignore)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        needs_session = "db" in signature.parameters
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not settings.CACHE_ENABLED:
+                return await func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key_args = {name: value for name, value in bound.arguments.items() if name not in ignored}
+            digest = hashlib.md5(
+                json.dumps(key_args, sort_keys=True, default=json_default).encode()
+            ).hexdigest()
+            key = f"{CACHE_KEY_PREFIX}:{namespace}:{digest}"
+            entry_tags = list(tags(key_args) if callable(tags) else (tags or []))
+
+            refresh_compute = None
+            if stale_ttl > 0:
+                if not needs_session:
+                    refresh_compute = lambda: func(*bound.args, **bound.kwargs)
+                elif session_factory is not None:
+                    async def refresh_compute():
+                        async with session_factory() as session:
+                            bound.arguments["db"] = session
+                            return await func(*bound.args, **bound.kwargs)
+
+            return await service_cache.get_or_compute(
+                key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                tags=entry_tags,
+                condition=condition,
+                refresh_compute=refresh_compute,
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,192 @@
+# ===========================================
+# CODECS DO CACHE
+# ===========================================
+#
+# Valores gravados no Redis = 1 byte de cabeçalho + corpo:
+#   bits 6-7: versão do formato (FORMAT_VERSION)
+#   bits 4-5: compressão (0 = nenhuma, 1 = zstd)
+#   bits 0-3: serializador (0 = json, 1 = orjson, 2 = msgpack)
+# O corpo só é comprimido acima de CACHE_COMPRESSION_THRESHOLD bytes (payloads
+# do DataJud com a lista completa de movimentos). Valores antigos, gravados
+# como JSON puro, começam por '{', '[', '"'... e continuam sendo lidos.
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Union
+
+from app.core.config import settings
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+FORMAT_VERSION = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZSTD = 1
+
+# Primeiros bytes possíveis de um JSON (valores gravados antes do codec)
+LEGACY_JSON_PREFIXES = frozenset(b'{["-0123456789tfn \t\r\n')
+
+class CodecError(ValueError):
+    """Valor do cache que não pode ser decodificado neste worker."""
+
+def json_default(value: Any):
+    """Serializar tipos comuns dos serviços do mesmo jeito que a resposta JSON."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+# ===========================================
+# SERIALIZADORES
+# ===========================================
+
+class Serializer:
+    """Par dumps/loads identificado por um id de 4 bits no cabeçalho."""
+
+    def __init__(self, codec_id: int, name: str, dumps: Callable[[Any], bytes], loads: Callable[[bytes], Any]):
+        self.codec_id = codec_id
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return f"<Serializer({self.codec_id}, {self.name})>"
+
+SERIALIZERS: Dict[str, Serializer] = {}
+SERIALIZERS_BY_ID: Dict[int, Serializer] = {}
+
+def register_serializer(serializer: Serializer):
+    """Registrar um serializador (ids 0-2 são reservados aos nativos)."""
+    if not 0 <= serializer.codec_id <= 0x0F:
+        raise ValueError("O id do serializador deve caber em 4 bits")
+    SERIALIZERS[serializer.name] = serializer
+    SERIALIZERS_BY_ID[serializer.codec_id] = serializer
+
+register_serializer(Serializer(
+    0,
+    "json",
+    lambda value: json.dumps(
+        value, default=json_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8"),
+    json.loads,
+))
+
+if ORJSON_AVAILABLE:
+    register_serializer(Serializer(
+        1,
+        "orjson",
+        lambda value: orjson.dumps(value, default=json_default, option=orjson.OPT_NON_STR_KEYS),
+        orjson.loads,
+    ))
+
+if MSGPACK_AVAILABLE:
+    register_serializer(Serializer(
+        2,
+        "msgpack",
+        lambda value: msgpack.packb(value, default=json_default, use_bin_type=True),
+        lambda raw: msgpack.unpackb(raw, raw=False, strict_map_key=False),
+    ))
+
+def default_serializer_name() -> str:
+    """Serializador do modo "auto": orjson, depois msgpack, depois json."""
+    for name in ("orjson", "msgpack"):
+        if name in SERIALIZERS:
+            return name
+    return "json"
+
+# ===========================================
+# CODEC
+# ===========================================
+
+class CacheCodec:
+    """Codificar valores do cache com cabeçalho de versão e compressão opcional."""
+
+    def __init__(self, serializer: str = "auto", compression_threshold: int = 1024, compression_level: int = 3):
+        name = default_serializer_name() if serializer == "auto" else serializer
+        if name not in SERIALIZERS:
+            raise ValueError(f"Serializador de cache indisponível: {name}")
+        self.serializer = SERIALIZERS[name]
+        # 0 desliga a compressão
+        self.compression_threshold = compression_threshold if ZSTD_AVAILABLE else 0
+        self.compression_level = compression_level
+        self._compressor = zstandard.ZstdCompressor(level=compression_level) if ZSTD_AVAILABLE else None
+        self._decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+
+    @staticmethod
+    def header(codec_id: int, compression: int) -> int:
+        return (FORMAT_VERSION << 6) | (compression << 4) | codec_id
+
+    def encode(self, value: Any) -> bytes:
+        body = self.serializer.dumps(value)
+        compression = COMPRESSION_NONE
+        if self.compression_threshold and len(body) >= self.compression_threshold:
+            compressed = self._compressor.compress(body)
+            if len(compressed) < len(body):
+                body = compressed
+                compression = COMPRESSION_ZSTD
+        return bytes((self.header(self.serializer.codec_id, compression),)) + body
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        if isinstance(data, str):
+            return json.loads(data)
+        if not data:
+            raise CodecError("Valor vazio")
+
+        header = data[0]
+        if header in LEGACY_JSON_PREFIXES:
+            return json.loads(data)
+
+        version = header >> 6
+        compression = (header >> 4) & 0b11
+        serializer = SERIALIZERS_BY_ID.get(header & 0x0F)
+        if version != FORMAT_VERSION:
+            raise CodecError(f"Versão de formato desconhecida: {version}")
+        if serializer is None:
+            raise CodecError(f"Serializador {header & 0x0F} indisponível neste worker")
+
+        body = data[1:]
+        if compression == COMPRESSION_ZSTD:
+            if self._decompressor is None:
+                raise CodecError("zstandard não instalado")
+            body = self._decompressor.decompress(body)
+        elif compression != COMPRESSION_NONE:
+            raise CodecError(f"Compressão desconhecida: {compression}")
+        return serializer.loads(body)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "serializer": self.serializer.name,
+            "compression": "zstd" if self.compression_threshold else None,
+            "compression_threshold": self.compression_threshold,
+        }
+
+# ===========================================
+# INSTÂNCIA GLOBAL
+# ===========================================
+
+cache_codec = CacheCodec(
+    serializer=settings.CACHE_CODEC,
+    compression_threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+    compression_level=settings.CACHE_COMPRESSION_LEVEL,
+)
@@ -21,6 +21,10 @@ class Settings(BaseModel):
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
 
+    # Boot rápido: create_all só quando o marcador de schema diverge e
+    # usuários padrão só em banco vazio (deploys rodam `python -m app.cli prepare`)
+    FAST_BOOT: bool = True
+
     # ===========================================
     # API
     # ===========================================
@@ -39,6 +43,26 @@ class Settings(BaseModel):
     # URL do banco (Render fornece via DATABASE_URL)
     DATABASE_URL: Optional[str] = None
 
+    # Pool de conexões (por worker; total = workers x (size + overflow))
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 300
+
+    # Perfil SQLite: "production" (WAL + pool) ou "static" (conexão única)
+    SQLITE_PROFILE: str = "production"
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456  # 256MB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Réplica de leitura para consultas analíticas (opcional)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 30.0
+    DATABASE_REPLICA_CHECK_INTERVAL: float = 10.0
+
+    # Instrumentação: repetições da mesma query que caracterizam N+1
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+
     @property
     def database_url(self) -> str:
         """URL de conexão com o banco."""
@@ -63,6 +87,48 @@ class Settings(BaseModel):
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
     REDIS_DB: int = 0
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+
+    # Circuit breaker do Redis: abre após N falhas de conexão seguidas e testa
+    # a volta em segundo plano a cada REDIS_CIRCUIT_RESET_SECONDS
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = 3
+    REDIS_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Cache de serviços (@cached): nível local por processo na frente do Redis
+    CACHE_ENABLED: bool = True
+    CACHE_LOCAL_MAX_ENTRIES: int = 1000
+    CACHE_LOCAL_TTL: float = 5.0
+    # Codec dos valores no Redis: auto (orjson > msgpack > json), json, orjson
+    # ou msgpack; zstd acima do limite em bytes (0 desliga)
+    CACHE_CODEC: str = "auto"
+    CACHE_COMPRESSION_THRESHOLD: int = 1024
+    CACHE_COMPRESSION_LEVEL: int = 3
+
+    # Contadores do dashboard mantidos por hooks de flush + reconciliação (s)
+    COUNTERS_ENABLED: bool = True
+    COUNTERS_RECONCILE_SECONDS: int = 300
+    # Agregados mensais (gráficos de produtividade/crescimento/receita)
+    ROLLUPS_ENABLED: bool = True
+    ROLLUPS_RECONCILE_SECONDS: int = 3600
+    # Linhas por lote (yield_per) nas saídas linha a linha dos relatórios
+    REPORTS_STREAM_BATCH_SIZE: int = 1000
+    # Linhas por record batch (row group no Parquet) na exportação colunar
+    EXPORT_BATCH_SIZE: int = 10000
+    # Validade (s) do retrato financeiro por período no cache de serviços
+    FINANCIAL_CACHE_TTL: int = 120
+    # Feed SSE do dashboard: intervalo mínimo entre recálculos (s), recálculo
+    # periódico (mudanças de outros workers e prazos que vencem) e keep-alive
+    DASHBOARD_FEED_ENABLED: bool = True
+    DASHBOARD_FEED_MIN_INTERVAL: float = 1.0
+    DASHBOARD_FEED_REFRESH_SECONDS: int = 60
+    DASHBOARD_FEED_HEARTBEAT_SECONDS: int = 15
+    # Validade do token de /dashboard/stream-token (EventSource o envia na URL)
+    DASHBOARD_STREAM_TOKEN_SECONDS: int = 60
+    # Busca textual (tsvector + GIN no Postgres, FTS5 no SQLite) e aproximada
+    # por trigramas (pg_trgm); desligadas, as buscas voltam ao ILIKE
+    FULL_TEXT_SEARCH_ENABLED: bool = True
+    # Similaridade mínima (0 a 1) dos resultados do typeahead por número/cliente
+    TYPEAHEAD_MIN_SIMILARITY: float = 0.4
 
     @property
     def REDIS_URL(self) -> str:
@@ -82,6 +148,18 @@ class Settings(BaseModel):
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     ALGORITHM: str = "HS256"
 
+    # Cache do usuário autenticado (get_current_user)
+    AUTH_PRINCIPAL_CACHE_ENABLED: bool = True
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 1024
+    AUTH_PRINCIPAL_CACHE_LOCAL_TTL: int = 30
+    AUTH_PRINCIPAL_CACHE_REDIS_TTL: int = 300
+
+    # Hash/verificação de senha em executor dedicado (0 workers = no event loop)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    # /auth/login valida a senha (desligado por padrão: modo demonstração)
+    LOGIN_VERIFY_PASSWORD: bool = False
+
     # Criptografia
     ENCRYPTION_KEY: str = "your-encryption-key-32-characters"
 
@@ -132,8 +210,14 @@ class Settings(BaseModel):
     # ===========================================
     # RATE LIMITING
     # ===========================================
-    RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_ENABLED: bool = True
+    # Limite geral de /api/v1 por usuário: só contra abuso (uma tela do
+    # frontend dispara várias requisições); 0 desativa
+    RATE_LIMIT_PER_MINUTE: int = 600
     RATE_LIMIT_PER_HOUR: int = 1000
+    # Rotas caras (por usuário); DataJud usa DATAJUD_RATE_LIMIT_PER_MINUTE
+    RATE_LIMIT_AI_PER_MINUTE: int = 10
+    RATE_LIMIT_JURISPRUDENCE_PER_MINUTE: int = 20
 
     # ===========================================
     # BACKUP
@@ -210,6 +294,7 @@ class Settings(BaseModel):
             ),
             ENVIRONMENT=os.getenv("ENVIRONMENT", "development"),
             DEBUG=os.getenv("DEBUG", "true").lower() == "true",
+            FAST_BOOT=os.getenv("FAST_BOOT", "true").lower() == "true",
 
             # API
             API_V1_STR=os.getenv("API_V1_STR", "/api/v1"),
@@ -224,12 +309,87 @@ class Settings(BaseModel):
                 "POSTGRES_PASSWORD", "postgres123"
             ),
             DATABASE_URL=os.getenv("DATABASE_URL"),
+            DB_POOL_SIZE=int(os.getenv("DB_POOL_SIZE", "5")),
+            DB_MAX_OVERFLOW=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            DB_POOL_TIMEOUT=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+            DB_POOL_RECYCLE=int(os.getenv("DB_POOL_RECYCLE", "300")),
+            SQLITE_PROFILE=os.getenv("SQLITE_PROFILE", "production"),
+            SQLITE_CACHE_SIZE_KB=int(
+                os.getenv("SQLITE_CACHE_SIZE_KB", "65536")
+            ),
+            SQLITE_MMAP_SIZE=int(os.getenv("SQLITE_MMAP_SIZE", "268435456")),
+            SQLITE_BUSY_TIMEOUT_MS=int(
+                os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")
+            ),
+            DATABASE_REPLICA_URL=os.getenv("DATABASE_REPLICA_URL"),
+            DATABASE_REPLICA_MAX_LAG_SECONDS=float(
+                os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", "30")
+            ),
+            DATABASE_REPLICA_CHECK_INTERVAL=float(
+                os.getenv("DATABASE_REPLICA_CHECK_INTERVAL", "10")
+            ),
+            DB_N_PLUS_ONE_THRESHOLD=int(
+                os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5")
+            ),
 
             # Redis
             REDIS_HOST=os.getenv("REDIS_HOST", "localhost"),
             REDIS_PORT=int(os.getenv("REDIS_PORT", "6379")),
             REDIS_PASSWORD=os.getenv("REDIS_PASSWORD"),
             REDIS_DB=int(os.getenv("REDIS_DB", "0")),
+            REDIS_SOCKET_TIMEOUT=float(os.getenv("REDIS_SOCKET_TIMEOUT", "5")),
+            REDIS_CIRCUIT_FAILURE_THRESHOLD=int(
+                os.getenv("REDIS_CIRCUIT_FAILURE_THRESHOLD", "3")
+            ),
+            REDIS_CIRCUIT_RESET_SECONDS=float(
+                os.getenv("REDIS_CIRCUIT_RESET_SECONDS", "30")
+            ),
+            CACHE_ENABLED=os.getenv("CACHE_ENABLED", "true").lower() == "true",
+            CACHE_LOCAL_MAX_ENTRIES=int(
+                os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1000")
+            ),
+            CACHE_LOCAL_TTL=float(os.getenv("CACHE_LOCAL_TTL", "5")),
+            CACHE_CODEC=os.getenv("CACHE_CODEC", "auto"),
+            CACHE_COMPRESSION_THRESHOLD=int(
+                os.getenv("CACHE_COMPRESSION_THRESHOLD", "1024")
+            ),
+            CACHE_COMPRESSION_LEVEL=int(
+                os.getenv("CACHE_COMPRESSION_LEVEL", "3")
+            ),
+            COUNTERS_ENABLED=os.getenv("COUNTERS_ENABLED", "true").lower() == "true",
+            COUNTERS_RECONCILE_SECONDS=int(
+                os.getenv("COUNTERS_RECONCILE_SECONDS", "300")
+            ),
+            ROLLUPS_ENABLED=os.getenv("ROLLUPS_ENABLED", "true").lower() == "true",
+            ROLLUPS_RECONCILE_SECONDS=int(
+                os.getenv("ROLLUPS_RECONCILE_SECONDS", "3600")
+            ),
+            REPORTS_STREAM_BATCH_SIZE=int(
+                os.getenv("REPORTS_STREAM_BATCH_SIZE", "1000")
+            ),
+            EXPORT_BATCH_SIZE=int(
+                os.getenv("EXPORT_BATCH_SIZE", "10000")
+            ),
+            FINANCIAL_CACHE_TTL=int(
+                os.getenv("FINANCIAL_CACHE_TTL", "120")
+            ),
+            DASHBOARD_FEED_ENABLED=os.getenv("DASHBOARD_FEED_ENABLED", "true").lower() == "true",
+            DASHBOARD_FEED_MIN_INTERVAL=float(
+                os.getenv("DASHBOARD_FEED_MIN_INTERVAL", "1")
+            ),
+            DASHBOARD_FEED_REFRESH_SECONDS=int(
+                os.getenv("DASHBOARD_FEED_REFRESH_SECONDS", "60")
+            ),
+            DASHBOARD_FEED_HEARTBEAT_SECONDS=int(
+                os.getenv("DASHBOARD_FEED_HEARTBEAT_SECONDS", "15")
+            ),
+            DASHBOARD_STREAM_TOKEN_SECONDS=int(
+                os.getenv("DASHBOARD_STREAM_TOKEN_SECONDS", "60")
+            ),
+            FULL_TEXT_SEARCH_ENABLED=os.getenv("FULL_TEXT_SEARCH_ENABLED", "true").lower() == "true",
+            TYPEAHEAD_MIN_SIMILARITY=float(
+                os.getenv("TYPEAHEAD_MIN_SIMILARITY", "0.4")
+            ),
 
             # Segurança
             SECRET_KEY=os.getenv(
@@ -243,6 +403,27 @@ class Settings(BaseModel):
                 os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7")
             ),
             ALGORITHM=os.getenv("ALGORITHM", "HS256"),
+            AUTH_PRINCIPAL_CACHE_ENABLED=os.getenv(
+                "AUTH_PRINCIPAL_CACHE_ENABLED", "true"
+            ).lower() == "true",
+            AUTH_PRINCIPAL_CACHE_SIZE=int(
+                os.getenv("AUTH_PRINCIPAL_CACHE_SIZE", "1024")
+            ),
+            AUTH_PRINCIPAL_CACHE_LOCAL_TTL=int(
+                os.getenv("AUTH_PRINCIPAL_CACHE_LOCAL_TTL", "30")
+            ),
+            AUTH_PRINCIPAL_CACHE_REDIS_TTL=int(
+                os.getenv("AUTH_PRINCIPAL_CACHE_REDIS_TTL", "300")
+            ),
+            PASSWORD_HASH_WORKERS=int(
+                os.getenv("PASSWORD_HASH_WORKERS", "2")
+            ),
+            PASSWORD_HASH_MAX_PENDING=int(
+                os.getenv("PASSWORD_HASH_MAX_PENDING", "32")
+            ),
+            LOGIN_VERIFY_PASSWORD=os.getenv(
+                "LOGIN_VERIFY_PASSWORD", "false"
+            ).lower() == "true",
             ENCRYPTION_KEY=os.getenv(
                 "ENCRYPTION_KEY", "your-encryption-key-32-characters"
             ),
@@ -275,11 +456,20 @@ class Settings(BaseModel):
 
             # Rate limiting
             RATE_LIMIT_PER_MINUTE=int(
-                os.getenv("RATE_LIMIT_PER_MINUTE", "60")
+                os.getenv("RATE_LIMIT_PER_MINUTE", "600")
             ),
             RATE_LIMIT_PER_HOUR=int(
                 os.getenv("RATE_LIMIT_PER_HOUR", "1000")
             ),
+            RATE_LIMIT_ENABLED=os.getenv(
+                "RATE_LIMIT_ENABLED", "true"
+            ).lower() == "true",
+            RATE_LIMIT_AI_PER_MINUTE=int(
+                os.getenv("RATE_LIMIT_AI_PER_MINUTE", "10")
+            ),
+            RATE_LIMIT_JURISPRUDENCE_PER_MINUTE=int(
+                os.getenv("RATE_LIMIT_JURISPRUDENCE_PER_MINUTE", "20")
+            ),
 
             # Backup
             BACKUP_DIR=os.getenv("BACKUP_DIR", "./backups"),
@@ -353,6 +543,27 @@ def get_database_url() -> str:
     return settings.database_url
 
 
+def get_async_database_url() -> str:
+    """Obter URL do banco com driver assíncrono (asyncpg / aiosqlite)."""
+    url = get_database_url()
+    if url.startswith("postgres://"):
+        # Render/Heroku ainda fornecem o esquema antigo "postgres://"
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
+
+
+def get_replica_database_url() -> Optional[str]:
+    """Obter URL da réplica de leitura (None quando não configurada)."""
+    url = os.getenv("DATABASE_REPLICA_URL") or settings.DATABASE_REPLICA_URL
+    if url and url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url or None
+
+
 def get_redis_url() -> str:
     """Obter URL do Redis baseada no ambiente."""
     # Sempre usar variável de ambiente se disponível
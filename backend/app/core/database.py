@@ -2,16 +2,382 @@
 # CONFIGURAÇÃO DO BANCO DE DADOS
 # ===========================================
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import (
+    Column, DateTime, Integer, String, Table,
+    case, create_engine, delete, event, func, insert, inspect, or_, select, text, update,
+)
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+from collections import Counter
+from contextvars import ContextVar, Token
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
 import logging
+import os
+import threading
+import time
 
-from app.core.config import settings, get_database_url
+from app.core.config import (
+    settings,
+    get_database_url,
+    get_async_database_url,
+    get_replica_database_url,
+)
 from app.core.base import Base
 
+try:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    ASYNC_SQLALCHEMY_AVAILABLE = True
+except ImportError:
+    ASYNC_SQLALCHEMY_AVAILABLE = False
+    AsyncSession = None
+    async_sessionmaker = None
+    create_async_engine = None
+
 logger = logging.getLogger(__name__)
 
+# ===========================================
+# MÉTRICAS DO POOL DE CONEXÕES
+# ===========================================
+
+# Limites superiores (ms) dos buckets do histograma de espera por conexão
+POOL_WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+class PoolMetrics:
+    """Eventos de um pool de conexões (valores do worker atual)."""
+
+    def __init__(self, name: str, target_engine):
+        self.name = name
+        self.engine = target_engine
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.overflow_checkouts = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_histogram = [0] * (len(POOL_WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def _checked_out(self) -> int:
+        pool = self.engine.pool
+        if hasattr(pool, "checkedout"):
+            return pool.checkedout()
+        return max(self.checkouts - self.checkins, 0)
+
+    def record_wait(self, elapsed: float, timed_out: bool = False):
+        """Registrar o tempo de espera por uma conexão livre."""
+        elapsed_ms = elapsed * 1000
+        bucket = len(POOL_WAIT_BUCKETS_MS)
+        for index, limit in enumerate(POOL_WAIT_BUCKETS_MS):
+            if elapsed_ms <= limit:
+                bucket = index
+                break
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += elapsed
+            self.wait_max = max(self.wait_max, elapsed)
+            self.wait_histogram[bucket] += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        pool = self.engine.pool
+        in_overflow = hasattr(pool, "overflow") and pool.overflow() > 0
+        with self._lock:
+            self.checkouts += 1
+            if in_overflow:
+                self.overflow_checkouts += 1
+        checked_out = self._checked_out()
+        with self._lock:
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def on_soft_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.soft_invalidations += 1
+
+    def snapshot(self) -> dict:
+        """Estado atual do pool e contadores acumulados."""
+        pool = self.engine.pool
+        checked_out = self._checked_out()
+        data = {
+            "pool_class": type(pool).__name__,
+            "checked_out": checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "overflow_checkouts": self.overflow_checkouts,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+            "timeouts": self.timeouts,
+            "wait": {
+                "count": self.wait_count,
+                "avg_ms": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "max_ms": round(self.wait_max * 1000, 3),
+                "histogram_ms": {
+                    **{
+                        f"<={limit}": count
+                        for limit, count in zip(POOL_WAIT_BUCKETS_MS, self.wait_histogram)
+                    },
+                    f">{POOL_WAIT_BUCKETS_MS[-1]}": self.wait_histogram[-1],
+                },
+            },
+        }
+        if isinstance(pool, QueuePool):
+            max_overflow = max(pool._max_overflow, 0)
+            capacity = pool.size() + max_overflow
+            data.update({
+                "size": pool.size(),
+                "max_overflow": max_overflow,
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "capacity": capacity,
+                "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+            })
+        return data
+
+# Métricas por engine ("primary", "async", "replica")
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+class _TimedCheckoutMixin:
+    """Mede quanto tempo cada checkout esperou por uma conexão livre."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # dispose() recria o pool; as métricas continuam as mesmas
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool com tempo de espera por conexão."""
+
+class InstrumentedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool com tempo de espera por conexão."""
+
+def instrument_pool(name: str, target_engine) -> PoolMetrics:
+    """Registrar eventos do pool de um engine síncrono em pool_metrics[name]."""
+    metrics = PoolMetrics(name, target_engine)
+    pool = target_engine.pool
+    event.listen(pool, "connect", metrics.on_connect)
+    event.listen(pool, "checkout", metrics.on_checkout)
+    event.listen(pool, "checkin", metrics.on_checkin)
+    event.listen(pool, "invalidate", metrics.on_invalidate)
+    event.listen(pool, "soft_invalidate", metrics.on_soft_invalidate)
+    if isinstance(pool, _TimedCheckoutMixin):
+        pool.metrics = metrics
+    pool_metrics[name] = metrics
+    return metrics
+
+def get_pool_status() -> dict:
+    """Saturação dos pools deste worker (cada worker do uvicorn tem os seus)."""
+    return {
+        "pid": os.getpid(),
+        "config": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+        },
+        "pools": {name: metrics.snapshot() for name, metrics in pool_metrics.items()},
+    }
+
+# ===========================================
+# PERFIL SQLITE DE PRODUÇÃO
+# ===========================================
+
+SQLITE_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER")
+
+def is_sqlite_memory(url: str) -> bool:
+    """SQLite em memória (o banco só existe dentro de uma conexão)."""
+    if not url.startswith("sqlite"):
+        return False
+    database = url.split("://", 1)[1] if "://" in url else ""
+    return ":memory:" in database or database in ("", "/")
+
+def is_sqlite_production(url: str) -> bool:
+    """SQLite em arquivo usando o perfil de produção (WAL + pool de conexões)."""
+    if not url.startswith("sqlite") or is_sqlite_memory(url):
+        return False
+    return settings.SQLITE_PROFILE == "production"
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """PRAGMAs aplicados em cada nova conexão SQLite."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+class SQLiteWriterLock:
+    """Garante um único escritor por processo.
+
+    Com WAL, leitores não bloqueiam o escritor, mas duas transações
+    escrevendo ao mesmo tempo resultam em "database is locked". O lock é
+    obtido no primeiro statement de escrita da transação e liberado no
+    commit/rollback ou quando a conexão volta ao pool. Se o lock não for
+    obtido dentro do busy timeout, a escrita segue e o SQLite decide.
+    """
+
+    INFO_KEY = "sqlite_writer_lock"
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Obter o lock (bloqueante, até o busy timeout); retorna se conseguiu."""
+        return self._lock.acquire(timeout=self.timeout)
+
+    def release(self):
+        self._lock.release()
+
+    def _release(self, info):
+        if info.pop(self.INFO_KEY, False):
+            self._lock.release()
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get(self.INFO_KEY):
+            return
+        if not statement.lstrip()[:7].upper().startswith(SQLITE_WRITE_PREFIXES):
+            return
+        if self.acquire():
+            conn.info[self.INFO_KEY] = True
+        else:
+            logger.warning("⚠️ Timeout aguardando o lock de escrita do SQLite")
+
+    def on_transaction_end(self, conn):
+        self._release(conn.info)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        self._release(connection_record.info)
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        self._release(connection_record.info)
+
+    def attach(self, target_engine):
+        event.listen(target_engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(target_engine, "commit", self.on_transaction_end)
+        event.listen(target_engine, "rollback", self.on_transaction_end)
+        event.listen(target_engine.pool, "checkin", self.on_checkin)
+        event.listen(target_engine.pool, "invalidate", self.on_invalidate)
+
+sqlite_writer_lock = SQLiteWriterLock(timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+
+if ASYNC_SQLALCHEMY_AVAILABLE:
+    class SQLiteAsyncSession(AsyncSession):
+        """Sessão assíncrona que usa o mesmo lock de escrita do engine síncrono.
+
+        O lock não pode ser obtido nos eventos do engine: os statements do
+        aiosqlite rodam no event loop, que ficaria travado. Aqui ele é obtido
+        fora do loop (em uma thread) antes da primeira escrita da transação
+        (flush com alterações ou INSERT/UPDATE/DELETE explícito) e liberado no
+        commit, rollback ou close, como nas sessões síncronas.
+        """
+
+        writer_lock = sqlite_writer_lock
+
+        async def _acquire_writer(self):
+            if self.info.get(SQLiteWriterLock.INFO_KEY):
+                return
+            acquiring = asyncio.get_running_loop().run_in_executor(None, self.writer_lock.acquire)
+            try:
+                acquired = await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # A thread ainda pode obter o lock depois do cancelamento
+                acquiring.add_done_callback(
+                    lambda done: done.result() and self.writer_lock.release()
+                )
+                raise
+            if acquired:
+                self.info[SQLiteWriterLock.INFO_KEY] = True
+            else:
+                logger.warning("⚠️ Timeout aguardando o lock de escrita do SQLite")
+
+        def _release_writer(self):
+            if self.info.pop(SQLiteWriterLock.INFO_KEY, False):
+                self.writer_lock.release()
+
+        def _has_changes(self) -> bool:
+            session = self.sync_session
+            return bool(session.new or session.dirty or session.deleted)
+
+        async def execute(self, statement, *args, **kwargs):
+            if getattr(statement, "is_dml", False):
+                await self._acquire_writer()
+            return await super().execute(statement, *args, **kwargs)
+
+        async def flush(self, objects=None):
+            if self._has_changes():
+                await self._acquire_writer()
+            await super().flush(objects)
+
+        async def commit(self):
+            if self._has_changes():
+                await self._acquire_writer()
+            try:
+                await super().commit()
+            finally:
+                self._release_writer()
+
+        async def rollback(self):
+            try:
+                await super().rollback()
+            finally:
+                self._release_writer()
+
+        async def close(self):
+            try:
+                await super().close()
+            finally:
+                self._release_writer()
+
+def configure_sqlite_engine(target_engine, writer_lock: Optional[SQLiteWriterLock] = None):
+    """Aplicar o perfil de produção a um engine SQLite síncrono."""
+    event.listen(target_engine, "connect", _apply_sqlite_pragmas)
+    if writer_lock is not None:
+        writer_lock.attach(target_engine)
+
 # ===========================================
 # CONFIGURAÇÃO DO ENGINE
 # ===========================================
@@ -19,7 +385,7 @@ logger = logging.getLogger(__name__)
 # Configurações do engine baseadas no ambiente
 engine_kwargs = {
     "pool_pre_ping": True,
-    "pool_recycle": 300,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
 }
 
 if settings.ENVIRONMENT == "development":
@@ -29,16 +395,95 @@ if settings.ENVIRONMENT == "development":
         "echo_pool": settings.DEBUG,
     })
 
-# Se for SQLite, usar pool estático
-if "sqlite" in get_database_url():
-    engine_kwargs["poolclass"] = StaticPool
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
+def pool_kwargs(url: str, queue_poolclass=InstrumentedQueuePool) -> dict:
+    """Parâmetros de pool conforme o banco da URL."""
+    sized_pool = {
+        "poolclass": queue_poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    if "sqlite" in url:
+        if is_sqlite_production(url):
+            return {
+                **sized_pool,
+                "connect_args": {
+                    "check_same_thread": False,
+                    "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                },
+            }
+        # Banco em memória ou perfil "static": uma única conexão compartilhada
+        return {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        }
+    return sized_pool
 
 # Criar engine
 engine = create_engine(
     get_database_url(),
-    **engine_kwargs
+    **engine_kwargs,
+    **pool_kwargs(get_database_url())
 )
+if is_sqlite_production(get_database_url()):
+    configure_sqlite_engine(engine, writer_lock=sqlite_writer_lock)
+instrument_pool("primary", engine)
+
+# ===========================================
+# INSTRUMENTAÇÃO DE QUERIES POR REQUISIÇÃO
+# ===========================================
+
+class QueryStats:
+    """Quantidade de statements e tempo de banco de uma requisição."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements idênticos executados `threshold` vezes ou mais (padrão N+1)."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+# ContextVar é copiado para o threadpool do FastAPI, então endpoints
+# síncronos e assíncronos acumulam no mesmo objeto da requisição.
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def start_query_stats() -> Tuple[QueryStats, Token]:
+    """Iniciar a contagem de queries para o contexto atual."""
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+def stop_query_stats(token: Token):
+    """Encerrar a contagem iniciada por start_query_stats."""
+    _query_stats.reset(token)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _query_stats.get() is not None:
+        context._query_start_time = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    start_time = getattr(context, "_query_start_time", None)
+    if stats is None or start_time is None:
+        return
+    stats.record(statement, time.perf_counter() - start_time)
+
+def instrument_engine(target_engine):
+    """Registrar os hooks de contagem em um engine síncrono."""
+    event.listen(target_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target_engine, "after_cursor_execute", _after_cursor_execute)
+
+instrument_engine(engine)
 
 # ===========================================
 # SESSION FACTORY
@@ -87,15 +532,407 @@ class DatabaseContext:
             self.db.commit()
         self.db.close()
 
+# ===========================================
+# ENGINE E SESSÕES ASSÍNCRONAS
+# ===========================================
+
+def _create_async_engine():
+    """Criar engine assíncrono (asyncpg / aiosqlite) se o driver estiver instalado."""
+    if not ASYNC_SQLALCHEMY_AVAILABLE:
+        return None
+
+    url = get_database_url()
+    if url.startswith("sqlite") and not is_sqlite_production(url):
+        # A conexão única do StaticPool seria compartilhada por sessões
+        # assíncronas concorrentes, misturando as transações: em arquivo, uma
+        # conexão por sessão; em memória, sem engine assíncrono
+        if is_sqlite_memory(url):
+            logger.warning("⚠️ Engine assíncrono indisponível para SQLite em memória")
+            return None
+        async_pool = {"poolclass": NullPool}
+    else:
+        async_pool = pool_kwargs(url, InstrumentedAsyncAdaptedQueuePool)
+
+    try:
+        return create_async_engine(
+            get_async_database_url(),
+            **engine_kwargs,
+            **async_pool
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Engine assíncrono indisponível: {e}")
+        return None
+
+async_engine = _create_async_engine()
+if async_engine is not None:
+    if is_sqlite_production(get_database_url()):
+        # O lock de escrita fica na sessão (SQLiteAsyncSession), fora do event loop
+        configure_sqlite_engine(async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine)
+    instrument_pool("async", async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=SQLiteAsyncSession if is_sqlite_production(get_database_url()) else AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+) if async_engine is not None else None
+
+async def get_async_db():
+    """Dependência para obter sessão assíncrona do banco."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError(
+            "Sessão assíncrona indisponível: instale asyncpg (PostgreSQL) ou aiosqlite (SQLite)"
+        )
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Erro na sessão assíncrona do banco: {e}")
+            await db.rollback()
+            raise
+
+class AsyncDatabaseContext:
+    """Contexto assíncrono para gerenciar sessões do banco."""
+    
+    def __init__(self):
+        self.db = None
+    
+    async def __aenter__(self):
+        if AsyncSessionLocal is None:
+            raise RuntimeError("Sessão assíncrona indisponível")
+        self.db = AsyncSessionLocal()
+        return self.db
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type:
+                await self.db.rollback()
+            else:
+                await self.db.commit()
+        finally:
+            await self.db.close()
+
+# ===========================================
+# RÉPLICA DE LEITURA (ANALYTICS)
+# ===========================================
+
+def _create_replica_engine():
+    """Criar engine da réplica de leitura se DATABASE_REPLICA_URL estiver definida."""
+    replica_url = get_replica_database_url()
+    if not replica_url:
+        return None
+
+    try:
+        return create_engine(replica_url, **engine_kwargs, **pool_kwargs(replica_url))
+    except Exception as e:
+        logger.warning(f"⚠️ Réplica de leitura indisponível: {e}")
+        return None
+
+replica_engine = _create_replica_engine()
+if replica_engine is not None:
+    if is_sqlite_production(get_replica_database_url()):
+        configure_sqlite_engine(replica_engine)
+    instrument_engine(replica_engine)
+    instrument_pool("replica", replica_engine)
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=replica_engine
+) if replica_engine is not None else None
+
+# Atraso de replicação em segundos. Em um standby que já aplicou todo o WAL
+# recebido o atraso é zero, mesmo que o primário esteja ocioso há horas.
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class ReplicaRoutingPolicy:
+    """Decide se leituras analíticas vão para a réplica ou para o primário.
+
+    O atraso da réplica é medido no máximo uma vez a cada `check_interval`
+    segundos; acima de `max_lag_seconds` (ou se a réplica não responder) as
+    leituras voltam para o primário até a próxima verificação.
+    """
+
+    def __init__(self, max_lag_seconds: float, check_interval: float):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.last_lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._use_replica = replica_engine is not None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def measure_lag(self) -> float:
+        """Consultar o atraso atual da réplica em segundos."""
+        with replica_engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                return 0.0
+            return float(conn.execute(REPLICA_LAG_QUERY).scalar() or 0.0)
+
+    def should_use_replica(self) -> bool:
+        """Retornar True se a réplica estiver apta a servir a leitura."""
+        if replica_engine is None:
+            return False
+
+        if time.monotonic() - self._last_check < self.check_interval:
+            return self._use_replica
+
+        # Apenas uma thread mede o atraso; as demais usam a última decisão
+        if not self._lock.acquire(blocking=False):
+            return self._use_replica
+        try:
+            try:
+                self.last_lag = self.measure_lag()
+                self.last_error = None
+                use_replica = self.last_lag <= self.max_lag_seconds
+                if not use_replica:
+                    logger.warning(
+                        f"⚠️ Réplica atrasada ({self.last_lag:.1f}s > "
+                        f"{self.max_lag_seconds:.1f}s), usando primário"
+                    )
+            except Exception as e:
+                self.last_error = str(e)
+                use_replica = False
+                logger.warning(f"⚠️ Réplica indisponível, usando primário: {e}")
+
+            if use_replica and not self._use_replica:
+                logger.info("✅ Réplica de leitura restabelecida")
+            self._use_replica = use_replica
+            self._last_check = time.monotonic()
+            return use_replica
+        finally:
+            self._lock.release()
+
+    def status(self) -> dict:
+        """Estado atual do roteamento (usado no health check)."""
+        if replica_engine is None:
+            return {"configured": False}
+        return {
+            "configured": True,
+            "routing": "replica" if self._use_replica else "primary",
+            "lag_seconds": self.last_lag,
+            "max_lag_seconds": self.max_lag_seconds,
+            "error": self.last_error,
+        }
+
+read_routing_policy = ReplicaRoutingPolicy(
+    max_lag_seconds=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL,
+)
+
+def get_read_db():
+    """Dependência para leituras analíticas (réplica com fallback para o primário).
+
+    Use apenas em endpoints somente-leitura: dados escritos na mesma
+    requisição podem ainda não estar visíveis na réplica.
+    """
+    if read_routing_policy.should_use_replica():
+        db = ReadSessionLocal()
+    else:
+        db = SessionLocal()
+    try:
+        yield db
+    except Exception as e:
+        logger.error(f"Erro na sessão de leitura do banco: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
 # ===========================================
 # FUNÇÕES UTILITÁRIAS
 # ===========================================
 
-def create_tables():
-    """Criar todas as tabelas."""
+# Marcador da versão do schema aplicada ao banco. No boot rápido, o
+# create_all (que consulta cada tabela) só roda quando o marcador diverge.
+schema_version_table = Table(
+    "schema_version",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+def schema_fingerprint() -> str:
+    """Hash da definição de tabelas, colunas e índices registrados nos modelos."""
     # Importar todos os modelos para garantir que sejam registrados
     import app.models  # noqa
-    Base.metadata.create_all(bind=engine)
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(table.name.encode())
+        for column in table.columns:
+            digest.update(repr((
+                column.name,
+                repr(column.type),
+                column.nullable,
+                column.primary_key,
+                sorted(fk.target_fullname for fk in column.foreign_keys),
+            )).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(repr((
+                index.name,
+                index.unique,
+                [column.name for column in index.columns],
+            )).encode())
+    return digest.hexdigest()
+
+def get_schema_version(bind=None) -> Optional[str]:
+    """Fingerprint gravado no banco (None se ainda não houver marcador)."""
+    try:
+        with (bind or engine).connect() as conn:
+            return conn.execute(
+                select(schema_version_table.c.fingerprint)
+                .where(schema_version_table.c.id == 1)
+            ).scalar()
+    except sa_exc.DBAPIError:
+        # Tabela do marcador ainda não existe
+        return None
+
+def add_missing_columns(bind=None) -> List[str]:
+    """Adicionar a tabelas existentes as colunas anuláveis e os índices novos dos modelos.
+
+    O create_all só cria tabelas inteiras; colunas opcionais acrescentadas a
+    modelos existentes (ex.: chaves para tabelas de dimensão) entram aqui com
+    ALTER TABLE ADD COLUMN, e índices novos (ex.: os da paginação por cursor)
+    com CREATE INDEX. A chave estrangeira não é recriada em tabelas antigas
+    (o vínculo é mantido pela aplicação).
+    Retorna as colunas adicionadas ("tabela.coluna").
+    """
+    bind = bind or engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing]
+        for column in missing:
+            if not column.nullable or column.server_default is not None:
+                logger.warning(f"⚠️ Coluna {table.name}.{column.name} precisa de migração manual")
+                continue
+            with bind.begin() as conn:
+                column_ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+            added.append(f"{table.name}.{column.name}")
+        present = existing | {column.name for column in missing if f"{table.name}.{column.name}" in added}
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            # Índices sobre colunas que precisam de migração manual ficam para depois
+            if index.name not in existing_indexes and {column.name for column in index.columns} <= present:
+                index.create(bind=bind, checkfirst=True)
+                logger.info(f"✅ Índice criado: {index.name}")
+    for name in added:
+        logger.info(f"✅ Coluna adicionada: {name}")
+    return added
+
+def ensure_schema(bind=None, force: bool = False) -> bool:
+    """Criar tabelas (e colunas novas) se o marcador de schema divergir dos modelos.
+
+    Retorna True quando o create_all foi executado.
+    """
+    bind = bind or engine
+    fingerprint = schema_fingerprint()
+    if not force and get_schema_version(bind) == fingerprint:
+        return False
+
+    Base.metadata.create_all(bind=bind)
+    add_missing_columns(bind)
+    with bind.begin() as conn:
+        conn.execute(delete(schema_version_table))
+        conn.execute(insert(schema_version_table).values(
+            id=1,
+            fingerprint=fingerprint,
+            applied_at=datetime.utcnow(),
+        ))
+    return True
+
+# Backfills de dados (ex.: lançamentos de abertura do livro-razão) já
+# concluídos neste banco. O marcador também reserva o backfill: com vários
+# workers subindo juntos, só um deles roda cada backfill.
+backfill_markers_table = Table(
+    "backfill_markers",
+    Base.metadata,
+    Column("name", String(100), primary_key=True),
+    Column("started_at", DateTime, nullable=False),
+    Column("completed_at", DateTime, nullable=True),
+)
+
+# Reserva de um backfill não concluído que pode ser retomada (worker caído)
+BACKFILL_CLAIM_TIMEOUT = timedelta(hours=1)
+
+def claim_backfill(name: str, bind=None, force: bool = False) -> bool:
+    """Reservar um backfill; False se já concluído ou em andamento em outro worker.
+
+    force reserva mesmo concluído (bootstrap roda todos os backfills de novo),
+    mas nunca uma reserva em andamento em outro processo.
+    """
+    bind = bind or engine
+    table = backfill_markers_table
+    now = datetime.utcnow()
+    try:
+        with bind.begin() as conn:
+            conn.execute(insert(table).values(name=name, started_at=now))
+        return True
+    except sa_exc.IntegrityError:
+        pass
+    stale = table.c.completed_at.is_(None) & (table.c.started_at < now - BACKFILL_CLAIM_TIMEOUT)
+    conditions = [table.c.name == name, or_(table.c.completed_at.isnot(None), stale) if force else stale]
+    with bind.begin() as conn:
+        result = conn.execute(update(table).where(*conditions).values(started_at=now, completed_at=None))
+    return result.rowcount == 1
+
+def finish_backfill(name: str, completed: bool, bind=None):
+    """Marcar o backfill como concluído ou, se falhou, liberar a reserva."""
+    table = backfill_markers_table
+    with (bind or engine).begin() as conn:
+        if completed:
+            conn.execute(update(table).where(table.c.name == name).values(completed_at=datetime.utcnow()))
+        else:
+            conn.execute(delete(table).where(table.c.name == name, table.c.completed_at.is_(None)))
+
+def mark_backfill_completed(name: str, bind=None):
+    """Marcar como concluído um backfill executado fora de run_backfills."""
+    claim_backfill(name, bind, force=True)
+    finish_backfill(name, True, bind)
+
+def reset_backfill(name: str, bind=None):
+    """Esquecer a conclusão de um backfill (ex.: índice recriado vazio)."""
+    table = backfill_markers_table
+    try:
+        with (bind or engine).begin() as conn:
+            conn.execute(delete(table).where(table.c.name == name, table.c.completed_at.isnot(None)))
+    except sa_exc.DBAPIError:
+        # Tabela dos marcadores ainda não existe: nada a esquecer
+        pass
+
+def is_backfill_completed(name: str, bind=None) -> bool:
+    """Se o backfill já foi concluído neste banco (`bind`: engine ou conexão em uso)."""
+    table = backfill_markers_table
+    query = select(table.c.completed_at).where(table.c.name == name)
+    bind = bind or engine
+    if isinstance(bind, Connection):
+        # Na transação em uso: sem a tabela, o erro abortaria a transação (Postgres)
+        if not inspect(bind).has_table(table.name):
+            return False
+        return bind.execute(query).scalar() is not None
+    try:
+        with bind.connect() as conn:
+            return conn.execute(query).scalar() is not None
+    except sa_exc.DBAPIError:
+        # Tabela dos marcadores ainda não existe
+        return False
+
+def create_tables():
+    """Criar todas as tabelas."""
+    ensure_schema(force=True)
 
 def drop_tables():
     """Remover todas as tabelas."""
@@ -110,6 +947,90 @@ def reset_database():
     create_tables()
     logger.info("✅ Banco de dados resetado")
 
+# ===========================================
+# AGREGAÇÕES PORTÁVEIS
+# ===========================================
+#
+# Expressões que o Postgres e o SQLite escrevem de formas diferentes. O dialeto
+# vem de session.get_bind().dialect.name.
+
+def count_where(condition, dialect_name: str):
+    """COUNT condicional: FILTER (WHERE ...) no Postgres, SUM(CASE ...) nos demais."""
+    if dialect_name == "postgresql":
+        return func.count().filter(condition)
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def sum_where(expression, condition, dialect_name: str):
+    """SUM condicional (NULL sem linhas): FILTER (WHERE ...) no Postgres, SUM(CASE ...) nos demais."""
+    if dialect_name == "postgresql":
+        return func.sum(expression).filter(condition)
+    return func.sum(case((condition, expression), else_=None))
+
+def month_bucket(column, dialect_name: str):
+    """Mês da data como texto 'AAAA-MM' (date_trunc só existe no Postgres)."""
+    if dialect_name == "postgresql":
+        return func.to_char(func.date_trunc("month", column), "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+def seconds_between(start, end, dialect_name: str):
+    """Segundos entre duas datas (EXTRACT(EPOCH) no Postgres, julianday no SQLite)."""
+    if dialect_name == "postgresql":
+        return func.extract("epoch", end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400
+
+def upsert_increments(connection, table, index_columns, rows: List[Dict], value_column: str = "value"):
+    """
+    Somar rows[i][value_column] às linhas identificadas por index_columns.
+
+    ON CONFLICT DO UPDATE no Postgres e no SQLite (atômico, cria as linhas que
+    faltam); nos demais bancos, UPDATE e INSERT quando nada foi atualizado.
+    """
+    dialect_name = connection.dialect.name
+    value = table.c[value_column]
+    if dialect_name in ("postgresql", "sqlite"):
+        if dialect_name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(index_columns),
+            set_={value_column: value + statement.excluded[value_column], "updated_at": func.now()},
+        )
+        connection.execute(statement, rows)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(*(column == row[column.name] for column in index_columns))
+            .values({value_column: value + row[value_column], "updated_at": func.now()})
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**row))
+
+def begin_reconcile(db: Session, table) -> bool:
+    """
+    Iniciar a reconciliação de uma tabela de agregados (sessão sem transação aberta).
+
+    A reconciliação lê o esperado e o atual e soma a diferença: as duas
+    leituras precisam do mesmo snapshot e só um worker pode rodá-la por vez,
+    senão a mesma diferença é somada duas vezes.
+
+      - Postgres: REPEATABLE READ e pg_try_advisory_xact_lock; False se outro
+        worker já está reconciliando (liberado no commit/rollback)
+      - SQLite: um UPDATE vazio abre a transação de escrita antes das
+        leituras; outros escritores esperam o commit
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        key = int.from_bytes(hashlib.sha256(table.name.encode()).digest()[:8], "big", signed=True)
+        return bool(db.execute(select(func.pg_try_advisory_xact_lock(key))).scalar())
+    if dialect_name == "sqlite":
+        db.execute(update(table).where(text("1 = 0")).values({table.c.value: table.c.value}))
+    return True
+
 # ===========================================
 # VERIFICAÇÃO DE SAÚDE
 # ===========================================
@@ -122,4 +1043,9 @@ def check_database_health() -> bool:
         return True
     except Exception as e:
         logger.error(f"Health check do banco falhou: {e}")
-        return False
\ No newline at end of file
+        return False
+
+async def close_async_engine():
+    """Liberar conexões do engine assíncrono."""
+    if async_engine is not None:
+        await async_engine.dispose()
\ No newline at end of file
@@ -3,11 +3,14 @@
 # ===========================================
 
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_async_db
+from app.core.principal_cache import principal_cache
 from app.services.auth import AuthService
 from app.models.user import User, UserRole
 
@@ -23,17 +26,44 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Obter usuário atual a partir do token JWT.
+    
+    O usuário vem do cache de autenticação (app/core/principal_cache.py) ou,
+    em caso de falta, da sessão assíncrona. O objeto retornado não deve ser
+    alterado diretamente: para modificá-lo numa sessão síncrona, recarregue-o
+    pelo ID e chame invalidate_principal() depois do commit.
+    """
+    return await _user_from_token(token, "access", db)
+
+async def get_stream_user(
+    token: str = Query(..., description="Token curto de /dashboard/stream-token"),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
     """
+    Usuário de conexões SSE, pelo token na query string.
+
+    EventSource não envia o cabeçalho Authorization; o token de stream vale
+    só para feeds e por DASHBOARD_STREAM_TOKEN_SECONDS, o que limita o dano
+    de uma URL registrada em logs.
+    """
+    return await _user_from_token(token, "stream", db)
+
+async def _user_from_token(token: str, token_type: str, db: AsyncSession) -> User:
     try:
         # Verificar token
-        token_data = AuthService.verify_token(token, "access")
+        token_data = AuthService.verify_token(token, token_type)
         
-        # Buscar usuário
-        user = db.query(User).filter(User.id == token_data.user_id).first()
+        # Buscar usuário (cache em memória -> Redis -> banco)
+        if settings.AUTH_PRINCIPAL_CACHE_ENABLED:
+            user = await principal_cache.get_or_load(
+                token_data.user_id,
+                lambda: db.get(User, token_data.user_id)
+            )
+        else:
+            user = await db.get(User, token_data.user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -101,7 +131,7 @@ async def get_current_lawyer_user(
 
 async def get_current_user_optional(
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[User]:
     """
     Obter usuário atual opcionalmente.
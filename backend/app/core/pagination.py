@@ -0,0 +1,197 @@
+# ===========================================
+# PAGINAÇÃO POR CURSOR (KEYSET)
+# ===========================================
+#
+# Com OFFSET/LIMIT o banco lê e descarta todas as linhas anteriores à página:
+# o custo cresce com a profundidade. Aqui a página seguinte começa depois da
+# última linha lida, pela chave de ordenação e pelo id (desempate estável):
+#
+#   WHERE (chave, id) > (:chave, :id) ORDER BY chave, id LIMIT :n + 1
+#
+# que percorre o índice (chave, id) a partir do ponto certo: custo O(página)
+# em qualquer profundidade. O cursor é opaco para o cliente (base64url de um
+# JSON com a ordenação, o valor da chave e o id) e só vale para a ordenação
+# com que foi gerado. `skip` continua aceito na primeira requisição
+# (compatibilidade) e também devolve cursor para as páginas seguintes.
+#
+# O total é opcional e rápido: contadores do dashboard (processos e tarefas),
+# estimativa do planner no Postgres (pg_class.reltuples) para tabelas inteiras
+# e COUNT exato só para listas filtradas por colunas indexadas.
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, String, bindparam, func, select, text, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+class PaginationError(ValueError):
+    """Cursor ou ordenação inválidos."""
+
+class KeysetPage:
+    """Uma página de resultados e o cursor da próxima (None na última)."""
+
+    def __init__(self, items: List[Any], next_cursor: Optional[str],
+                 total: Optional[int] = None, total_estimated: bool = False):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+        self.total_estimated = total_estimated
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+    def metadata(self) -> Dict[str, Any]:
+        """Campos de paginação das respostas de lista."""
+        return {
+            "total": self.total,
+            "total_estimated": self.total_estimated,
+            "next_cursor": self.next_cursor,
+            "has_more": self.has_more,
+        }
+
+# ===========================================
+# ORDENAÇÃO E CURSOR
+# ===========================================
+
+def resolve_sort(sort: Optional[str], allowed: Dict[str, Any], default: str) -> Tuple[str, Any, bool]:
+    """Ordenação pedida ("campo" ou "-campo") -> (nome, coluna, decrescente)."""
+    sort = sort or default
+    descending = sort.startswith("-")
+    name = sort[1:] if descending else sort
+    if name not in allowed:
+        raise PaginationError(f"Ordenação inválida: {sort} (use {', '.join(allowed)}, com '-' para decrescente)")
+    return sort, allowed[name], descending
+
+def encode_cursor(sort: str, value: Any, row_id: int) -> str:
+    """Cursor opaco da posição (valor da chave, id) na ordenação `sort`."""
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps({"s": sort, "v": value, "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    """(valor da chave, id) de um cursor gerado para a ordenação `sort`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value, row_id = payload["v"], payload["i"]
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+    except (ValueError, TypeError, KeyError, binascii.Error, UnicodeError):
+        raise PaginationError("Cursor inválido")
+    if payload.get("s") != sort:
+        raise PaginationError("Cursor gerado para outra ordenação")
+    if not isinstance(row_id, int):
+        raise PaginationError("Cursor inválido")
+    return value, row_id
+
+def _cursor_key(column, dialect_name: str):
+    """
+    Expressão da chave guardada no cursor e comparada na próxima página.
+
+    No SQLite as datas são texto em formatos mistos (CURRENT_TIMESTAMP sem
+    microssegundos, valores do SQLAlchemy com): o cursor guarda o texto
+    gravado e a comparação é textual, como o ORDER BY.
+    """
+    if dialect_name == "sqlite" and isinstance(column.type, DateTime):
+        return type_coerce(column, String)
+    return column
+
+# ===========================================
+# CONSULTA
+# ===========================================
+
+def keyset_statement(statement, sort: str, column, id_column, descending: bool, cursor: Optional[str],
+                     limit: int, dialect_name: str, skip: int = 0):
+    """
+    `statement` (select de uma entidade) ordenado por (chave, id), a partir do
+    cursor, com uma linha a mais para saber se há próxima página. A chave do
+    cursor vem como última coluna de cada linha.
+    """
+    key = _cursor_key(column, dialect_name)
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort)
+        if column is id_column:
+            statement = statement.where(id_column < row_id if descending else id_column > row_id)
+        else:
+            position = tuple_(bindparam(None, value, type_=key.type), bindparam(None, row_id))
+            current = tuple_(column, id_column)
+            statement = statement.where(current < position if descending else current > position)
+    elif skip:
+        statement = statement.offset(skip)
+
+    if descending:
+        order = [column.desc()] if column is id_column else [column.desc(), id_column.desc()]
+    else:
+        order = [column] if column is id_column else [column, id_column]
+    return statement.add_columns(key.label("_cursor_key")).order_by(*order).limit(limit + 1)
+
+def split_page(rows: List[Any], sort: str, limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Entidades da página e o cursor da próxima, a partir das linhas de keyset_statement."""
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and page:
+        last = page[-1]
+        next_cursor = encode_cursor(sort, last[-1], last[0].id)
+    return [row[0] for row in page], next_cursor
+
+# ===========================================
+# TOTAL
+# ===========================================
+
+def count_rows(db: Session, model, *filters, counter: Optional[str] = None) -> Tuple[int, bool]:
+    """
+    Total de linhas do modelo com os filtros: (valor, é estimativa).
+
+    Sem filtros, usa o contador do dashboard `counter` (exato, mantido pelos
+    hooks) ou, no Postgres, a estimativa do planner; senão, COUNT exato.
+    """
+    if not filters:
+        if counter and settings.COUNTERS_ENABLED:
+            from app.services.counters import CounterService
+            return CounterService.get_counters(db)[counter], False
+        if db.get_bind().dialect.name == "postgresql":
+            estimate = db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": model.__tablename__},
+            ).scalar()
+            # -1: tabela ainda não analisada (sem estimativa)
+            if estimate is not None and estimate >= 0:
+                return int(estimate), True
+    total = db.execute(select(func.count()).select_from(model).where(*filters)).scalar()
+    return int(total or 0), False
+
+def paginate_sync(db: Session, statement, sort: str, column, id_column, descending: bool,
+                  cursor: Optional[str], limit: int, skip: int = 0) -> Tuple[List[Any], Optional[str]]:
+    """Executar keyset_statement numa sessão síncrona: (entidades, próximo cursor)."""
+    dialect_name = db.get_bind().dialect.name
+    rows = db.execute(
+        keyset_statement(statement, sort, column, id_column, descending, cursor, limit, dialect_name, skip)
+    ).all()
+    return split_page(rows, sort, limit)
+
+async def paginate(db: AsyncSession, statement, sort: str, column, id_column, descending: bool,
+                   cursor: Optional[str], limit: int, skip: int = 0) -> Tuple[List[Any], Optional[str]]:
+    """Executar keyset_statement numa sessão assíncrona: (entidades, próximo cursor)."""
+    dialect_name = db.get_bind().dialect.name
+    result = await db.execute(
+        keyset_statement(statement, sort, column, id_column, descending, cursor, limit, dialect_name, skip)
+    )
+    return split_page(result.all(), sort, limit)
+
+async def page_with_total(db: AsyncSession, statement, model, filters: List[Any], sort: str, column,
+                          descending: bool, cursor: Optional[str], limit: int, skip: int = 0,
+                          include_total: bool = True, counter: Optional[str] = None) -> KeysetPage:
+    """Página de `statement` (já filtrado por `filters`) e, opcionalmente, o total."""
+    items, next_cursor = await paginate(db, statement, sort, column, model.id, descending, cursor, limit, skip)
+    if not include_total:
+        return KeysetPage(items, next_cursor)
+    total, estimated = await db.run_sync(lambda session: count_rows(session, model, *filters, counter=counter))
+    return KeysetPage(items, next_cursor, total, estimated)
@@ -0,0 +1,232 @@
+# ===========================================
+# CACHE DO USUÁRIO AUTENTICADO
+# ===========================================
+#
+# get_current_user roda em toda requisição autenticada. Este cache guarda as
+# colunas do usuário (sem hash de senha e segredo de 2FA) em dois níveis,
+# indexados pelo 'sub' do token:
+#   1. LRU em memória do processo, com TTL curto (sem round trip algum);
+#   2. Redis, compartilhado entre workers, com TTL maior.
+# Alterações em usuários chamam invalidate(user_id). O LRU dos outros workers
+# só expira pelo TTL local, que limita a janela de dados desatualizados.
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import DateTime, Enum
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Colunas que nunca saem do banco pelo cache
+EXCLUDED_COLUMNS = {"hashed_password", "totp_secret"}
+
+REDIS_KEY_PREFIX = "auth_principal"
+
+# ===========================================
+# SERIALIZAÇÃO
+# ===========================================
+
+def serialize_user(user: User) -> Dict[str, Any]:
+    """Converter as colunas do usuário em um dicionário serializável em JSON."""
+    data = {}
+    for column in User.__table__.columns:
+        if column.name in EXCLUDED_COLUMNS:
+            continue
+        value = getattr(user, column.name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif value is not None and isinstance(column.type, Enum):
+            value = value.value
+        data[column.name] = value
+    return data
+
+def build_user(data: Dict[str, Any]) -> User:
+    """
+    Reconstruir um User destacado (detached) a partir do dicionário do cache.
+
+    O objeto tem identidade (id), então um db.add()/merge() acidental vira
+    UPDATE e não INSERT. Colunas excluídas do cache ficam não carregadas.
+    """
+    values = {}
+    for column in User.__table__.columns:
+        if column.name not in data:
+            continue
+        value = data[column.name]
+        if value is not None:
+            if isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column.type, Enum):
+                value = column.type.enum_class(value)
+        values[column.name] = value
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+# ===========================================
+# CACHE EM DOIS NÍVEIS
+# ===========================================
+
+class PrincipalCache:
+    """LRU em memória com TTL na frente de um nível Redis."""
+
+    def __init__(self, max_size: int, local_ttl: float, redis_ttl: int):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # Geração por usuário: impede que uma leitura iniciada antes de uma
+        # invalidação grave dados antigos depois dela
+        self._generations: Dict[int, int] = {}
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def redis_key(user_id: int) -> str:
+        return f"{REDIS_KEY_PREFIX}:{user_id}"
+
+    # -------------------------------------------
+    # Nível local
+    # -------------------------------------------
+
+    def _get_local(self, user_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return data
+
+    def _set_local(self, user_id: int, data: Dict[str, Any]):
+        self._entries[user_id] = (time.monotonic() + self.local_ttl, data)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    # -------------------------------------------
+    # Nível Redis
+    # -------------------------------------------
+
+    async def _redis(self):
+        """Cliente Redis, ou None com o circuito do Redis aberto."""
+        from app.core.redis import get_redis_if_available
+        return await get_redis_if_available()
+
+    def _redis_unavailable(self, error: Exception):
+        from app.core.redis import redis_breaker
+        redis_breaker.record_failure(error)
+        logger.warning(f"⚠️ Redis indisponível para o cache de autenticação: {error}")
+
+    async def _get_redis(self, user_id: int) -> Optional[Dict[str, Any]]:
+        client = await self._redis()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(self.redis_key(user_id))
+        except Exception as e:
+            self._redis_unavailable(e)
+            return None
+        from app.core.redis import redis_breaker
+        redis_breaker.record_success()
+        return json.loads(raw) if raw else None
+
+    async def _set_redis(self, user_id: int, data: Dict[str, Any]):
+        client = await self._redis()
+        if client is None:
+            return
+        try:
+            await client.setex(self.redis_key(user_id), self.redis_ttl, json.dumps(data))
+        except Exception as e:
+            self._redis_unavailable(e)
+
+    # -------------------------------------------
+    # API pública
+    # -------------------------------------------
+
+    async def get_or_load(
+        self,
+        user_id: int,
+        loader: Callable[[], Awaitable[Optional[User]]],
+    ) -> Optional[User]:
+        """
+        Obter o usuário pelo cache ou, em caso de falta, pelo loader.
+
+        Cada chamada devolve um objeto novo: alterações feitas pela requisição
+        não contaminam o cache.
+        """
+        data = self._get_local(user_id)
+        if data is not None:
+            self.local_hits += 1
+            return build_user(data)
+
+        generation = self._generations.get(user_id, 0)
+        data = await self._get_redis(user_id)
+        if data is not None:
+            self.redis_hits += 1
+            if self._generations.get(user_id, 0) == generation:
+                self._set_local(user_id, data)
+            return build_user(data)
+
+        self.misses += 1
+        user = await loader()
+        if user is None:
+            return None
+
+        data = serialize_user(user)
+        if self._generations.get(user_id, 0) == generation:
+            self._set_local(user_id, data)
+            await self._set_redis(user_id, data)
+        return user
+
+    async def invalidate(self, user_id: int):
+        """Remover o usuário dos dois níveis (chamar após alterá-lo)."""
+        self._entries.pop(user_id, None)
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        client = await self._redis()
+        if client is None:
+            return
+        try:
+            await client.delete(self.redis_key(user_id))
+        except Exception as e:
+            self._redis_unavailable(e)
+
+    def clear(self):
+        """Esvaziar o nível local."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de acerto/falta do cache."""
+        return {
+            "enabled": settings.AUTH_PRINCIPAL_CACHE_ENABLED,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+        }
+
+# ===========================================
+# INSTÂNCIA GLOBAL
+# ===========================================
+
+principal_cache = PrincipalCache(
+    max_size=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+    local_ttl=settings.AUTH_PRINCIPAL_CACHE_LOCAL_TTL,
+    redis_ttl=settings.AUTH_PRINCIPAL_CACHE_REDIS_TTL,
+)
+
+async def invalidate_principal(user_id: int):
+    """Invalidar o usuário no cache de autenticação."""
+    await principal_cache.invalidate(user_id)
@@ -0,0 +1,242 @@
+# ===========================================
+# RATE LIMITING DISTRIBUÍDO (TOKEN BUCKET)
+# ===========================================
+#
+# Cada combinação (política, usuário) tem um token bucket guardado no Redis,
+# compartilhado por todos os workers. A verificação é um único script Lua
+# (EVALSHA): lê o bucket, repõe os tokens pelo tempo decorrido (relógio do
+# próprio Redis), consome o custo e grava, tudo em um round trip atômico.
+# Sem Redis, cai para buckets em memória do processo (limite por worker).
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from jose import JWTError, jwt
+from starlette.requests import HTTPConnection
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Buckets mantidos em memória quando o Redis está indisponível
+LOCAL_MAX_BUCKETS = 10000
+
+REDIS_KEY_PREFIX = "ratelimit"
+
+# KEYS[1] = bucket; ARGV = capacidade, tokens por segundo, custo
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+# ===========================================
+# POLÍTICAS
+# ===========================================
+
+class RateLimitPolicy:
+    """Limite por usuário para as rotas que começam com um prefixo."""
+
+    def __init__(self, name: str, prefix: str, per_minute: int, burst: Optional[int] = None):
+        self.name = name
+        self.prefix = prefix
+        self.per_minute = per_minute
+        self.capacity = burst or per_minute
+        self.rate = per_minute / 60.0
+
+    def __repr__(self):
+        return f"<RateLimitPolicy({self.name}, {self.prefix}, {self.per_minute}/min)>"
+
+def default_policies() -> List[RateLimitPolicy]:
+    """Políticas padrão: rotas caras primeiro, depois o limite geral da API."""
+    api = settings.API_V1_STR
+    return [
+        RateLimitPolicy("ai", f"{api}/ai/", settings.RATE_LIMIT_AI_PER_MINUTE),
+        RateLimitPolicy(
+            "jurisprudence", f"{api}/jurisprudence/", settings.RATE_LIMIT_JURISPRUDENCE_PER_MINUTE
+        ),
+        RateLimitPolicy(
+            "datajud_search", f"{api}/datajud/search/", settings.DATAJUD_RATE_LIMIT_PER_MINUTE
+        ),
+        RateLimitPolicy("api", f"{api}/", settings.RATE_LIMIT_PER_MINUTE),
+    ]
+
+# ===========================================
+# LIMITADOR
+# ===========================================
+
+class RateLimitResult:
+    """Resultado da verificação de um bucket."""
+
+    def __init__(self, policy: RateLimitPolicy, allowed: bool, remaining: float, retry_after: float):
+        self.policy = policy
+        self.allowed = allowed
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.policy.capacity),
+            "X-RateLimit-Remaining": str(max(0, int(self.remaining))),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+class TokenBucketLimiter:
+    """Token bucket no Redis (um round trip) com fallback em memória."""
+
+    def __init__(self, policies: List[RateLimitPolicy]):
+        self.policies = policies
+        self._script = None
+        self._script_client = None
+        self._local: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def policy_for(self, path: str) -> Optional[RateLimitPolicy]:
+        """Política mais específica para o caminho (a primeira que casar)."""
+        for policy in self.policies:
+            if path.startswith(policy.prefix):
+                return policy
+        return None
+
+    @staticmethod
+    def identity(request: HTTPConnection) -> str:
+        """Usuário do token (sub) ou, sem token válido, o IP do cliente."""
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            try:
+                payload = jwt.decode(
+                    authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+                )
+                if payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            except JWTError:
+                pass
+        host = request.client.host if request.client else "unknown"
+        return f"ip:{host}"
+
+    # -------------------------------------------
+    # Redis
+    # -------------------------------------------
+
+    async def _redis_script(self):
+        """Script registrado no cliente Redis atual, ou None se indisponível."""
+        from app.core.redis import get_redis_if_available
+        client = await get_redis_if_available()
+        if client is None:
+            return None
+        if self._script is None or self._script_client is not client:
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            self._script_client = client
+        return self._script
+
+    def _redis_unavailable(self, error: Exception):
+        from app.core.redis import redis_breaker
+        redis_breaker.record_failure(error)
+        logger.warning(f"⚠️ Redis indisponível para rate limiting, usando limites locais: {error}")
+
+    # -------------------------------------------
+    # Fallback local
+    # -------------------------------------------
+
+    def _hit_local(self, key: str, policy: RateLimitPolicy, cost: float) -> Tuple[bool, float, float]:
+        now = time.monotonic()
+        tokens, ts = self._local.get(key, (float(policy.capacity), now))
+        tokens = min(policy.capacity, tokens + max(0.0, now - ts) * policy.rate)
+        allowed = tokens >= cost
+        retry_after = 0.0
+        if allowed:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / policy.rate
+        self._local[key] = (tokens, now)
+        self._local.move_to_end(key)
+        while len(self._local) > LOCAL_MAX_BUCKETS:
+            self._local.popitem(last=False)
+        return allowed, tokens, retry_after
+
+    # -------------------------------------------
+    # API pública
+    # -------------------------------------------
+
+    async def hit(self, request: HTTPConnection, cost: float = 1.0) -> Optional[RateLimitResult]:
+        """Consumir um token do bucket da requisição (None se não há política)."""
+        policy = self.policy_for(request.url.path)
+        if policy is None or policy.per_minute <= 0:
+            return None
+
+        key = f"{REDIS_KEY_PREFIX}:{policy.name}:{self.identity(request)}"
+        script = await self._redis_script()
+        if script is not None:
+            try:
+                allowed, tokens, retry_after = await script(
+                    keys=[key], args=[policy.capacity, policy.rate, cost]
+                )
+                from app.core.redis import redis_breaker
+                redis_breaker.record_success()
+                return RateLimitResult(policy, bool(int(allowed)), float(tokens), float(retry_after))
+            except Exception as e:
+                self._redis_unavailable(e)
+
+        allowed, tokens, retry_after = self._hit_local(key, policy, cost)
+        return RateLimitResult(policy, allowed, tokens, retry_after)
+
+# ===========================================
+# INSTÂNCIA GLOBAL
+# ===========================================
+
+rate_limiter = TokenBucketLimiter(default_policies())
+
+# ===========================================
+# DEPENDÊNCIA DO FASTAPI
+# ===========================================
+
+async def enforce_rate_limit(connection: HTTPConnection, response: Response):
+    """
+    Aplicar o rate limit às rotas da API.
+
+    É uma dependência do router (e não um middleware) para que a resposta 429
+    passe pelos handlers de exceção e pelo CORS como qualquer outro erro.
+    """
+    if not settings.RATE_LIMIT_ENABLED or connection.scope["type"] != "http":
+        return
+
+    result = await rate_limiter.hit(connection)
+    if result is None:
+        return
+
+    if not result.allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Limite de requisições excedido. Tente novamente em instantes.",
+            headers=result.headers()
+        )
+    response.headers.update(result.headers())
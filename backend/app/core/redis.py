@@ -2,37 +2,163 @@
 # CONFIGURAÇÃO DO REDIS
 # ===========================================
 
-import redis.asyncio as redis
+import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Any, Dict, Iterable, Optional, Union
+
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
+from app.core.codec import cache_codec
 from app.core.config import settings, get_redis_url
 
 logger = logging.getLogger(__name__)
 
+# Erros que indicam Redis fora do ar (erros de comando/script não contam)
+REDIS_CONNECTION_ERRORS = (RedisConnectionError, RedisTimeoutError, OSError, asyncio.TimeoutError)
+
+# ===========================================
+# CIRCUIT BREAKER
+# ===========================================
+#
+# Sem o breaker, cada chamada de cache com o Redis fora do ar esperaria o
+# timeout de conexão. Depois de failure_threshold falhas seguidas o circuito
+# abre: get_redis() falha na hora e os helpers de cache viram no-ops. Uma
+# tarefa em segundo plano testa o Redis (half-open) a cada reset_timeout e
+# fecha o circuito quando o PING volta; requisições nunca esperam pelo teste.
+
+class RedisUnavailable(Exception):
+    """Circuito aberto: o Redis não é chamado."""
+
+class RedisCircuitBreaker:
+    """Circuit breaker do cliente Redis (closed -> open -> half_open -> closed)."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def allow(self) -> bool:
+        """Se o Redis pode ser chamado agora."""
+        if self.state == self.CLOSED:
+            return True
+        self._ensure_probe()
+        return False
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self, error: Exception, connecting: bool = False):
+        """
+        Contar uma falha de conexão; abre o circuito ao atingir o limite.
+
+        Com connecting=True (falha ao criar o cliente) qualquer erro conta.
+        """
+        if not connecting and not isinstance(error, REDIS_CONNECTION_ERRORS):
+            return
+        self.failures += 1
+        self.last_error = str(error)
+        if self.state == self.CLOSED and self.failures >= self.failure_threshold:
+            self.trip(error)
+
+    def trip(self, error: Optional[Exception] = None):
+        """Abrir o circuito e agendar o teste em segundo plano."""
+        if error is not None:
+            self.last_error = str(error)
+        if self.state == self.CLOSED:
+            self.trips += 1
+            logger.warning(
+                f"⚠️ Redis indisponível, circuito aberto por {self.reset_timeout:.0f}s: {self.last_error}"
+            )
+        self.state = self.OPEN
+        self.opened_at = time.time()
+        self._ensure_probe()
+
+    def reset(self):
+        """Fechar o circuito (Redis respondeu)."""
+        if self.state != self.CLOSED:
+            logger.info("✅ Redis respondeu, circuito fechado")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+    def _ensure_probe(self):
+        """Garantir uma tarefa de teste viva no event loop atual."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = self._probe_task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._probe_task = loop.create_task(self._probe())
+
+    async def _probe(self):
+        while self.state != self.CLOSED:
+            await asyncio.sleep(self.reset_timeout)
+            self.state = self.HALF_OPEN
+            try:
+                await _ping()
+            except Exception as e:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+                self.last_error = str(e)
+                logger.debug(f"Redis ainda indisponível: {e}")
+            else:
+                self.reset()
+
+    def status(self) -> Dict[str, Any]:
+        """Estado do circuito para o /health."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "opened_at": self.opened_at,
+            "last_error": self.last_error,
+        }
+
+redis_breaker = RedisCircuitBreaker(
+    failure_threshold=settings.REDIS_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.REDIS_CIRCUIT_RESET_SECONDS,
+)
+
 # ===========================================
 # CLIENTE REDIS GLOBAL
 # ===========================================
 
 redis_client: Optional[redis.Redis] = None
 
+# Cliente sem decode_responses para valores binários (codec do cache)
+redis_binary_client: Optional[redis.Redis] = None
+
 # ===========================================
 # FUNÇÕES DE CONFIGURAÇÃO
 # ===========================================
 
-async def create_redis_client() -> redis.Redis:
+async def create_redis_client(decode_responses: bool = True) -> redis.Redis:
     """Criar cliente Redis com configurações adequadas."""
+    client = redis.from_url(
+        get_redis_url(),
+        encoding="utf-8",
+        decode_responses=decode_responses,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        retry_on_timeout=True,
+        health_check_interval=30
+    )
+    
     try:
-        client = redis.from_url(
-            get_redis_url(),
-            encoding="utf-8",
-            decode_responses=True,
-            socket_connect_timeout=5,
-            socket_timeout=5,
-            retry_on_timeout=True,
-            health_check_interval=30
-        )
-        
         # Testar conexão
         await client.ping()
         logger.info("✅ Cliente Redis criado com sucesso")
@@ -40,72 +166,269 @@ async def create_redis_client() -> redis.Redis:
         
     except Exception as e:
         logger.error(f"❌ Erro ao criar cliente Redis: {e}")
+        await client.close()
         raise
 
-async def get_redis() -> redis.Redis:
-    """Obter cliente Redis (singleton)."""
+async def _ping():
+    """PING no cliente atual (criando-o se preciso), usado pelo teste do breaker."""
     global redis_client
     
     if redis_client is None:
         redis_client = await create_redis_client()
+    else:
+        await redis_client.ping()
+
+async def get_redis(binary: bool = False) -> redis.Redis:
+    """
+    Obter cliente Redis (singleton).
+
+    binary=True devolve o cliente que lê bytes (valores do codec do cache).
+    Levanta RedisUnavailable na hora, sem tentar conectar, com o circuito aberto.
+    """
+    global redis_client, redis_binary_client
     
-    return redis_client
+    if not redis_breaker.allow():
+        raise RedisUnavailable(f"Circuito do Redis aberto: {redis_breaker.last_error}")
+    
+    client = redis_binary_client if binary else redis_client
+    if client is None:
+        try:
+            client = await create_redis_client(decode_responses=not binary)
+        except Exception as e:
+            redis_breaker.record_failure(e, connecting=True)
+            raise
+        if binary:
+            redis_binary_client = client
+        else:
+            redis_client = client
+    
+    return client
+
+async def get_redis_if_available(binary: bool = False) -> Optional[redis.Redis]:
+    """Cliente Redis, ou None se ele não estiver disponível (cache vira no-op)."""
+    try:
+        return await get_redis(binary=binary)
+    except Exception:
+        return None
 
 async def close_redis():
     """Fechar conexão com Redis."""
-    global redis_client
+    global redis_client, redis_binary_client
     
+    if redis_binary_client:
+        await redis_binary_client.close()
+        redis_binary_client = None
     if redis_client:
         await redis_client.close()
         redis_client = None
         logger.info("✅ Conexão Redis fechada")
 
+# ===========================================
+# TAGS DE INVALIDAÇÃO
+# ===========================================
+#
+# Cada entrada pode ser registrada em conjuntos de tags (tags:process:42,
+# tags:user:7, tags:dashboard...). Uma escrita invalida exatamente as entradas
+# das tags afetadas, em O(chaves marcadas), sem varrer o keyspace.
+# Os conjuntos são ordenados pela expiração de cada entrada: membros vencidos
+# são podados a cada escrita. Todo comando/script toca uma única chave, então
+# funciona também no Redis Cluster.
+
+TAG_KEY_PREFIX = "tags:"
+
+# Tamanho dos lotes do SCAN/UNLINK em clear_cache_pattern
+SCAN_BATCH_SIZE = 500
+
+DASHBOARD_TAG = "dashboard"
+
+def process_tag(process_id) -> str:
+    """Tag das entradas que dependem de um processo."""
+    return f"process:{process_id}"
+
+def user_tag(user_id) -> str:
+    """Tag das entradas que dependem de um usuário."""
+    return f"user:{user_id}"
+
+def cnj_tag(cnj_number: str) -> str:
+    """Tag das entradas de um número CNJ (somente dígitos)."""
+    return "cnj:" + "".join(filter(str.isdigit, cnj_number))
+
+def tag_key(tag: str) -> str:
+    """Chave do conjunto Redis que guarda as entradas de uma tag."""
+    return f"{TAG_KEY_PREFIX}{tag}"
+
+# KEYS[1] = conjunto da tag; ARGV = chave da entrada, expiração (epoch), agora, ttl (s)
+# Poda os membros vencidos; o conjunto vive tanto quanto a entrada mais longa
+# ainda válida dele.
+TAG_ENTRY_SCRIPT = """
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[3])
+local ttl = tonumber(ARGV[4])
+if redis.call('TTL', KEYS[1]) < ttl then
+    redis.call('EXPIRE', KEYS[1], ttl)
+end
+return 1
+"""
+
+_scripts = {}
+
+def _get_script(client: redis.Redis, source: str):
+    """Script Lua registrado no cliente atual (EVALSHA com fallback para EVAL)."""
+    cached = _scripts.get(source)
+    if cached is None or cached[0] is not client:
+        cached = (client, client.register_script(source))
+        _scripts[source] = cached
+    return cached[1]
+
 # ===========================================
 # FUNÇÕES ÚTEIS PARA CACHE
 # ===========================================
 
-async def set_cache(key: str, value: str, expire: int = 3600):
-    """Armazenar valor no cache."""
+async def set_cache(key: str, value: Union[str, bytes], expire: int = 3600, tags: Optional[Iterable[str]] = None):
+    """Armazenar valor no cache, opcionalmente registrado em tags."""
+    client = await get_redis_if_available()
+    if client is None:
+        return
     try:
-        client = await get_redis()
-        await client.setex(key, expire, value)
+        if tags:
+            now = time.time()
+            script = _get_script(client, TAG_ENTRY_SCRIPT)
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, expire, value)
+                for tag in tags:
+                    await script(keys=[tag_key(tag)], args=[key, now + expire, now, expire], client=pipe)
+                await pipe.execute()
+        else:
+            await client.setex(key, expire, value)
+        redis_breaker.record_success()
         logger.debug(f"Cache set: {key}")
     except Exception as e:
+        redis_breaker.record_failure(e)
         logger.error(f"Erro ao definir cache {key}: {e}")
 
 async def get_cache(key: str) -> Optional[str]:
     """Recuperar valor do cache."""
+    client = await get_redis_if_available()
+    if client is None:
+        return None
     try:
-        client = await get_redis()
         value = await client.get(key)
+        redis_breaker.record_success()
         if value:
             logger.debug(f"Cache hit: {key}")
         else:
             logger.debug(f"Cache miss: {key}")
         return value
     except Exception as e:
+        redis_breaker.record_failure(e)
         logger.error(f"Erro ao recuperar cache {key}: {e}")
         return None
 
 async def delete_cache(key: str):
     """Remover valor do cache."""
+    client = await get_redis_if_available()
+    if client is None:
+        return
     try:
-        client = await get_redis()
         await client.delete(key)
+        redis_breaker.record_success()
         logger.debug(f"Cache deleted: {key}")
     except Exception as e:
+        redis_breaker.record_failure(e)
         logger.error(f"Erro ao deletar cache {key}: {e}")
 
-async def clear_cache_pattern(pattern: str):
-    """Limpar cache por padrão."""
+async def get_cache_bytes(key: str) -> Optional[bytes]:
+    """Recuperar valor binário do cache (sem decodificar como texto)."""
+    client = await get_redis_if_available(binary=True)
+    if client is None:
+        return None
     try:
-        client = await get_redis()
-        keys = await client.keys(pattern)
-        if keys:
-            await client.delete(*keys)
-            logger.debug(f"Cache cleared pattern: {pattern}")
+        value = await client.get(key)
+        redis_breaker.record_success()
+        return value
+    except Exception as e:
+        redis_breaker.record_failure(e)
+        logger.error(f"Erro ao recuperar cache {key}: {e}")
+        return None
+
+async def set_cached_value(key: str, value: Any, expire: int = 3600, tags: Optional[Iterable[str]] = None):
+    """Armazenar um valor Python com o codec do cache (cabeçalho + compressão)."""
+    await set_cache(key, cache_codec.encode(value), expire, tags=tags)
+
+async def get_cached_value(key: str) -> Optional[Any]:
+    """Recuperar um valor gravado com set_cached_value (ou JSON legado)."""
+    data = await get_cache_bytes(key)
+    if data is None:
+        return None
+    try:
+        return cache_codec.decode(data)
+    except Exception as e:
+        # Formato de outra versão/worker ou valor corrompido: tratar como falta
+        logger.warning(f"Valor de cache ilegível {key}: {e}")
+        return None
+
+async def invalidate_tags(*tags: str) -> int:
+    """
+    Remover todas as entradas registradas nas tags (dois round trips).
+
+    Só os membros lidos saem do conjunto: uma entrada registrada durante a
+    invalidação continua marcada.
+    """
+    if not tags:
+        return 0
+    client = await get_redis_if_available()
+    if client is None:
+        return 0
+    try:
+        now = time.time()
+        async with client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.zrangebyscore(tag_key(tag), now, "+inf")
+            members_per_tag = await pipe.execute()
+        keys = {key for members in members_per_tag for key in members}
+        async with client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.unlink(key)
+            for tag, members in zip(tags, members_per_tag):
+                if members:
+                    pipe.zrem(tag_key(tag), *members)
+                pipe.zremrangebyscore(tag_key(tag), "-inf", now)
+            results = await pipe.execute()
+        deleted = sum(results[:len(keys)])
+        redis_breaker.record_success()
+        logger.debug(f"Cache invalidated tags {tags}: {deleted} chaves")
+        return deleted
+    except Exception as e:
+        redis_breaker.record_failure(e)
+        logger.error(f"Erro ao invalidar tags {tags}: {e}")
+        return 0
+
+async def clear_cache_pattern(pattern: str) -> int:
+    """
+    Limpar cache por padrão.
+
+    Fallback para entradas sem tag: usa SCAN incremental em lotes (não bloqueia
+    o Redis como KEYS) e UNLINK. Prefira invalidate_tags quando possível.
+    """
+    deleted = 0
+    client = await get_redis_if_available()
+    if client is None:
+        return deleted
+    try:
+        batch = []
+        async for key in client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                deleted += await client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await client.unlink(*batch)
+        redis_breaker.record_success()
+        logger.debug(f"Cache cleared pattern: {pattern} ({deleted} chaves)")
     except Exception as e:
+        redis_breaker.record_failure(e)
         logger.error(f"Erro ao limpar cache pattern {pattern}: {e}")
+    return deleted
 
 # ===========================================
 # FUNÇÕES ESPECÍFICAS DO SISTEMA
@@ -113,89 +436,71 @@ async def clear_cache_pattern(pattern: str):
 
 async def cache_user_session(user_id: int, session_data: dict, expire: int = 1800):
     """Cache de sessão do usuário."""
-    import json
     key = f"user_session:{user_id}"
-    await set_cache(key, json.dumps(session_data), expire)
+    await set_cached_value(key, session_data, expire, tags=[user_tag(user_id)])
 
 async def get_user_session(user_id: int) -> Optional[dict]:
     """Recuperar sessão do usuário."""
-    import json
     key = f"user_session:{user_id}"
-    data = await get_cache(key)
-    if data:
-        return json.loads(data)
-    return None
+    return await get_cached_value(key)
 
 async def invalidate_user_session(user_id: int):
     """Invalidar sessão do usuário."""
     key = f"user_session:{user_id}"
     await delete_cache(key)
 
-async def cache_process_data(cnj_number: str, process_data: dict, expire: int = 3600):
+async def cache_process_data(
+    cnj_number: str,
+    process_data: dict,
+    expire: int = 3600,
+    tags: Optional[Iterable[str]] = None
+):
     """Cache de dados de processo da API DataJud."""
-    import json
     key = f"process_data:{cnj_number}"
-    await set_cache(key, json.dumps(process_data), expire)
+    await set_cached_value(key, process_data, expire, tags=[cnj_tag(cnj_number), *(tags or [])])
 
 async def get_cached_process_data(cnj_number: str) -> Optional[dict]:
     """Recuperar dados de processo do cache."""
-    import json
     key = f"process_data:{cnj_number}"
-    data = await get_cache(key)
-    if data:
-        return json.loads(data)
-    return None
+    return await get_cached_value(key)
 
-async def cache_api_response(endpoint: str, params: dict, response_data: dict, expire: int = 1800):
-    """Cache genérico para respostas de API."""
+def api_cache_key(endpoint: str, params: dict) -> str:
+    """Chave de cache de uma resposta de API (hash dos parâmetros)."""
     import json
     import hashlib
     
-    # Criar hash dos parâmetros para a chave
     params_str = json.dumps(params, sort_keys=True)
     params_hash = hashlib.md5(params_str.encode()).hexdigest()
-    key = f"api_cache:{endpoint}:{params_hash}"
-    
-    await set_cache(key, json.dumps(response_data), expire)
+    return f"api_cache:{endpoint}:{params_hash}"
+
+async def cache_api_response(
+    endpoint: str,
+    params: dict,
+    response_data: dict,
+    expire: int = 1800,
+    tags: Optional[Iterable[str]] = None
+):
+    """Cache genérico para respostas de API (tags: ex. process_tag(id), DASHBOARD_TAG)."""
+    await set_cached_value(api_cache_key(endpoint, params), response_data, expire, tags=tags)
 
 async def get_cached_api_response(endpoint: str, params: dict) -> Optional[dict]:
     """Recuperar resposta de API do cache."""
-    import json
-    import hashlib
-    
-    params_str = json.dumps(params, sort_keys=True)
-    params_hash = hashlib.md5(params_str.encode()).hexdigest()
-    key = f"api_cache:{endpoint}:{params_hash}"
-    
-    data = await get_cache(key)
-    if data:
-        return json.loads(data)
-    return None
+    return await get_cached_value(api_cache_key(endpoint, params))
 
 # ===========================================
 # VERIFICAÇÃO DE SAÚDE
 # ===========================================
 
 async def check_redis_health() -> bool:
-    """Verificar saúde do Redis."""
+    """Verificar saúde do Redis (com o circuito aberto, responde sem chamar o Redis)."""
     try:
         client = await get_redis()
         await client.ping()
+        redis_breaker.record_success()
         return True
+    except RedisUnavailable:
+        return False
     except Exception as e:
+        redis_breaker.record_failure(e)
         logger.error(f"Redis health check failed: {e}")
         return False
-
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -2,27 +2,25 @@
 # APLICAÇÃO PRINCIPAL FASTAPI
 # ===========================================
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
-try:
-    from slowapi import Limiter, _rate_limit_exceeded_handler
-    from slowapi.util import get_remote_address
-    from slowapi.errors import RateLimitExceeded
-    SLOWAPI_AVAILABLE = True
-except ImportError:
-    SLOWAPI_AVAILABLE = False
-    Limiter = None
-    RateLimitExceeded = None
-    _rate_limit_exceeded_handler = None
 import time
 import logging
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import start_query_stats, stop_query_stats
 from app.api.v1.router import api_router
 from app.core.exceptions import CustomException
+from app.core.rate_limit import enforce_rate_limit
+from app.services.counters import install_counter_hooks, run_counter_reconciliation
+from app.services.rollups import install_rollup_hooks, run_rollup_reconciliation
+from app.services.clients import install_client_hooks
+from app.services.ledger import install_ledger_hooks
+from app.services.dashboard_feed import dashboard_feed, install_feed_hooks
+from app.services.process_search import ensure_search_schema, install_search_hooks
+from app.services.process_lookup import ensure_lookup_schema, install_lookup_hooks
 
 # ===========================================
 # CONFIGURAÇÃO DE LOGGING
@@ -34,18 +32,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# ===========================================
-# CONFIGURAÇÃO DO RATE LIMITER
-# ===========================================
-
-if SLOWAPI_AVAILABLE:
-    try:
-        limiter = Limiter(key_func=get_remote_address)
-    except Exception:
-        limiter = None
-else:
-    limiter = None
-
 # ===========================================
 # CRIAÇÃO DA APLICAÇÃO FASTAPI
 # ===========================================
@@ -59,11 +45,6 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
-# Adicionar rate limiter (se disponível)
-if SLOWAPI_AVAILABLE and limiter and RateLimitExceeded and _rate_limit_exceeded_handler:
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # ===========================================
 # MIDDLEWARES
 # ===========================================
@@ -115,8 +96,12 @@ async def log_requests(request: Request, call_next):
     # Log da requisição
     logger.info(f"Request: {request.method} {request.url}")
     
-    # Processar requisição
-    response = await call_next(request)
+    # Processar requisição contando as queries executadas
+    query_stats, query_stats_token = start_query_stats()
+    try:
+        response = await call_next(request)
+    finally:
+        stop_query_stats(query_stats_token)
     
     # Calcular tempo de processamento
     process_time = time.time() - start_time
@@ -124,11 +109,25 @@ async def log_requests(request: Request, call_next):
     # Log da resposta
     logger.info(
         f"Response: {response.status_code} - "
-        f"Time: {process_time:.4f}s"
+        f"Time: {process_time:.4f}s - "
+        f"DB: {query_stats.count} queries / {query_stats.total_time:.4f}s"
     )
     
-    # Adicionar header com tempo de processamento
+    # Detectar N+1 (mesmo statement repetido várias vezes)
+    repeated = query_stats.repeated_statements(settings.DB_N_PLUS_ONE_THRESHOLD)
+    if repeated:
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", request.url.path)
+        for statement, count in repeated:
+            logger.warning(
+                f"⚠️ Possível N+1 em {request.method} {route_path}: "
+                f"{count}x {' '.join(statement.split())[:200]}"
+            )
+    
+    # Adicionar headers com tempo de processamento e uso do banco
     response.headers["X-Process-Time"] = str(process_time)
+    response.headers["X-DB-Queries"] = str(query_stats.count)
+    response.headers["X-DB-Time"] = f"{query_stats.total_time:.4f}"
     
     return response
 
@@ -136,6 +135,20 @@ async def log_requests(request: Request, call_next):
 # EVENTOS DA APLICAÇÃO
 # ===========================================
 
+# Contadores do dashboard, agregados mensais, vínculo de clientes e livro-razão
+# mantidos a cada flush (clientes antes do livro-razão, que lê client_id);
+# o feed SSE do dashboard é avisado a cada commit que muda suas métricas
+install_counter_hooks()
+install_rollup_hooks()
+install_client_hooks()
+install_ledger_hooks()
+install_feed_hooks()
+install_lookup_hooks()
+install_search_hooks()
+
+# Tarefas de fundo iniciadas no startup (canceladas no shutdown)
+background_tasks = []
+
 @app.on_event("startup")
 async def startup_event():
     """Eventos executados na inicialização da aplicação."""
@@ -143,75 +156,75 @@ async def startup_event():
     
     # Criar tabelas do banco de dados
     try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("✅ Banco de dados inicializado")
-        
-        # Criar usuário admin automaticamente
-        from app.core.database import SessionLocal
-        from app.models.user import User
-        from app.services.auth import AuthService
+        if settings.FAST_BOOT:
+            # Boot rápido: create_all só quando o schema mudou; usuários
+            # padrão só num banco vazio (deploys sem `python -m app.cli prepare`)
+            from app.cli import seed_users_if_empty
+            from app.core.database import ensure_schema
+            if ensure_schema():
+                logger.info("✅ Banco de dados inicializado (schema atualizado)")
+            else:
+                logger.info("✅ Banco de dados inicializado (schema inalterado)")
+            seed_users_if_empty()
+            
+            # Configurar os mappers agora, e não na primeira requisição
+            from sqlalchemy.orm import configure_mappers
+            configure_mappers()
+        else:
+            from app.cli import seed_default_users
+            from app.core.database import ensure_schema
+            ensure_schema(force=True)
+            logger.info("✅ Banco de dados inicializado")
+            
+            # Criar usuários admin e demo automaticamente
+            seed_default_users()
         
-        db = SessionLocal()
-        from app.models.user import UserRole
-        try:
-            # Criar/garantir ADMIN (independente do DEMO)
-            try:
-                admin_user = db.query(User).filter(User.email == "admin@sistema.com").first()
-                if not admin_user:
-                    admin_user = User(
-                        email="admin@sistema.com",
-                        username="admin",
-                        full_name="Administrador",
-                        hashed_password=AuthService.get_password_hash("123456"),
-                        is_active=True,
-                        is_verified=True,
-                        role=UserRole.ADMIN
-                    )
-                    db.add(admin_user)
-                    db.commit()
-                    logger.info("✅ Usuário admin criado automaticamente")
-                else:
-                    logger.info("✅ Usuário admin já existe")
-            except Exception as e:
-                logger.error(f"❌ Erro ao criar/garantir usuário admin: {e}")
-                db.rollback()
-
-            # Criar/garantir DEMO (não-admin), mesmo que admin falhe
-            try:
-                demo_user = db.query(User).filter(User.email == "demo@demo.com").first()
-                if not demo_user:
-                    demo_user = User(
-                        email="demo@demo.com",
-                        username="demo",
-                        full_name="Usuário Demo",
-                        hashed_password=AuthService.get_password_hash("demo123"),
-                        is_active=True,
-                        is_verified=True,
-                        role=UserRole.ASSISTANT
-                    )
-                    db.add(demo_user)
-                    db.commit()
-                    logger.info("✅ Usuário DEMO criado (demo@demo.com / demo123)")
-                else:
-                    logger.info("✅ Usuário DEMO já existe")
-            except Exception as e:
-                logger.error(f"❌ Erro ao criar/garantir usuário DEMO: {e}")
-                db.rollback()
-        finally:
-            db.close()
+        # Estruturas da busca textual e aproximada (idempotentes); os processos
+        # existentes entram pelos backfills
+        ensure_lookup_schema()
+        ensure_search_schema()
+        if not settings.FAST_BOOT:
+            # Backfills pendentes (vínculo de clientes, lançamentos de
+            # abertura, dígitos dos números, índices da busca); no boot rápido
+            # rodam em segundo plano
+            from app.cli import run_backfills
+            run_backfills()
             
     except Exception as e:
         logger.error(f"❌ Erro ao inicializar banco: {e}")
     
     # Inicializar Redis
+    from app.core.redis import REDIS_CONNECTION_ERRORS, RedisUnavailable, get_redis, redis_breaker
     try:
-        from app.core.redis import get_redis
         redis_client = await get_redis()
         await redis_client.ping()
         logger.info("✅ Redis conectado")
+    except RedisUnavailable as e:
+        # Circuito já aberto (get_redis não tentou conectar)
+        logger.error(f"❌ Redis indisponível: {e}")
     except Exception as e:
+        # Abrir o circuito já no boot: as primeiras requisições não esperam
+        # timeouts de conexão; o teste em segundo plano reconecta depois
+        if isinstance(e, REDIS_CONNECTION_ERRORS):
+            redis_breaker.trip(e)
         logger.error(f"❌ Erro ao conectar Redis: {e}")
     
+    # Reconciliação periódica dos contadores e agregados (a primeira roda já no boot)
+    import asyncio
+    if settings.COUNTERS_ENABLED:
+        background_tasks.append(asyncio.create_task(run_counter_reconciliation()))
+    if settings.ROLLUPS_ENABLED:
+        background_tasks.append(asyncio.create_task(run_rollup_reconciliation()))
+    
+    # Recálculo compartilhado do feed SSE do dashboard
+    if settings.DASHBOARD_FEED_ENABLED:
+        background_tasks.append(asyncio.create_task(dashboard_feed.run()))
+    
+    # Boot rápido: backfills ainda não concluídos neste banco rodam em segundo plano
+    if settings.FAST_BOOT:
+        from app.cli import run_pending_backfills
+        background_tasks.append(asyncio.create_task(run_pending_backfills()))
+    
     logger.info("🎉 Aplicação iniciada com sucesso!")
 
 @app.on_event("shutdown")
@@ -219,10 +232,18 @@ async def shutdown_event():
     """Eventos executados no encerramento da aplicação."""
     logger.info("🛑 Encerrando aplicação...")
     
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    
     # Fechar conexões
     try:
         from app.core.redis import close_redis
+        from app.core.database import close_async_engine
+        from app.services.auth import password_executor
         await close_redis()
+        await close_async_engine()
+        password_executor.shutdown()
         logger.info("✅ Conexões fechadas")
     except Exception as e:
         logger.error(f"❌ Erro ao fechar conexões: {e}")
@@ -234,7 +255,11 @@ async def shutdown_event():
 # ===========================================
 
 # Incluir rotas da API
-app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(
+    api_router,
+    prefix=settings.API_V1_STR,
+    dependencies=[Depends(enforce_rate_limit)]
+)
 
 # ===========================================
 # ROTAS BÁSICAS
@@ -256,7 +281,6 @@ async def health_check():
     import time
     # Health check simples - sempre retorna OK se o servidor está rodando
     db_status = "unknown"
-    redis_status = "unknown"
     
     # Verificar banco de dados (opcional)
     try:
@@ -270,20 +294,20 @@ async def health_check():
         logger.warning(f"Database not available: {db_error}")
         db_status = "disconnected"
     
-    # Redis é opcional
-    try:
-        from app.core.redis import get_redis
-        redis_client = await get_redis()
-        await redis_client.ping()
-        redis_status = "connected"
-    except Exception as redis_error:
-        logger.warning(f"Redis not available: {redis_error}")
-        redis_status = "disconnected"
+    # Réplica de leitura (opcional)
+    from app.core.database import read_routing_policy
+    replica_status = read_routing_policy.status()
+    
+    # Redis é opcional; com o circuito aberto não há PING (resposta imediata)
+    from app.core.redis import check_redis_health, redis_breaker
+    redis_status = "connected" if await check_redis_health() else "disconnected"
     
     return {
         "status": "healthy",
         "database": db_status,
+        "database_replica": replica_status,
         "redis": redis_status,
+        "redis_circuit": redis_breaker.status(),
         "timestamp": time.time(),
         "version": settings.VERSION
     }
@@ -3,6 +3,7 @@
 # ===========================================
 
 from .user import User
+from .client import Client
 from .process import Process
 from .task import Task
 from .file import File
@@ -12,9 +13,14 @@ from .audit import AuditLog
 from .precatorio import Precatorio
 from .legal_diagnosis import LegalDiagnosis
 from .jurisprudence import Jurisprudence, JurisprudenceChat
+from .counter import DashboardCounter
+from .rollup import MonthlyRollup
+from .ledger import LedgerEntry
+from .payment import Payment
 
 __all__ = [
     "User",
+    "Client",
     "Process", 
     "Task",
     "File",
@@ -25,5 +31,9 @@ __all__ = [
     "LegalDiagnosis",
     "Jurisprudence",
     "JurisprudenceChat",
+    "DashboardCounter",
+    "MonthlyRollup",
+    "LedgerEntry",
+    "Payment",
 ]
 
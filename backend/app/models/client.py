@@ -0,0 +1,45 @@
+# ===========================================
+# MODELO DE CLIENTE
+# ===========================================
+
+from sqlalchemy import Column, String, Enum, Index, text
+from sqlalchemy.orm import relationship
+from enum import Enum as PyEnum
+
+from .base import BaseModel
+
+class ClientDocumentType(PyEnum):
+    """Tipo do documento do cliente."""
+    CPF = "cpf"
+    CNPJ = "cnpj"
+
+class Client(BaseModel):
+    """
+    Cliente (dimensão compartilhada por processos e precatórios).
+
+    A identidade é o CPF/CNPJ normalizado (só dígitos, com dígitos
+    verificadores válidos). Clientes sem documento válido são identificados
+    pelo nome normalizado (sem acentos, minúsculo, espaços simples), único
+    entre os clientes sem documento.
+    """
+
+    __tablename__ = "clients"
+    __table_args__ = (
+        Index(
+            "uq_clients_name_key_without_document", "name_key",
+            unique=True,
+            sqlite_where=text("document IS NULL"),
+            postgresql_where=text("document IS NULL"),
+        ),
+    )
+
+    name = Column(String(255), nullable=False, index=True)
+    name_key = Column(String(255), nullable=False, index=True)
+    document = Column(String(14), unique=True, index=True, nullable=True)
+    document_type = Column(Enum(ClientDocumentType), nullable=True)
+
+    processes = relationship("Process", foreign_keys="Process.client_id", back_populates="client")
+    precatorios = relationship("Precatorio", foreign_keys="Precatorio.cliente_id", back_populates="cliente")
+
+    def __repr__(self):
+        return f"<Client(id={self.id}, name='{self.name}', document='{self.document}')>"
@@ -0,0 +1,30 @@
+# ===========================================
+# MODELO DE CONTADORES DO DASHBOARD
+# ===========================================
+
+from sqlalchemy import Column, String, Integer, UniqueConstraint
+
+from .base import BaseModel
+
+# user_id dos contadores globais (não é FK: 0 não é um usuário)
+GLOBAL_SCOPE = 0
+
+class DashboardCounter(BaseModel):
+    """
+    Contador mantido incrementalmente (ex.: tasks.status.todo).
+
+    Uma linha por (escopo, nome): o escopo é GLOBAL_SCOPE ou o id do usuário
+    responsável pela tarefa / dono do processo.
+    """
+
+    __tablename__ = "dashboard_counters"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="uq_dashboard_counters_user_name"),
+    )
+
+    user_id = Column(Integer, nullable=False, default=GLOBAL_SCOPE, index=True)
+    name = Column(String(64), nullable=False)
+    value = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DashboardCounter(user_id={self.user_id}, name='{self.name}', value={self.value})>"
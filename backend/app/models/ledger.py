@@ -0,0 +1,50 @@
+# ===========================================
+# MODELO DO LIVRO-RAZÃO DE RECEITAS
+# ===========================================
+
+from sqlalchemy import Column, String, Integer, DateTime, Enum, Numeric, Index
+from enum import Enum as PyEnum
+
+from .base import BaseModel
+
+class LedgerEntryType(PyEnum):
+    """Tipo do lançamento."""
+    REVENUE = "revenue"    # variação do valor (actual_value) de um processo
+    PAYMENT = "payment"    # pagamento recebido (estorno com valor negativo)
+
+class LedgerEntry(BaseModel):
+    """
+    Lançamento imutável do livro-razão (somente inserção).
+
+    A receita de um processo é a soma dos seus lançamentos REVENUE; `cases`
+    vale +1 quando o processo passa a ter valor e -1 quando deixa de ter, de
+    modo que contagens também são somas. Categoria e cliente são copiados no
+    momento do lançamento e process_id/payment_id/client_id não são FKs: o
+    histórico continua íntegro depois que o processo ou o pagamento é excluído.
+    opening_process_id só é preenchido no lançamento de abertura (backfill),
+    com índice único: um processo nunca recebe duas aberturas.
+    """
+
+    __tablename__ = "revenue_ledger"
+    __table_args__ = (
+        Index("ix_revenue_ledger_category_date", "category", "entry_date"),
+        Index("ix_revenue_ledger_client_date", "client_id", "entry_date"),
+        Index("uq_revenue_ledger_opening", "opening_process_id", unique=True),
+    )
+
+    entry_date = Column(DateTime(timezone=True), nullable=False, index=True)
+    entry_type = Column(Enum(LedgerEntryType), nullable=False)
+    amount = Column(Numeric(15, 2), nullable=False)
+    cases = Column(Integer, nullable=False, default=0)
+    currency = Column(String(3), default="BRL", nullable=False)
+
+    category = Column(String(100), nullable=True)
+    client_id = Column(Integer, nullable=True)
+    client_name = Column(String(255), nullable=True)
+    process_id = Column(Integer, nullable=True, index=True)
+    payment_id = Column(Integer, nullable=True, index=True)
+    description = Column(String(255), nullable=True)
+    opening_process_id = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<LedgerEntry(id={self.id}, type='{self.entry_type.value}', amount={self.amount})>"
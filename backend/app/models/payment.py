@@ -0,0 +1,44 @@
+# ===========================================
+# MODELO DE PAGAMENTO
+# ===========================================
+
+from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, Numeric
+from sqlalchemy.orm import relationship
+from enum import Enum as PyEnum
+
+from .base import BaseModel
+
+class PaymentStatus(PyEnum):
+    """Status do pagamento."""
+    PENDING = "pendente"
+    PAID = "pago"
+    CANCELLED = "cancelado"
+
+class Payment(BaseModel):
+    """Pagamento (honorários, cálculos...) ligado a um processo ou tarefa."""
+
+    __tablename__ = "payments"
+
+    amount = Column(Numeric(15, 2), nullable=False)
+    currency = Column(String(3), default="BRL", nullable=False)
+    status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING, nullable=False, index=True)
+    description = Column(String(255), nullable=True)
+
+    due_date = Column(DateTime(timezone=True), nullable=True, index=True)
+    payment_date = Column(DateTime(timezone=True), nullable=True)
+    payment_method = Column(String(50), nullable=True)
+    transaction_id = Column(String(100), nullable=True)
+    notes = Column(Text, nullable=True)
+
+    # Relacionamentos
+    process_id = Column(ForeignKey("processes.id"), nullable=True, index=True)
+    task_id = Column(ForeignKey("tasks.id"), nullable=True)
+    user_id = Column(ForeignKey("users.id"), nullable=True, index=True)
+    created_by_id = Column(ForeignKey("users.id"), nullable=True)
+
+    process = relationship("Process", foreign_keys=[process_id])
+    task = relationship("Task", foreign_keys=[task_id])
+    user = relationship("User", foreign_keys=[user_id])
+
+    def __repr__(self):
+        return f"<Payment(id={self.id}, amount={self.amount}, status='{self.status.value}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Numeric, Integer
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Numeric, Integer, Index
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
 
@@ -23,6 +23,8 @@ class Precatorio(BaseModel):
     """Modelo de precatório vinculado a um processo."""
 
     __tablename__ = "precatorios"
+    # Paginação por cursor em (created_at, id)
+    __table_args__ = (Index("ix_precatorios_created_at_id", "created_at", "id"),)
 
     numero = Column(String(100), unique=True, index=True, nullable=False)
     processo_origem = Column(String(100), nullable=True)
@@ -41,6 +43,8 @@ class Precatorio(BaseModel):
 
     cliente_nome = Column(String(255), nullable=False)
     cliente_documento = Column(String(20), nullable=True)
+    cliente_id = Column(ForeignKey("clients.id"), nullable=True, index=True)
+    cliente = relationship("Client", foreign_keys=[cliente_id], back_populates="precatorios")
 
     processo_id = Column(ForeignKey("processes.id"), nullable=True)
     processo = relationship("Process", foreign_keys=[processo_id])
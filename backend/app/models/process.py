@@ -2,7 +2,7 @@
 # MODELO DE PROCESSO
 # ===========================================
 
-from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, Numeric
+from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, Numeric, Index
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
 
@@ -27,11 +27,15 @@ class Process(BaseModel):
     """Modelo de processo jurídico."""
     
     __tablename__ = "processes"
+    # Paginação por cursor em (updated_at, id)
+    __table_args__ = (Index("ix_processes_updated_at_id", "updated_at", "id"),)
     
     # Informações básicas
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     process_number = Column(String(100), unique=True, index=True, nullable=True)
+    # Só os dígitos do número (CNJ com ou sem pontuação), preenchido nos hooks de flush
+    process_number_digits = Column(String(30), index=True, nullable=True)
     client_name = Column(String(255), nullable=False)
     client_document = Column(String(20), nullable=True)
     
@@ -57,6 +61,10 @@ class Process(BaseModel):
     user_id = Column(ForeignKey("users.id"), nullable=False)
     user = relationship("User", foreign_keys=[user_id])
     
+    # Cliente normalizado (vinculado por client_name/client_document nos hooks de flush)
+    client_id = Column(ForeignKey("clients.id"), nullable=True, index=True)
+    client = relationship("Client", foreign_keys=[client_id], back_populates="processes")
+    
     # Funil de processos (temporariamente desabilitado para evitar problemas de importação)
     # funnel_id = Column(ForeignKey("process_funnels.id"), nullable=True)
     # funnel = relationship("ProcessFunnel", foreign_keys=[funnel_id], lazy="select")
@@ -0,0 +1,26 @@
+# ===========================================
+# MODELO DE AGREGADOS MENSAIS
+# ===========================================
+
+from sqlalchemy import Column, String, Numeric, UniqueConstraint
+
+from .base import BaseModel
+
+class MonthlyRollup(BaseModel):
+    """
+    Total mensal de uma métrica mantido incrementalmente (ex.: tasks.completed).
+
+    Uma linha por (métrica, mês); o mês é texto 'AAAA-MM', como month_bucket.
+    """
+
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (
+        UniqueConstraint("metric", "month", name="uq_monthly_rollups_metric_month"),
+    )
+
+    metric = Column(String(64), nullable=False)
+    month = Column(String(7), nullable=False, index=True)
+    value = Column(Numeric(18, 2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MonthlyRollup(metric='{self.metric}', month='{self.month}', value={self.value})>"
@@ -2,7 +2,7 @@
 # MODELO DE TAREFA
 # ===========================================
 
-from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, Boolean, Integer
+from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, Boolean, Integer, Index
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
 
@@ -27,6 +27,8 @@ class Task(BaseModel):
     """Modelo de tarefa."""
     
     __tablename__ = "tasks"
+    # Paginação por cursor em (updated_at, id)
+    __table_args__ = (Index("ix_tasks_updated_at_id", "updated_at", "id"),)
     
     # Informações básicas
     title = Column(String(255), nullable=False)
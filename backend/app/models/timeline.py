@@ -2,7 +2,7 @@
 # MODELO DE TIMELINE
 # ===========================================
 
-from sqlalchemy import Column, String, Text, ForeignKey, Enum, JSON
+from sqlalchemy import Column, String, Text, ForeignKey, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
 
@@ -26,6 +26,8 @@ class TimelineEvent(BaseModel):
     """Modelo de evento na timeline."""
     
     __tablename__ = "timeline_events"
+    # Paginação por cursor em (created_at, id)
+    __table_args__ = (Index("ix_timeline_events_created_at_id", "created_at", "id"),)
     
     # Informações básicas
     event_type = Column(Enum(TimelineEventType), nullable=False)
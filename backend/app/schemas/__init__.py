@@ -9,7 +9,7 @@ from .file import FileCreate, FileResponse, FileList
 from .timeline import TimelineEventResponse, TimelineEventList
 from .notification import NotificationResponse, NotificationList
 from .auth import Token, TokenData, LoginResponse
-from .common import MessageResponse, PaginatedResponse
+from .common import MessageResponse, PaginatedResponse, CursorPageMeta
 from .precatorio import (
     PrecatorioCreate,
     PrecatorioUpdate,
@@ -58,6 +58,7 @@ __all__ = [
     # Common schemas
     "MessageResponse",
     "PaginatedResponse",
+    "CursorPageMeta",
 
     # Precatorio
     "PrecatorioCreate",
@@ -24,6 +24,13 @@ class PaginatedResponse(BaseModel, Generic[T]):
     has_next: bool
     has_prev: bool
 
+class CursorPageMeta(BaseModel):
+    """Campos da paginação por cursor (total opcional; estimado em tabelas grandes)."""
+    total: Optional[int] = None
+    total_estimated: bool = False
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
 class BaseResponse(BaseModel):
     """Schema base para respostas."""
     id: int
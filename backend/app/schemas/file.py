@@ -7,7 +7,7 @@ from pydantic import BaseModel, Field
 from enum import Enum
 
 from app.models.file import FileType
-from app.schemas.common import BaseResponse
+from app.schemas.common import BaseResponse, CursorPageMeta
 
 class FileCreate(BaseModel):
     """Schema para criação de arquivo."""
@@ -35,10 +35,9 @@ class FileResponse(BaseResponse):
     process_id: Optional[int]
     uploaded_by_id: int
 
-class FileList(BaseModel):
+class FileList(CursorPageMeta):
     """Schema para lista de arquivos."""
     files: list[FileResponse]
-    total: int
     page: int
     per_page: int
 
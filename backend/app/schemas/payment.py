@@ -0,0 +1,34 @@
+# ===========================================
+# SCHEMAS DE PAGAMENTO
+# ===========================================
+
+from typing import Optional
+from decimal import Decimal
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from datetime import datetime
+
+from app.models.payment import PaymentStatus
+
+class PaymentCreate(BaseModel):
+    """Schema para registro de pagamento (aceita os nomes usados pelo frontend)."""
+    model_config = ConfigDict(populate_by_name=True)
+
+    amount: Decimal = Field(..., gt=0)
+    currency: str = Field("BRL", max_length=3)
+    status: PaymentStatus = PaymentStatus.PENDING
+    description: Optional[str] = Field(None, max_length=255)
+    due_date: Optional[datetime] = Field(None, alias="dueDate")
+    payment_date: Optional[datetime] = Field(None, alias="paymentDate")
+    payment_method: Optional[str] = Field(None, max_length=50, alias="method")
+    transaction_id: Optional[str] = Field(None, max_length=100, alias="transactionId")
+    notes: Optional[str] = None
+    process_id: Optional[int] = Field(None, alias="processId")
+    task_id: Optional[int] = Field(None, alias="taskId")
+    user_id: Optional[int] = Field(None, alias="userId")
+
+    @model_validator(mode="after")
+    def paid_when_dated(self):
+        """Pagamento informado com data e sem status já foi recebido."""
+        if self.payment_date is not None and "status" not in self.model_fields_set:
+            self.status = PaymentStatus.PAID
+        return self
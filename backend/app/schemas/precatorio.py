@@ -4,6 +4,7 @@ from typing import Optional, List
 from pydantic import BaseModel, Field
 
 from app.models.precatorio import PrecatórioNatureza, PrecatórioStatus
+from app.schemas.common import CursorPageMeta
 
 
 class PrecatorioBase(BaseModel):
@@ -42,6 +43,7 @@ class PrecatorioUpdate(BaseModel):
 
 class PrecatorioResponse(PrecatorioBase):
     id: int
+    cliente_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -50,9 +52,8 @@ class PrecatorioResponse(PrecatorioBase):
         from_attributes = True
 
 
-class PrecatorioList(BaseModel):
+class PrecatorioList(CursorPageMeta):
     items: List[PrecatorioResponse]
-    total: int
 
 
 
@@ -9,6 +9,7 @@ from decimal import Decimal
 from enum import Enum
 
 from app.models.process import ProcessStatus, ProcessPriority
+from app.schemas.common import CursorPageMeta
 from app.schemas.user import UserResponse
 from app.schemas.common import BaseResponse
 
@@ -53,6 +54,7 @@ class ProcessResponse(BaseResponse):
     process_number: Optional[str]
     client_name: str
     client_document: Optional[str]
+    client_id: Optional[int] = None
     status: ProcessStatus
     priority: ProcessPriority
     start_date: Optional[datetime]
@@ -66,10 +68,9 @@ class ProcessResponse(BaseResponse):
     user_id: int
     user: Optional[UserResponse] = None
 
-class ProcessList(BaseModel):
+class ProcessList(CursorPageMeta):
     """Schema para lista de processos."""
     processes: List[ProcessResponse]
-    total: int
     page: int
     per_page: int
 
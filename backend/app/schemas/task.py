@@ -8,7 +8,7 @@ from datetime import datetime
 from enum import Enum
 
 from app.models.task import TaskStatus, TaskPriority
-from app.schemas.common import BaseResponse
+from app.schemas.common import BaseResponse, CursorPageMeta
 
 class TaskCreate(BaseModel):
     """Schema para criação de tarefa."""
@@ -55,10 +55,9 @@ class TaskResponse(BaseResponse):
     assigned_user_id: Optional[int]
     created_by_id: int
 
-class TaskList(BaseModel):
+class TaskList(CursorPageMeta):
     """Schema para lista de tarefas."""
     tasks: list[TaskResponse]
-    total: int
     page: int
     per_page: int
 
@@ -8,7 +8,7 @@ from datetime import datetime
 from enum import Enum
 
 from app.models.timeline import TimelineEventType
-from app.schemas.common import BaseResponse
+from app.schemas.common import BaseResponse, CursorPageMeta
 
 class TimelineEventResponse(BaseResponse):
     """Schema para resposta de evento na timeline."""
@@ -20,10 +20,9 @@ class TimelineEventResponse(BaseResponse):
     process_id: Optional[int]
     task_id: Optional[int]
 
-class TimelineEventList(BaseModel):
+class TimelineEventList(CursorPageMeta):
     """Schema para lista de eventos da timeline."""
     events: list[TimelineEventResponse]
-    total: int
     page: int
     per_page: int
 
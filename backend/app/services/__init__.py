@@ -4,11 +4,11 @@
 
 from .auth import AuthService
 from .user import UserService
-from .process import ProcessService
-from .task import TaskService
-from .file import FileService
-from .notification import NotificationService
-from .timeline import TimelineService
+from .process import ProcessService, AsyncProcessService
+from .task import TaskService, AsyncTaskService
+from .file import FileService, AsyncFileService
+from .notification import NotificationService, AsyncNotificationService
+from .timeline import TimelineService, AsyncTimelineService
 
 __all__ = [
     "AuthService",
@@ -17,7 +17,12 @@ __all__ = [
     "TaskService",
     "FileService",
     "NotificationService",
-    "TimelineService"
+    "TimelineService",
+    "AsyncProcessService",
+    "AsyncTaskService",
+    "AsyncFileService",
+    "AsyncNotificationService",
+    "AsyncTimelineService"
 ]
 
 
@@ -2,6 +2,7 @@
 # SERVIÇO DE IA COM HUGGING FACE
 # ===========================================
 
+import importlib.util
 import logging
 from typing import Optional, Dict, Any, List
 import httpx
@@ -11,13 +12,9 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Tentar importar huggingface_hub se disponível
-try:
-    from huggingface_hub import InferenceClient
-    HF_HUB_AVAILABLE = True
-except ImportError:
-    HF_HUB_AVAILABLE = False
-    InferenceClient = None
+# huggingface_hub é pesado: apenas verificar se está instalado e importar
+# no primeiro uso do cliente (ver AIService.hf_client)
+HF_HUB_AVAILABLE = importlib.util.find_spec("huggingface_hub") is not None
 
 
 class AIService:
@@ -37,18 +34,11 @@ class AIService:
         self.timeout = settings.AI_REQUEST_TIMEOUT
         self.cache_enabled = settings.AI_CACHE_ENABLED
 
-        # Tentar usar huggingface_hub se disponível (forma recomendada)
-        if HF_HUB_AVAILABLE and self.api_token:
-            try:
-                self.hf_client = InferenceClient(token=self.api_token)
-                logger.info("Usando huggingface_hub para Inference API")
-            except Exception as e:
-                logger.warning(f"Erro ao inicializar huggingface_hub: {e}")
-                self.hf_client = None
-        else:
-            self.hf_client = None
-            if not HF_HUB_AVAILABLE:
-                logger.warning("huggingface_hub não disponível, usando httpx")
+        # huggingface_hub (forma recomendada) é carregado no primeiro uso
+        self._hf_client = None
+        self._hf_client_loaded = False
+        if not HF_HUB_AVAILABLE:
+            logger.warning("huggingface_hub não disponível, usando httpx")
 
         # Cliente HTTP (fallback)
         headers = {}
@@ -60,6 +50,20 @@ class AIService:
             headers=headers
         )
 
+    @property
+    def hf_client(self):
+        """Cliente do huggingface_hub, criado no primeiro uso."""
+        if not self._hf_client_loaded:
+            self._hf_client_loaded = True
+            if HF_HUB_AVAILABLE and self.api_token:
+                try:
+                    from huggingface_hub import InferenceClient
+                    self._hf_client = InferenceClient(token=self.api_token)
+                    logger.info("Usando huggingface_hub para Inference API")
+                except Exception as e:
+                    logger.warning(f"Erro ao inicializar huggingface_hub: {e}")
+        return self._hf_client
+
     async def analyze_text(
         self,
         text: str,
@@ -2,27 +2,30 @@
 # SERVIÇO DE AUTENTICAÇÃO
 # ===========================================
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+import asyncio
+import importlib.util
+import logging
 import secrets
+import threading
 try:
     import pyotp
     PYOTP_AVAILABLE = True
 except ImportError:
     PYOTP_AVAILABLE = False
     pyotp = None
-try:
-    import qrcode
-    QRCODE_AVAILABLE = True
-except ImportError:
-    QRCODE_AVAILABLE = False
-    qrcode = None
+# qrcode (e o Pillow) só é usado na configuração do 2FA: importar sob demanda
+QRCODE_AVAILABLE = importlib.util.find_spec("qrcode") is not None
 from io import BytesIO
 import base64
 
 from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -30,6 +33,8 @@ from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin
 from app.schemas.auth import Token, TokenData, LoginResponse, TwoFactorSetup
 
+logger = logging.getLogger(__name__)
+
 # Contexto de criptografia para senhas
 # Usa PBKDF2 como padrão (sem limite de 72 bytes) e mantém compatibilidade com hashes bcrypt existentes.
 pwd_context = CryptContext(
@@ -38,6 +43,83 @@ pwd_context = CryptContext(
     bcrypt__truncate_error=False  # compat para verificar/gerar bcrypt sem levantar erro
 )
 
+# ===========================================
+# EXECUTOR DE HASH DE SENHA
+# ===========================================
+
+class PasswordExecutor:
+    """
+    Executor limitado para hash/verificação de senha.
+
+    PBKDF2 e bcrypt levam dezenas de milissegundos de CPU: rodando no event
+    loop, uma rajada de logins trava todas as outras requisições. Aqui eles
+    rodam em threads dedicadas (hashlib e bcrypt liberam o GIL), e o número
+    de operações em andamento + na fila é limitado: acima de max_pending a
+    requisição é rejeitada com 503 em vez de acumular latência.
+    Com workers=0 a operação roda direto no event loop (comportamento antigo).
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def run(self, func, *args):
+        """Executar func(*args) no executor, respeitando o limite da fila."""
+        if self.workers <= 0:
+            return func(*args)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Muitas autenticações simultâneas. Tente novamente em instantes.",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    def status(self) -> Dict[str, Any]:
+        """Estado atual do executor."""
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        """Encerrar as threads do executor."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_executor = PasswordExecutor(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
 class AuthService:
     """Serviço de autenticação e autorização."""
     
@@ -51,6 +133,16 @@ class AuthService:
         """Gerar hash da senha."""
         return pwd_context.hash(password)
     
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """Verificar senha no executor dedicado (para endpoints assíncronos)."""
+        return await password_executor.run(pwd_context.verify, plain_password, hashed_password)
+    
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """Gerar hash da senha no executor dedicado (para endpoints assíncronos)."""
+        return await password_executor.run(pwd_context.hash, password)
+    
     @staticmethod
     def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         """Criar token de acesso JWT."""
@@ -65,6 +157,14 @@ class AuthService:
         encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
         return encoded_jwt
     
+    @staticmethod
+    def create_stream_token(data: Dict[str, Any]) -> str:
+        """Criar token curto para feeds SSE (aceito só por get_stream_user)."""
+        to_encode = data.copy()
+        expire = datetime.utcnow() + timedelta(seconds=settings.DASHBOARD_STREAM_TOKEN_SECONDS)
+        to_encode.update({"exp": expire, "type": "stream"})
+        return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    
     @staticmethod
     def create_refresh_token(data: Dict[str, Any]) -> str:
         """Criar token de refresh JWT."""
@@ -77,16 +177,12 @@ class AuthService:
     @staticmethod
     def verify_token(token: str, token_type: str = "access") -> TokenData:
         """Verificar e decodificar token JWT."""
+        # Roda em toda requisição autenticada: nada de payload em nível INFO
         try:
-            import logging
-            logger = logging.getLogger(__name__)
-            
-            logger.info(f"🔍 Verificando token (tipo: {token_type})...")
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            logger.info(f"✅ Token decodificado. Payload: {payload}")
             
             if payload.get("type") != token_type:
-                logger.error(f"❌ Tipo de token incorreto. Esperado: {token_type}, Recebido: {payload.get('type')}")
+                logger.warning(f"❌ Tipo de token incorreto. Esperado: {token_type}, Recebido: {payload.get('type')}")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Tipo de token inválido"
@@ -95,10 +191,8 @@ class AuthService:
             user_id_str = payload.get("sub")
             email = payload.get("email")
             
-            logger.info(f"🔍 user_id (sub): {user_id_str} (tipo: {type(user_id_str)}), email: {email}")
-            
             if user_id_str is None or email is None:
-                logger.error(f"❌ Token inválido: user_id={user_id_str}, email={email}")
+                logger.warning("❌ Token inválido: sub ou email ausente")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Token inválido - user_id ou email não encontrado"
@@ -108,26 +202,24 @@ class AuthService:
             try:
                 user_id = int(user_id_str)
             except (ValueError, TypeError):
-                logger.error(f"❌ user_id não é um número válido: {user_id_str}")
+                logger.warning(f"❌ user_id não é um número válido: {user_id_str}")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Token inválido - user_id inválido"
                 )
             
-            logger.info(f"✅ Token válido! user_id: {user_id}, email: {email}")
+            logger.debug(f"✅ Token válido (tipo: {token_type}, user_id: {user_id})")
             return TokenData(user_id=user_id, email=str(email), exp=payload.get("exp"))
             
+        except HTTPException:
+            raise
         except JWTError as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"❌ Erro JWT ao verificar token: {e}")
+            logger.warning(f"❌ Erro JWT ao verificar token: {e}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Token inválido: {str(e)}"
             )
         except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
             logger.error(f"❌ Erro inesperado ao verificar token: {e}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -135,14 +227,15 @@ class AuthService:
             )
     
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-        """Autenticar usuário com email e senha."""
-        user = db.query(User).filter(User.email == email).first()
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+        """Autenticar usuário com email e senha (senha verificada no executor dedicado)."""
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalar_one_or_none()
         
         if not user:
             return None
         
-        if not AuthService.verify_password(password, user.hashed_password):
+        if not await AuthService.verify_password_async(password, user.hashed_password):
             return None
         
         if not user.is_active:
@@ -151,9 +244,9 @@ class AuthService:
         return user
     
     @staticmethod
-    def login(db: Session, login_data: UserLogin) -> Dict[str, Any]:
+    async def login(db: AsyncSession, login_data: UserLogin) -> Dict[str, Any]:
         """Realizar login do usuário."""
-        user = AuthService.authenticate_user(db, login_data.email, login_data.password)
+        user = await AuthService.authenticate_user(db, login_data.email, login_data.password)
         
         if not user:
             raise HTTPException(
@@ -187,7 +280,7 @@ class AuthService:
         
         # Atualizar último login
         user.last_login = datetime.utcnow()
-        db.commit()
+        await db.commit()
         
         # Criar resposta
         token = Token(
@@ -214,11 +307,12 @@ class AuthService:
                 detail="2FA já está habilitado para este usuário"
             )
         
-        if not PYOTP_AVAILABLE:
+        if not PYOTP_AVAILABLE or not QRCODE_AVAILABLE:
             raise HTTPException(
                 status_code=503,
                 detail="2FA não disponível neste ambiente"
             )
+        import qrcode
         
         # Gerar secret
         secret = pyotp.random_base32()
@@ -0,0 +1,240 @@
+# ===========================================
+# EXPORTAÇÃO COLUNAR PARA BI
+# ===========================================
+#
+# Analistas montavam bases percorrendo /processes, /tasks e /timeline página a
+# página. Aqui cada tabela é exportada inteira (ou a partir de updated_at) em
+# Parquet, Arrow IPC (stream) ou CSV:
+#
+#   - a leitura usa cursor no servidor (stream_results; cursor nomeado no
+#     Postgres) e lotes fixos de EXPORT_BATCH_SIZE linhas (result.partitions)
+#   - cada lote vira um record batch (um row group no Parquet) e os bytes
+#     escritos são entregues logo em seguida, sem acumular o arquivo
+#
+# A memória fica limitada a um lote, qualquer que seja o tamanho da tabela.
+# Parquet e Arrow dependem do pyarrow (opcional); sem ele, só CSV.
+
+import csv
+import importlib.util
+import io
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum as PyEnum
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import JSON, Boolean, Date, DateTime, Enum, Float, Integer, Numeric, select
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.models.audit import AuditLog
+from app.models.precatorio import Precatorio
+from app.models.process import Process
+from app.models.task import Task
+from app.models.timeline import TimelineEvent
+
+# pyarrow é pesado: importado só na primeira exportação colunar
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Tabelas exportáveis (nome na URL/CLI -> modelo)
+EXPORT_TABLES = {
+    "processes": Process,
+    "tasks": Task,
+    "timeline_events": TimelineEvent,
+    "precatorios": Precatorio,
+    "audit_logs": AuditLog,
+}
+
+# Formato -> (media type, extensão, precisa de pyarrow)
+EXPORT_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", ".parquet", True),
+    "arrow": ("application/vnd.apache.arrow.stream", ".arrows", True),
+    "csv": ("text/csv; charset=utf-8", ".csv", False),
+}
+
+class ExportError(ValueError):
+    """Tabela ou formato de exportação inválido/indisponível."""
+
+def available_formats() -> List[str]:
+    return [name for name, (_, _, needs_arrow) in EXPORT_FORMATS.items() if PYARROW_AVAILABLE or not needs_arrow]
+
+def validate_export(table_name: str, fmt: str):
+    """Levantar ExportError se a tabela ou o formato não puder ser exportado."""
+    if table_name not in EXPORT_TABLES:
+        raise ExportError(f"Tabela não exportável: {table_name} (use {', '.join(EXPORT_TABLES)})")
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Formato inválido: {fmt} (use {', '.join(EXPORT_FORMATS)})")
+    if fmt not in available_formats():
+        raise ExportError(f"Formato {fmt} requer pyarrow (instale-o ou use csv)")
+
+# ===========================================
+# LEITURA EM LOTES
+# ===========================================
+
+def _enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, PyEnum) else value
+
+def _json_text(value: Any) -> Optional[str]:
+    return json.dumps(value, ensure_ascii=False, default=str) if value is not None else None
+
+def _converters(table) -> List:
+    """Conversão por coluna: enums pelo valor, JSON como texto."""
+    converters = []
+    for column in table.columns:
+        if isinstance(column.type, Enum):
+            converters.append(_enum_value)
+        elif isinstance(column.type, JSON):
+            converters.append(_json_text)
+        else:
+            converters.append(None)
+    return converters
+
+def iter_batches(connection: Connection, table_name: str, batch_size: Optional[int] = None,
+                 since: Optional[datetime] = None) -> Iterator[List[tuple]]:
+    """Lotes de linhas da tabela, por id, lidos com cursor no servidor."""
+    table = EXPORT_TABLES[table_name].__table__
+    statement = select(table).order_by(table.c.id)
+    if since is not None:
+        statement = statement.where(table.c.updated_at >= since)
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    converters = _converters(table)
+    result = connection.execution_options(stream_results=True, max_row_buffer=batch_size).execute(statement)
+    try:
+        for partition in result.partitions(batch_size):
+            yield [
+                tuple(convert(value) if convert else value for convert, value in zip(converters, row))
+                for row in partition
+            ]
+    finally:
+        result.close()
+
+# ===========================================
+# ESCRITORES
+# ===========================================
+
+class _ChunkSink:
+    """Destino de escrita que só acumula os bytes até o próximo drain()."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def arrow_schema(table_name: str):
+    """Schema Arrow a partir dos tipos das colunas (enums e JSON como texto)."""
+    import pyarrow as pa
+
+    fields = []
+    for column in EXPORT_TABLES[table_name].__table__.columns:
+        column_type = column.type
+        if isinstance(column_type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column_type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column_type, Numeric):
+            arrow_type = pa.decimal128(column_type.precision or 38, column_type.scale or 0)
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC" if column_type.timezone else None)
+        elif isinstance(column_type, Date):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable or column.primary_key))
+    return pa.schema(fields)
+
+def _record_batch(schema, rows: List[tuple]):
+    import pyarrow as pa
+
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return format(value, "f")
+    return value
+
+def iter_export(connection: Connection, table_name: str, fmt: str, batch_size: Optional[int] = None,
+                since: Optional[datetime] = None) -> Iterator[bytes]:
+    """Bytes do arquivo exportado, gerados lote a lote."""
+    validate_export(table_name, fmt)
+    batches = iter_batches(connection, table_name, batch_size, since)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([column.name for column in EXPORT_TABLES[table_name].__table__.columns])
+        for rows in batches:
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+        return
+
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(table_name)
+    sink = _ChunkSink()
+    output = pa.PythonFile(sink, mode="w")
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(output, schema, compression="zstd")
+    else:
+        writer = ipc.new_stream(output, schema)
+    try:
+        for rows in batches:
+            writer.write_batch(_record_batch(schema, rows))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def export_to_file(connection: Connection, table_name: str, fmt: str, directory: str,
+                   batch_size: Optional[int] = None, since: Optional[datetime] = None) -> Dict[str, Any]:
+    """Gravar a exportação de uma tabela em `directory`; retorna caminho e tamanho."""
+    validate_export(table_name, fmt)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{table_name}{EXPORT_FORMATS[fmt][1]}")
+    size = 0
+    with open(path, "wb") as target:
+        for chunk in iter_export(connection, table_name, fmt, batch_size, since):
+            target.write(chunk)
+            size += len(chunk)
+    return {"table": table_name, "path": path, "bytes": size}
@@ -0,0 +1,308 @@
+# ===========================================
+# DIMENSÃO DE CLIENTES
+# ===========================================
+#
+# Processos (client_name/client_document) e precatórios (cliente_nome/
+# cliente_documento) guardavam o cliente em texto livre, e as contagens e
+# rankings agrupavam por esse texto ("Fulano", "fulano " e "FULANO" viravam
+# três clientes). Aqui cada um é vinculado a um registro de `clients`:
+#
+#   - identidade pelo CPF/CNPJ normalizado (só dígitos, verificadores válidos)
+#   - sem documento válido, pelo nome normalizado (sem acentos, minúsculo)
+#
+# O vínculo é feito pelo hook before_flush sempre que o nome ou o documento
+# muda; registros anteriores são vinculados por `python -m app.cli
+# backfill-clients`. Agregados por cliente agrupam pela FK indexada.
+
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, event, func, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.client import Client, ClientDocumentType
+from app.models.ledger import LedgerEntry, LedgerEntryType
+from app.models.precatorio import Precatorio
+from app.models.process import Process
+
+logger = logging.getLogger(__name__)
+
+# Colunas de nome, documento e FK do cliente em cada modelo vinculado
+LINKED_COLUMNS = {
+    Process: ("client_name", "client_document", "client_id"),
+    Precatorio: ("cliente_nome", "cliente_documento", "cliente_id"),
+}
+
+# ===========================================
+# NORMALIZAÇÃO
+# ===========================================
+
+def _check_digit(digits: str, weights: List[int]) -> int:
+    remainder = sum(int(digit) * weight for digit, weight in zip(digits, weights)) % 11
+    return 0 if remainder < 2 else 11 - remainder
+
+def _valid_cpf(digits: str) -> bool:
+    if len(set(digits)) == 1:
+        return False
+    first = _check_digit(digits[:9], list(range(10, 1, -1)))
+    second = _check_digit(digits[:10], list(range(11, 1, -1)))
+    return digits[9:] == f"{first}{second}"
+
+def _valid_cnpj(digits: str) -> bool:
+    if len(set(digits)) == 1:
+        return False
+    weights = [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    first = _check_digit(digits[:12], weights[1:])
+    second = _check_digit(digits[:13], weights)
+    return digits[12:] == f"{first}{second}"
+
+def normalize_document(value: Optional[str]) -> Optional[Tuple[str, ClientDocumentType]]:
+    """CPF/CNPJ só com dígitos e o tipo (None se ausente ou inválido)."""
+    digits = re.sub(r"\D", "", value or "")
+    if len(digits) == 11 and _valid_cpf(digits):
+        return digits, ClientDocumentType.CPF
+    if len(digits) == 14 and _valid_cnpj(digits):
+        return digits, ClientDocumentType.CNPJ
+    return None
+
+def normalize_name(value: Optional[str]) -> str:
+    """Nome sem acentos, minúsculo e com espaços simples (chave de clientes sem documento)."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(without_accents.casefold().split())[:255]
+
+def client_identity(name: Optional[str], document: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Chave de identidade: ("document", dígitos) ou ("name", nome normalizado)."""
+    normalized = normalize_document(document)
+    if normalized is not None:
+        return "document", normalized[0]
+    name_key = normalize_name(name)
+    return ("name", name_key) if name_key else None
+
+# ===========================================
+# RESOLUÇÃO
+# ===========================================
+
+def resolve_client(session: Session, name: str, document: Optional[str],
+                   cache: Dict[Tuple[str, str], Client]) -> Optional[Client]:
+    """
+    Cliente da identidade de (nome, documento), criado se ainda não existir.
+
+    `cache` evita consultas repetidas e clientes duplicados entre registros
+    do mesmo flush/lote. Clientes novos são inseridos na hora, ignorando o
+    conflito com um cliente igual criado por outra transação, e relidos.
+    """
+    identity = client_identity(name, document)
+    if identity is None:
+        return None
+    if identity in cache:
+        return cache[identity]
+
+    kind, key = identity
+    if kind == "document":
+        query = select(Client).where(Client.document == key)
+    else:
+        query = select(Client).where(Client.name_key == key, Client.document.is_(None))
+    with session.no_autoflush:
+        client = session.execute(query).scalars().first()
+        if client is None:
+            normalized = normalize_document(document) if kind == "document" else None
+            insert_client(session.connection(), {
+                "name": " ".join(name.split())[:255],
+                "name_key": normalize_name(name),
+                "document": normalized[0] if normalized else None,
+                "document_type": normalized[1] if normalized else None,
+            })
+            client = session.execute(query).scalars().one()
+    cache[identity] = client
+    return client
+
+def insert_client(connection, values: Dict[str, Any]):
+    """
+    Inserir um cliente, sem erro se outra transação já criou o mesmo.
+
+    ON CONFLICT DO NOTHING no Postgres e no SQLite (vale para o documento
+    único e para o índice parcial do nome); nos demais bancos, INSERT num
+    SAVEPOINT descartado em caso de conflito.
+    """
+    table = Client.__table__
+    dialect_name = connection.dialect.name
+    if dialect_name in ("postgresql", "sqlite"):
+        if dialect_name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        connection.execute(dialect_insert(table).values(**values).on_conflict_do_nothing())
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(table.insert().values(**values))
+    except IntegrityError:
+        pass
+
+# ===========================================
+# HOOK DE FLUSH
+# ===========================================
+
+def _identity_changed(obj) -> bool:
+    name_column, document_column, fk_column = LINKED_COLUMNS[type(obj)]
+    state = inspect(obj)
+    if getattr(obj, fk_column) is None:
+        return True
+    return any(state.attrs[column].history.has_changes() for column in (name_column, document_column))
+
+def _before_flush(session: Session, flush_context, instances):
+    """Vincular ao cliente os processos/precatórios novos ou com nome/documento alterado."""
+    cache: Dict[Tuple[str, str], Client] = {}
+    for obj in list(session.new) + list(session.dirty):
+        if type(obj) not in LINKED_COLUMNS or not _identity_changed(obj):
+            continue
+        name_column, document_column, fk_column = LINKED_COLUMNS[type(obj)]
+        client = resolve_client(session, getattr(obj, name_column), getattr(obj, document_column), cache)
+        if client is not None:
+            setattr(obj, fk_column, client.id)
+
+_hooks_installed = False
+
+def install_client_hooks():
+    """Registrar o hook em todas as sessões (antes do livro-razão, que lê client_id)."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Session, "before_flush", _before_flush)
+    _hooks_installed = True
+
+# ===========================================
+# SERVIÇO
+# ===========================================
+
+class ClientService:
+    """Vínculo e agregados da dimensão de clientes."""
+
+    @staticmethod
+    def _link_model(db: Session, model, cache: Dict[Tuple[str, str], Client]) -> int:
+        """Vincular registros sem cliente, com um UPDATE por par (nome, documento)."""
+        name_column, document_column, fk_column = (getattr(model, column) for column in LINKED_COLUMNS[model])
+        pairs = db.execute(
+            select(name_column, document_column).where(fk_column.is_(None)).distinct()
+        ).all()
+        resolved = [(name, document, resolve_client(db, name, document, cache)) for name, document in pairs]
+        db.flush()
+
+        linked = 0
+        for name, document, client in resolved:
+            if client is None:
+                continue
+            result = db.execute(
+                update(model)
+                .where(
+                    fk_column.is_(None),
+                    name_column == name,
+                    document_column.is_(None) if document is None else document_column == document,
+                )
+                .values({fk_column.key: client.id})
+                .execution_options(synchronize_session=False)
+            )
+            linked += result.rowcount
+        return linked
+
+    @staticmethod
+    def backfill(db: Session) -> Dict[str, int]:
+        """
+        Vincular processos e precatórios existentes e os lançamentos do livro-razão.
+
+        Os UPDATEs são feitos fora do ORM: vincular a dimensão não altera
+        valores, então não geram lançamentos. Nos lançamentos só client_id
+        (nulo) é preenchido, a partir do processo.
+        """
+        cache: Dict[Tuple[str, str], Client] = {}
+        processes = ClientService._link_model(db, Process, cache)
+        precatorios = ClientService._link_model(db, Precatorio, cache)
+
+        process_client = (
+            select(Process.client_id)
+            .where(Process.id == LedgerEntry.process_id)
+            .scalar_subquery()
+        )
+        ledger = db.execute(
+            update(LedgerEntry)
+            .where(
+                LedgerEntry.client_id.is_(None),
+                LedgerEntry.process_id.in_(select(Process.id).where(Process.client_id.isnot(None))),
+            )
+            .values(client_id=process_client)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        return {"processes": processes, "precatorios": precatorios, "ledger_entries": ledger}
+
+    @staticmethod
+    def with_aggregates(db: Session, clients: List[Client]) -> List[Dict[str, Any]]:
+        """Clientes com número de processos, precatórios e receita (uma consulta por tabela, pelas FKs)."""
+        if not clients:
+            return []
+        client_ids = [client.id for client in clients]
+        processes = dict(db.execute(
+            select(Process.client_id, func.count())
+            .where(Process.client_id.in_(client_ids))
+            .group_by(Process.client_id)
+        ).all())
+        precatorios = dict(db.execute(
+            select(Precatorio.cliente_id, func.count())
+            .where(Precatorio.cliente_id.in_(client_ids))
+            .group_by(Precatorio.cliente_id)
+        ).all())
+        revenue = dict(db.execute(
+            select(LedgerEntry.client_id, func.sum(LedgerEntry.amount))
+            .where(and_(LedgerEntry.client_id.in_(client_ids), LedgerEntry.entry_type == LedgerEntryType.REVENUE))
+            .group_by(LedgerEntry.client_id)
+        ).all())
+
+        return [
+            {
+                "id": client.id,
+                "name": client.name,
+                "document": client.document,
+                "document_type": client.document_type.value if client.document_type else None,
+                "processes": processes.get(client.id, 0),
+                "precatorios": precatorios.get(client.id, 0),
+                "revenue": float(revenue.get(client.id) or 0),
+            }
+            for client in clients
+        ]
+
+    @staticmethod
+    def search(db: Session, query: Optional[str] = None, skip: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """Clientes por documento (dígitos) ou prefixo do nome normalizado, com agregados."""
+        statement = select(Client)
+        if query:
+            normalized = normalize_document(query)
+            if normalized is not None:
+                statement = statement.where(Client.document == normalized[0])
+            else:
+                statement = statement.where(Client.name_key.startswith(normalize_name(query), autoescape=True))
+        clients = db.execute(
+            statement.order_by(Client.name_key, Client.id).offset(skip).limit(limit)
+        ).scalars().all()
+        return ClientService.with_aggregates(db, list(clients))
+
+    @staticmethod
+    def get_client(db: Session, client_id: int) -> Optional[Dict[str, Any]]:
+        """Cliente por ID com agregados (None se não existir)."""
+        client = db.get(Client, client_id)
+        return ClientService.with_aggregates(db, [client])[0] if client else None
+
+def backfill_clients() -> Dict[str, int]:
+    """Vincular os registros existentes em uma sessão própria."""
+    with SessionLocal() as db:
+        linked = ClientService.backfill(db)
+        db.commit()
+    if any(linked.values()):
+        logger.info(
+            f"👥 Clientes: {linked['processes']} processos, {linked['precatorios']} precatórios "
+            f"e {linked['ledger_entries']} lançamentos vinculados"
+        )
+    return linked
@@ -0,0 +1,332 @@
+# ===========================================
+# CONTADORES INCREMENTAIS DO DASHBOARD
+# ===========================================
+#
+# Os endpoints de dashboard contavam as tabelas inteiras de tarefas e processos
+# a cada carregamento. Aqui os totais ficam na tabela dashboard_counters
+# (global e por usuário) e são mantidos por hooks de flush do SQLAlchemy: cada
+# flush que cria, altera ou remove Task/Process aplica os deltas na mesma
+# transação, com um upsert por contador. A leitura vira um SELECT por escopo.
+#
+# Contadores que dependem do relógio (atrasadas, urgentes, prazo próximo) mudam
+# sem nenhuma escrita; eles e qualquer alteração feita fora do ORM (insert/update
+# em massa) são corrigidos pela reconciliação periódica, que recalcula tudo com
+# agregados condicionais (COUNTERS_RECONCILE_SECONDS).
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, begin_reconcile, count_where, upsert_increments
+from app.models.counter import GLOBAL_SCOPE, DashboardCounter
+from app.models.process import Process, ProcessStatus
+from app.models.task import Task, TaskPriority, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# Contador que marca a tabela como reconciliada ao menos uma vez
+RECONCILED_MARKER = "_meta.reconciled"
+
+# Janelas dos contadores dependentes do relógio (iguais às dos endpoints)
+URGENT_WINDOW = timedelta(days=1)
+DEADLINE_WARNING_WINDOW = timedelta(days=7)
+
+_SESSION_INFO_KEY = "dashboard_counter_changes"
+
+def _naive(value) -> Optional[datetime]:
+    """Datas comparáveis com datetime.now() (o SQLite devolve datas sem fuso)."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+# ===========================================
+# DEFINIÇÃO DOS CONTADORES
+# ===========================================
+#
+# Cada contador tem a condição em SQL (reconciliação) e em Python (hooks), que
+# precisam concordar. O escopo por usuário é assigned_user_id nas tarefas e
+# user_id nos processos, como em get_user_dashboard_data.
+
+def task_counter_names(values: Dict[str, Any], now: datetime) -> List[str]:
+    """Contadores em que uma tarefa com estes valores entra."""
+    status = values["status"]
+    names = ["tasks.total", f"tasks.status.{status.value}"]
+    due_date = _naive(values["due_date"])
+    if due_date is not None and status != TaskStatus.COMPLETED:
+        if due_date < now:
+            names.append("tasks.overdue")
+        if values["priority"] == TaskPriority.URGENT and due_date <= now + URGENT_WINDOW:
+            names.append("tasks.urgent")
+    return names
+
+def process_counter_names(values: Dict[str, Any], now: datetime) -> List[str]:
+    """Contadores em que um processo com estes valores entra."""
+    status = values["status"]
+    names = ["processes.total", f"processes.status.{status.value}"]
+    end_date = _naive(values["expected_end_date"])
+    if (
+        end_date is not None
+        and status == ProcessStatus.ACTIVE
+        and end_date <= now + DEADLINE_WARNING_WINDOW
+    ):
+        names.append("processes.deadline_warning")
+    return names
+
+def task_counter_conditions(now: datetime) -> Dict[str, Any]:
+    """Condições SQL equivalentes a task_counter_names."""
+    open_task = Task.status != TaskStatus.COMPLETED
+    conditions = {f"tasks.status.{status.value}": Task.status == status for status in TaskStatus}
+    conditions["tasks.overdue"] = (Task.due_date < now) & open_task
+    conditions["tasks.urgent"] = (
+        (Task.priority == TaskPriority.URGENT) & (Task.due_date <= now + URGENT_WINDOW) & open_task
+    )
+    return conditions
+
+def process_counter_conditions(now: datetime) -> Dict[str, Any]:
+    """Condições SQL equivalentes a process_counter_names."""
+    conditions = {
+        f"processes.status.{status.value}": Process.status == status for status in ProcessStatus
+    }
+    conditions["processes.deadline_warning"] = (
+        (Process.expected_end_date <= now + DEADLINE_WARNING_WINDOW)
+        & (Process.status == ProcessStatus.ACTIVE)
+    )
+    return conditions
+
+# Modelo -> (colunas lidas, coluna de escopo, função dos nomes)
+TRACKED_MODELS = {
+    Task: (("status", "priority", "due_date", "assigned_user_id"), "assigned_user_id", task_counter_names),
+    Process: (("status", "expected_end_date", "user_id"), "user_id", process_counter_names),
+}
+
+def counter_keys(model, values: Dict[str, Any], now: datetime) -> List[Tuple[int, str]]:
+    """Pares (escopo, nome) afetados por um registro: global e do usuário."""
+    _, scope_column, names_for = TRACKED_MODELS[model]
+    names = names_for(values, now)
+    keys = [(GLOBAL_SCOPE, name) for name in names]
+    if values[scope_column] is not None:
+        keys.extend((values[scope_column], name) for name in names)
+    return keys
+
+# ===========================================
+# HOOKS DE FLUSH
+# ===========================================
+
+def old_column_values(session: Session, obj, columns: Iterable[str]) -> Dict[str, Any]:
+    """Valores do registro antes do flush (lidos do banco se não carregados)."""
+    model = type(obj)
+    columns = tuple(columns)
+    state = inspect(obj)
+    values = {}
+    for column in columns:
+        history = state.attrs[column].history
+        if history.deleted:
+            values[column] = history.deleted[0]
+        elif history.unchanged:
+            values[column] = history.unchanged[0]
+        else:
+            # Atributo expirado: o banco ainda tem o valor antigo
+            break
+    else:
+        return values
+
+    row = session.connection().execute(
+        select(*(getattr(model, column) for column in columns)).where(model.id == state.identity[0])
+    ).one()
+    return dict(zip(columns, row))
+
+def _old_values(session: Session, obj) -> Dict[str, Any]:
+    return old_column_values(session, obj, TRACKED_MODELS[type(obj)][0])
+
+def _current_values(obj) -> Dict[str, Any]:
+    state = inspect(obj)
+    columns = TRACKED_MODELS[type(obj)][0]
+    return {
+        column: state.dict[column] if column in state.dict else getattr(obj, column)
+        for column in columns
+    }
+
+def _tracked_changed(obj) -> bool:
+    """Se alguma coluna que define os contadores mudou."""
+    state = inspect(obj)
+    return any(state.attrs[column].history.has_changes() for column in TRACKED_MODELS[type(obj)][0])
+
+def _before_flush(session: Session, flush_context, instances):
+    """Guardar os valores antigos das tarefas/processos que vão mudar."""
+    # Lista nova a cada flush: sobras de um flush que falhou são descartadas
+    changes = session.info[_SESSION_INFO_KEY] = []
+    for obj in session.new:
+        if type(obj) in TRACKED_MODELS:
+            changes.append((obj, None, False))
+    for obj in session.dirty:
+        if type(obj) in TRACKED_MODELS and _tracked_changed(obj):
+            changes.append((obj, _old_values(session, obj), False))
+    for obj in session.deleted:
+        if type(obj) in TRACKED_MODELS and inspect(obj).has_identity:
+            changes.append((obj, _old_values(session, obj), True))
+
+def _after_flush(session: Session, flush_context):
+    """Aplicar os deltas dos contadores na transação do flush."""
+    changes = session.info.pop(_SESSION_INFO_KEY, None)
+    if not changes:
+        return
+
+    now = datetime.now()
+    deltas: Counter = Counter()
+    for obj, old, deleted in changes:
+        model = type(obj)
+        if old is not None:
+            for key in counter_keys(model, old, now):
+                deltas[key] -= 1
+        if not deleted:
+            for key in counter_keys(model, _current_values(obj), now):
+                deltas[key] += 1
+
+    rows = [
+        {"user_id": user_id, "name": name, "value": delta}
+        for (user_id, name), delta in deltas.items()
+        if delta
+    ]
+    if rows:
+        apply_counter_deltas(session.connection(), rows)
+
+def _after_rollback(session: Session):
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+def apply_counter_deltas(connection, rows: List[Dict[str, Any]]):
+    """Somar deltas aos contadores (upsert atômico; cria as linhas que faltam)."""
+    table = DashboardCounter.__table__
+    upsert_increments(connection, table, (table.c.user_id, table.c.name), rows)
+
+_hooks_installed = False
+
+def install_counter_hooks():
+    """Registrar os hooks em todas as sessões (síncronas e assíncronas)."""
+    global _hooks_installed
+    if _hooks_installed or not settings.COUNTERS_ENABLED:
+        return
+    event.listen(Session, "before_flush", _before_flush)
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _hooks_installed = True
+
+# ===========================================
+# SERVIÇO
+# ===========================================
+
+class CounterService:
+    """Leitura e reconciliação dos contadores do dashboard."""
+
+    @staticmethod
+    def compute(db: Session, now: Optional[datetime] = None) -> Dict[Tuple[int, str], int]:
+        """Calcular todos os contadores a partir das tabelas (uma consulta por tabela)."""
+        now = now or datetime.now()
+        dialect_name = db.get_bind().dialect.name
+        result: Counter = Counter()
+        for model, prefix, conditions in (
+            (Task, "tasks", task_counter_conditions(now)),
+            (Process, "processes", process_counter_conditions(now)),
+        ):
+            scope_column = getattr(model, TRACKED_MODELS[model][1])
+            names = list(conditions)
+            rows = db.execute(
+                select(
+                    scope_column,
+                    func.count(),
+                    *(count_where(conditions[name], dialect_name) for name in names)
+                ).select_from(model).group_by(scope_column)
+            ).all()
+            for scope, total, *counts in rows:
+                scopes = [GLOBAL_SCOPE] if scope is None else [GLOBAL_SCOPE, scope]
+                for user_id in scopes:
+                    result[(user_id, f"{prefix}.total")] += total
+                    for name, count in zip(names, counts):
+                        result[(user_id, name)] += int(count)
+        return result
+
+    @staticmethod
+    def reconcile(db: Session) -> int:
+        """
+        Recalcular os contadores e corrigir os divergentes (chamar db.commit() depois).
+
+        Cada linha recebe a diferença (esperado - atual) pelo mesmo upsert dos
+        hooks, em vez de apagar e regravar a tabela: deltas gravados por outras
+        transações durante a reconciliação não se perdem nem geram conflito de
+        chave única. Leituras em um só snapshot e um worker por vez (ver
+        begin_reconcile). Retorna quantos contadores estavam divergentes.
+        """
+        if not begin_reconcile(db, DashboardCounter.__table__):
+            logger.info("🔢 Contadores já em reconciliação em outro worker")
+            return 0
+        expected = CounterService.compute(db)
+        expected[(GLOBAL_SCOPE, RECONCILED_MARKER)] = 1
+        current = {
+            (user_id, name): value
+            for user_id, name, value in db.execute(
+                select(DashboardCounter.user_id, DashboardCounter.name, DashboardCounter.value)
+            )
+        }
+        rows = []
+        for key in set(expected) | set(current):
+            difference = expected.get(key, 0) - current.get(key, 0)
+            if difference:
+                user_id, name = key
+                rows.append({"user_id": user_id, "name": name, "value": difference})
+        if rows:
+            apply_counter_deltas(db.connection(), rows)
+        db.execute(delete(DashboardCounter).where(DashboardCounter.value == 0))
+        return len(rows)
+
+    @staticmethod
+    def get_counters(db: Session, user_id: int = GLOBAL_SCOPE) -> Counter:
+        """
+        Contadores de um escopo (nomes ausentes valem 0).
+
+        Antes da primeira reconciliação a tabela ainda não é confiável: os
+        valores são calculados na hora, sem gravar (a sessão pode ser da réplica).
+        """
+        rows = db.execute(
+            select(DashboardCounter.user_id, DashboardCounter.name, DashboardCounter.value).where(
+                DashboardCounter.user_id.in_({user_id, GLOBAL_SCOPE})
+            )
+        ).all()
+        if any(row.name == RECONCILED_MARKER and row.user_id == GLOBAL_SCOPE for row in rows):
+            return Counter({row.name: row.value for row in rows if row.user_id == user_id})
+
+        computed = CounterService.compute(db)
+        return Counter({name: value for (scope, name), value in computed.items() if scope == user_id})
+
+    @staticmethod
+    def status_counts(counters: Counter, prefix: str, statuses: Iterable) -> Dict[Any, int]:
+        """Contagem por status a partir dos contadores (ex.: prefixo "tasks")."""
+        return {status: counters[f"{prefix}.status.{status.value}"] for status in statuses}
+
+# ===========================================
+# RECONCILIAÇÃO PERIÓDICA
+# ===========================================
+
+def reconcile_counters() -> int:
+    """Reconciliar os contadores em uma sessão própria."""
+    with SessionLocal() as db:
+        drift = CounterService.reconcile(db)
+        db.commit()
+    if drift:
+        logger.info(f"🔢 Contadores do dashboard reconciliados ({drift} divergentes)")
+    return drift
+
+async def run_counter_reconciliation():
+    """Loop de reconciliação (iniciado no startup da aplicação)."""
+    while True:
+        try:
+            await asyncio.to_thread(reconcile_counters)
+        except Exception as e:
+            logger.error(f"❌ Erro ao reconciliar contadores do dashboard: {e}")
+        await asyncio.sleep(settings.COUNTERS_RECONCILE_SECONDS)
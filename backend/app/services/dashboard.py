@@ -2,15 +2,64 @@
 # SERVIÇO DE DASHBOARD
 # ===========================================
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
 
-from app.models.user import User, UserStatus
+from app.core.cache import cached
+from app.core.database import AsyncSessionLocal, count_where, seconds_between
+from app.core.redis import DASHBOARD_TAG, user_tag
+from app.models.user import User, UserRole, UserStatus
 from app.models.process import Process, ProcessStatus
 from app.models.task import Task, TaskStatus
 from app.models.timeline import TimelineEvent
+from app.services.counters import CounterService
+from app.services.financial_analytics import revenue_growth as financial_revenue_growth
+from app.services.rollups import RollupService
+
+# Rótulos dos status nos gráficos do frontend
+TASK_STATUS_LABELS = {
+    TaskStatus.TODO: "pendente",
+    TaskStatus.IN_PROGRESS: "em_andamento",
+    TaskStatus.REVIEW: "revisao",
+    TaskStatus.COMPLETED: "concluida",
+    TaskStatus.CANCELLED: "cancelada"
+}
+
+PROCESS_STATUS_LABELS = {
+    ProcessStatus.DRAFT: "rascunho",
+    ProcessStatus.ACTIVE: "ativo",
+    ProcessStatus.PAUSED: "pausado",
+    ProcessStatus.COMPLETED: "concluido",
+    ProcessStatus.ARCHIVED: "arquivado"
+}
+
+def count_by_status(db: Session, model, statuses) -> Tuple[int, Dict[Any, int]]:
+    """
+    Total e contagem por status de uma tabela em uma única consulta.
+
+    Usa agregados condicionais (um COUNT filtrado por status) em vez de um
+    count() por status seguido de um GROUP BY com os mesmos números.
+    """
+    dialect_name = db.get_bind().dialect.name
+    statuses = list(statuses)
+    row = db.execute(
+        select(
+            func.count(),
+            *(count_where(model.status == status, dialect_name) for status in statuses)
+        ).select_from(model)
+    ).one()
+    return row[0], {status: int(count) for status, count in zip(statuses, row[1:])}
+
+def status_chart(counts: Dict[Any, int], labels: Dict[Any, str]) -> List[Dict[str, Any]]:
+    """Série do gráfico por status (somente status com registros)."""
+    return [
+        {"status": labels.get(status, status.value), "count": count}
+        for status, count in counts.items()
+        if count
+    ]
 
 class DashboardService:
     """Serviço para dados do dashboard."""
@@ -18,32 +67,18 @@ class DashboardService:
     @staticmethod
     def get_admin_dashboard_data(db: Session) -> Dict[str, Any]:
         """Obter dados reais do dashboard administrativo."""
+        dialect_name = db.get_bind().dialect.name
+        
+        # Contadores: uma consulta por tabela
+        total_processes, processes_count = count_by_status(db, Process, ProcessStatus)
+        total_tasks, tasks_count = count_by_status(db, Task, TaskStatus)
+        total_users, users_count = count_by_status(db, User, [UserStatus.ACTIVE])
         
-        # Contadores básicos
-        total_processes = db.query(Process).count()
-        active_processes = db.query(Process).filter(
-            Process.status == ProcessStatus.ACTIVE
-        ).count()
-        
-        total_tasks = db.query(Task).count()
-        pending_tasks = db.query(Task).filter(
-            Task.status == TaskStatus.TODO
-        ).count()
-        in_progress_tasks = db.query(Task).filter(
-            Task.status == TaskStatus.IN_PROGRESS
-        ).count()
-        completed_tasks = db.query(Task).filter(
-            Task.status == TaskStatus.COMPLETED
-        ).count()
-        
-        total_users = db.query(User).count()
-        active_users = db.query(User).filter(
-            User.status == UserStatus.ACTIVE
-        ).count()
-        
-        # Atividade recente (últimos 30 dias)
+        # Atividade recente (últimos 30 dias), com o usuário no mesmo SELECT
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_activity = db.query(TimelineEvent).filter(
+        recent_activity = db.query(TimelineEvent).options(
+            joinedload(TimelineEvent.user)
+        ).filter(
             TimelineEvent.created_at >= thirty_days_ago
         ).order_by(desc(TimelineEvent.created_at)).limit(10).all()
         
@@ -58,78 +93,28 @@ class DashboardService:
                 "timestamp": event.created_at.isoformat()
             })
         
-        # Estatísticas de tarefas por status
-        task_stats = db.query(
-            Task.status,
-            func.count(Task.id).label('count')
-        ).group_by(Task.status).all()
-        
-        tasks_by_status = []
-        for status, count in task_stats:
-            status_map = {
-                TaskStatus.TODO: "pendente",
-                TaskStatus.IN_PROGRESS: "em_andamento", 
-                TaskStatus.REVIEW: "revisao",
-                TaskStatus.COMPLETED: "concluida",
-                TaskStatus.CANCELLED: "cancelada"
-            }
-            tasks_by_status.append({
-                "status": status_map.get(status, status.value),
-                "count": count
-            })
-        
-        # Processos por status
-        process_stats = db.query(
-            Process.status,
-            func.count(Process.id).label('count')
-        ).group_by(Process.status).all()
-        
-        processes_by_status = []
-        for status, count in process_stats:
-            status_map = {
-                ProcessStatus.DRAFT: "rascunho",
-                ProcessStatus.ACTIVE: "ativo",
-                ProcessStatus.PAUSED: "pausado",
-                ProcessStatus.COMPLETED: "concluido",
-                ProcessStatus.ARCHIVED: "arquivado"
-            }
-            processes_by_status.append({
-                "status": status_map.get(status, status.value),
-                "count": count
-            })
-        
-        # Dados de produtividade (últimos 6 meses)
+        # Dados de produtividade (últimos 6 meses): agregados mensais
         six_months_ago = datetime.utcnow() - timedelta(days=180)
-        monthly_tasks = db.query(
-            func.date_trunc('month', Task.completed_at).label('month'),
-            func.count(Task.id).label('count')
-        ).filter(
-            Task.completed_at >= six_months_ago,
-            Task.status == TaskStatus.COMPLETED
-        ).group_by(func.date_trunc('month', Task.completed_at)).all()
-        
-        productivity_data = []
-        for month, count in monthly_tasks:
-            productivity_data.append({
-                "month": month.strftime("%Y-%m") if month else "N/A",
-                "completed_tasks": count
-            })
+        productivity_data = [
+            {"month": month, "completed_tasks": count}
+            for month, count in RollupService.get_series(db, "tasks.completed", six_months_ago)
+        ]
         
         return {
             "summary": {
                 "total_processes": total_processes,
-                "active_processes": active_processes,
+                "active_processes": processes_count[ProcessStatus.ACTIVE],
                 "total_tasks": total_tasks,
-                "pending_tasks": pending_tasks,
-                "in_progress_tasks": in_progress_tasks,
-                "completed_tasks": completed_tasks,
+                "pending_tasks": tasks_count[TaskStatus.TODO],
+                "in_progress_tasks": tasks_count[TaskStatus.IN_PROGRESS],
+                "completed_tasks": tasks_count[TaskStatus.COMPLETED],
                 "total_users": total_users,
-                "active_users": active_users
+                "active_users": users_count[UserStatus.ACTIVE]
             },
             "recent_activity": formatted_activity,
             "charts": {
-                "tasks_by_status": tasks_by_status,
-                "processes_by_status": processes_by_status,
+                "tasks_by_status": status_chart(tasks_count, TASK_STATUS_LABELS),
+                "processes_by_status": status_chart(processes_count, PROCESS_STATUS_LABELS),
                 "productivity_by_month": productivity_data
             }
         }
@@ -138,27 +123,8 @@ class DashboardService:
     def get_user_dashboard_data(db: Session, user_id: int) -> Dict[str, Any]:
         """Obter dados do dashboard do usuário."""
         
-        # Tarefas do usuário
-        my_tasks = db.query(Task).filter(Task.assigned_user_id == user_id).count()
-        my_pending_tasks = db.query(Task).filter(
-            Task.assigned_user_id == user_id,
-            Task.status == TaskStatus.TODO
-        ).count()
-        my_in_progress_tasks = db.query(Task).filter(
-            Task.assigned_user_id == user_id,
-            Task.status == TaskStatus.IN_PROGRESS
-        ).count()
-        my_completed_tasks = db.query(Task).filter(
-            Task.assigned_user_id == user_id,
-            Task.status == TaskStatus.COMPLETED
-        ).count()
-        
-        # Processos do usuário
-        my_processes = db.query(Process).filter(Process.user_id == user_id).count()
-        my_active_processes = db.query(Process).filter(
-            Process.user_id == user_id,
-            Process.status == ProcessStatus.ACTIVE
-        ).count()
+        # Tarefas e processos do usuário: contadores por usuário
+        counters = CounterService.get_counters(db, user_id)
         
         # Tarefas próximas do prazo (próximos 7 dias)
         next_week = datetime.utcnow() + timedelta(days=7)
@@ -180,12 +146,12 @@ class DashboardService:
         
         return {
             "summary": {
-                "my_tasks": my_tasks,
-                "my_pending_tasks": my_pending_tasks,
-                "my_in_progress_tasks": my_in_progress_tasks,
-                "my_completed_tasks": my_completed_tasks,
-                "my_processes": my_processes,
-                "my_active_processes": my_active_processes
+                "my_tasks": counters["tasks.total"],
+                "my_pending_tasks": counters[f"tasks.status.{TaskStatus.TODO.value}"],
+                "my_in_progress_tasks": counters[f"tasks.status.{TaskStatus.IN_PROGRESS.value}"],
+                "my_completed_tasks": counters[f"tasks.status.{TaskStatus.COMPLETED.value}"],
+                "my_processes": counters["processes.total"],
+                "my_active_processes": counters[f"processes.status.{ProcessStatus.ACTIVE.value}"]
             },
             "upcoming_tasks": formatted_upcoming
         }
@@ -194,21 +160,12 @@ class DashboardService:
     def get_system_metrics(db: Session) -> Dict[str, Any]:
         """Obter métricas gerais do sistema."""
         
-        # Crescimento de usuários (últimos 12 meses)
+        # Crescimento de usuários (últimos 12 meses): agregados mensais
         twelve_months_ago = datetime.utcnow() - timedelta(days=365)
-        monthly_users = db.query(
-            func.date_trunc('month', User.created_at).label('month'),
-            func.count(User.id).label('count')
-        ).filter(
-            User.created_at >= twelve_months_ago
-        ).group_by(func.date_trunc('month', User.created_at)).all()
-        
-        user_growth = []
-        for month, count in monthly_users:
-            user_growth.append({
-                "month": month.strftime("%Y-%m") if month else "N/A",
-                "new_users": count
-            })
+        user_growth = [
+            {"month": month, "new_users": count}
+            for month, count in RollupService.get_series(db, "users.created", twelve_months_ago)
+        ]
         
         # Distribuição de usuários por role
         user_roles = db.query(
@@ -238,3 +195,133 @@ class DashboardService:
                 "last_backup": "2024-01-01T02:00:00Z"  # TODO: implementar backup real
             }
         }
+    
+    @staticmethod
+    def average_days(db: Session, start, end, *conditions) -> float:
+        """Média em dias entre duas colunas de data (portável entre SQLite e Postgres)."""
+        seconds = seconds_between(start, end, db.get_bind().dialect.name)
+        value = db.query(func.avg(seconds / 86400)).filter(*conditions).scalar()
+        return float(value) if value else 0.0
+    
+    @staticmethod
+    def get_stats(db: Session) -> Dict[str, Any]:
+        """Estatísticas gerais (/dashboard/stats)."""
+        # Contadores mantidos incrementalmente (sem varrer tarefas/processos)
+        counters = CounterService.get_counters(db)
+        
+        # Tempo médio de processos (em dias)
+        average_time = DashboardService.average_days(
+            db, Process.created_at, Process.updated_at, Process.status == ProcessStatus.COMPLETED
+        )
+        
+        # Receita total
+        total_revenue = db.query(func.coalesce(func.sum(Process.actual_value), 0)).filter(
+            Process.actual_value.isnot(None)
+        ).scalar()
+        
+        # Membros da equipe
+        team_members = db.query(func.count(User.id)).filter(
+            User.role != UserRole.ADMIN
+        ).scalar()
+        
+        return {
+            "totalProcesses": counters["processes.total"],
+            "activeProcesses": counters[f"processes.status.{ProcessStatus.ACTIVE.value}"],
+            "completedTasks": counters[f"tasks.status.{TaskStatus.COMPLETED.value}"],
+            "averageTime": round(average_time, 1),
+            "totalRevenue": float(total_revenue) if total_revenue else 0.0,
+            "pendingTasks": counters[f"tasks.status.{TaskStatus.TODO.value}"],
+            "overdueTasks": counters["tasks.overdue"],
+            "teamMembers": team_members
+        }
+    
+    @staticmethod
+    def get_performance(db: Session) -> Dict[str, Any]:
+        """Métricas de performance (/dashboard/performance)."""
+        counters = CounterService.get_counters(db)
+        
+        # Taxas de conclusão a partir dos contadores
+        total_processes = counters["processes.total"]
+        completed_processes = counters[f"processes.status.{ProcessStatus.COMPLETED.value}"]
+        process_completion_rate = (completed_processes / total_processes * 100) if total_processes > 0 else 0
+        
+        total_tasks = counters["tasks.total"]
+        completed_tasks = counters[f"tasks.status.{TaskStatus.COMPLETED.value}"]
+        task_completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+        
+        # Tempos médios de processo e de tarefa (em dias)
+        average_process_time = DashboardService.average_days(
+            db, Process.created_at, Process.updated_at, Process.status == ProcessStatus.COMPLETED
+        )
+        average_task_time = DashboardService.average_days(
+            db, Task.created_at, Task.completed_at,
+            Task.status == TaskStatus.COMPLETED, Task.completed_at.isnot(None)
+        )
+        
+        # Crescimento de receita do mês-calendário sobre o anterior (livro-razão,
+        # mesma regra de /financial/summary)
+        revenue_growth = financial_revenue_growth(db) or 0.0
+        
+        # Satisfação do cliente (simulado baseado em processos completados)
+        client_satisfaction = min(95, max(70, process_completion_rate + 10))
+        
+        return {
+            "processCompletionRate": round(process_completion_rate, 1),
+            "taskCompletionRate": round(task_completion_rate, 1),
+            "averageProcessTime": round(average_process_time, 1),
+            "averageTaskTime": round(average_task_time, 1),
+            "revenueGrowth": round(revenue_growth, 1),
+            "clientSatisfaction": round(client_satisfaction, 1)
+        }
+    
+    @staticmethod
+    def get_alerts(db: Session) -> Dict[str, Any]:
+        """Alertas (/dashboard/alerts) a partir dos contadores."""
+        counters = CounterService.get_counters(db)
+        
+        # Tarefas urgentes (alta prioridade e próximas do vencimento)
+        urgent_tasks = counters["tasks.urgent"]
+        # Tarefas atrasadas e processos próximos do vencimento
+        warnings = counters["tasks.overdue"] + counters["processes.deadline_warning"]
+        # Notificações não lidas (simulado - sem consulta complexa)
+        unread_notifications = 0
+        
+        return {
+            "urgent": urgent_tasks,
+            "warnings": warnings,
+            "info": unread_notifications,
+            "total": urgent_tasks + warnings + unread_notifications
+        }
+
+
+class AsyncDashboardService:
+    """Serviço assíncrono para dados do dashboard.
+
+    As agregações reaproveitam as consultas de ``DashboardService`` via
+    ``AsyncSession.run_sync``: o I/O passa pelo driver assíncrono, então o
+    event loop não fica bloqueado, e os relacionamentos lazy continuam válidos.
+    Os resultados ficam no cache de serviços (tag ``dashboard``, invalidada
+    pelas escritas de processos e tarefas).
+    """
+    
+    @staticmethod
+    @cached("dashboard:admin", ttl=30, stale_ttl=120, tags=[DASHBOARD_TAG],
+            session_factory=AsyncSessionLocal)
+    async def get_admin_dashboard_data(db: AsyncSession) -> Dict[str, Any]:
+        """Obter dados reais do dashboard administrativo."""
+        return await db.run_sync(DashboardService.get_admin_dashboard_data)
+    
+    @staticmethod
+    @cached("dashboard:user", ttl=30, stale_ttl=120,
+            tags=lambda args: [DASHBOARD_TAG, user_tag(args["user_id"])],
+            session_factory=AsyncSessionLocal)
+    async def get_user_dashboard_data(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+        """Obter dados do dashboard do usuário."""
+        return await db.run_sync(DashboardService.get_user_dashboard_data, user_id)
+    
+    @staticmethod
+    @cached("dashboard:metrics", ttl=60, stale_ttl=300, tags=[DASHBOARD_TAG],
+            session_factory=AsyncSessionLocal)
+    async def get_system_metrics(db: AsyncSession) -> Dict[str, Any]:
+        """Obter métricas gerais do sistema."""
+        return await db.run_sync(DashboardService.get_system_metrics)
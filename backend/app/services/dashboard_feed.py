@@ -0,0 +1,248 @@
+# ===========================================
+# FEED DO DASHBOARD (SERVER-SENT EVENTS)
+# ===========================================
+#
+# O frontend consultava /dashboard/stats, /alerts, /performance e
+# /financial/summary em intervalos fixos, em cada aba aberta. Aqui as métricas
+# são calculadas uma vez por rodada e distribuídas a todos os assinantes de
+# /dashboard/stream:
+#
+#   - o hook after_commit marca o feed como sujo quando tarefas, processos,
+#     pagamentos, lançamentos ou usuários mudam (rajadas de commits viram um
+#     único recálculo, no máximo a cada DASHBOARD_FEED_MIN_INTERVAL s)
+#   - cada assinante recebe o retrato completo ao conectar e depois só as
+#     métricas que mudaram (evento "delta")
+#   - um recálculo periódico (DASHBOARD_FEED_REFRESH_SECONDS) cobre commits de
+#     outros workers e prazos que vencem sem escrita; sem assinantes, nada é
+#     calculado
+#
+# Formato dos eventos: `event: snapshot|delta`, `id: <versão>` e `data: <JSON>`
+# com {tópico: {métrica: valor}}; comentários de keep-alive a cada
+# DASHBOARD_FEED_HEARTBEAT_SECONDS s.
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.ledger import LedgerEntry
+from app.models.payment import Payment
+from app.models.process import Process
+from app.models.task import Task
+from app.models.user import User
+from app.services.dashboard import DashboardService
+from app.services.financial_analytics import FinancialAnalyticsService
+
+logger = logging.getLogger(__name__)
+
+Metrics = Dict[str, Dict[str, Any]]
+
+# Modelos cujas escritas mudam alguma métrica do feed
+FEED_MODELS = (Task, Process, Payment, LedgerEntry, User)
+
+# Eventos pendentes por assinante; um cliente lento demais recebe um novo retrato
+SUBSCRIBER_QUEUE_SIZE = 32
+
+_SESSION_INFO_KEY = "dashboard_feed_dirty"
+
+# ===========================================
+# MÉTRICAS
+# ===========================================
+
+def compute_dashboard_metrics() -> Metrics:
+    """
+    Todas as métricas do feed, por tópico, em uma sessão própria.
+
+    Usa o primário: o recálculo segue um commit, que a réplica pode ainda
+    não ter aplicado.
+    """
+    with SessionLocal() as db:
+        snapshot = FinancialAnalyticsService.compute(db)
+        return {
+            "stats": DashboardService.get_stats(db),
+            "alerts": DashboardService.get_alerts(db),
+            "performance": DashboardService.get_performance(db),
+            "financial": FinancialAnalyticsService.summary(snapshot),
+        }
+
+def diff_metrics(old: Metrics, new: Metrics) -> Metrics:
+    """Só as métricas de `new` que diferem de `old`, agrupadas por tópico."""
+    changes = {}
+    for topic, values in new.items():
+        previous = old.get(topic, {})
+        changed = {name: value for name, value in values.items() if previous.get(name) != value}
+        if changed:
+            changes[topic] = changed
+    return changes
+
+def sse_event(event_name: str, data: Any, event_id: Optional[int] = None) -> str:
+    """Um evento no formato text/event-stream."""
+    lines = [f"event: {event_name}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+# ===========================================
+# DIFUSÃO
+# ===========================================
+
+class DashboardFeed:
+    """Recálculo compartilhado das métricas e distribuição das diferenças."""
+
+    def __init__(self, compute: Callable[[], Metrics] = compute_dashboard_metrics):
+        self._compute = compute
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._snapshot: Optional[Metrics] = None
+        self._version = 0
+        self._stale = True
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dirty: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _bind(self):
+        """Criar o evento e o lock no event loop em execução."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._dirty = asyncio.Event()
+            self._lock = asyncio.Lock()
+
+    def mark_dirty(self):
+        """Agendar um recálculo (pode ser chamado de qualquer thread)."""
+        self._stale = True
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dirty.set()
+        else:
+            try:
+                loop.call_soon_threadsafe(self._dirty.set)
+            except RuntimeError:
+                # Loop encerrado entre a verificação e a chamada
+                pass
+
+    def _publish(self, message: Tuple[str, int, Metrics]):
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Deltas perdidos: descartar a fila e reenviar o retrato completo
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(("snapshot", self._version, self._snapshot))
+
+    async def _refresh(self) -> Metrics:
+        """Recalcular (uma vez, fora do event loop) e publicar o que mudou. Requer o lock."""
+        self._stale = False
+        metrics = await asyncio.to_thread(self._compute)
+        changes = diff_metrics(self._snapshot or {}, metrics)
+        self._snapshot = metrics
+        if changes:
+            self._version += 1
+            self._publish(("delta", self._version, changes))
+        return changes
+
+    async def refresh(self) -> Metrics:
+        """Recalcular agora; retorna as métricas que mudaram."""
+        self._bind()
+        async with self._lock:
+            return await self._refresh()
+
+    async def subscribe(self) -> Tuple[asyncio.Queue, int, Metrics]:
+        """Registrar um assinante; retorna a fila, a versão e o retrato atual."""
+        self._bind()
+        async with self._lock:
+            if self._snapshot is None or self._stale:
+                await self._refresh()
+            queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+            self._subscribers.add(queue)
+            return queue, self._version, self._snapshot
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    async def events(self, queue: asyncio.Queue, version: int, snapshot: Metrics) -> AsyncIterator[str]:
+        """Eventos SSE de um assinante: retrato inicial, deltas e keep-alive."""
+        try:
+            yield "retry: 5000\n\n" + sse_event("snapshot", snapshot, version)
+            while True:
+                try:
+                    event_name, event_id, data = await asyncio.wait_for(
+                        queue.get(), timeout=settings.DASHBOARD_FEED_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_event(event_name, data, event_id)
+        finally:
+            self.unsubscribe(queue)
+
+    async def run(self):
+        """Loop de recálculo (iniciado no startup da aplicação)."""
+        self._bind()
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=settings.DASHBOARD_FEED_REFRESH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+            if not self._subscribers:
+                # Ninguém ouvindo: o próximo assinante recalcula ao conectar
+                self._stale = True
+                continue
+            try:
+                async with self._lock:
+                    await self._refresh()
+            except Exception as e:
+                logger.error(f"❌ Erro ao recalcular o feed do dashboard: {e}")
+            # Commits durante a espera são atendidos por um único recálculo
+            await asyncio.sleep(settings.DASHBOARD_FEED_MIN_INTERVAL)
+
+dashboard_feed = DashboardFeed()
+
+# ===========================================
+# HOOKS DE SESSÃO
+# ===========================================
+
+def _before_flush(session: Session, flush_context, instances):
+    """Lembrar se o flush escreve algum modelo que afeta o feed."""
+    if session.info.get(_SESSION_INFO_KEY):
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, FEED_MODELS):
+            session.info[_SESSION_INFO_KEY] = True
+            return
+
+def _after_commit(session: Session):
+    if session.info.pop(_SESSION_INFO_KEY, None):
+        dashboard_feed.mark_dirty()
+
+def _after_rollback(session: Session):
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+_hooks_installed = False
+
+def install_feed_hooks():
+    """Registrar os hooks em todas as sessões (síncronas e assíncronas)."""
+    global _hooks_installed
+    if _hooks_installed or not settings.DASHBOARD_FEED_ENABLED:
+        return
+    event.listen(Session, "before_flush", _before_flush)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _hooks_installed = True
@@ -8,7 +8,9 @@ import logging
 import random
 from datetime import datetime, timedelta
 
+from app.core.cache import cached
 from app.core.config import settings
+from app.core.redis import cnj_tag
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,9 @@ class DataJudService:
         self.real_api_available = False  # Será detectado automaticamente
         self.api_key = settings.DATAJUD_API_KEY if hasattr(settings, 'DATAJUD_API_KEY') else None
 
+    @cached("datajud:processo", ttl=3600, stale_ttl=600,
+            tags=lambda args: [cnj_tag(args["numero_processo"])],
+            condition=lambda result: bool(result) and not result.get("erro"))
     async def consultar_processo_por_numero(self, numero_processo: str) -> Optional[Dict[str, Any]]:
         """
         Consulta um processo pelo número CNJ usando a API real do DataJud.
@@ -175,6 +180,7 @@ class DataJudService:
             logger.error(f"Erro geral na consulta DataJud: {e}")
             return None
     
+    @cached("datajud:documento", ttl=1800, stale_ttl=600, condition=bool)
     async def consultar_processos_por_cpf_cnpj(self, documento: str) -> List[Dict[str, Any]]:
         """
         Consulta processos por CPF ou CNPJ usando API DataJud real.
@@ -271,6 +277,7 @@ class DataJudService:
             logger.error(f"Erro na consulta por documento: {e}")
             return []
     
+    @cached("datajud:tribunais", ttl=86400, stale_ttl=3600, condition=bool)
     async def consultar_tribunais(self) -> List[Dict[str, Any]]:
         """
         Consulta lista de tribunais disponíveis na API DataJud.
@@ -688,6 +695,7 @@ class DataJudService:
             logger.error(f"Erro ao consultar movimentações: {e}")
             return []
     
+    @cached("datajud:classe", ttl=1800, stale_ttl=600, condition=bool)
     async def consultar_processos_por_classe(self, classe_processual: str, tribunal: str = None) -> List[Dict[str, Any]]:
         """
         Consulta processos por classe processual.
@@ -760,6 +768,8 @@ class DataJudService:
             logger.error(f"Erro ao consultar por classe: {e}")
             return []
     
+    @cached("datajud:estatisticas", ttl=3600, stale_ttl=3600,
+            condition=lambda result: "erro" not in result)
     async def consultar_estatisticas_tribunal(self, tribunal: str) -> Dict[str, Any]:
         """
         Consulta estatísticas de um tribunal.
@@ -4,7 +4,10 @@
 
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
+from app.core.pagination import KeysetPage, page_with_total
 from app.models.file import File
 from app.schemas.file import FileCreate
 
@@ -53,14 +56,52 @@ class FileService:
         return True
 
 
-
-
-
-
-
-
-
-
-
-
-
+class AsyncFileService:
+    """Serviço assíncrono para gerenciar arquivos (AsyncSession)."""
+    
+    @staticmethod
+    async def create_file(db: AsyncSession, file_data: FileCreate, uploaded_by_id: int) -> File:
+        """Criar novo arquivo."""
+        file = File(
+            **file_data.dict(),
+            uploaded_by_id=uploaded_by_id
+        )
+        
+        db.add(file)
+        await db.commit()
+        await db.refresh(file)
+        
+        return file
+    
+    @staticmethod
+    async def get_file_by_id(db: AsyncSession, file_id: int) -> Optional[File]:
+        """Obter arquivo por ID."""
+        return await db.get(File, file_id)
+    
+    @staticmethod
+    async def get_files_page(
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        process_id: Optional[int] = None,
+        include_total: bool = True
+    ) -> KeysetPage:
+        """Página de arquivos por cursor (ordem de id), opcionalmente de um processo."""
+        filters = [File.process_id == process_id] if process_id else []
+        return await page_with_total(
+            db, select(File).where(*filters), File, filters, "id", File.id, False, cursor, limit, skip,
+            include_total=include_total
+        )
+    
+    @staticmethod
+    async def delete_file(db: AsyncSession, file_id: int) -> bool:
+        """Deletar arquivo."""
+        file = await AsyncFileService.get_file_by_id(db, file_id)
+        if not file:
+            return False
+        
+        await db.delete(file)
+        await db.commit()
+        
+        return True
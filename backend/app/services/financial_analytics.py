@@ -0,0 +1,232 @@
+# ===========================================
+# ANÁLISES FINANCEIRAS
+# ===========================================
+#
+# /financial/summary, /monthly-trends, /insights e /revenue-by-area faziam, cada
+# um, várias somas sobre processos (9 no resumo, 12 em laço nas tendências,
+# com meses aproximados por janelas de 30 dias). Aqui o retrato sai de duas
+# consultas:
+#   - saldos mensais do livro-razão (monthly_rollups: revenue, revenue.cases,
+#     payments.received), de onde vêm as tendências, o crescimento e os
+#     totais acumulados;
+#   - receita por área: GROUP BY categoria só nos lançamentos dos meses do
+#     retrato (índice em entry_date), com clientes (pela FK client_id) e
+#     pagamentos em aberto em subconsultas na mesma instrução.
+# Os endpoints leem o mesmo retrato (FinancialSnapshot), guardado no cache de
+# serviços por período.
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import cached
+from app.core.config import settings
+from app.core.redis import DASHBOARD_TAG
+from app.models.ledger import LedgerEntry, LedgerEntryType
+from app.models.payment import Payment, PaymentStatus
+from app.models.process import Process, ProcessStatus
+from app.services.ledger import BALANCE_METRICS, CASES_METRIC
+from app.services.rollups import RollupService
+
+# Saldos mensais do livro-razão em monthly_rollups
+REVENUE_METRIC = BALANCE_METRICS[LedgerEntryType.REVENUE]
+PAYMENTS_METRIC = BALANCE_METRICS[LedgerEntryType.PAYMENT]
+
+# Status dos processos de clientes ativos
+ACTIVE_STATUS = ProcessStatus.ACTIVE
+
+def current_period() -> str:
+    """Mês-calendário atual como 'AAAA-MM' (UTC, como as datas gravadas pelo banco)."""
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+def previous_months(period: str, count: int) -> List[str]:
+    """Os `count` meses até `period` (inclusive), do mais antigo ao mais recente."""
+    year, month = int(period[:4]), int(period[5:7])
+    months = []
+    for _ in range(count):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return list(reversed(months))
+
+def month_start(period: str, offset: int = 0) -> datetime:
+    """Primeiro instante (UTC) do mês `period` deslocado de `offset` meses."""
+    index = int(period[:4]) * 12 + int(period[5:7]) - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+def growth_rate(current: float, previous: float) -> Optional[float]:
+    """Variação (%) de um mês sobre o anterior (None sem base)."""
+    if previous <= 0:
+        return None
+    return (current - previous) / previous * 100
+
+def revenue_growth(db: Session, period: Optional[str] = None) -> Optional[float]:
+    """Crescimento da receita do mês sobre o anterior, pelos saldos mensais do livro-razão."""
+    previous, current = previous_months(period or current_period(), 2)
+    revenue = dict(RollupService.get_series(db, REVENUE_METRIC, datetime.strptime(previous, "%Y-%m")))
+    return growth_rate(float(revenue.get(current, 0)), float(revenue.get(previous, 0)))
+
+class FinancialSnapshot:
+    """Agregados financeiros de um período, montados a partir dos grupos da consulta."""
+
+    def __init__(self, period: str, months: int):
+        self.period = period
+        self.months = previous_months(period, max(months, 2))
+        self.total_revenue = 0.0
+        self.valued_cases = 0
+        self.paid_payments = 0.0
+        self.pending_payments = 0.0
+        self.overdue_payments = 0.0
+        self.total_clients = 0
+        self.active_clients = 0
+        self.revenue_by_month: Dict[str, float] = defaultdict(float)
+        self.cases_by_month: Dict[str, int] = defaultdict(int)
+        self.revenue_by_area: Dict[str, float] = defaultdict(float)
+        self.cases_by_area: Dict[str, int] = defaultdict(int)
+
+    def add_balances(self, history: Dict[str, Dict[str, Any]]):
+        """Tendências e totais acumulados a partir dos saldos mensais."""
+        for month, value in history[REVENUE_METRIC].items():
+            self.revenue_by_month[month] = float(value)
+        for month, value in history[CASES_METRIC].items():
+            self.cases_by_month[month] = int(value)
+        self.total_revenue = sum(self.revenue_by_month.values())
+        self.valued_cases = sum(self.cases_by_month.values())
+        self.paid_payments = float(sum(history[PAYMENTS_METRIC].values()))
+
+    def add_area(self, category: str, amount, cases):
+        self.revenue_by_area[category] += float(amount or 0)
+        self.cases_by_area[category] += int(cases or 0)
+
+    @property
+    def average_ticket(self) -> float:
+        return self.total_revenue / self.valued_cases if self.valued_cases else 0.0
+
+    def growth_rate(self) -> Optional[float]:
+        """Variação (%) da receita do período sobre o mês anterior (None sem base)."""
+        return growth_rate(
+            self.revenue_by_month.get(self.months[-1], 0.0),
+            self.revenue_by_month.get(self.months[-2], 0.0),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forma serializável (é o que fica no cache)."""
+        return {
+            "period": self.period,
+            "total_revenue": self.total_revenue,
+            "valued_cases": self.valued_cases,
+            "average_ticket": self.average_ticket,
+            "growth_rate": self.growth_rate(),
+            "total_clients": self.total_clients,
+            "active_clients": self.active_clients,
+            "payments": {
+                "paid": self.paid_payments,
+                "pending": self.pending_payments,
+                "overdue": self.overdue_payments,
+            },
+            "monthly": [
+                {
+                    "month": month,
+                    "revenue": self.revenue_by_month.get(month, 0.0),
+                    "cases": self.cases_by_month.get(month, 0),
+                }
+                for month in self.months
+            ],
+            "by_area": [
+                {"area": area, "revenue": self.revenue_by_area[area], "cases": self.cases_by_area[area]}
+                for area in sorted(self.revenue_by_area, key=self.revenue_by_area.get, reverse=True)
+                if self.cases_by_area[area] or self.revenue_by_area[area]
+            ],
+        }
+
+class FinancialAnalyticsService:
+    """Cálculo do retrato financeiro em duas consultas."""
+
+    @staticmethod
+    def compute(db: Session, period: Optional[str] = None, months: int = 6) -> Dict[str, Any]:
+        """
+        Retrato financeiro de `period` com as tendências dos `months` meses até ele.
+
+        Totais de receita, casos e pagamentos são acumulados (todos os meses);
+        a receita por área cobre os meses do retrato.
+        """
+        snapshot = FinancialSnapshot(period or current_period(), months)
+        snapshot.add_balances(
+            RollupService.get_history(db, [REVENUE_METRIC, CASES_METRIC, PAYMENTS_METRIC])
+        )
+        now = datetime.now(timezone.utc)
+
+        # Subconsultas sem correlação: calculadas uma vez pelo banco
+        total_clients = select(func.count(func.distinct(Process.client_id))).scalar_subquery()
+        active_clients = (
+            select(func.count(func.distinct(Process.client_id)))
+            .where(Process.status == ACTIVE_STATUS)
+            .scalar_subquery()
+        )
+        open_payment = Payment.status == PaymentStatus.PENDING
+        pending_payments = (
+            select(func.coalesce(func.sum(Payment.amount), 0))
+            .where(open_payment, or_(Payment.due_date.is_(None), Payment.due_date >= now))
+            .scalar_subquery()
+        )
+        overdue_payments = (
+            select(func.coalesce(func.sum(Payment.amount), 0))
+            .where(open_payment, Payment.due_date < now)
+            .scalar_subquery()
+        )
+
+        rows = db.execute(
+            select(
+                LedgerEntry.category,
+                func.sum(LedgerEntry.amount),
+                func.sum(LedgerEntry.cases),
+                total_clients,
+                active_clients,
+                pending_payments,
+                overdue_payments,
+            ).where(
+                LedgerEntry.entry_type == LedgerEntryType.REVENUE,
+                LedgerEntry.entry_date >= month_start(snapshot.months[0]),
+                LedgerEntry.entry_date < month_start(snapshot.period, 1),
+            ).group_by(LedgerEntry.category)
+        ).all()
+        if not rows:
+            # Sem lançamentos no período: os totais de clientes e pagamentos ainda valem
+            rows = [(None, 0, 0) + tuple(
+                db.execute(select(total_clients, active_clients, pending_payments, overdue_payments)).one()
+            )]
+
+        for category, amount, cases, *totals in rows:
+            if category is not None:
+                snapshot.add_area(category, amount, cases)
+            (snapshot.total_clients, snapshot.active_clients,
+             snapshot.pending_payments, snapshot.overdue_payments) = (
+                totals[0], totals[1], float(totals[2] or 0), float(totals[3] or 0)
+            )
+        return snapshot.to_dict()
+
+    @staticmethod
+    def summary(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Resumo (/financial/summary) a partir do retrato."""
+        payments = snapshot["payments"]
+        return {
+            "totalRevenue": snapshot["total_revenue"],
+            # Mês-calendário atual e crescimento sobre o mês anterior
+            "monthlyRevenue": snapshot["monthly"][-1]["revenue"],
+            "growthRate": round(snapshot["growth_rate"] or 0.0, 2),
+            "averageTicket": round(snapshot["average_ticket"], 2),
+            "totalClients": snapshot["total_clients"],
+            "activeClients": snapshot["active_clients"],
+            "pendingPayments": payments["pending"],
+            "paidPayments": payments["paid"],
+            "overduePayments": payments["overdue"]
+        }
+
+    @staticmethod
+    @cached("financial:snapshot", ttl=settings.FINANCIAL_CACHE_TTL, tags=[DASHBOARD_TAG])
+    async def get_snapshot(db: Session, period: str, months: int = 6) -> Dict[str, Any]:
+        """Retrato do período pelo cache de serviços (calculado fora do event loop)."""
+        return await asyncio.to_thread(FinancialAnalyticsService.compute, db, period, months)
@@ -0,0 +1,361 @@
+# ===========================================
+# LIVRO-RAZÃO DE RECEITAS E PAGAMENTOS
+# ===========================================
+#
+# Os endpoints financeiros tratavam como receita do período todo actual_value
+# de processo alterado no período (qualquer edição movia a receita de mês) e
+# precisavam varrer processos por updated_at. Aqui cada mudança de valor vira
+# um lançamento imutável em revenue_ledger:
+#
+#   - Process: inserir/alterar/excluir actual_value lança REVENUE com a
+#     diferença (e cases +1/-1 quando o processo passa a ter/deixa de ter valor);
+#     mudar a área ou o cliente transfere a receita entre as atribuições
+#   - Payment: passar a "pago" lança PAYMENT com o valor; sair de "pago"
+#     (ou excluir um pagamento pago) lança o estorno
+#
+# Os lançamentos são gravados pelos hooks de flush na transação da escrita,
+# junto com os saldos mensais em monthly_rollups (revenue, revenue.cases,
+# payments.received). Consultas de receita viram varreduras por faixa nos
+# índices (entry_date), (category, entry_date) e (client_id, entry_date).
+
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, event, exists, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal, upsert_increments
+from app.models.ledger import LedgerEntry, LedgerEntryType
+from app.models.payment import Payment, PaymentStatus
+from app.models.process import Process
+from app.models.rollup import MonthlyRollup
+from app.services.counters import old_column_values
+from app.services.rollups import month_key
+
+logger = logging.getLogger(__name__)
+
+_SESSION_INFO_KEY = "ledger_changes"
+
+# Saldo mensal (monthly_rollups) de cada tipo de lançamento
+BALANCE_METRICS = {
+    LedgerEntryType.REVENUE: "revenue",
+    LedgerEntryType.PAYMENT: "payments.received",
+}
+CASES_METRIC = "revenue.cases"
+
+# Colunas lidas de cada modelo
+TRACKED_COLUMNS = {
+    Process: ("actual_value", "category", "client_id", "client_name"),
+    Payment: ("amount", "status", "payment_date", "process_id", "currency"),
+}
+
+class LedgerImmutableError(ValueError):
+    """Tentativa de alterar ou excluir um lançamento do livro-razão."""
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value)) if value is not None else Decimal(0)
+
+def _paid_amount(values: Optional[Dict[str, Any]]) -> Decimal:
+    if values is None or values["status"] != PaymentStatus.PAID:
+        return Decimal(0)
+    return _decimal(values["amount"])
+
+def _flushed_values(obj, old: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Valores após o flush sem recarregar o registro (colunas fora do objeto não mudaram)."""
+    state = inspect(obj)
+    values = {}
+    for column in TRACKED_COLUMNS[type(obj)]:
+        if column in state.dict:
+            values[column] = state.dict[column]
+        else:
+            values[column] = old[column] if old is not None else None
+    return values
+
+# ===========================================
+# LANÇAMENTOS A PARTIR DAS ESCRITAS
+# ===========================================
+
+def _revenue_share(values: Optional[Dict[str, Any]]):
+    """Área/cliente a que o valor de um processo é atribuído (None se sem valor)."""
+    if values is None or values["actual_value"] is None:
+        return None
+    client = values["client_id"] if values["client_id"] is not None else values["client_name"]
+    return values["category"], client
+
+def process_entries(process_id: int, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+                    now: datetime) -> List[Dict[str, Any]]:
+    """
+    Lançamentos REVENUE da mudança de valor de um processo.
+
+    Mudança de área ou de cliente de um processo com valor estorna a receita
+    da atribuição antiga e lança na nova, para os agregados por área/cliente
+    seguirem o processo.
+    """
+    old_share, new_share = _revenue_share(old), _revenue_share(new)
+    if old_share == new_share:
+        amount = _decimal(new and new["actual_value"]) - _decimal(old and old["actual_value"])
+        if not amount:
+            return []
+        parts = [(new, amount, 0)]
+    else:
+        parts = []
+        if old_share is not None:
+            parts.append((old, -_decimal(old["actual_value"]), -1))
+        if new_share is not None:
+            parts.append((new, _decimal(new["actual_value"]), 1))
+
+    if new is None:
+        description = "Processo excluído"
+    elif old_share is None:
+        description = "Valor do processo definido"
+    elif new_share is None:
+        description = "Valor do processo removido"
+    elif old_share != new_share:
+        description = "Processo reclassificado (área/cliente)"
+    else:
+        description = "Valor do processo alterado"
+    return [
+        {
+            "entry_date": now,
+            "entry_type": LedgerEntryType.REVENUE,
+            "amount": amount,
+            "cases": cases,
+            "category": values["category"],
+            "client_id": values["client_id"],
+            "client_name": values["client_name"],
+            "process_id": process_id,
+            "description": description,
+        }
+        for values, amount, cases in parts
+    ]
+
+def payment_entry(payment_id: int, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+                  now: datetime) -> Optional[Dict[str, Any]]:
+    """Lançamento PAYMENT de um pagamento que entrou em (ou saiu de) "pago"."""
+    amount = _paid_amount(new) - _paid_amount(old)
+    if not amount:
+        return None
+
+    source = new if new is not None else old
+    # Pagamento que acabou de ser recebido usa a data informada; estornos e ajustes, agora
+    became_paid = amount > 0 and not _paid_amount(old)
+    return {
+        "entry_date": (source["payment_date"] or now) if became_paid else now,
+        "entry_type": LedgerEntryType.PAYMENT,
+        "amount": amount,
+        "cases": 0,
+        "currency": source["currency"] or "BRL",
+        "process_id": source["process_id"],
+        "payment_id": payment_id,
+        "description": "Pagamento recebido" if amount > 0 else "Estorno de pagamento",
+    }
+
+# ===========================================
+# HOOKS DE FLUSH
+# ===========================================
+
+def _tracked_changed(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[column].history.has_changes() for column in TRACKED_COLUMNS[type(obj)])
+
+def _before_flush(session: Session, flush_context, instances):
+    """Bloquear alterações no livro-razão e guardar os valores antigos."""
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, LedgerEntry) and (obj in session.deleted or session.is_modified(obj)):
+            raise LedgerImmutableError("Lançamentos do livro-razão não podem ser alterados nem excluídos")
+
+    changes = session.info[_SESSION_INFO_KEY] = []
+    for obj in session.new:
+        if type(obj) in TRACKED_COLUMNS:
+            changes.append((obj, None, False))
+    for obj in session.dirty:
+        if type(obj) in TRACKED_COLUMNS and _tracked_changed(obj):
+            changes.append((obj, old_column_values(session, obj, TRACKED_COLUMNS[type(obj)]), False))
+    for obj in session.deleted:
+        if type(obj) in TRACKED_COLUMNS and inspect(obj).has_identity:
+            changes.append((obj, old_column_values(session, obj, TRACKED_COLUMNS[type(obj)]), True))
+
+def _after_flush(session: Session, flush_context):
+    """Gravar os lançamentos na transação do flush."""
+    changes = session.info.pop(_SESSION_INFO_KEY, None)
+    if not changes:
+        return
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for obj, old, deleted in changes:
+        new = None if deleted else _flushed_values(obj, old)
+        # Chave primária já está no objeto após o INSERT (identity só no fim do flush)
+        if isinstance(obj, Process):
+            rows.extend(process_entries(obj.id, old, new, now))
+        else:
+            entry = payment_entry(obj.id, old, new, now)
+            if entry is not None:
+                rows.append(entry)
+
+    if rows:
+        _fill_payment_context(session.connection(), rows)
+        LedgerService.append(session.connection(), rows)
+
+def _after_rollback(session: Session):
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+def _fill_payment_context(connection, rows: List[Dict[str, Any]]):
+    """Área e cliente dos pagamentos, copiados do processo (uma consulta)."""
+    process_ids = {
+        row["process_id"] for row in rows
+        if row["entry_type"] == LedgerEntryType.PAYMENT and row["process_id"] is not None
+    }
+    if not process_ids:
+        return
+    context = {
+        process_id: (category, client_id, client_name)
+        for process_id, category, client_id, client_name in connection.execute(
+            select(Process.id, Process.category, Process.client_id, Process.client_name)
+            .where(Process.id.in_(process_ids))
+        )
+    }
+    for row in rows:
+        if row["entry_type"] == LedgerEntryType.PAYMENT and row["process_id"] in context:
+            row["category"], row["client_id"], row["client_name"] = context[row["process_id"]]
+
+_hooks_installed = False
+
+def install_ledger_hooks():
+    """Registrar os hooks em todas as sessões (síncronas e assíncronas)."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Session, "before_flush", _before_flush)
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _hooks_installed = True
+
+# ===========================================
+# SERVIÇO
+# ===========================================
+
+class LedgerService:
+    """Gravação e consulta do livro-razão."""
+
+    @staticmethod
+    def append(connection, rows: List[Dict[str, Any]]) -> int:
+        """
+        Inserir lançamentos e somar os saldos mensais correspondentes.
+
+        Lançamentos de abertura (opening_process_id) já gravados por outro
+        processo são ignorados (ON CONFLICT DO NOTHING no Postgres e no SQLite;
+        nos demais bancos, o índice único rejeita o lote). Retorna quantos
+        lançamentos foram gravados.
+        """
+        table = LedgerEntry.__table__
+        columns = ("category", "client_id", "client_name", "process_id", "payment_id", "description",
+                   "opening_process_id")
+        entries = [
+            {"cases": 0, "currency": "BRL", **{column: None for column in columns}, **row}
+            for row in rows
+        ]
+        if connection.dialect.name in ("postgresql", "sqlite") and any(
+            entry["opening_process_id"] is not None for entry in entries
+        ):
+            if connection.dialect.name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            statement = dialect_insert(table).on_conflict_do_nothing(
+                index_elements=[table.c.opening_process_id]
+            ).returning(table.c.entry_date, table.c.entry_type, table.c.amount, table.c.cases)
+            entries = [dict(row._mapping) for row in connection.execute(statement, entries)]
+        else:
+            connection.execute(insert(table), entries)
+
+        balances: Counter = Counter()
+        for entry in entries:
+            month = month_key(entry["entry_date"])
+            balances[(BALANCE_METRICS[entry["entry_type"]], month)] += entry["amount"]
+            if entry["cases"]:
+                balances[(CASES_METRIC, month)] += entry["cases"]
+        balance_rows = [
+            {"metric": metric, "month": month, "value": value}
+            for (metric, month), value in balances.items()
+            if value
+        ]
+        if balance_rows:
+            table = MonthlyRollup.__table__
+            upsert_increments(connection, table, (table.c.metric, table.c.month), balance_rows)
+        return len(entries)
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 1000) -> int:
+        """
+        Lançamento de abertura para processos com valor e sem lançamentos REVENUE.
+
+        A data é o updated_at do processo, o mês em que os relatórios antigos
+        contavam a receita. Dois backfills simultâneos não duplicam a abertura
+        (índice único em opening_process_id). Retorna quantos lançamentos foram
+        criados.
+        """
+        has_entries = exists().where(and_(
+            LedgerEntry.process_id == Process.id,
+            LedgerEntry.entry_type == LedgerEntryType.REVENUE,
+        ))
+        rows = db.execute(
+            select(Process.id, Process.actual_value, Process.category, Process.client_id,
+                   Process.client_name, Process.updated_at)
+            .where(Process.actual_value.isnot(None), ~has_entries)
+            .order_by(Process.id)
+        ).all()
+
+        created = 0
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            created += LedgerService.append(db.connection(), [
+                {
+                    "entry_date": updated_at,
+                    "entry_type": LedgerEntryType.REVENUE,
+                    "amount": _decimal(value),
+                    "cases": 1,
+                    "category": category,
+                    "client_id": client_id,
+                    "client_name": client_name,
+                    "process_id": process_id,
+                    "description": "Saldo de abertura",
+                    "opening_process_id": process_id,
+                }
+                for process_id, value, category, client_id, client_name, updated_at in batch
+            ])
+        return created
+
+    @staticmethod
+    def get_entries(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    entry_type: Optional[LedgerEntryType] = None, category: Optional[str] = None,
+                    client_id: Optional[int] = None, client_name: Optional[str] = None,
+                    skip: int = 0, limit: int = 100) -> List[LedgerEntry]:
+        """Lançamentos por período/categoria/cliente, mais recentes primeiro."""
+        query = select(LedgerEntry)
+        if start is not None:
+            query = query.where(LedgerEntry.entry_date >= start)
+        if end is not None:
+            query = query.where(LedgerEntry.entry_date <= end)
+        if entry_type is not None:
+            query = query.where(LedgerEntry.entry_type == entry_type)
+        if category is not None:
+            query = query.where(LedgerEntry.category == category)
+        if client_id is not None:
+            query = query.where(LedgerEntry.client_id == client_id)
+        if client_name is not None:
+            query = query.where(LedgerEntry.client_name == client_name)
+        query = query.order_by(LedgerEntry.entry_date.desc(), LedgerEntry.id.desc()).offset(skip).limit(limit)
+        return list(db.execute(query).scalars())
+
+def backfill_ledger() -> int:
+    """Criar os lançamentos de abertura em uma sessão própria."""
+    with SessionLocal() as db:
+        created = LedgerService.backfill(db)
+        db.commit()
+    if created:
+        logger.info(f"📒 Livro-razão: {created} lançamentos de abertura criados")
+    return created
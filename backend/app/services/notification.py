@@ -4,12 +4,17 @@
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+import logging
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
 
 from app.models.notification import Notification, NotificationType, NotificationStatus
 from app.models.user import User
 from app.api.v1.endpoints.websocket import send_notification_to_user
 
+logger = logging.getLogger(__name__)
+
 class NotificationService:
     """Serviço para gerenciar notificações."""
     
@@ -309,4 +314,150 @@ class NotificationService:
                 title=title,
                 message=message,
                 notification_type=NotificationType.WARNING
-            )
\ No newline at end of file
+            )
+
+
+class AsyncNotificationService:
+    """Serviço assíncrono para gerenciar notificações (AsyncSession)."""
+    
+    @staticmethod
+    async def create_notification(
+        db: AsyncSession,
+        user_id: int,
+        title: str,
+        message: str,
+        notification_type: NotificationType = NotificationType.INFO,
+        action_url: Optional[str] = None
+    ) -> Notification:
+        """Criar nova notificação."""
+        
+        notification = Notification(
+            user_id=user_id,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            status=NotificationStatus.UNREAD,
+            action_url=action_url
+        )
+        
+        db.add(notification)
+        await db.commit()
+        await db.refresh(notification)
+        
+        return notification
+    
+    @staticmethod
+    async def create_and_send_notification(
+        db: AsyncSession,
+        user_id: int,
+        title: str,
+        message: str,
+        notification_type: NotificationType = NotificationType.INFO,
+        action_url: Optional[str] = None
+    ) -> Notification:
+        """Criar notificação e enviar via WebSocket."""
+        
+        notification = await AsyncNotificationService.create_notification(
+            db, user_id, title, message, notification_type, action_url
+        )
+        
+        try:
+            await send_notification_to_user(user_id, {
+                "id": notification.id,
+                "title": notification.title,
+                "message": notification.message,
+                "type": notification.notification_type.value,
+                "status": notification.status.value,
+                "action_url": notification.action_url,
+                "created_at": notification.created_at.isoformat()
+            })
+        except Exception as e:
+            logger.error(f"Erro ao enviar notificação via WebSocket: {e}")
+        
+        return notification
+    
+    @staticmethod
+    async def get_user_notifications(
+        db: AsyncSession,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        unread_only: bool = False
+    ) -> List[Notification]:
+        """Obter notificações do usuário."""
+        
+        stmt = select(Notification).where(Notification.user_id == user_id)
+        
+        if unread_only:
+            stmt = stmt.where(Notification.status == NotificationStatus.UNREAD)
+        
+        result = await db.execute(
+            stmt.order_by(Notification.created_at.desc()).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def get_notification(db: AsyncSession, notification_id: int, user_id: int) -> Optional[Notification]:
+        """Obter notificação do usuário por ID."""
+        
+        result = await db.execute(
+            select(Notification).where(
+                Notification.id == notification_id,
+                Notification.user_id == user_id
+            )
+        )
+        return result.scalars().first()
+    
+    @staticmethod
+    async def mark_as_read(db: AsyncSession, notification_id: int, user_id: int) -> bool:
+        """Marcar notificação como lida."""
+        
+        notification = await AsyncNotificationService.get_notification(db, notification_id, user_id)
+        if not notification:
+            return False
+        
+        notification.status = NotificationStatus.READ
+        notification.read_at = datetime.utcnow()
+        
+        await db.commit()
+        return True
+    
+    @staticmethod
+    async def mark_all_as_read(db: AsyncSession, user_id: int) -> int:
+        """Marcar todas as notificações do usuário como lidas."""
+        
+        result = await db.execute(
+            update(Notification)
+            .where(
+                Notification.user_id == user_id,
+                Notification.status == NotificationStatus.UNREAD
+            )
+            .values(status=NotificationStatus.READ, read_at=datetime.utcnow())
+        )
+        
+        await db.commit()
+        return result.rowcount
+    
+    @staticmethod
+    async def delete_notification(db: AsyncSession, notification_id: int, user_id: int) -> bool:
+        """Deletar notificação."""
+        
+        notification = await AsyncNotificationService.get_notification(db, notification_id, user_id)
+        if not notification:
+            return False
+        
+        await db.delete(notification)
+        await db.commit()
+        return True
+    
+    @staticmethod
+    async def get_unread_count(db: AsyncSession, user_id: int) -> int:
+        """Obter contagem de notificações não lidas."""
+        
+        result = await db.execute(
+            select(func.count(Notification.id)).where(
+                Notification.user_id == user_id,
+                Notification.status == NotificationStatus.UNREAD
+            )
+        )
+        return result.scalar() or 0
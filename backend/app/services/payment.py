@@ -0,0 +1,143 @@
+# ===========================================
+# SERVIÇO DE PAGAMENTO
+# ===========================================
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.cache import invalidate_cache_tags
+from app.core.database import count_where, sum_where
+from app.core.redis import DASHBOARD_TAG
+from app.models.payment import Payment, PaymentStatus
+from app.schemas.payment import PaymentCreate
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def serialize_payment(payment: Payment) -> Dict[str, Any]:
+    """Pagamento no formato da API (o mesmo do antigo mock do frontend)."""
+    return {
+        "id": payment.id,
+        "user": {
+            "id": payment.user.id,
+            "name": payment.user.full_name,
+            "email": payment.user.email,
+        } if payment.user else None,
+        "task": {"id": payment.task.id, "title": payment.task.title} if payment.task else None,
+        "process": {
+            "id": payment.process.id,
+            "title": payment.process.title,
+            "process_number": payment.process.process_number,
+        } if payment.process else None,
+        "amount": float(payment.amount),
+        "currency": payment.currency,
+        "status": payment.status.value,
+        "description": payment.description,
+        "payment_date": _iso(payment.payment_date),
+        "due_date": _iso(payment.due_date),
+        "payment_method": payment.payment_method,
+        "transaction_id": payment.transaction_id,
+        "notes": payment.notes,
+        "created_at": _iso(payment.created_at),
+        "updated_at": _iso(payment.updated_at),
+    }
+
+class AsyncPaymentService:
+    """Serviço assíncrono de pagamentos (os lançamentos vêm dos hooks do livro-razão)."""
+
+    @staticmethod
+    def _filters(status: Optional[PaymentStatus], user_id: Optional[int], process_id: Optional[int]) -> List:
+        filters = []
+        if status is not None:
+            filters.append(Payment.status == status)
+        if user_id is not None:
+            filters.append(Payment.user_id == user_id)
+        if process_id is not None:
+            filters.append(Payment.process_id == process_id)
+        return filters
+
+    @staticmethod
+    async def get_payments(db: AsyncSession, skip: int = 0, limit: int = 100,
+                           status: Optional[PaymentStatus] = None, user_id: Optional[int] = None,
+                           process_id: Optional[int] = None) -> Tuple[List[Payment], Dict[str, Any]]:
+        """Página de pagamentos e resumo dos filtrados (um agregado condicional)."""
+        filters = AsyncPaymentService._filters(status, user_id, process_id)
+        result = await db.execute(
+            select(Payment)
+            .options(selectinload(Payment.user), selectinload(Payment.task), selectinload(Payment.process))
+            .where(*filters)
+            .order_by(Payment.created_at.desc(), Payment.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        payments = list(result.scalars().all())
+
+        dialect_name = db.get_bind().dialect.name
+        paid = Payment.status == PaymentStatus.PAID
+        pending = Payment.status == PaymentStatus.PENDING
+        total, total_amount, paid_count, paid_amount, pending_count, pending_amount = (await db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(Payment.amount), 0),
+                count_where(paid, dialect_name),
+                func.coalesce(sum_where(Payment.amount, paid, dialect_name), 0),
+                count_where(pending, dialect_name),
+                func.coalesce(sum_where(Payment.amount, pending, dialect_name), 0),
+            ).select_from(Payment).where(*filters)
+        )).one()
+
+        return payments, {
+            "total": total,
+            "summary": {
+                "total_amount": float(total_amount),
+                "paid_amount": float(paid_amount),
+                "pending_amount": float(pending_amount),
+                "total_payments": total,
+                "paid_payments": paid_count,
+                "pending_payments": pending_count,
+            },
+        }
+
+    @staticmethod
+    async def get_payment_by_id(db: AsyncSession, payment_id: int) -> Optional[Payment]:
+        """Obter pagamento por ID (com relacionamentos carregados para serialização)."""
+        result = await db.execute(
+            select(Payment)
+            .options(selectinload(Payment.user), selectinload(Payment.task), selectinload(Payment.process))
+            .where(Payment.id == payment_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def create_payment(db: AsyncSession, payment_data: PaymentCreate, created_by_id: int) -> Payment:
+        """Registrar pagamento (pago gera lançamento PAYMENT no livro-razão)."""
+        payment = Payment(**payment_data.model_dump(), created_by_id=created_by_id)
+        if payment.status == PaymentStatus.PAID and payment.payment_date is None:
+            payment.payment_date = datetime.now(timezone.utc)
+
+        db.add(payment)
+        await db.commit()
+        await invalidate_cache_tags(DASHBOARD_TAG)
+
+        return await AsyncPaymentService.get_payment_by_id(db, payment.id)
+
+    @staticmethod
+    async def update_status(db: AsyncSession, payment_id: int, status: PaymentStatus) -> Optional[Payment]:
+        """Alterar status (entrar/sair de "pago" gera lançamento/estorno)."""
+        payment = await db.get(Payment, payment_id)
+        if not payment:
+            return None
+
+        payment.status = status
+        if status == PaymentStatus.PAID and payment.payment_date is None:
+            payment.payment_date = datetime.now(timezone.utc)
+
+        await db.commit()
+        await invalidate_cache_tags(DASHBOARD_TAG)
+
+        return await AsyncPaymentService.get_payment_by_id(db, payment_id)
@@ -3,11 +3,19 @@
 # ===========================================
 
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
+from app.core.cache import invalidate_cache_tags
+from app.core.pagination import KeysetPage, page_with_total, resolve_sort
+from app.core.redis import DASHBOARD_TAG, process_tag
 from app.models.process import Process
 from app.schemas.process import ProcessCreate, ProcessUpdate
+from app.services.process_search import ProcessSearchService
+
+# Ordenações da listagem (sempre desempatadas pelo id)
+PROCESS_SORTS = {"id": Process.id, "updated_at": Process.updated_at}
 
 class ProcessService:
     """Serviço para gerenciar processos."""
@@ -43,14 +51,9 @@ class ProcessService:
     
     @staticmethod
     def search_processes(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[Process]:
-        """Buscar processos por título ou cliente."""
-        search_filter = or_(
-            Process.title.ilike(f"%{query}%"),
-            Process.client_name.ilike(f"%{query}%"),
-            Process.process_number.ilike(f"%{query}%")
-        )
-        
-        return db.query(Process).filter(search_filter).offset(skip).limit(limit).all()
+        """Buscar processos por texto (índice textual) ou número."""
+        search_filter = ProcessSearchService.match_filter(db, query)
+        return db.query(Process).filter(search_filter).order_by(Process.id).offset(skip).limit(limit).all()
     
     @staticmethod
     def update_process(db: Session, process_id: int, process_data: ProcessUpdate) -> Optional[Process]:
@@ -81,14 +84,85 @@ class ProcessService:
         return True
 
 
-
-
-
-
-
-
-
-
-
-
-
+class AsyncProcessService:
+    """Serviço assíncrono para gerenciar processos (AsyncSession)."""
+    
+    @staticmethod
+    async def create_process(db: AsyncSession, process_data: ProcessCreate, user_id: int) -> Process:
+        """Criar novo processo."""
+        process = Process(
+            **process_data.dict(),
+            user_id=user_id
+        )
+        
+        db.add(process)
+        await db.commit()
+        await invalidate_cache_tags(DASHBOARD_TAG)
+        
+        return await AsyncProcessService.get_process_by_id(db, process.id)
+    
+    @staticmethod
+    async def get_process_by_id(db: AsyncSession, process_id: int) -> Optional[Process]:
+        """Obter processo por ID (com usuário carregado para serialização)."""
+        result = await db.execute(
+            select(Process)
+            .options(selectinload(Process.user))
+            .where(Process.id == process_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+    
+    @staticmethod
+    async def get_processes_page(
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        sort: Optional[str] = None,
+        search: Optional[str] = None,
+        user_id: Optional[int] = None,
+        include_total: bool = True
+    ) -> KeysetPage:
+        """Página de processos por cursor, com busca e dono opcionais."""
+        sort, column, descending = resolve_sort(sort, PROCESS_SORTS, "id")
+        filters = []
+        if user_id is not None:
+            filters.append(Process.user_id == user_id)
+        if search:
+            filters.append(await db.run_sync(
+                lambda session: ProcessSearchService.match_filter(session, search)
+            ))
+        statement = select(Process).options(selectinload(Process.user)).where(*filters)
+        return await page_with_total(
+            db, statement, Process, filters, sort, column, descending, cursor, limit, skip,
+            include_total=include_total, counter="processes.total"
+        )
+    
+    @staticmethod
+    async def update_process(db: AsyncSession, process_id: int, process_data: ProcessUpdate) -> Optional[Process]:
+        """Atualizar processo."""
+        process = await AsyncProcessService.get_process_by_id(db, process_id)
+        if not process:
+            return None
+        
+        update_data = process_data.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(process, field, value)
+        
+        await db.commit()
+        await invalidate_cache_tags(DASHBOARD_TAG, process_tag(process_id))
+        
+        return await AsyncProcessService.get_process_by_id(db, process_id)
+    
+    @staticmethod
+    async def delete_process(db: AsyncSession, process_id: int) -> bool:
+        """Deletar processo."""
+        process = await db.get(Process, process_id)
+        if not process:
+            return False
+        
+        await db.delete(process)
+        await db.commit()
+        await invalidate_cache_tags(DASHBOARD_TAG, process_tag(process_id))
+        
+        return True
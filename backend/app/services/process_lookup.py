@@ -0,0 +1,445 @@
+# ===========================================
+# BUSCA APROXIMADA (TYPEAHEAD) DE PROCESSOS
+# ===========================================
+#
+# Usuários colam números CNJ com ou sem pontuação e erram nomes de clientes;
+# o ILIKE '%termo%' não acha nenhum dos dois casos e varre a tabela. Aqui a
+# busca é por trigramas:
+#
+#   - processes.process_number_digits guarda só os dígitos do número
+#     (preenchido no before_flush), comparado com os dígitos da busca
+#   - Postgres: pg_trgm com índices GIN (gin_trgm_ops) nos dígitos e no nome
+#     do cliente sem acentos/minúsculo; primeiro o trecho exato (LIKE pelo
+#     índice) e, se não houver, a busca aproximada: no número, trechos exatos
+#     de cada terço (um dígito errado preserva os outros) ranqueados por
+#     similarity; no nome, word_similarity (<%), do mais parecido ao menos
+#   - SQLite: tabela FTS5 processes_trgm (tokenizer trigram): trecho exato
+#     pelo índice e, se não houver, os mesmos terços do número ou os
+#     candidatos que compartilham trigramas com o nome, ranqueados em Python
+#     com a similaridade do pg_trgm
+#
+# A similaridade mínima vem de TYPEAHEAD_MIN_SIMILARITY. Sem os índices no
+# banco (ou com FULL_TEXT_SEARCH_ENABLED=false), volta ao LIKE sem ranking.
+# Processos anteriores (ou inseridos fora do ORM) ganham os dígitos e entram
+# no índice pelo backfill "lookup_index" (no boot ou com `python -m app.cli
+# search-index`); até ele ser concluído neste banco, o typeahead usa o LIKE e
+# a busca por número também compara o número com pontuação (ILIKE).
+
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import bindparam, event, inspect, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, is_backfill_completed, reset_backfill
+from app.models.process import Process
+
+logger = logging.getLogger(__name__)
+
+TRIGRAM_TABLE = "processes_trgm"
+BACKFILL_BATCH_SIZE = 10000
+
+# Marcador do backfill dos dígitos e do índice (ver app.cli.BACKFILLS)
+LOOKUP_BACKFILL = "lookup_index"
+
+# Dígitos mínimos para tratar a busca como número de processo
+MIN_NUMBER_DIGITS = 3
+
+# Candidatos (por trigramas em comum) avaliados na busca aproximada do SQLite
+FUZZY_CANDIDATES = 200
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # unaccent() não é IMMUTABLE e não pode entrar em índice de expressão
+    """
+    CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_processes_number_digits_trgm "
+    "ON processes USING GIN (process_number_digits gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_processes_client_name_trgm "
+    "ON processes USING GIN (immutable_unaccent(lower(client_name)) gin_trgm_ops)",
+]
+
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TRIGRAM_TABLE}
+    USING fts5(process_number_digits, client_name, tokenize = 'trigram remove_diacritics 1')
+    """,
+]
+
+# Nome do cliente normalizado no Postgres (mesma expressão do índice)
+CLIENT_NAME_SQL = "immutable_unaccent(lower(client_name))"
+
+# Bancos (URL do engine) em que os índices já foram encontrados e em que o
+# backfill já foi concluído (dígitos preenchidos, índice completo)
+_structure: Set[str] = set()
+_filled: Set[str] = set()
+
+# ===========================================
+# NORMALIZAÇÃO E SIMILARIDADE
+# ===========================================
+
+def only_digits(value: Optional[str]) -> Optional[str]:
+    """Dígitos de um número de processo (None se não houver nenhum)."""
+    digits = re.sub(r"\D", "", value or "")
+    return digits or None
+
+def fold_text(value: str) -> str:
+    """Texto em minúsculas e sem acentos."""
+    return "".join(
+        char for char in unicodedata.normalize("NFKD", value.lower()) if not unicodedata.combining(char)
+    )
+
+def is_number_query(query: str) -> bool:
+    """Busca por número do processo: só dígitos e pontuação do CNJ, com dígitos suficientes."""
+    digits = only_digits(query) or ""
+    return bool(re.fullmatch(r"[\d.\-/\s]+", query.strip())) and len(digits) >= MIN_NUMBER_DIGITS
+
+def number_chunks(digits: str) -> List[str]:
+    """
+    Trechos do número para a busca aproximada: um ou dois dígitos errados
+    preservam pelo menos um dos terços (ou uma das metades, em números curtos).
+    Trigramas soltos de dígitos se repetem em quase todos os processos.
+    """
+    parts = 3 if len(digits) >= 12 else 2 if len(digits) >= 8 else 0
+    size = len(digits) // parts if parts else 0
+    return [digits[index * size:(index + 1) * size if index < parts - 1 else None] for index in range(parts)]
+
+def trigrams(value: str) -> Set[str]:
+    """Trigramas de cada palavra como no pg_trgm (dois espaços antes, um depois)."""
+    grams = set()
+    for word in re.findall(r"\w+", fold_text(value)):
+        padded = f"  {word} "
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return grams
+
+def similarity(a: str, b: str) -> float:
+    """similarity() do pg_trgm: trigramas em comum sobre o total de trigramas distintos."""
+    first, second = trigrams(a), trigrams(b)
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+def word_similarity(query: str, value: str) -> float:
+    """
+    Aproximação de word_similarity() do pg_trgm: fração dos trigramas da busca
+    presentes em `value` (um trecho digitado de um nome pontua alto).
+    """
+    first = trigrams(query)
+    if not first:
+        return 0.0
+    return len(first & trigrams(value)) / len(first)
+
+# ===========================================
+# ESTRUTURA NO BANCO
+# ===========================================
+
+def _engine_key(bind) -> str:
+    return str(getattr(bind, "engine", bind).url)
+
+def _structure_found(bind) -> bool:
+    inspector = inspect(bind)
+    if bind.dialect.name == "postgresql":
+        indexes = {index["name"] for index in inspector.get_indexes("processes")}
+        return {"ix_processes_number_digits_trgm", "ix_processes_client_name_trgm"} <= indexes
+    return inspector.has_table(TRIGRAM_TABLE)
+
+def index_exists(bind) -> bool:
+    """Se o banco de `bind` (engine ou conexão) tem os índices de trigramas."""
+    if not settings.FULL_TEXT_SEARCH_ENABLED or bind.dialect.name not in ("postgresql", "sqlite"):
+        return False
+    key = _engine_key(bind)
+    if key not in _structure:
+        if not _structure_found(bind):
+            return False
+        _structure.add(key)
+    return True
+
+def digits_filled(bind) -> bool:
+    """Se o backfill já preencheu process_number_digits dos processos existentes."""
+    key = _engine_key(bind)
+    if key not in _filled:
+        if not is_backfill_completed(LOOKUP_BACKFILL, bind):
+            return False
+        _filled.add(key)
+    return True
+
+def lookup_ready(bind) -> bool:
+    """Se os índices de trigramas do banco de `bind` já têm todos os processos."""
+    return index_exists(bind) and digits_filled(bind)
+
+def ensure_lookup_schema(bind=None) -> bool:
+    """Criar (se faltar) os índices de trigramas; retorna se ficaram disponíveis.
+
+    Índices recém-criados (a tabela do SQLite começa vazia) apagam o marcador
+    do backfill, que roda de novo no próximo boot.
+    """
+    bind = bind or engine
+    if not settings.FULL_TEXT_SEARCH_ENABLED or bind.dialect.name not in ("postgresql", "sqlite"):
+        return False
+    statements = POSTGRES_DDL if bind.dialect.name == "postgresql" else SQLITE_DDL
+    try:
+        existed = _structure_found(bind)
+        with bind.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+    except Exception as e:
+        logger.error(f"❌ Busca aproximada indisponível (usando LIKE): {e}")
+        return False
+    key = _engine_key(bind)
+    if not existed:
+        reset_backfill(LOOKUP_BACKFILL, bind)
+        _filled.discard(key)
+    _structure.add(key)
+    return True
+
+def write_index(connection, process_ids: List[int]):
+    """Reindexar os processos na tabela de trigramas do SQLite (os removidos saem)."""
+    if not process_ids or connection.dialect.name != "sqlite":
+        return
+    placeholders = ", ".join(f":id{index}" for index in range(len(process_ids)))
+    params = {f"id{index}": process_id for index, process_id in enumerate(process_ids)}
+    connection.execute(text(f"DELETE FROM {TRIGRAM_TABLE} WHERE rowid IN ({placeholders})"), params)
+    connection.execute(
+        text(
+            f"INSERT INTO {TRIGRAM_TABLE} (rowid, process_number_digits, client_name) "
+            f"SELECT id, coalesce(process_number_digits, ''), client_name FROM processes "
+            f"WHERE id IN ({placeholders})"
+        ),
+        params,
+    )
+
+# ===========================================
+# HOOKS DE FLUSH
+# ===========================================
+
+def _before_flush(session: Session, flush_context, instances):
+    """Preencher os dígitos do número dos processos novos ou com número alterado."""
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Process) and inspect(obj).attrs.process_number.history.has_changes():
+            obj.process_number_digits = only_digits(obj.process_number)
+
+def _after_flush(session: Session, flush_context):
+    """Reindexar (SQLite) os processos novos, removidos ou com número/cliente alterado."""
+    changed: Set[int] = set()
+    for obj in session.new:
+        if isinstance(obj, Process):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Process):
+            state = inspect(obj)
+            if state.attrs.process_number_digits.history.has_changes() or \
+                    state.attrs.client_name.history.has_changes():
+                changed.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Process) and obj.id is not None:
+            changed.add(obj.id)
+    if not changed:
+        return
+    connection = session.connection()
+    if connection.dialect.name == "sqlite" and index_exists(connection):
+        write_index(connection, sorted(changed))
+
+_hooks_installed = False
+
+def install_lookup_hooks():
+    """Registrar os hooks em todas as sessões (os dígitos são mantidos mesmo sem os índices)."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Session, "before_flush", _before_flush)
+    event.listen(Session, "after_flush", _after_flush)
+    _hooks_installed = True
+
+# ===========================================
+# CONSULTA
+# ===========================================
+
+def number_filter(query: str, bind):
+    """Condição WHERE para um trecho do número (com ou sem pontuação).
+
+    Antes do backfill, processos antigos ainda não têm os dígitos: o número
+    digitado também é comparado com o número original.
+    """
+    condition = Process.process_number_digits.like(f"%{only_digits(query)}%")
+    if digits_filled(bind):
+        return condition
+    return or_(condition, Process.process_number.ilike(f"%{query}%"))
+
+def _item(row, match: str, score: Optional[float]) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "process_number": row.process_number,
+        "client_name": row.client_name,
+        "title": row.title,
+        "match": match,
+        "score": round(score, 4) if score is not None else None,
+    }
+
+class ProcessLookupService:
+    """Busca aproximada por número CNJ ou nome do cliente."""
+
+    @staticmethod
+    def _postgres(db: Session, query: str, limit: int, threshold: float) -> List[Dict[str, Any]]:
+        number = is_number_query(query)
+        needle = only_digits(query) if number else fold_text(query).strip()
+        column = "process_number_digits" if number else CLIENT_NAME_SQL
+        similarity_sql = f"similarity(:needle, {column})" if number else f"word_similarity(:needle, {column})"
+        statement = """
+            SELECT id, process_number, client_name, title, {score} AS score
+            FROM processes
+            WHERE {condition}
+            ORDER BY score DESC, id
+            LIMIT :limit
+        """
+
+        def like(value: str) -> str:
+            return "%" + re.sub(r"([\\%_])", r"\\\1", value) + "%"
+
+        # Trecho exato pelo índice (LIKE '%trecho%' usa o GIN de trigramas);
+        # no número, os que começam pelo trecho primeiro
+        contains = like(needle)
+        exact_score = f"CASE WHEN {column} LIKE :prefix THEN 1.0 ELSE 0.9 END" if number else similarity_sql
+        rows = db.execute(text(statement.format(score=exact_score, condition=f"{column} LIKE :contains")), {
+            "needle": needle, "contains": contains, "prefix": contains[1:], "limit": limit,
+        }).all()
+
+        chunks = number_chunks(needle) if number else []
+        if not rows and chunks:
+            # Número com erro: algum terço exato, do mais parecido ao menos
+            params = {f"chunk{index}": like(chunk) for index, chunk in enumerate(chunks)}
+            condition = " OR ".join(f"{column} LIKE :chunk{index}" for index in range(len(chunks)))
+            rows = db.execute(text(statement.format(
+                score=similarity_sql, condition=f"({condition}) AND {similarity_sql} >= :threshold"
+            )), {**params, "needle": needle, "threshold": threshold, "limit": limit}).all()
+        elif not rows and not number:
+            # Nome com erro: word_similarity pelo índice (<%), com o limiar configurado
+            db.execute(text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+                       {"threshold": str(threshold)})
+            rows = db.execute(text(statement.format(score=similarity_sql, condition=f":needle <% {column}")),
+                              {"needle": needle, "limit": limit}).all()
+        match = "process_number" if number else "client_name"
+        return [_item(row, match, float(row.score)) for row in rows]
+
+    @staticmethod
+    def _sqlite(db: Session, query: str, limit: int, threshold: float) -> List[Dict[str, Any]]:
+        number = is_number_query(query)
+        column = "process_number_digits" if number else "client_name"
+        needle = only_digits(query) if number else fold_text(query).strip()
+
+        def phrase(value: str) -> str:
+            return '"' + value.replace('"', '""') + '"'
+
+        def fetch(match: str):
+            return db.execute(text(f"""
+                SELECT p.id, p.process_number, p.process_number_digits, p.client_name, p.title
+                FROM {TRIGRAM_TABLE} JOIN processes p ON p.id = {TRIGRAM_TABLE}.rowid
+                WHERE {TRIGRAM_TABLE} MATCH :match
+                ORDER BY bm25({TRIGRAM_TABLE}), p.id
+                LIMIT :candidates
+            """), {"match": f"{column} : ({match})", "candidates": FUZZY_CANDIDATES}).all()
+
+        def score(row) -> float:
+            value = row.process_number_digits if number else row.client_name
+            if number:
+                return 1.0 if value.startswith(needle) else 0.9 if needle in value else similarity(needle, value)
+            return word_similarity(needle, value)
+
+        # Trecho exato (todos os trigramas, em sequência) pelo índice
+        scored = [(score(row), row) for row in fetch(phrase(needle))] if len(needle) >= 3 else []
+        if not scored:
+            # Aproximada: terços exatos do número ou trigramas em comum com o nome
+            if number:
+                candidates = [phrase(chunk) for chunk in number_chunks(needle)]
+            else:
+                candidates = [phrase(gram) for gram in sorted({needle[i:i + 3] for i in range(len(needle) - 2)})]
+            if candidates:
+                scored = [(score(row), row) for row in fetch(" OR ".join(candidates))]
+                scored = [(value, row) for value, row in scored if value >= threshold]
+
+        scored.sort(key=lambda item: (-item[0], item[1].id))
+        match_name = "process_number" if number else "client_name"
+        return [_item(row, match_name, value) for value, row in scored[:limit]]
+
+    @staticmethod
+    def typeahead(db: Session, query: str, limit: int = 10,
+                  min_similarity: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Processos cujo número ou cliente se parece com `query`, do mais parecido
+        ao menos. Buscas só com dígitos e pontuação comparam o número; as demais,
+        o nome do cliente.
+        """
+        query = query.strip()
+        threshold = settings.TYPEAHEAD_MIN_SIMILARITY if min_similarity is None else min_similarity
+        connection = db.connection()
+        if not lookup_ready(connection):
+            number = is_number_query(query)
+            condition = number_filter(query, connection) if number else Process.client_name.ilike(f"%{query}%")
+            rows = db.execute(
+                select(Process.id, Process.process_number, Process.client_name, Process.title)
+                .where(condition).order_by(Process.id).limit(limit)
+            ).all()
+            results = [_item(row, "process_number" if number else "client_name", None) for row in rows]
+        elif connection.dialect.name == "postgresql":
+            results = ProcessLookupService._postgres(db, query, limit, threshold)
+        else:
+            results = ProcessLookupService._sqlite(db, query, limit, threshold)
+        return {"query": query, "results": results}
+
+    @staticmethod
+    def backfill(db: Session, rebuild: bool = False) -> int:
+        """Preencher os dígitos dos números e (SQLite) indexar os trigramas; retorna os processos atualizados."""
+        connection = db.connection()
+        pending = Process.process_number.isnot(None)
+        if not rebuild:
+            pending = pending & Process.process_number_digits.is_(None)
+        updated = 0
+        if connection.dialect.name == "postgresql":
+            updated = connection.execute(
+                text("UPDATE processes SET process_number_digits = nullif(regexp_replace(process_number, "
+                     "'\\D', '', 'g'), '') WHERE process_number IS NOT NULL"
+                     + ("" if rebuild else " AND process_number_digits IS NULL"))
+            ).rowcount
+        else:
+            last_id = 0
+            while True:
+                rows = db.execute(
+                    select(Process.id, Process.process_number).where(pending, Process.id > last_id)
+                    .order_by(Process.id).limit(BACKFILL_BATCH_SIZE)
+                ).all()
+                if not rows:
+                    break
+                db.execute(
+                    Process.__table__.update()
+                    .where(Process.__table__.c.id == bindparam("row_id"))
+                    .values(process_number_digits=bindparam("digits")),
+                    [{"row_id": row.id, "digits": only_digits(row.process_number)} for row in rows],
+                )
+                updated += len(rows)
+                last_id = rows[-1].id
+
+        if connection.dialect.name == "sqlite" and index_exists(connection):
+            if rebuild or updated:
+                connection.execute(text(f"DELETE FROM {TRIGRAM_TABLE}"))
+            connection.execute(text(
+                f"INSERT INTO {TRIGRAM_TABLE} (rowid, process_number_digits, client_name) "
+                f"SELECT id, coalesce(process_number_digits, ''), client_name FROM processes "
+                f"WHERE id NOT IN (SELECT rowid FROM {TRIGRAM_TABLE})"
+            ))
+        return updated
+
+def backfill_lookup_index(rebuild: bool = False) -> int:
+    """Criar os índices (se faltarem) e preencher os dígitos em uma sessão própria."""
+    ensure_lookup_schema()
+    with SessionLocal() as db:
+        updated = ProcessLookupService.backfill(db, rebuild)
+        db.commit()
+    if updated:
+        logger.info(f"🔢 Busca aproximada: {updated} números de processo normalizados")
+    return updated
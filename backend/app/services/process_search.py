@@ -0,0 +1,415 @@
+# ===========================================
+# BUSCA TEXTUAL DE PROCESSOS
+# ===========================================
+#
+# A busca fazia três ILIKE '%termo%' (título, cliente e número), que nunca
+# usam índice e devolvem resultados sem ordem de relevância. Aqui título,
+# cliente, categoria e descrição são indexados para busca textual:
+#
+#   - Postgres: coluna processes.search_vector (tsvector, pesos A/B/C/D) com
+#     a configuração portuguese_unaccent (stemming português + unaccent),
+#     índice GIN, websearch_to_tsquery, ts_rank_cd e ts_headline
+#   - número do processo (só dígitos e pontuação): LIKE nos dígitos
+#     normalizados (ver process_lookup.number_filter)
+#   - SQLite: tabela FTS5 processes_fts (unicode61 sem diacríticos), bm25 com
+#     os mesmos pesos, highlight/snippet. O FTS5 não tem stemmer português:
+#     cada termo, sem sufixos flexionais comuns, é buscado como prefixo
+#
+# O índice é atualizado pelo hook after_flush quando um desses campos muda;
+# processos anteriores (ou inseridos fora do ORM) entram pelo backfill
+# "search_index" (no boot ou com `python -m app.cli search-index`). Até o
+# backfill ser concluído neste banco, a busca usa o ILIKE: um índice recém-
+# criado ainda não tem os processos existentes.
+
+import html
+import logging
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import event, func, inspect, literal_column, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, is_backfill_completed, reset_backfill
+from app.models.process import Process
+from app.services.process_lookup import fold_text, is_number_query, number_filter
+
+logger = logging.getLogger(__name__)
+
+# Campos indexados, na ordem das colunas do FTS5, com os pesos de cada banco
+SEARCH_COLUMNS = ("title", "client_name", "category", "description")
+TSVECTOR_WEIGHTS = {"title": "A", "client_name": "B", "category": "C", "description": "D"}
+BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# Sufixos retirados dos termos da busca no SQLite (do mais longo ao mais curto)
+PREFIX_SUFFIXES = ("coes", "cao", "oes", "aes", "ais", "eis", "es", "s")
+
+SEARCH_CONFIG = "portuguese_unaccent"
+FTS_TABLE = "processes_fts"
+BACKFILL_BATCH_SIZE = 10000
+
+# Marcador do backfill do índice (ver app.cli.BACKFILLS)
+SEARCH_BACKFILL = "search_index"
+
+# Marcadores dos trechos destacados (trocados por <mark> depois do escape HTML)
+_MARK_START, _MARK_END = "\ue000", "\ue001"
+
+# Bancos (URL do engine) em que a estrutura do índice já foi encontrada e em
+# que o índice já está completo (backfill concluído); sem eles, a verificação
+# se repete até a estrutura ser criada e o backfill terminar
+_structure: Set[str] = set()
+_ready: Set[str] = set()
+
+# tsvector ponderado dos campos (Postgres)
+SEARCH_VECTOR_SQL = " || ".join(
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{TSVECTOR_WEIGHTS[column]}')"
+    for column in SEARCH_COLUMNS
+)
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    f"""
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_CONFIG}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG}
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END $$
+    """,
+    "ALTER TABLE processes ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_processes_search_vector ON processes USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+    USING fts5({", ".join(SEARCH_COLUMNS)}, tokenize = 'unicode61 remove_diacritics 2')
+    """,
+]
+
+# ===========================================
+# ESTRUTURA NO BANCO
+# ===========================================
+
+def _engine_key(bind) -> str:
+    return str(getattr(bind, "engine", bind).url)
+
+def _structure_found(bind) -> bool:
+    inspector = inspect(bind)
+    if bind.dialect.name == "postgresql":
+        return any(column["name"] == "search_vector" for column in inspector.get_columns("processes"))
+    return inspector.has_table(FTS_TABLE)
+
+def index_exists(bind) -> bool:
+    """Se o banco de `bind` (engine ou conexão) tem a estrutura do índice textual."""
+    if not settings.FULL_TEXT_SEARCH_ENABLED or bind.dialect.name not in ("postgresql", "sqlite"):
+        return False
+    key = _engine_key(bind)
+    if key not in _structure:
+        if not _structure_found(bind):
+            return False
+        _structure.add(key)
+    return True
+
+def search_ready(bind) -> bool:
+    """Se o índice textual do banco de `bind` já tem todos os processos (backfill concluído)."""
+    if not index_exists(bind):
+        return False
+    key = _engine_key(bind)
+    if key not in _ready:
+        if not is_backfill_completed(SEARCH_BACKFILL, bind):
+            return False
+        _ready.add(key)
+    return True
+
+def ensure_search_schema(bind=None) -> bool:
+    """Criar (se faltar) a estrutura de busca do banco; retorna se ficou disponível.
+
+    Uma estrutura recém-criada começa vazia: o marcador do backfill é apagado
+    e a busca só passa a usá-la depois do próximo backfill.
+    """
+    bind = bind or engine
+    if not settings.FULL_TEXT_SEARCH_ENABLED or bind.dialect.name not in ("postgresql", "sqlite"):
+        return False
+    statements = POSTGRES_DDL if bind.dialect.name == "postgresql" else SQLITE_DDL
+    try:
+        existed = _structure_found(bind)
+        with bind.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+    except Exception as e:
+        logger.error(f"❌ Busca textual indisponível (usando ILIKE): {e}")
+        return False
+    key = _engine_key(bind)
+    if not existed:
+        reset_backfill(SEARCH_BACKFILL, bind)
+        _ready.discard(key)
+    _structure.add(key)
+    return True
+
+def write_index(connection, process_ids: List[int]):
+    """Reindexar os processos (os que não existem mais saem do índice)."""
+    if not process_ids:
+        return
+    ids = {"ids": process_ids}
+    if connection.dialect.name == "postgresql":
+        connection.execute(
+            text(f"UPDATE processes SET search_vector = {SEARCH_VECTOR_SQL} WHERE id = ANY(:ids)"), ids
+        )
+        return
+    placeholders = ", ".join(f":id{index}" for index in range(len(process_ids)))
+    params = {f"id{index}": process_id for index, process_id in enumerate(process_ids)}
+    connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})"), params)
+    connection.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+            f"SELECT id, {', '.join(f'coalesce({column}, {chr(39) * 2})' for column in SEARCH_COLUMNS)} "
+            f"FROM processes WHERE id IN ({placeholders})"
+        ),
+        params,
+    )
+
+# ===========================================
+# HOOK DE FLUSH
+# ===========================================
+
+def _search_changed(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[column].history.has_changes() for column in SEARCH_COLUMNS)
+
+def _after_flush(session: Session, flush_context):
+    """Reindexar, na transação do flush, os processos novos, alterados ou removidos."""
+    changed: Set[int] = set()
+    for obj in session.new:
+        if isinstance(obj, Process):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Process) and _search_changed(obj):
+            changed.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Process) and obj.id is not None:
+            changed.add(obj.id)
+    if not changed:
+        return
+    connection = session.connection()
+    if index_exists(connection):
+        write_index(connection, sorted(changed))
+
+_hooks_installed = False
+
+def install_search_hooks():
+    """Registrar o hook em todas as sessões (síncronas e assíncronas)."""
+    global _hooks_installed
+    if _hooks_installed or not settings.FULL_TEXT_SEARCH_ENABLED:
+        return
+    event.listen(Session, "after_flush", _after_flush)
+    _hooks_installed = True
+
+# ===========================================
+# CONSULTA
+# ===========================================
+
+def _prefix_term(term: str) -> str:
+    """
+    Radical aproximado de um termo (sem acentos), para busca por prefixo: tira
+    sufixos flexionais comuns, já que o FTS5 não tem stemmer português
+    ("indenização" -> "indeniza", que acha "indenizações" e "indenizar").
+    """
+    term = fold_text(term)
+    for suffix in PREFIX_SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 4:
+            return term[:-len(suffix)]
+    return term
+
+def fts5_query(query: str) -> Optional[str]:
+    """Termos da busca como prefixos entre aspas, todos obrigatórios (sintaxe FTS5 segura)."""
+    terms = re.findall(r"\w+", query.lower())
+    return " ".join(f'"{_prefix_term(term)}"*' for term in terms) or None
+
+def ilike_filter(query: str):
+    """Busca anterior (sem índice), usada enquanto o banco não tem o índice textual completo."""
+    return or_(
+        Process.title.ilike(f"%{query}%"),
+        Process.client_name.ilike(f"%{query}%"),
+        Process.process_number.ilike(f"%{query}%"),
+    )
+
+def _highlight(value: Optional[str]) -> Optional[str]:
+    """Trecho destacado com escape HTML e <mark> nos termos encontrados."""
+    if value is None:
+        return None
+    return html.escape(value).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+class ProcessSearchService:
+    """Busca textual ranqueada de processos."""
+
+    @staticmethod
+    def match_filter(db: Session, query: str):
+        """Condição WHERE de processos que casam com a busca (para listagens)."""
+        connection = db.connection()
+        if is_number_query(query):
+            # Número do processo (com ou sem pontuação) fica fora do índice textual
+            return number_filter(query, connection)
+        if not search_ready(connection):
+            return ilike_filter(query)
+        if connection.dialect.name == "postgresql":
+            return literal_column("processes.search_vector").op("@@")(
+                func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            )
+        fts_query = fts5_query(query)
+        if fts_query is None:
+            return Process.id.is_(None)
+        matches = select(literal_column("rowid")).select_from(text(FTS_TABLE)).where(
+            text(f"{FTS_TABLE} MATCH :fts_query").bindparams(fts_query=fts_query)
+        )
+        return Process.id.in_(matches)
+
+    @staticmethod
+    def _ranked(db: Session, query: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+        """(id, relevância, destaques) dos melhores resultados, do mais relevante ao menos."""
+        connection = db.connection()
+        if connection.dialect.name == "postgresql":
+            headline = f"'StartSel={_MARK_START}, StopSel={_MARK_END}, HighlightAll=true'"
+            fragments = f"'StartSel={_MARK_START}, StopSel={_MARK_END}, MaxFragments=2, MaxWords=18, MinWords=6'"
+            rows = connection.execute(text(f"""
+                WITH search_query AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :query) AS tsquery),
+                ranked AS (
+                    SELECT p.id, ts_rank_cd(p.search_vector, search_query.tsquery) AS rank
+                    FROM processes p, search_query
+                    WHERE p.search_vector @@ search_query.tsquery
+                    ORDER BY rank DESC, p.id
+                    LIMIT :limit OFFSET :offset
+                )
+                SELECT ranked.id, ranked.rank,
+                       ts_headline('{SEARCH_CONFIG}', p.title, search_query.tsquery, {headline}),
+                       ts_headline('{SEARCH_CONFIG}', p.client_name, search_query.tsquery, {headline}),
+                       ts_headline('{SEARCH_CONFIG}', coalesce(p.description, ''), search_query.tsquery, {fragments})
+                FROM ranked JOIN processes p ON p.id = ranked.id, search_query
+                ORDER BY ranked.rank DESC, ranked.id
+            """), {"query": query, "limit": limit, "offset": offset}).all()
+        else:
+            fts_query = fts5_query(query)
+            if fts_query is None:
+                return []
+            weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+            marks = f"'{_MARK_START}', '{_MARK_END}'"
+            description_column = SEARCH_COLUMNS.index("description")
+            rows = connection.execute(text(f"""
+                SELECT {FTS_TABLE}.rowid, -bm25({FTS_TABLE}, {weights}) AS rank,
+                       highlight({FTS_TABLE}, {SEARCH_COLUMNS.index("title")}, {marks}),
+                       highlight({FTS_TABLE}, {SEARCH_COLUMNS.index("client_name")}, {marks}),
+                       snippet({FTS_TABLE}, {description_column}, {marks}, '…', 18)
+                FROM {FTS_TABLE} JOIN processes p ON p.id = {FTS_TABLE}.rowid
+                WHERE {FTS_TABLE} MATCH :fts_query
+                ORDER BY bm25({FTS_TABLE}, {weights}), {FTS_TABLE}.rowid
+                LIMIT :limit OFFSET :offset
+            """), {"fts_query": fts_query, "limit": limit, "offset": offset}).all()
+
+        return [
+            {
+                "id": row[0],
+                "rank": round(float(row[1]), 6),
+                "highlights": {
+                    "title": _highlight(row[2]),
+                    "client_name": _highlight(row[3]),
+                    "description": _highlight(row[4]) or None,
+                },
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def search(db: Session, query: str, limit: int = 20, offset: int = 0,
+               include_total: bool = False) -> Dict[str, Any]:
+        """
+        Processos que casam com `query`, por relevância, com os trechos destacados.
+
+        Números de processo e bancos sem o índice textual completo usam ILIKE
+        (ordem por id, sem destaques).
+        """
+        query = query.strip()
+        if is_number_query(query) or not search_ready(db.connection()):
+            processes = db.execute(
+                select(Process).where(ProcessSearchService.match_filter(db, query))
+                .order_by(Process.id).offset(offset).limit(limit)
+            ).scalars().all()
+            ranked = [{"id": process.id, "rank": None, "highlights": {}} for process in processes]
+        else:
+            ranked = ProcessSearchService._ranked(db, query, limit, offset)
+            by_id = {
+                process.id: process
+                for process in db.execute(
+                    select(Process).where(Process.id.in_([item["id"] for item in ranked]))
+                ).scalars()
+            }
+            processes = [by_id[item["id"]] for item in ranked if item["id"] in by_id]
+            ranked = [item for item in ranked if item["id"] in by_id]
+
+        total = None
+        if include_total:
+            total = db.execute(
+                select(func.count()).select_from(Process).where(ProcessSearchService.match_filter(db, query))
+            ).scalar()
+
+        return {
+            "query": query,
+            "results": [
+                {
+                    "id": process.id,
+                    "title": process.title,
+                    "process_number": process.process_number,
+                    "client_name": process.client_name,
+                    "client_id": process.client_id,
+                    "category": process.category,
+                    "status": process.status.value if process.status else None,
+                    "rank": item["rank"],
+                    "highlights": item["highlights"],
+                }
+                for process, item in zip(processes, ranked)
+            ],
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+        }
+
+    @staticmethod
+    def backfill(db: Session, rebuild: bool = False) -> int:
+        """Indexar processos ainda fora do índice (todos, com `rebuild`), em lotes."""
+        connection = db.connection()
+        if not index_exists(connection):
+            return 0
+        if connection.dialect.name == "postgresql":
+            pending = "search_vector IS NULL" if not rebuild else "TRUE"
+            indexed = 0
+            last_id = 0
+            while True:
+                ids = connection.execute(text(
+                    f"SELECT id FROM processes WHERE {pending} AND id > :last_id ORDER BY id LIMIT :batch"
+                ), {"last_id": last_id, "batch": BACKFILL_BATCH_SIZE}).scalars().all()
+                if not ids:
+                    return indexed
+                write_index(connection, list(ids))
+                indexed += len(ids)
+                last_id = ids[-1]
+
+        if rebuild:
+            connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        columns = ", ".join(SEARCH_COLUMNS)
+        values = ", ".join(f"coalesce({column}, '')" for column in SEARCH_COLUMNS)
+        result = connection.execute(text(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) SELECT id, {values} FROM processes "
+            f"WHERE id NOT IN (SELECT rowid FROM {FTS_TABLE})"
+        ))
+        return result.rowcount
+
+def backfill_search_index(rebuild: bool = False) -> int:
+    """Criar a estrutura (se faltar) e indexar os processos em uma sessão própria."""
+    if not ensure_search_schema():
+        return 0
+    with SessionLocal() as db:
+        indexed = ProcessSearchService.backfill(db, rebuild)
+        db.commit()
+    if indexed:
+        logger.info(f"🔎 Busca textual: {indexed} processos indexados")
+    return indexed
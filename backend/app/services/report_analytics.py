@@ -0,0 +1,145 @@
+# ===========================================
+# SERVIÇO DE ANÁLISES DOS RELATÓRIOS
+# ===========================================
+#
+# As análises de processos e tarefas carregavam todos os registros do período
+# (query.all()) só para contar, e os agrupamentos por mês/cliente/prioridade
+# ignoravam o período. Aqui tudo é agregado no banco com os filtros de data em
+# todas as consultas; nenhuma linha chega ao Python além dos grupos.
+#
+# Saídas linha a linha (iter_process_rows/iter_task_rows) usam yield_per: o
+# banco entrega lotes de REPORTS_STREAM_BATCH_SIZE linhas (cursor no servidor
+# no Postgres) e a memória não cresce com o tamanho do período.
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import count_where, month_bucket, seconds_between, sum_where
+from app.models.client import Client
+from app.models.process import Process
+from app.models.task import Task, TaskStatus
+
+def date_filters(column, start: Optional[datetime], end: Optional[datetime]) -> List:
+    """Filtros do período (limites inclusivos, como nos endpoints)."""
+    filters = []
+    if start is not None:
+        filters.append(column >= start)
+    if end is not None:
+        filters.append(column <= end)
+    return filters
+
+def _enum_value(value):
+    return getattr(value, "value", value)
+
+class ReportAnalyticsService:
+    """Análises de processos e tarefas calculadas no banco."""
+
+    @staticmethod
+    def process_analytics(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, Any]:
+        """Total, processos por mês e por cliente no período (3 consultas)."""
+        filters = date_filters(Process.created_at, start, end)
+        dialect_name = db.get_bind().dialect.name
+
+        total = db.execute(select(func.count()).select_from(Process).where(*filters)).scalar_one()
+
+        month = month_bucket(Process.created_at, dialect_name)
+        monthly = db.execute(
+            select(month, func.count()).where(*filters).group_by(month).order_by(month)
+        ).all()
+
+        # Por cliente: agrupado pela FK indexada, com o nome da dimensão
+        count = func.count().label("count")
+        by_client = db.execute(
+            select(Client.name, count)
+            .select_from(Process)
+            .join(Client, Client.id == Process.client_id)
+            .where(*filters)
+            .group_by(Process.client_id, Client.name)
+            .order_by(count.desc(), Client.name)
+        ).all()
+
+        return {
+            "total": total,
+            "monthly": [
+                {"year": int(bucket[:4]), "month": int(bucket[5:7]), "count": value}
+                for bucket, value in monthly if bucket
+            ],
+            "by_client": [{"client": client, "count": value} for client, value in by_client],
+        }
+
+    @staticmethod
+    def task_analytics(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, Any]:
+        """Total, tarefas por prioridade/categoria e tempo médio de conclusão no período (3 consultas)."""
+        filters = date_filters(Task.created_at, start, end)
+        dialect_name = db.get_bind().dialect.name
+
+        completed = (Task.status == TaskStatus.COMPLETED) & Task.completed_at.isnot(None)
+        total, completed_count, total_seconds = db.execute(
+            select(
+                func.count(),
+                count_where(completed, dialect_name),
+                sum_where(seconds_between(Task.created_at, Task.completed_at, dialect_name), completed, dialect_name),
+            ).select_from(Task).where(*filters)
+        ).one()
+
+        by_priority = db.execute(
+            select(Task.priority, func.count()).where(*filters).group_by(Task.priority).order_by(Task.priority)
+        ).all()
+        by_category = db.execute(
+            select(Task.category, func.count()).where(*filters).group_by(Task.category).order_by(Task.category)
+        ).all()
+
+        return {
+            "total": total,
+            "by_priority": [{"priority": _enum_value(priority), "count": value} for priority, value in by_priority],
+            "by_category": [{"category": category, "count": value} for category, value in by_category],
+            "avg_completion_time_seconds": float(total_seconds or 0) / completed_count if completed_count else 0,
+        }
+
+    # ===========================================
+    # SAÍDAS LINHA A LINHA
+    # ===========================================
+
+    @staticmethod
+    def iter_rows(db: Session, statement, batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Percorrer o resultado em lotes (yield_per) como dicionários."""
+        batch_size = batch_size or settings.REPORTS_STREAM_BATCH_SIZE
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        for row in result.mappings():
+            yield {key: _enum_value(value) for key, value in row.items()}
+
+    @staticmethod
+    def iter_process_rows(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                          batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Processos do período, sem carregar objetos ORM."""
+        statement = select(
+            Process.id,
+            Process.process_number,
+            Process.title,
+            Process.client_id,
+            Process.client_name,
+            Process.status,
+            Process.actual_value,
+            Process.created_at,
+        ).where(*date_filters(Process.created_at, start, end)).order_by(Process.id)
+        return ReportAnalyticsService.iter_rows(db, statement, batch_size)
+
+    @staticmethod
+    def iter_task_rows(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Tarefas do período, sem carregar objetos ORM."""
+        statement = select(
+            Task.id,
+            Task.title,
+            Task.status,
+            Task.priority,
+            Task.category,
+            Task.assigned_user_id,
+            Task.created_at,
+            Task.completed_at,
+        ).where(*date_filters(Task.created_at, start, end)).order_by(Task.id)
+        return ReportAnalyticsService.iter_rows(db, statement, batch_size)
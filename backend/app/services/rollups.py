@@ -0,0 +1,335 @@
+# ===========================================
+# AGREGADOS MENSAIS (ROLLUPS)
+# ===========================================
+#
+# Os gráficos de produtividade e de crescimento agrupavam por mês o histórico
+# inteiro de tarefas e usuários a cada requisição. Aqui os totais mensais ficam
+# na tabela monthly_rollups e são mantidos por hooks de flush, como os
+# contadores do dashboard: cada flush que cria, altera ou remove Task, Process
+# ou User aplica os deltas (métrica, mês) na mesma transação. Os gráficos leem
+# uma faixa de meses com um SELECT pelo índice.
+#
+# Métricas:
+#   tasks.completed     tarefas concluídas, pelo mês de completed_at
+#   processes.created   processos, pelo mês de created_at
+#   users.created       usuários, pelo mês de created_at
+#   revenue             saldo mensal dos lançamentos REVENUE do livro-razão
+#   revenue.cases       variação mensal de processos com valor (livro-razão)
+#   payments.received   saldo mensal dos lançamentos PAYMENT do livro-razão
+#
+# As métricas do livro-razão são somadas por app.services.ledger ao gravar os
+# lançamentos; as demais, pelos hooks deste módulo. created_at é preenchido
+# pelo banco; nos hooks ele vale o instante do flush (UTC). Diferenças de fuso
+# perto da virada do mês e escritas fora do ORM são corrigidas pela
+# reconciliação periódica (ROLLUPS_RECONCILE_SECONDS).
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, begin_reconcile, month_bucket, upsert_increments
+from app.models.ledger import LedgerEntry, LedgerEntryType
+from app.models.process import Process
+from app.models.rollup import MonthlyRollup
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.services.counters import old_column_values
+
+logger = logging.getLogger(__name__)
+
+# Linha que marca a tabela como reconciliada ao menos uma vez
+RECONCILED_MARKER = ("_meta.reconciled", "0000-00")
+
+# Colunas preenchidas pelo banco (func.now()) no insert
+SERVER_TIME_COLUMNS = ("created_at",)
+
+_SESSION_INFO_KEY = "monthly_rollup_changes"
+
+def month_key(value) -> Optional[str]:
+    """Mês 'AAAA-MM' de uma data (datas com fuso são convertidas para UTC)."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m")
+
+# ===========================================
+# DEFINIÇÃO DAS MÉTRICAS
+# ===========================================
+#
+# Cada métrica tem a consulta de reconciliação e a contribuição em Python de um
+# registro (hooks), que precisam concordar.
+
+def task_rollups(values: Dict[str, Any]) -> List[Tuple[str, str, Any]]:
+    """(métrica, mês, valor) em que uma tarefa com estes valores entra."""
+    month = month_key(values["completed_at"])
+    if values["status"] == TaskStatus.COMPLETED and month:
+        return [("tasks.completed", month, 1)]
+    return []
+
+def process_rollups(values: Dict[str, Any]) -> List[Tuple[str, str, Any]]:
+    """(métrica, mês, valor) em que um processo com estes valores entra."""
+    return [("processes.created", month_key(values["created_at"]), 1)]
+
+def user_rollups(values: Dict[str, Any]) -> List[Tuple[str, str, Any]]:
+    """(métrica, mês, valor) em que um usuário com estes valores entra."""
+    return [("users.created", month_key(values["created_at"]), 1)]
+
+# Modelo -> (colunas lidas, colunas que disparam o hook, função das métricas)
+TRACKED_MODELS = {
+    Task: (("status", "completed_at"), ("status", "completed_at"), task_rollups),
+    Process: (("created_at",), ("created_at",), process_rollups),
+    User: (("created_at",), ("created_at",), user_rollups),
+}
+
+def rollup_queries():
+    """Métrica -> (coluna do mês, agregado, filtros) para a reconciliação."""
+    return {
+        "tasks.completed": (
+            Task.completed_at, func.count(),
+            (Task.status == TaskStatus.COMPLETED, Task.completed_at.isnot(None)),
+        ),
+        "processes.created": (Process.created_at, func.count(), ()),
+        "users.created": (User.created_at, func.count(), ()),
+        "revenue": (
+            LedgerEntry.entry_date, func.sum(LedgerEntry.amount),
+            (LedgerEntry.entry_type == LedgerEntryType.REVENUE,),
+        ),
+        "revenue.cases": (
+            LedgerEntry.entry_date, func.sum(LedgerEntry.cases),
+            (LedgerEntry.entry_type == LedgerEntryType.REVENUE,),
+        ),
+        "payments.received": (
+            LedgerEntry.entry_date, func.sum(LedgerEntry.amount),
+            (LedgerEntry.entry_type == LedgerEntryType.PAYMENT,),
+        ),
+    }
+
+# ===========================================
+# HOOKS DE FLUSH
+# ===========================================
+
+def _tracked_changed(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[column].history.has_changes() for column in TRACKED_MODELS[type(obj)][1])
+
+def _current_values(obj, old: Optional[Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+    """
+    Valores após o flush sem recarregar o registro.
+
+    Colunas fora do objeto não mudaram (update) ou são datas geradas agora pelo
+    banco (insert).
+    """
+    state = inspect(obj)
+    values = {}
+    for column in TRACKED_MODELS[type(obj)][0]:
+        if column in state.dict:
+            values[column] = state.dict[column]
+        elif old is not None:
+            values[column] = old[column]
+        elif column in SERVER_TIME_COLUMNS:
+            values[column] = now
+        else:
+            values[column] = None
+    return values
+
+def _before_flush(session: Session, flush_context, instances):
+    """Guardar os valores antigos dos registros que vão mudar."""
+    changes = session.info[_SESSION_INFO_KEY] = []
+    for obj in session.new:
+        if type(obj) in TRACKED_MODELS:
+            changes.append((obj, None, False))
+    for obj in session.dirty:
+        if type(obj) in TRACKED_MODELS and _tracked_changed(obj):
+            old = old_column_values(session, obj, TRACKED_MODELS[type(obj)][0])
+            changes.append((obj, old, False))
+    for obj in session.deleted:
+        if type(obj) in TRACKED_MODELS and inspect(obj).has_identity:
+            old = old_column_values(session, obj, TRACKED_MODELS[type(obj)][0])
+            changes.append((obj, old, True))
+
+def _after_flush(session: Session, flush_context):
+    """Aplicar os deltas mensais na transação do flush."""
+    changes = session.info.pop(_SESSION_INFO_KEY, None)
+    if not changes:
+        return
+
+    now = datetime.now(timezone.utc)
+    deltas: Counter = Counter()
+    for obj, old, deleted in changes:
+        rollups_for = TRACKED_MODELS[type(obj)][2]
+        if old is not None:
+            for metric, month, value in rollups_for(old):
+                deltas[(metric, month)] -= value
+        if not deleted:
+            for metric, month, value in rollups_for(_current_values(obj, old, now)):
+                deltas[(metric, month)] += value
+
+    rows = [
+        {"metric": metric, "month": month, "value": delta}
+        for (metric, month), delta in deltas.items()
+        if delta and month
+    ]
+    if rows:
+        table = MonthlyRollup.__table__
+        upsert_increments(session.connection(), table, (table.c.metric, table.c.month), rows)
+
+def _after_rollback(session: Session):
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+_hooks_installed = False
+
+def install_rollup_hooks():
+    """Registrar os hooks em todas as sessões (síncronas e assíncronas)."""
+    global _hooks_installed
+    if _hooks_installed or not settings.ROLLUPS_ENABLED:
+        return
+    event.listen(Session, "before_flush", _before_flush)
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _hooks_installed = True
+
+# ===========================================
+# SERVIÇO
+# ===========================================
+
+def _number(value):
+    """Contagens como int, somas como float (resposta JSON dos gráficos)."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+class RollupService:
+    """Leitura e reconciliação dos agregados mensais."""
+
+    @staticmethod
+    def compute(db: Session, metrics: Optional[List[str]] = None, since: Optional[str] = None) -> Dict[Tuple[str, str], Any]:
+        """Calcular os agregados a partir das tabelas (um GROUP BY por métrica)."""
+        dialect_name = db.get_bind().dialect.name
+        result = {}
+        for metric, (column, aggregate, filters) in rollup_queries().items():
+            if metrics is not None and metric not in metrics:
+                continue
+            month = month_bucket(column, dialect_name)
+            query = select(month, aggregate).where(*filters).group_by(month)
+            if since is not None:
+                query = query.where(month >= since)
+            for bucket, value in db.execute(query):
+                if bucket and value:
+                    result[(metric, bucket)] = value
+        return result
+
+    @staticmethod
+    def reconcile(db: Session) -> int:
+        """
+        Recalcular os agregados e corrigir os divergentes (chamar db.commit() depois).
+
+        Como nos contadores, cada (métrica, mês) recebe a diferença pelo upsert
+        dos hooks, com as leituras em um só snapshot e um worker por vez.
+        Retorna quantos (métrica, mês) estavam divergentes.
+        """
+        if not begin_reconcile(db, MonthlyRollup.__table__):
+            logger.info("📅 Agregados mensais já em reconciliação em outro worker")
+            return 0
+        expected = RollupService.compute(db)
+        expected[RECONCILED_MARKER] = 1
+        current = {
+            (metric, month): value
+            for metric, month, value in db.execute(
+                select(MonthlyRollup.metric, MonthlyRollup.month, MonthlyRollup.value)
+            )
+        }
+        rows = []
+        for key in set(expected) | set(current):
+            difference = Decimal(str(expected.get(key, 0))) - Decimal(str(current.get(key, 0)))
+            if difference:
+                metric, month = key
+                rows.append({"metric": metric, "month": month, "value": _number(difference)})
+        if rows:
+            table = MonthlyRollup.__table__
+            upsert_increments(db.connection(), table, (table.c.metric, table.c.month), rows)
+        db.execute(delete(MonthlyRollup).where(MonthlyRollup.value == 0))
+        return len(rows)
+
+    @staticmethod
+    def get_series(db: Session, metric: str, since: datetime) -> List[Tuple[str, Any]]:
+        """
+        Série mensal (mês, valor) de uma métrica a partir do mês de `since`.
+
+        Meses sem valor não aparecem. Antes da primeira reconciliação os valores
+        são calculados na hora, sem gravar (a sessão pode ser da réplica).
+        """
+        since_month = month_key(since)
+        marker_metric, marker_month = RECONCILED_MARKER
+        rows = db.execute(
+            select(MonthlyRollup.metric, MonthlyRollup.month, MonthlyRollup.value).where(
+                or_(
+                    (MonthlyRollup.metric == metric) & (MonthlyRollup.month >= since_month),
+                    (MonthlyRollup.metric == marker_metric) & (MonthlyRollup.month == marker_month),
+                )
+            )
+        ).all()
+        if any(row.metric == marker_metric for row in rows):
+            values = {row.month: row.value for row in rows if row.metric == metric}
+        else:
+            values = {
+                month: value
+                for (_, month), value in RollupService.compute(db, [metric], since_month).items()
+            }
+        return [(month, _number(values[month])) for month in sorted(values) if values[month]]
+
+    @staticmethod
+    def get_history(db: Session, metrics: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Todos os meses de cada métrica ({métrica: {mês: valor}}) em uma consulta.
+
+        Para métricas com uma linha por mês, como os saldos do livro-razão.
+        Antes da primeira reconciliação os valores são calculados na hora.
+        """
+        marker_metric, marker_month = RECONCILED_MARKER
+        rows = db.execute(
+            select(MonthlyRollup.metric, MonthlyRollup.month, MonthlyRollup.value).where(
+                or_(
+                    MonthlyRollup.metric.in_(metrics),
+                    (MonthlyRollup.metric == marker_metric) & (MonthlyRollup.month == marker_month),
+                )
+            )
+        ).all()
+        if any(row.metric == marker_metric for row in rows):
+            values = {(row.metric, row.month): row.value for row in rows if row.metric != marker_metric}
+        else:
+            values = RollupService.compute(db, metrics)
+        history = {metric: {} for metric in metrics}
+        for (metric, month), value in values.items():
+            if value:
+                history[metric][month] = _number(value)
+        return history
+
+# ===========================================
+# RECONCILIAÇÃO PERIÓDICA
+# ===========================================
+
+def reconcile_rollups() -> int:
+    """Reconciliar os agregados mensais em uma sessão própria."""
+    with SessionLocal() as db:
+        drift = RollupService.reconcile(db)
+        db.commit()
+    if drift:
+        logger.info(f"📅 Agregados mensais reconciliados ({drift} divergentes)")
+    return drift
+
+async def run_rollup_reconciliation():
+    """Loop de reconciliação (iniciado no startup da aplicação)."""
+    while True:
+        try:
+            await asyncio.to_thread(reconcile_rollups)
+        except Exception as e:
+            logger.error(f"❌ Erro ao reconciliar agregados mensais: {e}")
+        await asyncio.sleep(settings.ROLLUPS_RECONCILE_SECONDS)
@@ -4,10 +4,18 @@
 
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
+from app.core.cache import invalidate_cache_tags
+from app.core.pagination import KeysetPage, page_with_total, resolve_sort
+from app.core.redis import DASHBOARD_TAG
 from app.models.task import Task
 from app.schemas.task import TaskCreate, TaskUpdate
 
+# Ordenações da listagem (sempre desempatadas pelo id)
+TASK_SORTS = {"id": Task.id, "updated_at": Task.updated_at}
+
 class TaskService:
     """Serviço para gerenciar tarefas."""
     
@@ -69,14 +77,75 @@ class TaskService:
         return True
 
 
-
-
-
-
-
-
-
-
-
-
-
+class AsyncTaskService:
+    """Serviço assíncrono para gerenciar tarefas (AsyncSession)."""
+    
+    @staticmethod
+    async def create_task(db: AsyncSession, task_data: TaskCreate, created_by_id: int) -> Task:
+        """Criar nova tarefa."""
+        task = Task(
+            **task_data.dict(),
+            created_by_id=created_by_id
+        )
+        
+        db.add(task)
+        await db.commit()
+        await db.refresh(task)
+        await invalidate_cache_tags(DASHBOARD_TAG)
+        
+        return task
+    
+    @staticmethod
+    async def get_task_by_id(db: AsyncSession, task_id: int) -> Optional[Task]:
+        """Obter tarefa por ID."""
+        return await db.get(Task, task_id)
+    
+    @staticmethod
+    async def get_tasks_page(
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        sort: Optional[str] = None,
+        assigned_user_id: Optional[int] = None,
+        include_total: bool = True
+    ) -> KeysetPage:
+        """Página de tarefas por cursor (opcionalmente só as atribuídas a um usuário)."""
+        sort, column, descending = resolve_sort(sort, TASK_SORTS, "id")
+        filters = []
+        if assigned_user_id is not None:
+            filters.append(Task.assigned_user_id == assigned_user_id)
+        return await page_with_total(
+            db, select(Task).where(*filters), Task, filters, sort, column, descending, cursor, limit, skip,
+            include_total=include_total, counter="tasks.total"
+        )
+    
+    @staticmethod
+    async def update_task(db: AsyncSession, task_id: int, task_data: TaskUpdate) -> Optional[Task]:
+        """Atualizar tarefa."""
+        task = await AsyncTaskService.get_task_by_id(db, task_id)
+        if not task:
+            return None
+        
+        update_data = task_data.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(task, field, value)
+        
+        await db.commit()
+        await db.refresh(task)
+        await invalidate_cache_tags(DASHBOARD_TAG)
+        
+        return task
+    
+    @staticmethod
+    async def delete_task(db: AsyncSession, task_id: int) -> bool:
+        """Deletar tarefa."""
+        task = await AsyncTaskService.get_task_by_id(db, task_id)
+        if not task:
+            return False
+        
+        await db.delete(task)
+        await db.commit()
+        await invalidate_cache_tags(DASHBOARD_TAG)
+        
+        return True
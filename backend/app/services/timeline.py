@@ -4,7 +4,10 @@
 
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
+from app.core.pagination import KeysetPage, page_with_total
 from app.models.timeline import TimelineEvent, TimelineEventType
 
 class TimelineService:
@@ -59,14 +62,58 @@ class TimelineService:
         return db.query(TimelineEvent).filter(TimelineEvent.task_id == task_id).order_by(TimelineEvent.created_at.desc()).offset(skip).limit(limit).all()
 
 
-
-
-
-
-
-
-
-
-
-
-
+class AsyncTimelineService:
+    """Serviço assíncrono para gerenciar timeline (AsyncSession)."""
+    
+    @staticmethod
+    async def create_event(
+        db: AsyncSession,
+        event_type: TimelineEventType,
+        title: str,
+        description: Optional[str] = None,
+        user_id: Optional[int] = None,
+        process_id: Optional[int] = None,
+        task_id: Optional[int] = None,
+        event_data: Optional[Dict[str, Any]] = None
+    ) -> TimelineEvent:
+        """Criar novo evento na timeline."""
+        event = TimelineEvent(
+            event_type=event_type,
+            title=title,
+            description=description,
+            user_id=user_id,
+            process_id=process_id,
+            task_id=task_id,
+            event_data=event_data
+        )
+        
+        db.add(event)
+        await db.commit()
+        await db.refresh(event)
+        
+        return event
+    
+    @staticmethod
+    async def get_events_page(
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        user_id: Optional[int] = None,
+        process_id: Optional[int] = None,
+        task_id: Optional[int] = None,
+        include_total: bool = True
+    ) -> KeysetPage:
+        """Página de eventos, dos mais recentes aos mais antigos, com filtros opcionais."""
+        filters = []
+        if user_id is not None:
+            filters.append(TimelineEvent.user_id == user_id)
+        if process_id is not None:
+            filters.append(TimelineEvent.process_id == process_id)
+        if task_id is not None:
+            filters.append(TimelineEvent.task_id == task_id)
+        return await page_with_total(
+            db, select(TimelineEvent).where(*filters), TimelineEvent, filters,
+            "-created_at", TimelineEvent.created_at, True, cursor, limit, skip,
+            include_total=include_total
+        )
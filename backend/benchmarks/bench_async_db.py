@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# ===========================================
+# BENCHMARK: SESSÃO SÍNCRONA x ASSÍNCRONA
+# ===========================================
+#
+# Compara a vazão de requisições concorrentes em endpoints `async def`
+# usando a Session síncrona (comportamento antigo) e a AsyncSession
+# (get_async_db). Também mede o atraso máximo do event loop, que é o que
+# trava pings de WebSocket e chamadas ao DataJud no mesmo worker.
+#
+# Uso:
+#   python benchmarks/bench_async_db.py --requests 200 --concurrency 20
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.base import Base
+import app.models  # noqa: F401 - registra todas as tabelas
+from app.models.process import Process, ProcessStatus
+from app.models.user import User, UserRole
+
+# Consulta propositalmente pesada (auto-join) para simular um agregado do dashboard
+HEAVY_QUERY = (
+    "SELECT COUNT(*) FROM processes p1 JOIN processes p2 "
+    "ON p1.client_name = p2.client_name"
+)
+
+
+def seed_database(url: str, rows: int):
+    """Criar tabelas e popular processos de exemplo."""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        user = User(
+            email="bench@bench.com",
+            username="bench",
+            full_name="Benchmark",
+            hashed_password="x",
+            role=UserRole.ADMIN,
+        )
+        db.add(user)
+        db.flush()
+        db.add_all([
+            Process(
+                title=f"Processo {i}",
+                client_name=f"Cliente {i % 50}",
+                status=ProcessStatus.ACTIVE,
+                user_id=user.id,
+            )
+            for i in range(rows)
+        ])
+        db.commit()
+    engine.dispose()
+
+
+def build_app(sync_url: str, async_url: str) -> FastAPI:
+    """App mínima com a mesma rota nas duas variantes."""
+    sync_engine = create_engine(sync_url, connect_args={"check_same_thread": False})
+    SyncSession = sessionmaker(bind=sync_engine)
+    async_engine = create_async_engine(async_url)
+    AsyncSessionFactory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionFactory() as db:
+            yield db
+
+    bench_app = FastAPI()
+
+    @bench_app.get("/sync")
+    async def sync_route(db: Session = Depends(get_sync_db)):
+        heavy = db.execute(text(HEAVY_QUERY)).scalar()
+        total = db.query(func.count(Process.id)).scalar()
+        return {"heavy": heavy, "total": total}
+
+    @bench_app.get("/async")
+    async def async_route(db: AsyncSession = Depends(get_async_db)):
+        heavy = (await db.execute(text(HEAVY_QUERY))).scalar()
+        total = (await db.execute(select(func.count(Process.id)))).scalar()
+        return {"heavy": heavy, "total": total}
+
+    return bench_app
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list):
+    """Medir o atraso do event loop (equivalente a um ping de WebSocket)."""
+    interval = 0.005
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def run_scenario(bench_app: FastAPI, path: str, total: int, concurrency: int) -> dict:
+    """Disparar requisições concorrentes e coletar métricas."""
+    transport = httpx.ASGITransport(app=bench_app)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    lag_samples = []
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one_request():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        lag_task = asyncio.create_task(measure_loop_lag(stop, lag_samples))
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await lag_task
+
+    latencies.sort()
+    return {
+        "throughput": total / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max_loop_lag": max(lag_samples) * 1000 if lag_samples else 0.0,
+        "mean_loop_lag": statistics.mean(lag_samples) * 1000 if lag_samples else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Session x AsyncSession")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--database-url", default=None,
+                        help="URL síncrona (ex.: postgresql://...). Padrão: SQLite temporário")
+    args = parser.parse_args()
+
+    if args.database_url:
+        sync_url = args.database_url
+        async_url = sync_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench_async.db")
+        sync_url = f"sqlite:///{path}"
+        async_url = f"sqlite+aiosqlite:///{path}"
+        seed_database(sync_url, args.rows)
+
+    bench_app = build_app(sync_url, async_url)
+
+    print("⏱️  Benchmark de sessões do banco")
+    print("=" * 60)
+    print(f"Requisições: {args.requests} | Concorrência: {args.concurrency}")
+    print("-" * 60)
+
+    for label, route in (("Session síncrona (antes)", "/sync"), ("AsyncSession (depois)", "/async")):
+        result = asyncio.run(run_scenario(bench_app, route, args.requests, args.concurrency))
+        print(f"{label}")
+        print(f"   Vazão:              {result['throughput']:.1f} req/s")
+        print(f"   Latência p50/p99:   {result['p50']:.1f} / {result['p99']:.1f} ms")
+        print(f"   Atraso do loop:     médio {result['mean_loop_lag']:.1f} ms, máximo {result['max_loop_lag']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
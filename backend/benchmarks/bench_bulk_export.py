@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# ===========================================
+# BENCHMARK: EXPORTAÇÃO COLUNAR EM LOTES
+# ===========================================
+#
+# Exporta a tabela de tarefas com iter_export (cursor no servidor + record
+# batches de tamanho fixo) e compara com a montagem do arquivo inteiro em
+# memória (.all() + uma tabela Arrow). O pico de memória (tracemalloc para
+# objetos Python, pool do pyarrow para buffers Arrow) da exportação em lotes
+# deve ficar estável quando o número de linhas cresce.
+#
+# Uso:
+#   python benchmarks/bench_bulk_export.py --tasks 100000 500000
+#   python benchmarks/bench_bulk_export.py --tasks 1000000 --format csv --legacy-max 0
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+
+from app.services.bulk_export import PYARROW_AVAILABLE, arrow_schema, iter_batches, iter_export
+from benchmarks.bench_report_analytics import seed_database
+
+
+def legacy_export(connection):
+    """Arquivo inteiro em memória: todas as linhas e uma única tabela Arrow."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = [batch for batch in iter_batches(connection, "tasks", batch_size=10 ** 9)][0]
+    schema = arrow_schema("tasks")
+    table = pa.Table.from_arrays([pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)],
+                                 schema=schema)
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression="zstd")
+    return len(buffer.getvalue())
+
+
+def streamed_export(connection, fmt, batch_size):
+    """Exportação em lotes; os bytes são descartados como se fossem enviados."""
+    return sum(len(chunk) for chunk in iter_export(connection, "tasks", fmt, batch_size))
+
+
+def measure(label: str, func):
+    """Executar func medindo tempo e picos de memória (Python e pyarrow)."""
+    arrow_pool = None
+    if PYARROW_AVAILABLE:
+        import pyarrow as pa
+        arrow_pool = pa.default_memory_pool()
+        arrow_start = arrow_pool.max_memory()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow_peak = (arrow_pool.max_memory() - arrow_start) if arrow_pool is not None else 0
+    print(f"   {label:<30} {elapsed * 1000:10.1f} ms | pico Python {peak / 1024 / 1024:8.2f} MiB"
+          f" | pico Arrow {max(arrow_peak, 0) / 1024 / 1024:8.2f} MiB | {result / 1024 / 1024:7.2f} MiB gerados")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da exportação colunar")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[100000, 500000])
+    parser.add_argument("--format", default="parquet", choices=["parquet", "arrow", "csv"])
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--legacy-max", type=int, default=500000,
+                        help="Rodar a montagem em memória só até este número de linhas")
+    args = parser.parse_args()
+
+    if args.format != "csv" and not PYARROW_AVAILABLE:
+        print("⚠️ pyarrow não instalado: use --format csv")
+        return
+
+    print(f"📦 Benchmark da exportação colunar ({args.format}, lotes de {args.batch_size:,})")
+    print("=" * 100)
+    for tasks in args.tasks:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            seed_start = time.perf_counter()
+            seed_database(url, tasks)
+            print(f"{tasks:,} tarefas (carga em {time.perf_counter() - seed_start:.1f}s)")
+
+            engine = create_engine(url)
+            with engine.connect() as connection:
+                # Em lotes primeiro: o pico do pool do pyarrow é cumulativo no processo
+                measure("lotes: iter_export", lambda: streamed_export(connection, args.format, args.batch_size))
+                if PYARROW_AVAILABLE and tasks <= args.legacy_max:
+                    measure("antes: .all() + write_table", lambda: legacy_export(connection))
+                else:
+                    print(f"   {'antes: .all() + write_table':<30} (pulado)")
+            engine.dispose()
+        print("-" * 100)
+
+
+if __name__ == "__main__":
+    main()
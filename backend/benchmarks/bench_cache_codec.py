@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# ===========================================
+# BENCHMARK: CODECS DO CACHE (DATAJUD)
+# ===========================================
+#
+# Mede o tamanho gravado no Redis e o tempo de encode/decode de respostas do
+# DataJud processadas por DataJudService (com dados_originais e a lista de
+# movimentos) em cada codec disponível: JSON puro como antes, json/orjson/
+# msgpack com cabeçalho e, acima do limite, zstd.
+#
+# Sem --file, gera hits no formato da API pública do DataJud (_source com
+# classe, orgaoJulgador, assuntos e movimentos com complementosTabelados).
+# Com --file, usa uma resposta real salva (resposta do _search ou um _source).
+#
+# Uso:
+#   python benchmarks/bench_cache_codec.py --movimentos 20 200 1000
+#   python benchmarks/bench_cache_codec.py --file resposta_datajud.json
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.codec import SERIALIZERS, ZSTD_AVAILABLE, CacheCodec, json_default
+from app.services.datajud import DataJudService
+
+MOVIMENTOS = [
+    (26, "Distribuição"),
+    (51, "Conclusão"),
+    (85, "Petição"),
+    (11010, "Mero expediente"),
+    (60, "Expedição de documento"),
+    (123, "Remessa"),
+    (132, "Recebimento"),
+    (581, "Documento"),
+    (970, "Audiência"),
+    (12164, "Outras Decisões"),
+]
+
+ASSUNTOS = [
+    (7780, "Indenização por Dano Moral"),
+    (10433, "Indenização por Dano Material"),
+    (11806, "Rescisão do contrato e devolução do dinheiro"),
+    (7771, "Obrigação de Fazer / Não Fazer"),
+]
+
+
+def datajud_hit(index: int, movimentos: int) -> dict:
+    """Um _source no formato da API pública do DataJud."""
+    rnd = random.Random(index)
+    start = datetime(2021, 1, 1) + timedelta(days=rnd.randint(0, 900))
+    numero = f"{rnd.randint(0, 9999999):07d}{rnd.randint(0, 99):02d}{start.year}8260{rnd.randint(1, 999):03d}"
+    return {
+        "numeroProcesso": numero,
+        "classe": {"codigo": 7, "nome": "Procedimento Comum Cível"},
+        "sistema": {"codigo": 1, "nome": "SAJ"},
+        "formato": {"codigo": 1, "nome": "Eletrônico"},
+        "tribunal": "TJSP",
+        "dataHoraUltimaAtualizacao": (start + timedelta(days=400)).isoformat() + ".000Z",
+        "grau": "G1",
+        "@timestamp": datetime(2024, 6, 1).isoformat() + ".000Z",
+        "dataAjuizamento": start.strftime("%Y%m%d%H%M%S"),
+        "id": f"TJSP_G1_{numero}",
+        "nivelSigilo": 0,
+        "orgaoJulgador": {
+            "codigoMunicipioIBGE": 3550308,
+            "codigo": rnd.randint(1000, 9999),
+            "nome": f"{rnd.randint(1, 45)}ª VARA CÍVEL DO FORO CENTRAL",
+        },
+        "assuntos": [
+            {"codigo": codigo, "nome": nome}
+            for codigo, nome in rnd.sample(ASSUNTOS, 2)
+        ],
+        "movimentos": [
+            {
+                "codigo": codigo,
+                "nome": nome,
+                "dataHora": (start + timedelta(hours=12 * i)).isoformat() + ".000Z",
+                "complementosTabelados": [
+                    {
+                        "codigo": 4,
+                        "valor": rnd.randint(1, 90),
+                        "nome": "Despacho",
+                        "descricao": "tipo_de_documento",
+                    }
+                ],
+                "orgaoJulgador": {"codigoOrgao": 1234, "nomeOrgao": "VARA CÍVEL"},
+            }
+            for i, (codigo, nome) in enumerate(rnd.choice(MOVIMENTOS) for _ in range(movimentos))
+        ],
+    }
+
+
+def load_payloads(path: str) -> list:
+    """Hits de uma resposta real salva (hits.hits[]._source ou um _source)."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    hits = data.get("hits", {}).get("hits") if isinstance(data, dict) else None
+    if hits:
+        return [hit["_source"] for hit in hits]
+    return data if isinstance(data, list) else [data]
+
+
+def codecs(threshold: int) -> list:
+    """(rótulo, encode, decode) de cada codec disponível."""
+    legacy = (
+        "json puro (antes)",
+        lambda value: json.dumps(value, default=json_default).encode("utf-8"),
+        json.loads,
+    )
+    result = [legacy]
+    for name in SERIALIZERS:
+        plain = CacheCodec(name, compression_threshold=0)
+        result.append((f"{name}", plain.encode, plain.decode))
+        if ZSTD_AVAILABLE:
+            compressed = CacheCodec(name, compression_threshold=threshold)
+            result.append((f"{name} + zstd", compressed.encode, compressed.decode))
+    return result
+
+
+def measure(encode, decode, value, iterations: int):
+    """Tamanho (bytes) e tempos médios de encode/decode (µs)."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        data = encode(value)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(data)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+    return len(data), encode_us, decode_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos codecs do cache")
+    parser.add_argument("--movimentos", type=int, nargs="+", default=[20, 200, 1000])
+    parser.add_argument("--file", help="Resposta real do DataJud salva em JSON")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--threshold", type=int, default=1024, help="Limite de compressão (bytes)")
+    args = parser.parse_args()
+
+    service = DataJudService()
+    if args.file:
+        cases = [
+            (f"{os.path.basename(args.file)} #{i + 1}", service._processar_dados_processo_real(hit))
+            for i, hit in enumerate(load_payloads(args.file))
+        ]
+    else:
+        cases = [
+            (f"{n} movimentos", service._processar_dados_processo_real(datajud_hit(n, n)))
+            for n in args.movimentos
+        ]
+
+    print("📦 Benchmark dos codecs do cache")
+    print("=" * 72)
+    print(
+        f"Serializadores: {', '.join(SERIALIZERS)} | zstd: {'sim' if ZSTD_AVAILABLE else 'não'} | "
+        f"Iterações: {args.iterations}"
+    )
+    for label, value in cases:
+        print("-" * 72)
+        print(label)
+        baseline = None
+        for name, encode, decode in codecs(args.threshold):
+            size, encode_us, decode_us = measure(encode, decode, value, args.iterations)
+            baseline = baseline or size
+            print(
+                f"   {name:<22} {size:>9,} bytes ({size / baseline:6.1%}) | "
+                f"encode {encode_us:8.1f} µs | decode {decode_us:8.1f} µs"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# ===========================================
+# BENCHMARK: LOGINS CONCORRENTES
+# ===========================================
+#
+# Dispara logins concorrentes contra /api/v1/auth/login (com validação de
+# senha) e mede a latência p50/p99 dos logins e de uma requisição leve
+# (/api/v1/status) feita em paralelo, que mostra quanto o event loop ficou
+# travado. Compara a verificação de senha direto no event loop (antes) com o
+# executor limitado de app/services/auth.py (depois).
+#
+# Mede o modo LOGIN_VERIFY_PASSWORD=true. Com o padrão (false, modo de
+# demonstração) o login não verifica a senha e o executor não é usado.
+#
+# Uso:
+#   python benchmarks/bench_login.py --requests 200 --concurrency 32
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configurar antes de importar a aplicação
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_login.db')}"
+os.environ["LOGIN_VERIFY_PASSWORD"] = "true"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ.setdefault("DEBUG", "false")
+
+import logging
+
+import httpx
+
+from app.core.database import SessionLocal, close_async_engine, ensure_schema
+from app.main import app
+from app.models.user import User, UserRole
+from app.services import auth as auth_service
+
+EMAIL = "bench@bench.com"
+PASSWORD = "bench-password"
+
+
+def seed_user(scheme: str):
+    """Criar o usuário do benchmark com o esquema de hash escolhido."""
+    ensure_schema(force=True)
+    with SessionLocal() as db:
+        db.add(User(
+            email=EMAIL,
+            username="bench",
+            full_name="Benchmark",
+            hashed_password=auth_service.pwd_context.hash(PASSWORD, scheme=scheme),
+            role=UserRole.LAWYER,
+        ))
+        db.commit()
+
+
+def percentile(values, pct: float) -> float:
+    """Percentil simples (nearest-rank) em milissegundos."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index] * 1000
+
+
+async def run_scenario(requests: int, concurrency: int) -> dict:
+    """Disparar os logins e, em paralelo, sondar a latência de /status."""
+    transport = httpx.ASGITransport(app=app)
+    login_latencies, probe_latencies = [], []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    json={"email": EMAIL, "password": PASSWORD},
+                )
+                login_latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/api/v1/status")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return {
+        "elapsed": elapsed,
+        "statuses": statuses,
+        "login_p50": percentile(login_latencies, 50),
+        "login_p99": percentile(login_latencies, 99),
+        "probe_p50": percentile(probe_latencies, 50),
+        "probe_p99": percentile(probe_latencies, 99),
+    }
+
+
+async def run_all(scenarios, requests: int, concurrency: int) -> list:
+    """Rodar os cenários no mesmo event loop e fechar o engine assíncrono."""
+    results = []
+    try:
+        for _, executor in scenarios:
+            auth_service.password_executor = executor
+            results.append(await run_scenario(requests, concurrency))
+            executor.shutdown()
+    finally:
+        await close_async_engine()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de logins concorrentes")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2, help="Threads do executor de senha")
+    parser.add_argument("--max-pending", type=int, default=32, help="Limite da fila do executor")
+    parser.add_argument("--scheme", default="pbkdf2_sha256", help="pbkdf2_sha256 ou bcrypt")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    seed_user(args.scheme)
+
+    print("⏱️  Benchmark de login concorrente")
+    print("=" * 60)
+    print(
+        f"Logins: {args.requests} | Concorrência: {args.concurrency} | "
+        f"Hash: {args.scheme} | LOGIN_VERIFY_PASSWORD={os.environ['LOGIN_VERIFY_PASSWORD']} | "
+        f"CPUs: {os.cpu_count()}"
+    )
+    print("-" * 60)
+
+    scenarios = (
+        ("Verificação no event loop (antes)", auth_service.PasswordExecutor(0, 0)),
+        (
+            f"Executor limitado (depois: {args.workers} workers, fila {args.max_pending})",
+            auth_service.PasswordExecutor(args.workers, args.max_pending),
+        ),
+    )
+    results = asyncio.run(run_all(scenarios, args.requests, args.concurrency))
+    for (label, _), result in zip(scenarios, results):
+        ok = result["statuses"].get(200, 0)
+        rejected = result["statuses"].get(503, 0)
+        print(f"{label}")
+        print(
+            f"   Login:   p50 {result['login_p50']:.1f} ms | p99 {result['login_p99']:.1f} ms | "
+            f"{ok / result['elapsed']:.0f} logins/s (ok: {ok}, rejeitados: {rejected})"
+        )
+        print(
+            f"   /status em paralelo: p50 {result['probe_p50']:.1f} ms | "
+            f"p99 {result['probe_p99']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# ===========================================
+# BENCHMARK: BUSCA TEXTUAL DE PROCESSOS
+# ===========================================
+#
+# Compara a busca anterior (três ILIKE '%termo%', varredura da tabela inteira,
+# sem ordem de relevância) com ProcessSearchService.search (FTS5 no SQLite,
+# tsvector + GIN no Postgres): primeira página de 20 resultados e contagem dos
+# resultados. A mediana da busca textual deve ficar praticamente estável
+# quando o número de processos cresce.
+#
+# Uso:
+#   python benchmarks/bench_process_search.py --processes 100000 1000000
+#   python benchmarks/bench_process_search.py --processes 1000000 --database-url postgresql://.../bench
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.database import mark_backfill_completed
+import app.models  # noqa: F401 - registra todas as tabelas
+from app.models.process import Process, ProcessPriority, ProcessStatus
+from app.models.user import User, UserRole
+from app.services.process_search import SEARCH_BACKFILL, ProcessSearchService, ensure_search_schema, ilike_filter
+
+SUBJECTS = ["Ação de indenização", "Revisão contratual", "Execução fiscal", "Reclamação trabalhista",
+            "Inventário", "Divórcio consensual", "Mandado de segurança", "Usucapião", "Cobrança",
+            "Ação previdenciária"]
+CATEGORIES = ["Cível", "Trabalhista", "Tributário", "Família", "Previdenciário", None]
+NAMES = ["Maria", "João", "Ana", "José", "Francisca", "Antônio", "Adriana", "Carlos", "Juliana", "Paulo"]
+SURNAMES = ["Silva", "Santos", "Oliveira", "Souza", "Pereira", "Lima", "Gonçalves", "Ribeiro", "Araújo"]
+DETAILS = ["danos morais", "rescisão indireta", "cobrança indevida", "pensão alimentícia", "horas extras",
+           "repetição de indébito", "aposentadoria especial", "vícios construtivos", "partilha de bens"]
+
+# Termos buscados (com e sem acentos, termo raro, várias palavras)
+QUERIES = ["indenizacao", "Gonçalves", "aposentadoria especial", "usucapiao", "horas extras Ribeiro"]
+
+
+def seed_database(url: str, processes: int, chunk: int = 20000):
+    """Criar tabelas e inserir processos em lotes (core insert, sem ORM nem hooks)."""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    rnd = random.Random(42)
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(User).values(
+            email="bench@bench.com",
+            username="bench",
+            full_name="Benchmark",
+            hashed_password="x",
+            role=UserRole.ADMIN,
+        )).inserted_primary_key[0]
+        for offset in range(0, processes, chunk):
+            rows = []
+            for _ in range(min(chunk, processes - offset)):
+                number = offset + len(rows)
+                rows.append({
+                    "title": f"{rnd.choice(SUBJECTS)} {number}",
+                    "description": f"Pedido de {rnd.choice(DETAILS)} e {rnd.choice(DETAILS)}",
+                    "process_number": f"{number:07d}-{rnd.randint(10, 99)}.2024.8.26.{rnd.randint(1, 9999):04d}",
+                    "client_name": f"{rnd.choice(NAMES)} {rnd.choice(SURNAMES)} {rnd.choice(SURNAMES)}",
+                    "category": rnd.choice(CATEGORIES),
+                    "status": rnd.choice(list(ProcessStatus)).name,
+                    "priority": rnd.choice(list(ProcessPriority)).name,
+                    "currency": "BRL",
+                    "user_id": user_id,
+                })
+            conn.execute(insert(Process.__table__), rows)
+    engine.dispose()
+
+
+def legacy_search(db, query):
+    """Busca anterior: primeira página e contagem com ILIKE."""
+    page = db.execute(select(Process).where(ilike_filter(query)).limit(20)).scalars().all()
+    total = db.execute(select(func.count()).select_from(Process).where(ilike_filter(query))).scalar()
+    return len(page), total
+
+
+def full_text_search(db, query):
+    result = ProcessSearchService.search(db, query, limit=20, include_total=True)
+    return len(result["results"]), result["total"]
+
+
+def measure(label: str, func, db, repeat: int):
+    """Mediana de `repeat` execuções de cada termo."""
+    print(f"   {label}")
+    for query in QUERIES:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            page, total = func(db, query)
+            timings.append(time.perf_counter() - start)
+            db.rollback()
+        print(f"      {query!r:<26} {statistics.median(timings) * 1000:10.2f} ms | "
+              f"{page:3d} na página de {total:,}")
+
+
+def run(url: str, processes: int, repeat: int, legacy_max: int):
+    seed_start = time.perf_counter()
+    seed_database(url, processes)
+    print(f"{processes:,} processos (carga em {time.perf_counter() - seed_start:.1f}s)")
+
+    engine = create_engine(url)
+    if not ensure_search_schema(engine):
+        print("⚠️ Banco sem suporte à busca textual (SQLite com FTS5 ou Postgres)")
+        return
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        index_start = time.perf_counter()
+        ProcessSearchService.backfill(db, rebuild=True)
+        db.commit()
+        mark_backfill_completed(SEARCH_BACKFILL, bind=engine)
+        print(f"   índice criado em {time.perf_counter() - index_start:.1f}s")
+
+        measure("depois: busca textual ranqueada", full_text_search, db, repeat)
+        if processes <= legacy_max:
+            measure("antes: ILIKE '%termo%'", legacy_search, db, repeat)
+        else:
+            print("   antes: ILIKE '%termo%' (pulado)")
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca textual de processos")
+    parser.add_argument("--processes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy-max", type=int, default=1000000,
+                        help="Rodar a busca com ILIKE só até este número de processos")
+    parser.add_argument("--database-url", help="Banco dedicado (ex.: Postgres); padrão: SQLite temporário")
+    args = parser.parse_args()
+
+    print("🔎 Benchmark da busca textual de processos")
+    print("=" * 100)
+    for processes in args.processes:
+        if args.database_url:
+            engine = create_engine(args.database_url)
+            Base.metadata.drop_all(bind=engine)
+            engine.dispose()
+            run(args.database_url, processes, args.repeat, args.legacy_max)
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", processes, args.repeat, args.legacy_max)
+        print("-" * 100)
+
+
+if __name__ == "__main__":
+    main()
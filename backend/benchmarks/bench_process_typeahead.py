@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# ===========================================
+# BENCHMARK: TYPEAHEAD POR NÚMERO CNJ E CLIENTE
+# ===========================================
+#
+# Compara o ILIKE '%termo%' anterior (número com a pontuação digitada, nome
+# com acentos) com ProcessLookupService.typeahead (pg_trgm + GIN no Postgres,
+# FTS5 trigram no SQLite): número completo sem pontuação, trecho do número,
+# número com um dígito errado e nome com erro de grafia. Meta: menos de 20 ms
+# por sugestão com 1M de processos no Postgres.
+#
+# Uso:
+#   python benchmarks/bench_process_typeahead.py --processes 100000 1000000
+#   python benchmarks/bench_process_typeahead.py --processes 1000000 --database-url postgresql://.../bench
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, or_, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.database import mark_backfill_completed
+from app.models.process import Process
+from app.services.process_lookup import LOOKUP_BACKFILL, ProcessLookupService, ensure_lookup_schema
+from benchmarks.bench_process_search import seed_database
+
+TARGET_MS = 20.0
+
+
+def queries_for(db):
+    """Buscas a partir de um processo existente (número e cliente reais)."""
+    number, client_name = db.execute(
+        select(Process.process_number, Process.client_name).order_by(Process.id.desc()).limit(1)
+    ).one()
+    digits = "".join(char for char in number if char.isdigit())
+    typo = digits[:-1] + ("0" if digits[-1] != "0" else "1")
+    # Uma letra a menos no sobrenome
+    misspelled = client_name[:-3] + client_name[-2:]
+    return [
+        ("número sem pontuação", digits),
+        ("trecho do número", number[:12]),
+        ("número com erro", typo),
+        ("cliente com erro", misspelled),
+    ]
+
+
+def legacy_typeahead(db, query):
+    """Busca anterior: ILIKE no número e no cliente, sem ranking."""
+    return db.execute(
+        select(Process.id).where(or_(
+            Process.process_number.ilike(f"%{query}%"),
+            Process.client_name.ilike(f"%{query}%"),
+        )).limit(10)
+    ).all()
+
+
+def trigram_typeahead(db, query):
+    return ProcessLookupService.typeahead(db, query, limit=10)["results"]
+
+
+def measure(label: str, func, db, queries, repeat: int):
+    """Mediana de `repeat` execuções de cada busca."""
+    print(f"   {label}")
+    for name, query in queries:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = func(db, query)
+            timings.append(time.perf_counter() - start)
+            db.rollback()
+        median = statistics.median(timings) * 1000
+        flag = "✅" if median < TARGET_MS else "⚠️"
+        print(f"      {flag} {name:<22} {query!r:<32} {median:10.2f} ms | {len(results):2d} sugestões")
+
+
+def run(url: str, processes: int, repeat: int):
+    seed_start = time.perf_counter()
+    seed_database(url, processes)
+    print(f"{processes:,} processos (carga em {time.perf_counter() - seed_start:.1f}s)")
+
+    engine = create_engine(url)
+    if not ensure_lookup_schema(engine):
+        print("⚠️ Banco sem suporte a trigramas (SQLite com FTS5 trigram ou Postgres com pg_trgm)")
+        return
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        index_start = time.perf_counter()
+        ProcessLookupService.backfill(db, rebuild=True)
+        db.commit()
+        mark_backfill_completed(LOOKUP_BACKFILL, bind=engine)
+        print(f"   dígitos normalizados e índice criado em {time.perf_counter() - index_start:.1f}s")
+
+        queries = queries_for(db)
+        measure("depois: trigramas (similaridade)", trigram_typeahead, db, queries, repeat)
+        measure("antes: ILIKE '%termo%'", legacy_typeahead, db, queries, repeat)
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do typeahead de processos")
+    parser.add_argument("--processes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", help="Banco dedicado (ex.: Postgres); padrão: SQLite temporário")
+    args = parser.parse_args()
+
+    print(f"🔢 Benchmark do typeahead de processos (meta: {TARGET_MS:.0f} ms)")
+    print("=" * 100)
+    for processes in args.processes:
+        if args.database_url:
+            engine = create_engine(args.database_url)
+            Base.metadata.drop_all(bind=engine)
+            engine.dispose()
+            run(args.database_url, processes, args.repeat)
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", processes, args.repeat)
+        print("-" * 100)
+
+
+if __name__ == "__main__":
+    main()
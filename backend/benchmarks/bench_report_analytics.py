@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# ===========================================
+# BENCHMARK: ANÁLISES DE RELATÓRIOS NO BANCO
+# ===========================================
+#
+# Compara /reports/tasks/analytics antigo (query.all() de todas as tarefas do
+# período + média em Python) com as agregações no banco de
+# ReportAnalyticsService e mede a saída linha a linha com yield_per contra
+# .all(). O pico de memória (tracemalloc) das agregações e do stream deve ficar
+# estável quando o número de tarefas cresce.
+#
+# Uso:
+#   python benchmarks/bench_report_analytics.py --tasks 100000 500000
+#   python benchmarks/bench_report_analytics.py --tasks 500000 --legacy-max 500000
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+import app.models  # noqa: F401 - registra todas as tabelas
+from app.models.task import Task, TaskPriority, TaskStatus
+from app.models.user import User, UserRole
+from app.services.report_analytics import ReportAnalyticsService, date_filters
+
+CATEGORIES = ["Petição", "Audiência", "Prazo", "Diligência", None]
+
+
+def seed_database(url: str, tasks: int, chunk: int = 20000):
+    """Criar tabelas e inserir tarefas em lotes (core insert, sem ORM)."""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    rnd = random.Random(42)
+    base = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(User).values(
+            email="bench@bench.com",
+            username="bench",
+            full_name="Benchmark",
+            hashed_password="x",
+            role=UserRole.ADMIN,
+        )).inserted_primary_key[0]
+        for offset in range(0, tasks, chunk):
+            rows = []
+            for _ in range(min(chunk, tasks - offset)):
+                created = base + timedelta(minutes=rnd.randint(0, 2 * 365 * 24 * 60))
+                status = rnd.choice(list(TaskStatus))
+                rows.append({
+                    "title": f"Tarefa {offset + len(rows)}",
+                    "status": status.name,
+                    "priority": rnd.choice(list(TaskPriority)).name,
+                    "category": rnd.choice(CATEGORIES),
+                    "created_by_id": user_id,
+                    "created_at": created,
+                    "updated_at": created,
+                    "completed_at": created + timedelta(hours=rnd.randint(1, 500))
+                    if status == TaskStatus.COMPLETED else None,
+                })
+            conn.execute(insert(Task.__table__), rows)
+    engine.dispose()
+
+
+def legacy_task_analytics(db, start, end):
+    """Implementação anterior do endpoint (carrega todas as tarefas)."""
+    query = db.query(Task)
+    if start:
+        query = query.filter(Task.created_at >= start)
+    if end:
+        query = query.filter(Task.created_at <= end)
+    tasks = query.all()
+    completed_tasks = db.query(Task).filter(
+        Task.status == TaskStatus.COMPLETED,
+        Task.completed_at.isnot(None)
+    ).all()
+    total_time = sum(
+        (task.completed_at - task.created_at).total_seconds()
+        for task in completed_tasks
+        if task.completed_at and task.created_at
+    )
+    return {"total": len(tasks), "avg": total_time / len(completed_tasks) if completed_tasks else 0}
+
+
+def measure(label: str, func):
+    """Executar func medindo tempo e pico de memória alocada em Python."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {label:<34} {elapsed * 1000:10.1f} ms | pico {peak / 1024 / 1024:8.2f} MiB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das análises de relatórios")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[100000, 500000])
+    parser.add_argument("--legacy-max", type=int, default=100000,
+                        help="Rodar a versão antiga só até este número de tarefas")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    start = datetime(2024, 1, 1)
+    end = datetime(2026, 1, 1)
+
+    print("📊 Benchmark das análises de relatórios (SQLite)")
+    print("=" * 72)
+    for tasks in args.tasks:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            seed_start = time.perf_counter()
+            seed_database(url, tasks)
+            print(f"{tasks:,} tarefas (carga em {time.perf_counter() - seed_start:.1f}s)")
+
+            engine = create_engine(url)
+            Session = sessionmaker(bind=engine)
+            with Session() as db:
+                if tasks <= args.legacy_max:
+                    legacy = measure("antes: query.all() + len()", lambda: legacy_task_analytics(db, start, end))
+                    db.expunge_all()
+                else:
+                    legacy = None
+                    print(f"   {'antes: query.all() + len()':<34} (pulado, acima de --legacy-max)")
+
+                analytics = measure("agregações no banco", lambda: ReportAnalyticsService.task_analytics(db, start, end))
+                if legacy is not None and legacy["total"] != analytics["total"]:
+                    print(f"   ⚠️ Totais divergentes: {legacy['total']} x {analytics['total']}")
+
+                statement = select(Task.id, Task.title, Task.status, Task.created_at).where(
+                    *date_filters(Task.created_at, start, end)
+                )
+                measure("linhas: .all()", lambda: len(db.execute(statement).all()))
+                streamed = measure(
+                    f"linhas: yield_per({args.batch_size})",
+                    lambda: sum(1 for _ in ReportAnalyticsService.iter_task_rows(db, start, end, args.batch_size)),
+                )
+                print(f"   total={analytics['total']:,} | linhas no stream={streamed:,}")
+            engine.dispose()
+        print("-" * 72)
+
+
+if __name__ == "__main__":
+    main()
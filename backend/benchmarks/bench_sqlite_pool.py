@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# ===========================================
+# BENCHMARK: SQLITE STATICPOOL x PERFIL DE PRODUÇÃO
+# ===========================================
+#
+# Compara a vazão de leituras concorrentes (e de uma carga mista com 10% de
+# escritas) entre a configuração antiga (StaticPool, uma conexão compartilhada
+# por todas as threads) e o perfil de produção do SQLite (WAL,
+# synchronous=NORMAL, mmap/cache_size, pool de conexões e lock de escrita).
+#
+# Uso:
+#   python benchmarks/bench_sqlite_pool.py --threads 8 --seconds 5
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.core.base import Base
+import app.models  # noqa: F401 - registra todas as tabelas
+from app.core.database import SQLiteWriterLock, configure_sqlite_engine
+from app.models.process import Process, ProcessStatus
+from app.models.user import User, UserRole
+
+READ_QUERY = text(
+    "SELECT status, COUNT(*), AVG(estimated_value) FROM processes "
+    "WHERE client_name = :client GROUP BY status"
+)
+WRITE_QUERY = text(
+    "UPDATE processes SET estimated_value = estimated_value + 1 WHERE id = :id"
+)
+
+
+def seed_database(url: str, rows: int):
+    """Criar tabelas e popular processos de exemplo."""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        user = User(
+            email="bench@bench.com",
+            username="bench",
+            full_name="Benchmark",
+            hashed_password="x",
+            role=UserRole.ADMIN,
+        )
+        db.add(user)
+        db.flush()
+        db.execute(insert(Process), [
+            {
+                "title": f"Processo {i}",
+                "client_name": f"Cliente {i % 200}",
+                "status": ProcessStatus.ACTIVE,
+                "estimated_value": i % 1000,
+                "user_id": user.id,
+            }
+            for i in range(rows)
+        ])
+        db.execute(text("CREATE INDEX ix_bench_client ON processes (client_name)"))
+        db.commit()
+    engine.dispose()
+
+
+def build_static_engine(url: str):
+    """Configuração antiga: StaticPool sem PRAGMAs."""
+    return create_engine(
+        url,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+
+
+def build_production_engine(url: str, threads: int):
+    """Perfil de produção do app/core/database.py."""
+    engine = create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=threads,
+        max_overflow=0,
+        connect_args={"check_same_thread": False, "timeout": 5},
+    )
+    configure_sqlite_engine(engine, writer_lock=SQLiteWriterLock(timeout=5))
+    return engine
+
+
+def run_load(engine, threads: int, seconds: float, write_ratio: float, rows: int) -> dict:
+    """Executar consultas em várias threads pelo tempo indicado."""
+    stop = threading.Event()
+    counts = [0] * threads
+    errors = [0] * threads
+
+    def worker(index: int):
+        rng = random.Random(index)
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    if rng.random() < write_ratio:
+                        conn.execute(WRITE_QUERY, {"id": rng.randint(1, rows)})
+                        conn.commit()
+                    else:
+                        conn.execute(READ_QUERY, {"client": f"Cliente {rng.randint(0, 199)}"}).all()
+                counts[index] += 1
+            except Exception:
+                errors[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+
+    return {"ops": sum(counts) / seconds, "errors": sum(errors)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark StaticPool x perfil SQLite de produção")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_sqlite.db")
+    url = f"sqlite:///{path}"
+    seed_database(url, args.rows)
+
+    print("⏱️  Benchmark do SQLite")
+    print("=" * 60)
+    print(f"Linhas: {args.rows} | Threads: {args.threads} | Duração: {args.seconds}s")
+    print("-" * 60)
+
+    scenarios = (
+        ("StaticPool (antes)", build_static_engine),
+        ("Perfil de produção (depois)", lambda u: build_production_engine(u, args.threads)),
+    )
+    for label, factory in scenarios:
+        engine = factory(url)
+        reads = run_load(engine, args.threads, args.seconds, 0.0, args.rows)
+        mixed = run_load(engine, args.threads, args.seconds, 0.1, args.rows)
+        engine.dispose()
+        print(f"{label}")
+        print(f"   Somente leitura:    {reads['ops']:.0f} ops/s (erros: {reads['errors']})")
+        print(f"   Misto (10% escrita): {mixed['ops']:.0f} ops/s (erros: {mixed['errors']})")
+
+
+if __name__ == "__main__":
+    main()
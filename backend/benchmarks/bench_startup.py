@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# ===========================================
+# BENCHMARK: TEMPO DE BOOT DA APLICAÇÃO
+# ===========================================
+#
+# Mede, em processos Python novos, o tempo de import de app.main, o tempo
+# do evento de startup e a latência da primeira requisição que toca o banco,
+# com FAST_BOOT desligado (comportamento antigo) e ligado. A primeira rodada
+# de cada modo usa um banco vazio (boot frio); as demais, o banco já criado.
+#
+# Uso:
+#   python benchmarks/bench_startup.py --runs 5
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código executado em cada processo filho
+CHILD_SCRIPT = r"""
+import json, logging, time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+logging.disable(logging.CRITICAL)
+from fastapi.testclient import TestClient
+client = TestClient(app)
+t2 = time.perf_counter()
+client.__enter__()  # dispara o evento de startup
+t3 = time.perf_counter()
+client.post("/api/v1/auth/login", json={"email": "x@x.com", "password": "x"})
+t4 = time.perf_counter()
+client.__exit__(None, None, None)
+print("BENCH" + json.dumps({
+    "import": t1 - t0,
+    "startup": t3 - t2,
+    "first_request": t4 - t3,
+}))
+"""
+
+
+def run_child(database_url: str, fast_boot: bool) -> dict:
+    """Executar um boot completo em um processo novo."""
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": database_url,
+        "FAST_BOOT": "true" if fast_boot else "false",
+        "DEBUG": "false",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    line = next(line for line in result.stdout.splitlines() if line.startswith("BENCH"))
+    return json.loads(line[len("BENCH"):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tempo de boot")
+    parser.add_argument("--runs", type=int, default=5, help="Boots a quente por modo")
+    args = parser.parse_args()
+
+    print("⏱️  Benchmark de boot da aplicação")
+    print("=" * 60)
+
+    for label, fast_boot in (("FAST_BOOT=false (antes)", False), ("FAST_BOOT=true (depois)", True)):
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_startup.db')}"
+        cold = run_child(database_url, fast_boot)
+        warm = [run_child(database_url, fast_boot) for _ in range(args.runs)]
+
+        print(f"{label}")
+        print(
+            f"   Boot frio:   import {cold['import'] * 1000:.0f} ms | "
+            f"startup {cold['startup'] * 1000:.0f} ms | "
+            f"1ª requisição {cold['first_request'] * 1000:.0f} ms"
+        )
+        print(
+            f"   Boot quente (mediana de {args.runs}): "
+            f"import {statistics.median(r['import'] for r in warm) * 1000:.0f} ms | "
+            f"startup {statistics.median(r['startup'] for r in warm) * 1000:.0f} ms | "
+            f"1ª requisição {statistics.median(r['first_request'] for r in warm) * 1000:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
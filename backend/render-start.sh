@@ -16,6 +16,9 @@ fi
 
 echo "✅ Variáveis de ambiente verificadas"
 
+# Schema, usuários padrão e backfills pendentes (o startup da aplicação não cria mais usuários)
+python -m app.cli prepare
+
 # Iniciar servidor
 echo "🌐 Iniciando servidor na porta $PORT..."
 python -m uvicorn app.main:app --host 0.0.0.0 --port $PORT --workers 1
@@ -3,27 +3,35 @@
 Script para testar autenticação.
 """
 
-from app.core.database import get_db
+import asyncio
+
+from app.core.database import AsyncDatabaseContext, close_async_engine
 from app.services.auth import AuthService
 from app.schemas.user import UserLogin
 
 def test_auth():
     """Testar autenticação."""
-    db = next(get_db())
-    
+    asyncio.run(_test_auth())
+
+async def _test_auth():
+    async with AsyncDatabaseContext() as db:
+        await _check_auth(db)
+    await close_async_engine()
+
+async def _check_auth(db):
     # Testar autenticação
     login_data = UserLogin(email='admin@teste.com', password='admin123')
     
     try:
-        result = AuthService.login(db, login_data)
+        result = await AuthService.login(db, login_data)
         print("✅ Login bem-sucedido!")
-        print(f"Token: {result.access_token[:50]}...")
-        print(f"User: {result.user.email}")
+        print(f"Token: {result['access_token'][:50]}...")
+        print(f"User: {result['user'].email}")
     except Exception as e:
         print(f"❌ Erro no login: {e}")
         
         # Testar autenticação manual
-        user = AuthService.authenticate_user(db, 'admin@teste.com', 'admin123')
+        user = await AuthService.authenticate_user(db, 'admin@teste.com', 'admin123')
         if user:
             print(f"✅ Usuário autenticado: {user.email}")
         else:
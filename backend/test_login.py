@@ -3,7 +3,9 @@
 Script para testar login e criar usuário admin.
 """
 
-from app.core.database import get_db
+import asyncio
+
+from app.core.database import AsyncDatabaseContext, close_async_engine, get_db
 from app.models.user import User
 from app.services.user import UserService
 from app.schemas.user import UserCreate
@@ -32,12 +34,19 @@ def test_login():
     for password in test_passwords:
         try:
             login_data = UserLogin(email='admin@teste.com', password=password)
-            result = AuthService.login(db, login_data)
+            result = asyncio.run(_login(login_data))
             print(f"✅ Login bem-sucedido com senha: {password}")
-            print(f"Token: {result.access_token[:50]}...")
+            print(f"Token: {result['access_token'][:50]}...")
             return
         except Exception as e:
             print(f"❌ Falha com senha '{password}': {e}")
 
+async def _login(login_data):
+    try:
+        async with AsyncDatabaseContext() as db:
+            return await AuthService.login(db, login_data)
+    finally:
+        await close_async_engine()
+
 if __name__ == "__main__":
     test_login()
@@ -6,10 +6,11 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from app.main import app
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db, get_read_db, instrument_engine
 from app.models.base import Base
 
 # ===========================================
@@ -34,7 +35,23 @@ def override_get_db():
     finally:
         db.close()
 
+async_engine = create_async_engine(
+    "sqlite+aiosqlite:///./test.db",
+    poolclass=NullPool,
+)
+
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 # ===========================================
 # FIXTURES
@@ -78,6 +95,8 @@ def test_health_check(client):
     response = client.get("/health")
     # Pode falhar devido a conexões de banco, mas deve responder
     assert response.status_code in [200, 503]
+    if response.status_code == 200:
+        assert "state" in response.json()["redis_circuit"]
 
 def test_api_status(client):
     """Testar status da API."""
@@ -100,6 +119,797 @@ def test_login_invalid_credentials(client):
     })
     assert response.status_code == 401
 
+def test_db_instrumentation_headers(client):
+    """Testar headers de contagem de queries por requisição."""
+    response = client.post("/api/v1/auth/login", json={
+        "email": "invalid@example.com",
+        "password": "wrongpassword"
+    })
+    assert int(response.headers["X-DB-Queries"]) >= 1
+    assert float(response.headers["X-DB-Time"]) >= 0
+
+    response = client.get("/api/v1/status")
+    assert response.headers["X-DB-Queries"] == "0"
+
+def test_principal_cache_skips_db_on_hit(client):
+    """Testar cache do usuário autenticado e invalidação ao atualizar perfil."""
+    from app.core.principal_cache import principal_cache
+    from app.models.user import User, UserRole
+    from app.services.auth import AuthService
+
+    principal_cache.clear()
+    with TestingSessionLocal() as db:
+        user = User(
+            email="cache@example.com",
+            username="cacheuser",
+            full_name="Cache User",
+            hashed_password="x",
+            role=UserRole.LAWYER,
+        )
+        db.add(user)
+        db.commit()
+        token = AuthService.create_access_token({"sub": str(user.id), "email": user.email})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first = client.get("/api/v1/users/me", headers=headers)
+    assert first.status_code == 200
+    assert int(first.headers["X-DB-Queries"]) >= 1
+
+    second = client.get("/api/v1/users/me", headers=headers)
+    assert second.status_code == 200
+    assert second.headers["X-DB-Queries"] == "0"
+
+    response = client.put("/api/v1/users/me", headers=headers, json={"full_name": "Novo Nome"})
+    assert response.status_code == 200
+    assert client.get("/api/v1/users/me", headers=headers).json()["full_name"] == "Novo Nome"
+
+def test_admin_dashboard_query_count(client, monkeypatch):
+    """Testar que o dashboard admin não cresce em queries com o volume de dados."""
+    from app.core.config import settings
+    from app.core.principal_cache import principal_cache
+    from app.models.process import Process, ProcessStatus
+    from app.models.task import Task, TaskStatus
+    from app.models.timeline import TimelineEvent, TimelineEventType
+    from app.models.user import User, UserRole
+    from app.services.auth import AuthService
+    from app.services.rollups import RollupService
+
+    # Sem cache de serviços e de autenticação: medir as consultas reais
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "AUTH_PRINCIPAL_CACHE_ENABLED", False)
+    principal_cache.clear()
+
+    with TestingSessionLocal() as db:
+        users = [
+            User(
+                email=f"dash{i}@example.com",
+                username=f"dash{i}",
+                full_name=f"Dash {i}",
+                hashed_password="x",
+                role=UserRole.ADMIN if i == 0 else UserRole.LAWYER,
+            )
+            for i in range(5)
+        ]
+        db.add_all(users)
+        db.flush()
+        for i, user in enumerate(users):
+            process = Process(
+                title=f"Processo {i}",
+                client_name="Cliente",
+                status=ProcessStatus.ACTIVE,
+                user_id=user.id,
+            )
+            db.add(process)
+            db.add(Task(title=f"Tarefa {i}", status=TaskStatus.TODO, created_by_id=user.id))
+            db.add(TimelineEvent(
+                event_type=TimelineEventType.PROCESS_CREATED,
+                title="Processo criado",
+                user_id=user.id,
+            ))
+        # Estado após o boot: agregados mensais já reconciliados
+        RollupService.reconcile(db)
+        db.commit()
+        token = AuthService.create_access_token({"sub": str(users[0].id), "email": users[0].email})
+
+    response = client.get("/api/v1/admin/dashboard", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["summary"]["total_tasks"] == 5
+    assert data["summary"]["active_processes"] == 5
+    assert {event["user"] for event in data["recent_activity"]} == {f"Dash {i}" for i in range(5)}
+    # Usuário autenticado + 3 agregados (processos, tarefas, usuários) +
+    # atividade recente com JOIN + produtividade mensal (agregados)
+    assert int(response.headers["X-DB-Queries"]) <= 6
+
+def test_dashboard_counters_follow_writes(client):
+    """Testar contadores do dashboard mantidos pelos hooks de flush."""
+    from datetime import datetime, timedelta
+    from sqlalchemy import select
+    from app.models.counter import DashboardCounter
+    from app.models.task import Task, TaskPriority, TaskStatus
+    from app.models.user import User, UserRole
+    from app.services.auth import AuthService
+    from app.services.counters import CounterService
+
+    with TestingSessionLocal() as db:
+        CounterService.reconcile(db)
+        db.commit()
+
+        user = User(
+            email="counter@example.com",
+            username="counteruser",
+            full_name="Counter User",
+            hashed_password="x",
+            role=UserRole.LAWYER,
+        )
+        db.add(user)
+        db.flush()
+        overdue = Task(title="Atrasada", created_by_id=user.id, assigned_user_id=user.id,
+                       due_date=datetime.now() - timedelta(days=2))
+        urgent = Task(title="Urgente", created_by_id=user.id, priority=TaskPriority.URGENT,
+                      due_date=datetime.now() + timedelta(hours=2))
+        db.add_all([overdue, urgent])
+        db.commit()
+
+        # Alteração em objeto expirado pelo commit e remoção
+        overdue.status = TaskStatus.COMPLETED
+        db.commit()
+        db.delete(urgent)
+        db.commit()
+
+        stored = {
+            (row.user_id, row.name): row.value
+            for row in db.execute(select(DashboardCounter)).scalars()
+            if row.value and not row.name.startswith("_")
+        }
+        expected = {key: value for key, value in CounterService.compute(db).items() if value}
+        assert stored == expected
+        assert CounterService.get_counters(db, user.id)["tasks.status.completed"] == 1
+        token = AuthService.create_access_token({"sub": str(user.id), "email": user.email})
+
+    response = client.get("/api/v1/dashboard/alerts", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["urgent"] == 0
+
+def test_monthly_rollups_follow_writes(client):
+    """Testar agregados mensais mantidos pelos hooks de flush."""
+    from datetime import datetime
+    from decimal import Decimal
+    from sqlalchemy import select
+    from app.models.process import Process
+    from app.models.rollup import MonthlyRollup
+    from app.models.task import Task, TaskStatus
+    from app.models.user import User, UserRole
+    from app.services.rollups import RollupService
+
+    with TestingSessionLocal() as db:
+        RollupService.reconcile(db)
+        db.commit()
+
+        user = User(email="rollup@example.com", username="rollupuser", full_name="Rollup User",
+                    hashed_password="x", role=UserRole.LAWYER, created_at=datetime(2025, 3, 5))
+        db.add(user)
+        db.flush()
+        process = Process(title="Receita", client_name="Cliente", user_id=user.id,
+                          actual_value=Decimal("150.00"))
+        task = Task(title="Concluir", created_by_id=user.id)
+        db.add_all([process, task])
+        db.commit()
+
+        task.status = TaskStatus.COMPLETED
+        task.completed_at = datetime(2025, 4, 10)
+        process.actual_value = Decimal("250.00")
+        db.commit()
+
+        stored = {
+            (row.metric, row.month): Decimal(row.value)
+            for row in db.execute(select(MonthlyRollup)).scalars()
+            if row.value and not row.metric.startswith("_")
+        }
+        expected = {key: Decimal(str(value)) for key, value in RollupService.compute(db).items()}
+        assert stored == expected
+        assert ("2025-04", 1) in RollupService.get_series(db, "tasks.completed", datetime(2025, 1, 1))
+        assert ("2025-03", 1) in RollupService.get_series(db, "users.created", datetime(2025, 1, 1))
+
+def test_report_analytics_respect_period(client):
+    """Testar análises de relatórios agregadas no banco com o filtro de período."""
+    import json
+    from datetime import datetime
+    from app.models.process import Process
+    from app.models.task import Task, TaskPriority, TaskStatus
+    from app.models.user import User, UserRole
+    from app.services.auth import AuthService
+
+    with TestingSessionLocal() as db:
+        user = User(email="reports@example.com", username="reportsuser", full_name="Reports User",
+                    hashed_password="x", role=UserRole.LAWYER)
+        db.add(user)
+        db.flush()
+        for year in (2023, 2025):
+            db.add(Process(title=f"Processo {year}", client_name=f"Cliente {year}", user_id=user.id,
+                           created_at=datetime(year, 2, 1)))
+            db.add(Task(title=f"Tarefa {year}", created_by_id=user.id, priority=TaskPriority.HIGH,
+                        status=TaskStatus.COMPLETED, created_at=datetime(year, 2, 1),
+                        completed_at=datetime(year, 2, 2)))
+        db.commit()
+        token = AuthService.create_access_token({"sub": str(user.id), "email": user.email})
+
+    headers = {"Authorization": f"Bearer {token}"}
+    period = "start_date=2025-01-01&end_date=2025-12-31"
+    processes = client.get(f"/api/v1/reports/processes/analytics?{period}", headers=headers).json()
+    assert processes["total"] == 1
+    assert processes["monthly"] == [{"year": 2025, "month": 2, "count": 1}]
+    assert processes["by_client"] == [{"client": "Cliente 2025", "count": 1}]
+
+    tasks = client.get(f"/api/v1/reports/tasks/analytics?{period}", headers=headers).json()
+    assert tasks["by_priority"] == [{"priority": "high", "count": 1}]
+    assert round(tasks["avg_completion_time_seconds"]) == 86400
+
+    response = client.get(f"/api/v1/reports/tasks/analytics/rows?{period}", headers=headers)
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Tarefa 2025"]
+
+def test_financial_summary_from_balances(client, monkeypatch):
+    """Testar resumo financeiro pelos saldos mensais e pela receita por área do período."""
+    from datetime import datetime, timezone
+    from decimal import Decimal
+    from sqlalchemy import insert, select
+    from app.core.config import settings
+    from app.models.ledger import LedgerEntry
+    from app.models.process import Process, ProcessStatus
+    from app.models.user import User, UserRole
+    from app.services.ledger import LedgerService
+    from app.services.rollups import RollupService
+
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    previous = datetime(now.year - 1, 12, 15) if now.month == 1 else datetime(now.year, now.month - 1, 15)
+
+    with TestingSessionLocal() as db:
+        user = User(email="finance@example.com", username="financeuser", full_name="Finance User",
+                    hashed_password="x", role=UserRole.LAWYER)
+        db.add(user)
+        db.flush()
+        # Valor definido agora: lançamento pelos hooks no mês atual
+        db.add(Process(title="Financeiro", client_name="Cliente 300", category="Cível",
+                       status=ProcessStatus.ACTIVE, actual_value=Decimal("300"), user_id=user.id))
+        # Processo anterior ao livro-razão: lançamento de abertura no mês do updated_at
+        db.execute(insert(Process.__table__).values(
+            title="Financeiro", client_name="Cliente 100", category="Cível", status=ProcessStatus.COMPLETED.name,
+            priority="MEDIUM", currency="BRL", actual_value=Decimal("100"), user_id=user.id,
+            created_at=previous, updated_at=previous,
+        ))
+        assert LedgerService.backfill(db) == 1
+        # Abertura já gravada por um backfill concorrente é ignorada
+        opening = db.execute(select(LedgerEntry).where(LedgerEntry.opening_process_id.isnot(None))).scalar_one()
+        assert LedgerService.append(db.connection(), [{
+            "entry_date": opening.entry_date, "entry_type": opening.entry_type, "amount": opening.amount,
+            "cases": 1, "process_id": opening.process_id, "opening_process_id": opening.opening_process_id,
+        }]) == 0
+        RollupService.reconcile(db)
+        db.commit()
+
+    response = client.get("/api/v1/financial/summary")
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Queries"]) == 2
+    data = response.json()
+    assert data["totalRevenue"] == 400
+    assert data["monthlyRevenue"] == 300
+    assert data["growthRate"] == 200
+    assert data["activeClients"] == 1
+    trends = client.get("/api/v1/financial/monthly-trends").json()
+    assert [item["revenue"] for item in trends[-2:]] == [100, 300]
+    areas = client.get("/api/v1/financial/revenue-by-area").json()
+    assert [(item["area"], item["revenue"], item["cases"]) for item in areas] == [("Cível", 400, 2)]
+
+def test_revenue_ledger_entries(client):
+    """Testar lançamentos do livro-razão para valores de processo e pagamentos."""
+    from decimal import Decimal
+    from sqlalchemy import select
+    from app.models.ledger import LedgerEntry, LedgerEntryType
+    from app.models.process import Process
+    from app.models.user import User, UserRole
+    from app.services.auth import AuthService
+    from app.services.ledger import LedgerImmutableError
+
+    with TestingSessionLocal() as db:
+        user = User(email="ledger@example.com", username="ledgeruser", full_name="Ledger User",
+                    hashed_password="x", role=UserRole.LAWYER)
+        db.add(user)
+        db.flush()
+        process = Process(title="Honorários", client_name="Cliente Razão", category="Trabalhista",
+                          user_id=user.id, actual_value=Decimal("500.00"))
+        db.add(process)
+        db.commit()
+        process.actual_value = Decimal("800.00")
+        db.commit()
+        process_id = process.id
+        token = AuthService.create_access_token({"sub": str(user.id), "email": user.email})
+
+        entries = db.execute(select(LedgerEntry).order_by(LedgerEntry.id)).scalars().all()
+        assert [(Decimal(entry.amount), entry.cases) for entry in entries] == [
+            (Decimal("500.00"), 1), (Decimal("300.00"), 0)
+        ]
+        entries[0].amount = Decimal("0")
+        with pytest.raises(LedgerImmutableError):
+            db.commit()
+        db.rollback()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.post("/api/v1/financial/payments", headers=headers, json={
+        "processId": process_id, "amount": 200, "description": "Entrada",
+        "paymentDate": "2025-02-10T12:00:00", "method": "pix",
+    })
+    assert response.status_code == 201
+    assert response.json()["status"] == "pago"
+    payment_id = response.json()["id"]
+    assert client.put(f"/api/v1/financial/payments/{payment_id}/status?status=cancelado",
+                      headers=headers).status_code == 200
+    assert client.put(f"/api/v1/financial/payments/{payment_id}/status?status=invalido",
+                      headers=headers).status_code == 400
+
+    ledger_url = "/api/v1/financial/ledger?entry_type=payment&client_name=Cliente Razão"
+    assert client.get(ledger_url).status_code in (401, 403)
+    ledger = client.get(ledger_url, headers=headers).json()
+    assert sorted(entry["amount"] for entry in ledger["entries"]) == [-200, 200]
+    assert any(entry["date"].startswith("2025-02-10") for entry in ledger["entries"])
+
+    listing = client.get("/api/v1/financial/payments", headers=headers).json()
+    assert listing["total"] == 1
+    assert listing["summary"]["paid_amount"] == 0
+
+def test_backfill_markers(client):
+    """Testar reserva e conclusão dos backfills de dados pelo marcador."""
+    from app.core.database import claim_backfill, finish_backfill, is_backfill_completed
+
+    assert claim_backfill("test_backfill", bind=engine)
+    # Outro worker não pega um backfill em andamento
+    assert not claim_backfill("test_backfill", bind=engine)
+    finish_backfill("test_backfill", False, bind=engine)
+    assert claim_backfill("test_backfill", bind=engine)
+    finish_backfill("test_backfill", True, bind=engine)
+    assert is_backfill_completed("test_backfill", bind=engine)
+    assert not claim_backfill("test_backfill", bind=engine)
+    assert claim_backfill("test_backfill", bind=engine, force=True)
+    # force não toma a reserva em andamento
+    assert not claim_backfill("test_backfill", bind=engine, force=True)
+
+def test_clients_normalized_and_backfilled(client):
+    """Testar vínculo de processos/precatórios à tabela de clientes por CPF/CNPJ ou nome."""
+    from decimal import Decimal
+    from sqlalchemy import func, insert, select
+    from app.models.client import Client
+    from app.models.ledger import LedgerEntry
+    from app.models.precatorio import Precatorio
+    from app.models.process import Process
+    from app.models.user import User, UserRole
+    from app.services.clients import ClientService, normalize_document
+
+    assert normalize_document("529.982.247-25")[0] == "52998224725"
+    assert normalize_document("11.222.333/0001-81")[0] == "11222333000181"
+    assert normalize_document("111.111.111-11") is None
+
+    with TestingSessionLocal() as db:
+        user = User(email="clients@example.com", username="clientsuser", full_name="Clients User",
+                    hashed_password="x", role=UserRole.LAWYER)
+        db.add(user)
+        db.flush()
+        first = Process(title="Ação 1", client_name="José da Silva", client_document="529.982.247-25",
+                        user_id=user.id, actual_value=Decimal("100"))
+        second = Process(title="Ação 2", client_name="JOSE SILVA", client_document="52998224725",
+                         user_id=user.id, actual_value=Decimal("50"))
+        unnamed = Process(title="Ação 3", client_name="Maria  Souza", user_id=user.id)
+        db.add_all([first, second, unnamed])
+        db.add(Precatorio(numero="PRC-1", ente_devedor="União", valor_origem=Decimal("10"),
+                          cliente_nome="maria souza"))
+        # Registro anterior à dimensão (sem client_id)
+        db.execute(insert(Process.__table__).values(
+            title="Legado", client_name="Maria Souza", status="DRAFT", priority="MEDIUM",
+            currency="BRL", user_id=user.id,
+        ))
+        db.commit()
+
+        assert first.client_id == second.client_id
+        assert unnamed.client_id is not None and unnamed.client_id != first.client_id
+        assert db.execute(select(Precatorio.cliente_id)).scalar_one() == unnamed.client_id
+        assert ClientService.backfill(db)["processes"] == 1
+        db.commit()
+        assert db.execute(select(func.count()).select_from(Client)).scalar_one() == 2
+        assert db.execute(
+            select(func.count()).select_from(Process).where(Process.client_id == unnamed.client_id)
+        ).scalar_one() == 2
+
+        # Trocar o cliente transfere a receita no livro-razão
+        second.client_name = "Maria Souza"
+        second.client_document = None
+        db.commit()
+        revenue = dict(db.execute(
+            select(LedgerEntry.client_id, func.sum(LedgerEntry.amount)).group_by(LedgerEntry.client_id)
+        ).all())
+        assert Decimal(revenue[first.client_id]) == 100
+        assert Decimal(revenue[unnamed.client_id]) == 50
+
+    top = client.get("/api/v1/financial/top-clients").json()
+    assert [(item["name"], item["revenue"], item["cases"]) for item in top] == [
+        ("José da Silva", 100, 1), ("Maria Souza", 50, 1)
+    ]
+
+def test_bulk_export_streams_tables(client):
+    """Testar exportação completa de tabelas (CSV, Parquet com pyarrow) para administradores."""
+    import csv
+    import io
+    from app.models.task import Task
+    from app.models.user import User, UserRole
+    from app.services.auth import AuthService
+    from app.core.principal_cache import principal_cache
+    from app.services.bulk_export import PYARROW_AVAILABLE
+
+    principal_cache.clear()
+    with TestingSessionLocal() as db:
+        admin = User(email="export@example.com", username="exportuser", full_name="Export User",
+                     hashed_password="x", role=UserRole.ADMIN)
+        lawyer = User(email="noexport@example.com", username="noexportuser", full_name="No Export",
+                      hashed_password="x", role=UserRole.LAWYER)
+        db.add_all([admin, lawyer])
+        db.flush()
+        db.add_all([Task(title=f"Exportar {index}", created_by_id=admin.id) for index in range(3)])
+        db.commit()
+        headers, lawyer_headers = (
+            {"Authorization": f"Bearer {AuthService.create_access_token({'sub': str(user.id), 'email': user.email})}"}
+            for user in (admin, lawyer)
+        )
+
+    response = client.get("/api/v1/reports/export/bulk/tasks?format=csv", headers=headers)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows] == ["Exportar 0", "Exportar 1", "Exportar 2"]
+    assert rows[0]["status"] == "todo"
+
+    assert client.get("/api/v1/reports/export/bulk/users?format=csv", headers=headers).status_code == 400
+    assert client.get("/api/v1/reports/export/bulk/tasks", headers=lawyer_headers).status_code == 403
+
+    if PYARROW_AVAILABLE:
+        import pyarrow.parquet as pq
+        response = client.get("/api/v1/reports/export/bulk/tasks?format=parquet", headers=headers)
+        assert pq.read_table(io.BytesIO(response.content)).num_rows == 3
+
+def test_dashboard_feed_pushes_shared_deltas(client, monkeypatch):
+    """Testar o feed SSE: um recálculo por commit, só as métricas alteradas, para todos os assinantes."""
+    import asyncio
+    from datetime import datetime, timedelta
+    from app.core.config import settings
+    from app.models.task import Task, TaskPriority
+    from app.models.user import User, UserRole
+    from app.services import dashboard_feed as feed_module
+    from app.services.auth import AuthService
+    from app.services.dashboard import DashboardService
+
+    calls = []
+
+    def compute():
+        calls.append(1)
+        with TestingSessionLocal() as db:
+            return {"alerts": DashboardService.get_alerts(db)}
+
+    feed = feed_module.DashboardFeed(compute=compute)
+    # Os hooks de commit avisam o feed do módulo
+    monkeypatch.setattr(feed_module, "dashboard_feed", feed)
+    monkeypatch.setattr(settings, "DASHBOARD_FEED_MIN_INTERVAL", 0.01)
+
+    def add_urgent_task():
+        with TestingSessionLocal() as db:
+            user = User(email="feed@example.com", username="feeduser", full_name="Feed User",
+                        hashed_password="x", role=UserRole.LAWYER)
+            db.add(user)
+            db.flush()
+            db.add(Task(title="Urgente", created_by_id=user.id, priority=TaskPriority.URGENT,
+                        due_date=datetime.now() + timedelta(hours=1)))
+            db.commit()
+
+    async def scenario():
+        runner = asyncio.create_task(feed.run())
+        first, version, snapshot = await feed.subscribe()
+        second, _, _ = await feed.subscribe()
+        assert len(calls) == 1
+
+        # Commit em outra thread (como nos endpoints síncronos)
+        await asyncio.to_thread(add_urgent_task)
+        deltas = [await asyncio.wait_for(queue.get(), timeout=5) for queue in (first, second)]
+        runner.cancel()
+
+        assert deltas[0] == deltas[1]
+        event_name, event_id, changes = deltas[0]
+        assert (event_name, event_id) == ("delta", version + 1)
+        assert changes["alerts"]["urgent"] == snapshot["alerts"]["urgent"] + 1
+        assert "warnings" not in changes["alerts"]
+        assert len(calls) == 2
+
+        events = feed.events(first, version, snapshot)
+        assert "event: snapshot" in await events.__anext__()
+        await events.aclose()
+        assert feed.subscriber_count == 1
+
+    asyncio.run(scenario())
+
+    # EventSource não envia cabeçalhos: token curto na query string, aceito só pelo feed
+    with TestingSessionLocal() as db:
+        user = db.query(User).filter(User.email == "feed@example.com").one()
+        access_token = AuthService.create_access_token({"sub": str(user.id), "email": user.email})
+    response = client.post("/api/v1/dashboard/stream-token", headers={"Authorization": f"Bearer {access_token}"})
+    assert response.status_code == 200
+    stream_token = response.json()["token"]
+    assert client.get(f"/api/v1/dashboard/stream?token={access_token}").status_code == 401
+    assert client.get("/api/v1/dashboard/alerts",
+                      headers={"Authorization": f"Bearer {stream_token}"}).status_code == 401
+
+def test_keyset_pagination_cursor(client):
+    """Testar paginação por cursor: ordem estável com empates, sem repetições, e cursores inválidos."""
+    from datetime import datetime
+    from sqlalchemy import text, update
+    from app.core.principal_cache import principal_cache
+    from app.models.task import Task
+    from app.models.user import User, UserRole
+    from app.services.auth import AuthService
+
+    principal_cache.clear()
+    with TestingSessionLocal() as db:
+        user = User(email="cursor@example.com", username="cursoruser", full_name="Cursor User",
+                    hashed_password="x", role=UserRole.LAWYER)
+        db.add(user)
+        db.flush()
+        tasks = [Task(title=f"Cursor {index}", created_by_id=user.id, assigned_user_id=user.id)
+                 for index in range(5)]
+        db.add_all(tasks)
+        db.commit()
+        ids = [task.id for task in tasks]
+        # Mesmo instante para todas (o id desempata), gravado nos dois formatos do SQLite
+        db.execute(update(Task).where(Task.id.in_(ids)).values(updated_at=datetime(2024, 1, 1)))
+        db.execute(text("UPDATE tasks SET updated_at = '2024-01-01 00:00:00' WHERE id = :id"), {"id": ids[2]})
+        db.commit()
+        headers = {"Authorization": f"Bearer {AuthService.create_access_token({'sub': str(user.id), 'email': user.email})}"}
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "sort": "-updated_at", "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/v1/tasks/my", params=params, headers=headers).json()
+        assert body["total"] is None
+        seen += [task["id"] for task in body["tasks"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(seen, reverse=True) == sorted(ids, reverse=True) and len(seen) == len(set(seen))
+
+    first = client.get("/api/v1/tasks/my", params={"limit": 2}, headers=headers).json()
+    assert first["total"] == 5 and first["has_more"]
+    assert [task["id"] for task in first["tasks"]] == ids[:2]
+    # Cursor de outra ordenação ou corrompido
+    response = client.get("/api/v1/tasks/my", params={"cursor": first["next_cursor"], "sort": "updated_at"},
+                          headers=headers)
+    assert response.status_code == 400
+    assert client.get("/api/v1/tasks/my", params={"cursor": "???"}, headers=headers).status_code == 400
+
+def test_process_full_text_search(client):
+    """Testar busca textual: sem acentos, por relevância, com destaques e índice atualizado pelo hook."""
+    from app.core.principal_cache import principal_cache
+    from app.models.process import Process
+    from app.models.user import User, UserRole
+    from app.services.auth import AuthService
+    from app.core.database import mark_backfill_completed
+    from app.services.process_search import (
+        SEARCH_BACKFILL, ProcessSearchService, ensure_search_schema, search_ready,
+    )
+
+    assert ensure_search_schema(engine)
+    principal_cache.clear()
+    with TestingSessionLocal() as db:
+        ProcessSearchService.backfill(db, rebuild=True)
+        db.commit()
+    # Índice só é usado depois do backfill concluído
+    assert not search_ready(engine)
+    mark_backfill_completed(SEARCH_BACKFILL, bind=engine)
+    assert search_ready(engine)
+    with TestingSessionLocal() as db:
+        user = User(email="busca@example.com", username="buscauser", full_name="Busca User",
+                    hashed_password="x", role=UserRole.LAWYER)
+        db.add(user)
+        db.flush()
+        db.add_all([
+            Process(title="Ação de indenização", client_name="Maria", category="Cível",
+                    description="Pedido de indenização por danos <morais>", user_id=user.id),
+            Process(title="Revisão contratual", client_name="João Indenizações", user_id=user.id),
+            Process(title="Execução fiscal", client_name="Pedro", process_number="0001234-56.2024.8.26.0100",
+                    user_id=user.id),
+        ])
+        db.commit()
+        headers = {"Authorization": f"Bearer {AuthService.create_access_token({'sub': str(user.id), 'email': user.email})}"}
+
+    body = client.get("/api/v1/processes/search", params={"q": "indenizacao", "include_total": "true"},
+                      headers=headers).json()
+    assert body["total"] == 2
+    # Título pesa mais que cliente; termos destacados com o resto escapado
+    assert [item["title"] for item in body["results"]] == ["Ação de indenização", "Revisão contratual"]
+    highlights = body["results"][0]["highlights"]
+    assert highlights["title"] == "Ação de <mark>indenização</mark>"
+    assert "&lt;morais&gt;" in highlights["description"]
+    assert body["results"][1]["highlights"]["client_name"] == "João <mark>Indenizações</mark>"
+
+    # Número do processo e filtro da listagem
+    numbered = client.get("/api/v1/processes/search", params={"q": "0001234-56"}, headers=headers).json()
+    assert [item["title"] for item in numbered["results"]] == ["Execução fiscal"]
+    listed = client.get("/api/v1/processes/", params={"search": "execucao"}, headers=headers).json()
+    assert [item["title"] for item in listed["processes"]] == ["Execução fiscal"]
+
+    with TestingSessionLocal() as db:
+        process = db.query(Process).filter(Process.title == "Revisão contratual").one()
+        process.client_name = "João"
+        db.delete(db.query(Process).filter(Process.title == "Ação de indenização").one())
+        db.commit()
+    body = client.get("/api/v1/processes/search", params={"q": "indenização"}, headers=headers).json()
+    assert body["results"] == []
+
+def test_process_typeahead_trigram(client):
+    """Testar typeahead: número CNJ com ou sem pontuação, nome com erro e ordem por similaridade."""
+    from app.core.principal_cache import principal_cache
+    from app.models.process import Process
+    from app.models.user import User, UserRole
+    from app.services.auth import AuthService
+    from app.core.database import mark_backfill_completed
+    from app.services.process_lookup import LOOKUP_BACKFILL, ProcessLookupService, ensure_lookup_schema
+
+    assert ensure_lookup_schema(engine)
+    principal_cache.clear()
+    with TestingSessionLocal() as db:
+        user = User(email="trgm@example.com", username="trgmuser", full_name="Trgm User",
+                    hashed_password="x", role=UserRole.LAWYER)
+        db.add(user)
+        db.flush()
+        db.add_all([
+            Process(title="Execução fiscal", client_name="Maria Gonçalves",
+                    process_number="0001234-56.2024.8.26.0100", user_id=user.id),
+            Process(title="Cobrança", client_name="Mário Gomes",
+                    process_number="5009876-12.2023.4.03.6100", user_id=user.id),
+        ])
+        db.commit()
+        process = db.query(Process).filter(Process.title == "Cobrança").one()
+        assert process.process_number_digits == "50098761220234036100"
+        # Processo inserido fora do ORM (sem os dígitos)
+        db.execute(Process.__table__.insert().values(
+            title="Inventário", client_name="Ana Lima", process_number="0004321-10.2020.8.26.0050",
+            status="ACTIVE", priority="MEDIUM", currency="BRL", user_id=user.id,
+        ))
+        db.commit()
+        headers = {"Authorization": f"Bearer {AuthService.create_access_token({'sub': str(user.id), 'email': user.email})}"}
+
+    def titles(q):
+        response = client.get("/api/v1/processes/typeahead", params={"q": q}, headers=headers)
+        assert response.status_code == 200
+        return [item["title"] for item in response.json()["results"]]
+
+    # Antes do backfill: LIKE, também no número com pontuação
+    assert titles("0004321-10") == ["Inventário"]
+    with TestingSessionLocal() as db:
+        ProcessLookupService.backfill(db, rebuild=True)
+        db.commit()
+    mark_backfill_completed(LOOKUP_BACKFILL, bind=engine)
+    assert titles("00043211020208260050") == ["Inventário"]
+
+    # Número colado sem pontuação, trecho com pontuação e número com um dígito trocado
+    assert titles("00012345620248260100") == ["Execução fiscal"]
+    assert titles("9876-12.2023") == ["Cobrança"]
+    assert titles("50098761220234036109") == ["Cobrança"]
+    # Nome sem acento e com erro de grafia; o mais parecido primeiro
+    assert titles("goncalves") == ["Execução fiscal"]
+    assert titles("Maria Gonsalves")[0] == "Execução fiscal"
+
+    with TestingSessionLocal() as db:
+        process = db.query(Process).filter(Process.title == "Cobrança").one()
+        process.process_number = "7770000-00.2025.8.26.0001"
+        db.commit()
+    assert titles("5009876") == []
+    assert titles("7770000") == ["Cobrança"]
+
+def test_rate_limit_per_route_policy(client):
+    """Testar token bucket por rota (fallback local sem Redis)."""
+    from app.core.rate_limit import RateLimitPolicy, rate_limiter
+
+    original = rate_limiter.policies
+    rate_limiter.policies = [RateLimitPolicy("ai_test", "/api/v1/ai/", per_minute=2)]
+    try:
+        statuses = [client.get("/api/v1/ai/models").status_code for _ in range(3)]
+        assert statuses[-1] == 429
+        assert 429 not in statuses[:2]
+        # Outras rotas não são afetadas pela política de IA
+        assert client.get("/api/v1/users/").status_code == 401
+    finally:
+        rate_limiter.policies = original
+
+def test_service_cache_single_flight_and_stale():
+    """Testar coalescência de chamadas e stale-while-revalidate do @cached."""
+    import asyncio
+    import uuid
+    from app.core.cache import cached
+
+    calls = []
+    # Namespace único: com Redis ativo, execuções anteriores não interferem
+    run_id = uuid.uuid4().hex
+
+    @cached(f"test:single_flight:{run_id}", ttl=60)
+    async def slow_lookup(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return {"value": value}
+
+    @cached(f"test:stale:{run_id}", ttl=0, stale_ttl=60)
+    async def versioned():
+        calls.append("versioned")
+        return len(calls)
+
+    async def scenario():
+        results = await asyncio.gather(*(slow_lookup(1) for _ in range(10)))
+        assert results == [{"value": 1}] * 10
+        assert calls == [1]
+
+        first = await versioned()
+        # Vencido: devolve o valor antigo e recalcula em segundo plano
+        assert await versioned() == first
+        await asyncio.sleep(0.05)
+        assert calls.count("versioned") == 2
+
+    asyncio.run(scenario())
+
+def test_redis_circuit_breaker_short_circuits():
+    """Testar que, com o circuito aberto, o cache não tenta conectar ao Redis."""
+    import asyncio
+    import time
+    from redis.exceptions import ConnectionError as RedisConnectionError
+    from app.core import redis as redis_module
+
+    breaker = redis_module.RedisCircuitBreaker(failure_threshold=2, reset_timeout=60)
+    # Erros que não são de conexão não abrem o circuito
+    breaker.record_failure(ValueError("erro de script"))
+    breaker.record_failure(RedisConnectionError("conexão recusada"))
+    assert breaker.state == breaker.CLOSED
+
+    async def scenario():
+        breaker.record_failure(RedisConnectionError("conexão recusada"))
+        assert breaker.state == breaker.OPEN
+
+        original = redis_module.redis_breaker
+        redis_module.redis_breaker = breaker
+        try:
+            start = time.perf_counter()
+            assert await redis_module.get_cache("qualquer") is None
+            await redis_module.set_cache("qualquer", "1")
+            assert time.perf_counter() - start < 0.05
+        finally:
+            redis_module.redis_breaker = original
+
+        # O teste de volta (half-open) roda em segundo plano
+        assert breaker._probe_task is not None and not breaker._probe_task.done()
+        breaker._probe_task.cancel()
+
+    asyncio.run(scenario())
+
+def test_cache_codec_roundtrip_and_legacy_json():
+    """Testar o codec do cache: cabeçalho, compressão e leitura de JSON antigo."""
+    from app.core.codec import ZSTD_AVAILABLE, CacheCodec
+
+    codec = CacheCodec("json", compression_threshold=256)
+    payload = {"numero_processo": "0000001", "movimentos": [{"nome": "Conclusão"}] * 100}
+
+    small = codec.encode({"ok": True})
+    large = codec.encode(payload)
+    assert small[0] == 0x40  # versão 1, sem compressão, json
+    assert codec.decode(small) == {"ok": True}
+    assert codec.decode(large) == payload
+    if ZSTD_AVAILABLE:
+        assert large[0] == 0x50 and len(large) < 256
+    # Valores gravados antes do codec (JSON puro, bytes ou str)
+    assert codec.decode(b'{"a": 1}') == {"a": 1}
+    assert codec.decode('[1, 2]') == [1, 2]
+
 def test_protected_endpoint_without_auth(client):
     """Testar endpoint protegido sem autenticação."""
     response = client.get("/api/v1/users/")
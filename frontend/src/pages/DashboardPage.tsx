@@ -30,6 +30,15 @@ export const DashboardPage: React.FC = () => {
     loadDashboardData()
   }, [])
 
+  // Estatísticas ao vivo pelo feed SSE (sem consultas periódicas)
+  useEffect(() => {
+    return dashboardService.subscribeDashboardFeed((metrics) => {
+      if (metrics.stats) {
+        setDashboardStats((current: any) => ({ ...current, ...metrics.stats }))
+      }
+    })
+  }, [])
+
   const loadDashboardData = async () => {
     setLoading(true)
     try {
@@ -3,6 +3,7 @@
 // ===========================================
 
 import { apiService } from './api'
+import config from '../config/env'
 
 export interface DashboardStats {
   totalProcesses: number
@@ -47,6 +48,17 @@ export interface TaskSummary {
   createdAt: string
 }
 
+// Métricas do feed SSE (/dashboard/stream), por tópico
+export interface DashboardFeedMetrics {
+  stats?: Partial<DashboardStats>
+  alerts?: Record<string, number>
+  performance?: Record<string, number>
+  financial?: Record<string, number>
+}
+
+// Espera antes de reconectar o feed após uma falha (ms)
+const FEED_RECONNECT_DELAY = 5000
+
 export const dashboardService = {
   // Buscar estatísticas gerais do dashboard
   async getDashboardStats(): Promise<DashboardStats> {
@@ -130,6 +142,62 @@ export const dashboardService = {
       console.error('Erro ao buscar alertas:', error)
       throw error
     }
+  },
+
+  // Assinar o feed SSE do dashboard: retrato completo ao conectar e depois só
+  // as métricas alteradas, já mescladas. EventSource não envia o cabeçalho
+  // Authorization; cada conexão usa um token curto de /dashboard/stream-token.
+  // Retorna a função que encerra a assinatura.
+  subscribeDashboardFeed(onMetrics: (metrics: DashboardFeedMetrics) => void): () => void {
+    let source: EventSource | null = null
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null
+    let closed = false
+    let metrics: DashboardFeedMetrics = {}
+
+    const scheduleReconnect = () => {
+      if (!closed && reconnectTimer === null) {
+        reconnectTimer = setTimeout(() => {
+          reconnectTimer = null
+          connect()
+        }, FEED_RECONNECT_DELAY)
+      }
+    }
+
+    const connect = async () => {
+      try {
+        const { token } = await apiService.post<{ token: string }>('/dashboard/stream-token')
+        if (closed) return
+        source = new EventSource(`${config.API_BASE_URL}/dashboard/stream?token=${encodeURIComponent(token)}`)
+        source.addEventListener('snapshot', (event) => {
+          metrics = JSON.parse((event as MessageEvent).data)
+          onMetrics(metrics)
+        })
+        source.addEventListener('delta', (event) => {
+          const changes: DashboardFeedMetrics = JSON.parse((event as MessageEvent).data)
+          const merged: DashboardFeedMetrics = { ...metrics }
+          for (const topic of Object.keys(changes) as (keyof DashboardFeedMetrics)[]) {
+            merged[topic] = { ...metrics[topic], ...changes[topic] } as any
+          }
+          metrics = merged
+          onMetrics(metrics)
+        })
+        // A reconexão automática do EventSource reusaria o token vencido
+        source.onerror = () => {
+          source?.close()
+          source = null
+          scheduleReconnect()
+        }
+      } catch (error) {
+        console.error('Erro ao conectar ao feed do dashboard:', error)
+        scheduleReconnect()
+      }
+    }
+
+    connect()
+    return () => {
+      closed = true
+      if (reconnectTimer !== null) clearTimeout(reconnectTimer)
+      source?.close()
+    }
   }
 }
-
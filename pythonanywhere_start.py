@@ -14,8 +14,12 @@ os.environ.setdefault('DATABASE_URL', 'sqlite:///./gestor_juridico.db')
 
 if __name__ == "__main__":
     import uvicorn
+    from app.cli import main as cli_main
     from app.main import app
     
+    # Schema, usuários padrão e backfills pendentes (idempotente)
+    cli_main(["prepare"])
+    
     # Start do servidor
     uvicorn.run(
         app,
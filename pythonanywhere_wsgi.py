@@ -13,6 +13,11 @@ if path not in sys.path:
 os.environ.setdefault('ENVIRONMENT', 'production')
 os.environ.setdefault('DATABASE_URL', 'sqlite:///./gestor_juridico.db')
 
+# Schema, usuários padrão e backfills pendentes (idempotente; sob WSGI os
+# eventos de startup da aplicação não rodam)
+from app.cli import main as cli_main
+cli_main(["prepare"])
+
 # Importar a aplicação
 from app.main import app
 